@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# aprovacoes.py - Gestores concorrentes decidindo as mesmas solicitações em várias réplicas (compare-and-set)
+#
+# Uso:
+#   python benchmarks/aprovacoes.py                                    # 200 gestores, 2 réplicas, 50 solicitações
+#   python benchmarks/aprovacoes.py --gestores 500 --replicas 4 --solicitacoes 20 --segundos 10
+#
+# Cada réplica é um RepositorioSolicitacoes próprio sobre o mesmo banco. Cada gestor
+# (uma thread, como uma sessão do app) repete: lê as alterações desde o seu cursor,
+# abre uma solicitação, "pensa" e decide com a versão que viu. Decisões sobre versão
+# desatualizada são recusadas (ConflitoVersao) e o gestor relê. No fim, confere que
+# nenhuma decisão gravada se perdeu: a versão de cada solicitação é 1 + as decisões aceitas.
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from viagens.armazenamento import ConflitoVersao, RepositorioSolicitacoes
+from viagens.simulacao import gerar_solicitacoes_em_massa, registros_de_lote
+
+
+def percentis(latencias: list) -> dict:
+    latencias = sorted(latencias)
+    return {"n": len(latencias), "p50_ms": statistics.median(latencias) * 1000,
+            "p99_ms": latencias[int(0.99 * (len(latencias) - 1))] * 1000, "max_ms": latencias[-1] * 1000}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Decisões concorrentes com controle de versão.")
+    parser.add_argument("--gestores", type=int, default=200, help="sessões simultâneas")
+    parser.add_argument("--replicas", type=int, default=2, help="repositórios (processos do app) sobre o mesmo banco")
+    parser.add_argument("--solicitacoes", type=int, default=50, help="solicitações disputadas")
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--pensar-ms", type=float, default=200, help="tempo máximo entre abrir e decidir")
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "viagens.db")
+        os.environ["VIAGENS_CAIXA_SAIDA"] = os.path.join(pasta, "caixa_saida")
+        replicas = [RepositorioSolicitacoes(caminho) for _ in range(args.replicas)]
+        replicas[0].inserir_lote(registros_de_lote(
+            gerar_solicitacoes_em_massa(args.solicitacoes).assign(aprovacao="Pendente")))
+        ids = [l["id"] for l in replicas[0].listar_resumo()]
+        # Consultas da janela de alterações ao banco, por réplica (o resto das leituras sai da memória)
+        consultas = Counter()
+        for i, repo in enumerate(replicas):
+            ler = repo._janela._ler_apos
+            repo._janela._ler_apos = lambda apos, ler=ler, i=i: (consultas.update([i]), ler(apos))[1]
+
+        trava = threading.Lock()
+        lat = {"alteracoes_desde": [], "obter": [], "decisao": []}
+        aceitas, recusadas, alteracoes_vistas = Counter(), [0], [0]
+        fim = time.monotonic() + args.segundos
+
+        def gestor(n: int):
+            repo = replicas[n % len(replicas)]
+            aleatorio = random.Random(n)
+            cursor = repo.ultima_alteracao()
+            medidas = {k: [] for k in lat}
+            minhas, recusas, vistas = Counter(), 0, 0
+            while time.monotonic() < fim:
+                t = time.perf_counter()
+                novas, cursor = repo.alteracoes_desde(cursor)
+                medidas["alteracoes_desde"].append(time.perf_counter() - t)
+                vistas += len(novas or ())
+                t = time.perf_counter()
+                solic = repo.obter(aleatorio.choice(ids))
+                medidas["obter"].append(time.perf_counter() - t)
+                time.sleep(aleatorio.random() * args.pensar_ms / 1000)
+                t = time.perf_counter()
+                try:
+                    repo.registrar_decisao(solic["id"], aleatorio.choice(["Aprovado ✅", "Reprovado ❌"]),
+                                           f"gestor {n}", solic["versao"])
+                    minhas[solic["id"]] += 1
+                except ConflitoVersao:
+                    recusas += 1
+                medidas["decisao"].append(time.perf_counter() - t)
+            with trava:
+                for k, v in medidas.items():
+                    lat[k] += v
+                aceitas.update(minhas)
+                recusadas[0] += recusas
+                alteracoes_vistas[0] += vistas
+
+        threads = [threading.Thread(target=gestor, args=(n,)) for n in range(args.gestores)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - t0
+
+        versoes = {l["id"]: l["versao"] for l in replicas[0].pagina_resumo(0, len(ids))}
+        perdidas = sum(versoes[i] - 1 != aceitas[i] for i in ids)
+        resultados = {
+            "duracao_s": duracao,
+            "decisoes_aceitas": sum(aceitas.values()),
+            "decisoes_recusadas": recusadas[0],
+            "solicitacoes_com_perda": perdidas,
+            "alteracoes_recebidas": alteracoes_vistas[0],
+            "consultas_janela_por_replica": dict(consultas),
+            **{k: percentis(v) for k, v in lat.items()},
+        }
+
+    print(f"{args.gestores} gestores em {args.replicas} réplicas, {args.solicitacoes} solicitações, "
+          f"{duracao:.1f} s", file=sys.stderr)
+    for k in lat:
+        r = resultados[k]
+        print(f"{k:<17} n={r['n']:<7} p50 {r['p50_ms']:7.2f} ms  p99 {r['p99_ms']:7.2f} ms  max {r['max_ms']:7.1f} ms",
+              file=sys.stderr)
+    print(f"decisões aceitas {resultados['decisoes_aceitas']}, recusadas por versão desatualizada "
+          f"{resultados['decisoes_recusadas']} (sem controle de versão, sobrescreveriam outra decisão em silêncio); "
+          f"solicitações com decisão perdida: {perdidas}; consultas da janela ao banco por réplica: "
+          f"{dict(consultas)}", file=sys.stderr)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"parametros": vars(args), "resultados": resultados}, f, ensure_ascii=False, indent=2)
+    return 1 if perdidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# duble_skyscanner.py - Dublê local da API de voos da Skyscanner (Indicative e Live Search) para testes de carga offline
+#
+# Uso:
+#   python benchmarks/duble_skyscanner.py --porta 8765 --latencia-ms 80 --jitter-ms 40 --taxa-erro 0.05 --limite-rps 50
+#   VIAGENS_SKYSCANNER_URL=http://127.0.0.1:8765/apiservices/v3/flights streamlit run "Protótipo ... (1).py"
+#
+# Endpoints (mesmos caminhos da API real, sob /apiservices/v3/flights):
+#   POST /indicative/search           resposta gravada (benchmarks/payloads/indicative_<O>_<D>.json)
+#   POST /live/search/create          primeiro lote de itinerários + sessionToken, status incompleto
+#   POST /live/search/poll/{token}    lotes cumulativos; o último vem com RESULT_STATUS_COMPLETE
+# Rotas sem gravação própria usam a de FOR → GRU. Falhas injetadas: status_erro (503)
+# com probabilidade taxa_erro e HTTP 429 (com Retry-After) acima de limite_rps.
+import argparse
+import json
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PASTA_PAYLOADS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+PREFIXO = "/apiservices/v3/flights"
+ROTA_PADRAO = ("FOR", "GRU")
+STATUS_INCOMPLETO = "RESULT_STATUS_INCOMPLETE"
+STATUS_COMPLETO = "RESULT_STATUS_COMPLETE"
+MAX_SESSOES_LIVE = 10_000
+
+
+@dataclass
+class ConfiguracaoDuble:
+    latencia_s: float = 0.05          # atraso de cada resposta
+    jitter_s: float = 0.0             # + uniforme em [0, jitter_s]
+    taxa_erro: float = 0.0            # probabilidade de responder status_erro
+    status_erro: int = 503
+    limite_rps: float = 0.0           # 0 = sem limite; acima dele, HTTP 429
+    retry_after_s: float = 1.0        # valor do cabeçalho Retry-After nas respostas 429
+    polls_live: int = 3               # polls até o status completo (cada um traz mais itinerários)
+    semente: int = 42                 # falhas e jitter reprodutíveis
+    pasta_payloads: str = PASTA_PAYLOADS
+
+
+class _Balde:
+    """Token bucket: limite_rps requisições por segundo, rajada de até um segundo."""
+
+    def __init__(self, taxa: float):
+        self.taxa = taxa
+        self.tokens = taxa
+        self.atualizado = time.monotonic()
+        self.trava = threading.Lock()
+
+    def consumir(self) -> bool:
+        with self.trava:
+            agora = time.monotonic()
+            self.tokens = min(self.taxa, self.tokens + (agora - self.atualizado) * self.taxa)
+            self.atualizado = agora
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class DubleSkyscanner(ThreadingHTTPServer):
+    """Servidor do dublê; `url` é a base a passar em url_base/VIAGENS_SKYSCANNER_URL."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, endereco: tuple = ("127.0.0.1", 0), config: ConfiguracaoDuble | None = None):
+        super().__init__(endereco, _Manipulador)
+        self.config = config or ConfiguracaoDuble()
+        self._aleatorio = random.Random(self.config.semente)
+        self._balde = _Balde(self.config.limite_rps) if self.config.limite_rps > 0 else None
+        self._payloads = {}
+        self._sessoes = OrderedDict()  # token -> (payload completo, polls feitos)
+        self._trava = threading.Lock()
+        self.contadores = {"requisicoes": 0, "erros_injetados": 0, "limitadas": 0}
+
+    @property
+    def url(self) -> str:
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}{PREFIXO}"
+
+    def iniciar(self) -> "DubleSkyscanner":
+        """Atende numa thread de fundo (para uso dentro de benchmarks)."""
+        threading.Thread(target=self.serve_forever, name="duble-skyscanner", daemon=True).start()
+        return self
+
+    # -----------------------------------------------------
+    # Falhas e latência
+    # -----------------------------------------------------
+    def sortear_falha(self) -> int | None:
+        """Status de falha a injetar nesta requisição (429 ou status_erro) ou None."""
+        with self._trava:
+            self.contadores["requisicoes"] += 1
+            if self._balde and not self._balde.consumir():
+                self.contadores["limitadas"] += 1
+                return 429
+            if self._aleatorio.random() < self.config.taxa_erro:
+                self.contadores["erros_injetados"] += 1
+                return self.config.status_erro
+            return None
+
+    def atraso(self) -> float:
+        with self._trava:
+            return self.config.latencia_s + self._aleatorio.uniform(0, self.config.jitter_s)
+
+    # -----------------------------------------------------
+    # Gravações
+    # -----------------------------------------------------
+    def payload(self, tipo: str, origem: str, destino: str) -> dict:
+        """Resposta gravada da rota (tipo: 'indicative' ou 'live_poll'), com fallback para FOR → GRU."""
+        chave = (tipo, origem, destino)
+        if chave not in self._payloads:
+            caminho = os.path.join(self.config.pasta_payloads, f"{tipo}_{origem}_{destino}.json")
+            if not os.path.exists(caminho):
+                caminho = os.path.join(self.config.pasta_payloads, f"{tipo}_{ROTA_PADRAO[0]}_{ROTA_PADRAO[1]}.json")
+            with open(caminho, encoding="utf-8") as f:
+                self._payloads[chave] = json.load(f)
+        return self._payloads[chave]
+
+    def abrir_sessao_live(self, payload: dict) -> str:
+        token = secrets.token_urlsafe(8)
+        with self._trava:
+            self._sessoes[token] = (payload, 0)
+            while len(self._sessoes) > MAX_SESSOES_LIVE:
+                self._sessoes.popitem(last=False)
+        return token
+
+    def avancar_sessao_live(self, token: str) -> dict | None:
+        """Próximo lote cumulativo da sessão (None se o token não existir)."""
+        with self._trava:
+            if token not in self._sessoes:
+                return None
+            payload, polls = self._sessoes[token]
+            polls = min(polls + 1, self.config.polls_live)
+            self._sessoes[token] = (payload, polls)
+        return lote_live(payload, token, polls, self.config.polls_live)
+
+
+def lote_live(payload: dict, token: str, etapa: int, etapas: int) -> dict:
+    """Resposta do Live Search na etapa (0 = create): fração cumulativa dos itinerários gravados."""
+    resultados = payload["content"]["results"]
+    itinerarios = list(resultados["itineraries"].items())
+    n = len(itinerarios) if etapa >= etapas else max(1, len(itinerarios) * (etapa + 1) // (etapas + 1))
+    return {
+        "sessionToken": token,
+        "status": STATUS_COMPLETO if etapa >= etapas else STATUS_INCOMPLETO,
+        "action": "RESULT_ACTION_REPLACED",
+        "content": {"results": {**resultados, "itineraries": dict(itinerarios[:n])}},
+    }
+
+
+def _rota(corpo: dict) -> tuple:
+    consulta = corpo.get("query", {})
+    trecho = (consulta.get("queryLegs") or [consulta])[0]
+    return trecho.get("originPlace", {}).get("iata", ""), trecho.get("destinationPlace", {}).get("iata", "")
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _responder(self, status: int, corpo: dict, cabecalhos: dict | None = None):
+        dados = json.dumps(corpo).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_POST(self):
+        servidor = self.server
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        try:
+            corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        except ValueError:
+            self._responder(400, {"message": "invalid JSON"})
+            return
+        time.sleep(servidor.atraso())
+        falha = servidor.sortear_falha()
+        if falha == 429:
+            self._responder(429, {"message": "rate limit exceeded"},
+                            {"Retry-After": f"{servidor.config.retry_after_s:g}"})
+            return
+        if falha:
+            self._responder(falha, {"message": "injected error"})
+            return
+
+        caminho = self.path.split("?")[0]
+        if caminho == f"{PREFIXO}/indicative/search":
+            self._responder(200, servidor.payload("indicative", *_rota(corpo)))
+        elif caminho == f"{PREFIXO}/live/search/create":
+            payload = servidor.payload("live_poll", *_rota(corpo))
+            token = servidor.abrir_sessao_live(payload)
+            self._responder(200, lote_live(payload, token, 0, servidor.config.polls_live))
+        elif caminho.startswith(f"{PREFIXO}/live/search/poll/"):
+            resposta = servidor.avancar_sessao_live(caminho.rsplit("/", 1)[-1])
+            if resposta is None:
+                self._responder(404, {"message": "session not found"})
+            else:
+                self._responder(200, resposta)
+        else:
+            self._responder(404, {"message": "not found"})
+
+    def log_message(self, *args):
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Dublê local da API de voos da Skyscanner.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="probabilidade de erro injetado (0 a 1)")
+    parser.add_argument("--status-erro", type=int, default=503, help="status HTTP do erro injetado")
+    parser.add_argument("--limite-rps", type=float, default=0.0, help="requisições/s antes de HTTP 429 (0 = sem)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After (s) nas respostas 429")
+    parser.add_argument("--polls-live", type=int, default=3, help="polls até o Live Search completar")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--payloads", default=PASTA_PAYLOADS, help="pasta com as respostas gravadas")
+    args = parser.parse_args(argv)
+
+    config = ConfiguracaoDuble(args.latencia_ms / 1000, args.jitter_ms / 1000, args.taxa_erro, args.status_erro,
+                               args.limite_rps, args.retry_after, args.polls_live, args.semente, args.payloads)
+    with DubleSkyscanner((args.host, args.porta), config) as servidor:
+        print(f"Dublê da Skyscanner em {servidor.url}", file=sys.stderr)
+        print(f"  export VIAGENS_SKYSCANNER_URL={servidor.url}", file=sys.stderr)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# executar.py - Benchmarks offline dos caminhos críticos (política, preços, dashboard, voucher)
+#
+# Uso:
+#   python benchmarks/executar.py                          # 1k, 100k e 1M solicitações
+#   python benchmarks/executar.py --tamanhos 1000 100000 --saida base.json
+#   python benchmarks/executar.py --comparar base.json     # falha (exit 1) se houver regressão
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+import pandas as pd
+
+from viagens.aeroportos import resolvedor
+from viagens.colunar import SolicitacoesColunares
+from viagens.dashboard import ticket_medio, top_trechos, trecho_mais_caro, violacoes_por
+from viagens.folha_ajuda import lancamentos_ajuda
+from viagens.historico_tarifas import HistoricoTarifas
+from viagens.politicas import (
+    calcular_ajuda_custo, classificar_lote, classificar_solicitacao, sugerir_reducao_custos,
+)
+from viagens.simulacao import gerar_solicitacoes_em_massa, registros_de_lote, simula_hoteis, simula_voos
+from viagens.skyscanner import extrair_voos, parse_indicative
+from viagens.voucher import gerar_voucher_html
+
+PASTA_PAYLOADS = os.path.join(RAIZ, "benchmarks", "payloads")
+SAIDA_PADRAO = os.path.join(RAIZ, "benchmarks", "resultados", "ultimo.json")
+TAMANHOS_PADRAO = [1_000, 100_000, 1_000_000]
+TAMANHO_AMOSTRA = 10_000  # registros distintos reutilizados ciclicamente nos casos escalares
+DATA_BASE = date(2026, 1, 1)  # fixa, para os dados sintéticos serem iguais entre execuções
+RUIDO_MINIMO_S = 0.01  # abaixo disso a variação é ruído e não conta como regressão
+
+
+# =========================================================
+# Preparação dos dados (fora da medição)
+# =========================================================
+class Dados:
+    """Dados sintéticos de um tamanho, gerados sob demanda e reaproveitados entre casos."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self._df = None
+        self._df_app = None
+        self._amostra = None
+        self._opcoes = None
+        self._historico = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            self._df = gerar_solicitacoes_em_massa(self.n, data_base=DATA_BASE)
+        return self._df
+
+    @property
+    def df_app(self) -> pd.DataFrame:
+        """Como o dashboard recebe os dados: colunas de texto comuns (não categóricas)."""
+        if self._df_app is None:
+            df = self.df
+            self._df_app = df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+        return self._df_app
+
+    @property
+    def amostra(self) -> list:
+        if self._amostra is None:
+            self._amostra = list(registros_de_lote(self.df.head(TAMANHO_AMOSTRA)))
+        return self._amostra
+
+    @property
+    def opcoes(self) -> list:
+        """Conjuntos (voos_ida, voos_volta, hoteis, cargo) para sugerir_reducao_custos."""
+        if self._opcoes is None:
+            self._opcoes = []
+            for r in self.amostra[:500]:
+                ida, volta = simula_voos(r["origem"], r["destino"],
+                                         date.fromisoformat(r["data_ida"]), date.fromisoformat(r["data_volta"]))
+                self._opcoes.append((ida, volta, simula_hoteis(r["destino"], r["dias_viagem"], r["cargo"]), r["cargo"]))
+        return self._opcoes
+
+
+    @property
+    def historico(self) -> HistoricoTarifas:
+        """Histórico de tarifas com os voos da amostra, cada um cotado na data de criação da solicitação."""
+        if self._historico is None:
+            self._pasta_historico = tempfile.TemporaryDirectory()
+            self._historico = HistoricoTarifas(os.path.join(self._pasta_historico.name, "tarifas.db"),
+                                               amostras_minimas=1)
+            por_dia = {}
+            for r in self.amostra:
+                por_dia.setdefault(r["criado_em"][:10], []).extend([
+                    (r["origem"], r["destino"], r["data_ida"], [r["voo_ida"]]),
+                    (r["destino"], r["origem"], r["data_volta"], [r["voo_volta"]])])
+            for dia, trechos in por_dia.items():
+                self._historico.registrar("simulado", trechos, datetime.fromisoformat(dia))
+        return self._historico
+
+
+def _carregar_payload(nome: str) -> dict:
+    with open(os.path.join(PASTA_PAYLOADS, nome), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# =========================================================
+# Casos: cada um recebe Dados e devolve a função medida (sem argumentos)
+# =========================================================
+def caso_classificar_solicitacao(d: Dados):
+    amostra, n = d.amostra, d.n
+    antecedencias = [(date.fromisoformat(r["data_ida"]) - date.fromisoformat(r["criado_em"][:10])).days
+                     for r in amostra]
+
+    def rodar():
+        m = len(amostra)
+        for i in range(n):
+            r = amostra[i % m]
+            classificar_solicitacao(antecedencias[i % m], r["voo_ida"], r["voo_volta"], r["hotel"], r["cargo"])
+    return rodar
+
+
+def caso_classificar_lote(d: Dados):
+    df = d.df
+    return lambda: classificar_lote(df)
+
+
+def caso_sugerir_reducao_custos(d: Dados):
+    opcoes, n = d.opcoes, d.n
+
+    def rodar():
+        m = len(opcoes)
+        for i in range(n):
+            sugerir_reducao_custos(*opcoes[i % m])
+    return rodar
+
+
+def caso_calcular_ajuda_custo(d: Dados):
+    cargos = d.df["cargo"].to_numpy(dtype=object).tolist()
+    dias = d.df["dias_viagem"].tolist()
+
+    def rodar():
+        for cargo, dv in zip(cargos, dias):
+            calcular_ajuda_custo(cargo, dv)
+    return rodar
+
+
+def caso_gerar_voucher_html(d: Dados):
+    amostra, n = d.amostra, d.n
+
+    def rodar():
+        m = len(amostra)
+        for i in range(n):
+            gerar_voucher_html(amostra[i % m])
+    return rodar
+
+
+def caso_dashboard_ticket_medio(d: Dados):
+    df = d.df_app
+    return lambda: (ticket_medio(df, "area"), ticket_medio(df, "cargo"))
+
+
+def caso_dashboard_violacoes(d: Dados):
+    df = d.df_app
+    return lambda: (violacoes_por(df, "area"), violacoes_por(df, "cargo"))
+
+
+def caso_dashboard_top_trechos(d: Dados):
+    df = d.df_app
+    return lambda: top_trechos(df).head(5)
+
+
+def caso_dashboard_trecho_mais_caro(d: Dados):
+    df = d.df_app
+    return lambda: trecho_mais_caro(df)
+
+
+def caso_colunar_estender(d: Dados):
+    """Carga de n registros do app no armazenamento colunar (tempo e pico de memória)."""
+    amostra, n = d.amostra, d.n
+
+    def rodar():
+        m = len(amostra)
+        SolicitacoesColunares().estender(amostra[i % m] for i in range(n))
+    return rodar
+
+
+def caso_parse_indicative(d: Dados):
+    """Uma resposta Indicative gravada por solicitação."""
+    payload, n = _carregar_payload("indicative_FOR_GRU.json"), d.n
+
+    def rodar():
+        for _ in range(n):
+            parse_indicative(payload, "FOR → GRU", "2026-11-10")
+    return rodar
+
+
+def caso_extrair_voos_live(d: Dados):
+    """Resposta completa do Live Search (180 itinerários), uma a cada 100 solicitações."""
+    payload, n = _carregar_payload("live_poll_FOR_GRU.json"), d.n
+
+    def rodar():
+        for _ in range(max(1, n // 100)):
+            extrair_voos(payload, "FOR → GRU", "2026-11-10", limite=None)
+    return rodar
+
+
+def caso_folha_ajuda(d: Dados):
+    """Rateio mensal da ajuda de custo das n viagens (calendário de feriados, uma linha por viagem e mês)."""
+    df = d.df
+    viagens = pd.DataFrame({"id": np.arange(d.n), "colaborador": df["colaborador"], "area": df["area"],
+                            "cargo": df["cargo"], "data_ida": df["data_ida"], "data_volta": df["data_volta"]})
+    return lambda: lancamentos_ajuda(viagens)
+
+
+def caso_historico_tarifas_registrar(d: Dados):
+    """Uma busca (ida e volta, 4 opções cada) gravada no histórico a cada 100 solicitações."""
+    amostra, opcoes, n = d.amostra, d.opcoes, d.n
+    inicio = datetime.combine(DATA_BASE, datetime.min.time()) - timedelta(days=500)
+
+    def rodar():
+        with tempfile.TemporaryDirectory() as pasta:
+            historico = HistoricoTarifas(os.path.join(pasta, "tarifas.db"))
+            for i in range(max(1, n // 100)):
+                r, (ida, volta, _, _) = amostra[i % len(opcoes)], opcoes[i % len(opcoes)]
+                historico.registrar_busca("simulado", r["origem"], r["destino"], r["data_ida"], r["data_volta"],
+                                          ida, volta, inicio + timedelta(hours=i))
+    return rodar
+
+
+def caso_historico_tarifas_comparar(d: Dados):
+    """Cotação de ida comparada aos percentis da rota e antecedência, por solicitação."""
+    historico, amostra, n = d.historico, d.amostra, d.n
+    hojes = [date.fromisoformat(r["criado_em"][:10]) for r in amostra]
+
+    def rodar():
+        m = len(amostra)
+        for i in range(n):
+            historico.comparar(amostra[i % m]["voo_ida"], hojes[i % m])
+    return rodar
+
+
+def caso_aeroportos_sugerir(d: Dados):
+    """Autocompletar da cidade de destino (uma tecla por solicitação) e, a cada 100, um texto com erro de digitação."""
+    r, amostra, n = resolvedor(), d.amostra, d.n
+    cidades = [r.local(a["destino"]).cidade for a in amostra]
+    # Duas letras trocadas: "Fortaleza" -> "Foratleza"
+    prefixos = [c[:1 + i % len(c)] for i, c in enumerate(cidades)]
+    erros = [c[:3] + c[4] + c[3] + c[5:] if len(c) > 5 else c for c in cidades]
+
+    def rodar():
+        m = len(amostra)
+        for i in range(n):
+            r.sugerir(prefixos[i % m])
+        for i in range(max(1, n // 100)):
+            r.sugerir(erros[i % m])
+    return rodar
+
+
+CASOS = {
+    "classificar_solicitacao": caso_classificar_solicitacao,
+    "classificar_lote": caso_classificar_lote,
+    "sugerir_reducao_custos": caso_sugerir_reducao_custos,
+    "calcular_ajuda_custo": caso_calcular_ajuda_custo,
+    "gerar_voucher_html": caso_gerar_voucher_html,
+    "dashboard_ticket_medio": caso_dashboard_ticket_medio,
+    "dashboard_violacoes": caso_dashboard_violacoes,
+    "dashboard_top_trechos": caso_dashboard_top_trechos,
+    "dashboard_trecho_mais_caro": caso_dashboard_trecho_mais_caro,
+    "colunar_estender": caso_colunar_estender,
+    "parse_indicative": caso_parse_indicative,
+    "extrair_voos_live": caso_extrair_voos_live,
+    "folha_ajuda": caso_folha_ajuda,
+    "historico_tarifas_registrar": caso_historico_tarifas_registrar,
+    "historico_tarifas_comparar": caso_historico_tarifas_comparar,
+    "aeroportos_sugerir": caso_aeroportos_sugerir,
+}
+
+
+# =========================================================
+# Medição e comparação
+# =========================================================
+def medir(funcao, repeticoes: int, memoria: bool) -> dict:
+    """Melhor tempo entre as repetições e, numa execução à parte, o pico de memória (tracemalloc)."""
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    resultado = {"segundos": min(tempos), "segundos_mediana": float(np.median(tempos))}
+    if memoria:
+        tracemalloc.start()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultado["pico_memoria_mb"] = pico / 2**20
+    return resultado
+
+
+def executar(tamanhos: list, casos: list, repeticoes: int, memoria: bool) -> dict:
+    resultados = []
+    for n in tamanhos:
+        dados = Dados(n)
+        for nome in casos:
+            funcao = CASOS[nome](dados)
+            medida = medir(funcao, repeticoes, memoria)
+            resultados.append({"caso": nome, "n": n, **medida})
+            mem = f"{medida['pico_memoria_mb']:9.1f} MB" if memoria else ""
+            print(f"{nome:<28} n={n:<9} {medida['segundos']:9.4f} s {mem}", file=sys.stderr)
+    return {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "plataforma": platform.platform(),
+            "repeticoes": repeticoes,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> list:
+    """Lista de regressões: casos (caso, n) cujo tempo cresceu mais que a tolerância."""
+    tempos_base = {(r["caso"], r["n"]): r["segundos"] for r in base["resultados"]}
+    regressoes = []
+    for r in atual["resultados"]:
+        anterior = tempos_base.get((r["caso"], r["n"]))
+        if not anterior:
+            continue
+        razao = r["segundos"] / anterior
+        marca = "REGRESSÃO" if razao > 1 + tolerancia and r["segundos"] >= RUIDO_MINIMO_S else ""
+        print(f"{r['caso']:<28} n={r['n']:<9} {anterior:9.4f} s -> {r['segundos']:9.4f} s  x{razao:5.2f} {marca}",
+              file=sys.stderr)
+        if marca:
+            regressoes.append({"caso": r["caso"], "n": r["n"], "razao": razao})
+    return regressoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks offline da gestão de viagens.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--casos", nargs="+", choices=sorted(CASOS), default=list(CASOS))
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória")
+    parser.add_argument("--saida", default=SAIDA_PADRAO, help="arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="aumento relativo tolerado (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    resultado = executar(args.tamanhos, args.casos, args.repeticoes, not args.sem_memoria)
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {args.saida}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(resultado, base, args.tolerancia)
+        if regressoes:
+            print(f"{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}.", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# inicializacao.py - Tempo de importação, primeira execução e reruns do app Streamlit (via AppTest, sem navegador)
+#
+# Uso:
+#   python benchmarks/inicializacao.py                              # app atual
+#   python benchmarks/inicializacao.py --app /tmp/app_antigo.py     # outra versão do ponto de entrada, para comparar
+#   git show <commit>:"Protótipo completo em Streamlit para gestão de viagens corporativas (1).py" > /tmp/app_antigo.py
+#
+# Cada medição de partida roda num interpretador novo (nada em sys.modules); o banco
+# é um SQLite temporário com solicitações sintéticas, para as páginas terem dados.
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+APP_PADRAO = os.path.join(RAIZ, "Protótipo completo em Streamlit para gestão de viagens corporativas (1).py")
+PAGINAS = ["Nova solicitação", "Workflow de aprovação", "Dashboard gerencial"]
+# Módulos pesados ou de integração: presença em sys.modules após a primeira execução (fonte "Simulado")
+MODULOS_OBSERVADOS = ["requests", "viagens.skyscanner", "altair", "pyarrow", "viagens.importacao"]
+SOLICITACOES_PADRAO = 2_000
+DATA_BASE = date(2026, 1, 1)
+
+
+def _preparar_banco(caminho: str, n: int):
+    from viagens.armazenamento import RepositorioSolicitacoes
+    from viagens.simulacao import gerar_solicitacoes_em_massa, registros_de_lote
+    RepositorioSolicitacoes(caminho).inserir_lote(registros_de_lote(gerar_solicitacoes_em_massa(n, data_base=DATA_BASE)))
+
+
+# =========================================================
+# Processo filho: uma partida a frio + reruns
+# =========================================================
+def _importar_entrada(app: str) -> float:
+    """Executa só os imports de nível de módulo do ponto de entrada; devolve o tempo gasto."""
+    with open(app, encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    imports = ast.Module([n for n in arvore.body if isinstance(n, (ast.Import, ast.ImportFrom))], type_ignores=[])
+    t0 = time.perf_counter()
+    exec(compile(imports, app, "exec"), {})
+    return time.perf_counter() - t0
+
+
+def _filho(app: str, reruns: int) -> dict:
+    from streamlit.testing.v1 import AppTest  # já carrega o framework, que fica fora da medição
+
+    importacao = _importar_entrada(app)
+    at = AppTest.from_file(app, default_timeout=120)
+    t0 = time.perf_counter()
+    at.run()
+    primeira = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(f"Falha na primeira execução: {at.exception}")
+    carregados = [m for m in MODULOS_OBSERVADOS if m in sys.modules]
+
+    tempos = {}
+    for pagina in PAGINAS:
+        at.sidebar.radio[0].set_value(pagina).run()  # aquecimento: primeira visita importa a página
+        medidos = []
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            at.run()
+            medidos.append(time.perf_counter() - t0)
+        tempos[pagina] = statistics.median(medidos)
+    return {"importacao_entrada_s": importacao, "primeira_execucao_s": primeira,
+            "modulos_carregados": carregados, "rerun_mediana_s": tempos}
+
+
+# =========================================================
+# Processo principal
+# =========================================================
+def executar(app: str, partidas: int, reruns: int, n_solicitacoes: int) -> dict:
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = os.path.join(pasta, "viagens.db")
+        _preparar_banco(banco, n_solicitacoes)
+        ambiente = {**os.environ, "VIAGENS_DB": banco, "PYTHONPATH": RAIZ}
+        medidas = []
+        for _ in range(partidas):
+            saida = subprocess.run([sys.executable, __file__, "--filho", "--app", app, "--reruns", str(reruns)],
+                                   cwd=pasta, env=ambiente, capture_output=True, text=True, check=True)
+            medidas.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    # Partidas a frio: melhor entre as repetições; reruns: mediana das medianas
+    return {
+        "app": app,
+        "importacao_entrada_s": min(m["importacao_entrada_s"] for m in medidas),
+        "primeira_execucao_s": min(m["primeira_execucao_s"] for m in medidas),
+        "modulos_carregados": medidas[0]["modulos_carregados"],
+        "rerun_mediana_s": {p: statistics.median(m["rerun_mediana_s"][p] for m in medidas) for p in PAGINAS},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Partida a frio e reruns do app Streamlit.")
+    parser.add_argument("--app", default=APP_PADRAO, help="ponto de entrada a medir")
+    parser.add_argument("--partidas", type=int, default=3, help="partidas a frio (processos novos)")
+    parser.add_argument("--reruns", type=int, default=10, help="reruns medidos por página")
+    parser.add_argument("--solicitacoes", type=int, default=SOLICITACOES_PADRAO)
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.filho:
+        print(json.dumps(_filho(args.app, args.reruns)))
+        return 0
+
+    resultado = executar(os.path.abspath(args.app), args.partidas, args.reruns, args.solicitacoes)
+    print(f"{'imports do ponto de entrada':<32} {resultado['importacao_entrada_s']:8.3f} s", file=sys.stderr)
+    print(f"{'primeira execução':<32} {resultado['primeira_execucao_s']:8.3f} s", file=sys.stderr)
+    print(f"{'módulos carregados (Simulado)':<32} {', '.join(resultado['modulos_carregados']) or '—'}", file=sys.stderr)
+    for pagina, segundos in resultado["rerun_mediana_s"].items():
+        print(f"{'rerun ' + pagina:<32} {segundos * 1000:8.1f} ms", file=sys.stderr)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
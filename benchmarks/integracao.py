@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# integracao.py - Cenários da integração Skyscanner contra o dublê local: latência, Live Search parcial, erros, limite de requisições e prazo
+#
+# Uso:
+#   python benchmarks/integracao.py                         # 40 buscas por cenário, 4 simultâneas
+#   python benchmarks/integracao.py --buscas 200 --paralelo 16 --saida integracao.json
+#
+# Cada cenário sobe um dublê com a sua configuração (benchmarks/duble_skyscanner.py)
+# e faz buscas de ida e volta com datas distintas, exceto "cache quente", que repete
+# as do cenário anterior. Reporta vazão, latência, trechos incompletos (Live Search
+# interrompido com parciais), trechos simulados (falha sem resultado) e taxa de
+# acerto do cache de tarifas.
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.duble_skyscanner import ConfiguracaoDuble, DubleSkyscanner
+from viagens.skyscanner import buscar_voos_indicative, buscar_voos_live, cache_tarifas
+
+ROTAS = [("FOR", "GRU"), ("GRU", "SDU"), ("BSB", "CNF"), ("REC", "POA"), ("SSA", "CWB")]
+DATA_BASE = date.today() + timedelta(days=30)
+
+# (nome, fonte, configuração do dublê, prazo_s da busca, repete as datas do cenário anterior)
+CENARIOS = [
+    ("indicative", "indicative", ConfiguracaoDuble(latencia_s=0.05, jitter_s=0.05), None, False),
+    ("cache quente", "indicative", ConfiguracaoDuble(latencia_s=0.05, jitter_s=0.05), None, True),
+    ("live parcial", "live", ConfiguracaoDuble(latencia_s=0.05, polls_live=3), None, False),
+    ("erros 20%", "indicative", ConfiguracaoDuble(latencia_s=0.05, taxa_erro=0.2), None, False),
+    ("limite 20 rps", "indicative", ConfiguracaoDuble(latencia_s=0.02, limite_rps=20, retry_after_s=0.5), None, False),
+    ("prazo estourado", "live", ConfiguracaoDuble(latencia_s=0.3, polls_live=5), 1.0, False),
+]
+
+
+def buscar(fonte: str, url: str, origem: str, destino: str, ida: date, prazo_s) -> tuple:
+    """(segundos, avisos) de uma busca de ida e volta."""
+    avisos = []
+    funcao = buscar_voos_indicative if fonte == "indicative" else buscar_voos_live
+    t0 = time.perf_counter()
+    funcao(origem, destino, ida, ida + timedelta(days=3), aviso=avisos.append, url_base=url, prazo_s=prazo_s)
+    return time.perf_counter() - t0, avisos
+
+
+def medir_cenario(fonte: str, config: ConfiguracaoDuble, prazo_s, buscas: int, paralelo: int,
+                  deslocamento: int) -> dict:
+    with DubleSkyscanner(config=config) as duble:
+        duble.iniciar()
+        cache_antes = cache_tarifas().estatisticas()
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=paralelo) as executor:
+            medidas = list(executor.map(
+                lambda i: buscar(fonte, duble.url, *ROTAS[i % len(ROTAS)],
+                                 DATA_BASE + timedelta(days=deslocamento + i), prazo_s),
+                range(buscas)))
+        duracao = time.perf_counter() - t0
+        duble.shutdown()
+        cache_depois = cache_tarifas().estatisticas()
+    latencias = sorted(m[0] for m in medidas)
+    avisos = [a for m in medidas for a in m[1]]
+    acertos = (cache_depois["hits"] - cache_antes["hits"]) + (cache_depois["hits_disco"] - cache_antes["hits_disco"])
+    consultas = acertos + cache_depois["misses"] - cache_antes["misses"]
+    return {"segundos": duracao, "buscas_por_s": buscas / duracao,
+            "latencia_p50_ms": statistics.median(latencias) * 1000,
+            "latencia_p95_ms": latencias[int(0.95 * (len(latencias) - 1))] * 1000,
+            "trechos_incompletos": sum("incompleta" in a for a in avisos),
+            "trechos_simulados": sum("simulação" in a for a in avisos),
+            "taxa_acerto_cache": acertos / consultas if consultas else 0.0,
+            "duble": dict(duble.contadores)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cenários da integração Skyscanner contra o dublê local.")
+    parser.add_argument("--buscas", type=int, default=40, help="buscas (ida e volta) por cenário")
+    parser.add_argument("--paralelo", type=int, default=4, help="buscas simultâneas")
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    # Cache só em memória e vazio: o cenário "cache quente" mede apenas o que os anteriores gravaram
+    cache_tarifas.cache_clear()
+    os.environ.pop("VIAGENS_CACHE_TARIFAS", None)
+
+    resultados, deslocamento = [], 0
+    for nome, fonte, config, prazo_s, repetir in CENARIOS:
+        if repetir:
+            deslocamento -= args.buscas
+        medida = medir_cenario(fonte, config, prazo_s, args.buscas, args.paralelo, deslocamento)
+        deslocamento += args.buscas
+        resultados.append({"cenario": nome, "fonte": fonte, "buscas": args.buscas, **medida})
+        print(f"{nome:<16} {medida['buscas_por_s']:7.1f} buscas/s  p50 {medida['latencia_p50_ms']:7.1f} ms  "
+              f"p95 {medida['latencia_p95_ms']:7.1f} ms  incompletos={medida['trechos_incompletos']:<3} "
+              f"simulados={medida['trechos_simulados']:<3} cache={medida['taxa_acerto_cache']:.0%}  "
+              f"dublê={medida['duble']}", file=sys.stderr)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"paralelo": args.paralelo, "resultados": resultados}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
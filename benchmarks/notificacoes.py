@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# notificacoes.py - Latência da decisão do gestor com a caixa de saída vs. entrega síncrona, contra canais lentos
+#
+# Uso:
+#   python benchmarks/notificacoes.py                                  # 200 decisões, webhook com 300 ms e 20% de erro
+#   python benchmarks/notificacoes.py --decisoes 1000 --latencia-ms 800 --taxa-erro 0.3 --limite-webhook 20
+#
+# Sobe um dublê de webhook local (latência e erros configuráveis) e grava e-mails
+# como .eml numa pasta temporária. Mede a latência de registrar_decisao com o
+# entregador em segundo plano e, para comparação, entregando na própria chamada,
+# e quanto tempo o entregador leva para esvaziar a caixa de saída (com novas tentativas).
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from viagens import notificacoes
+from viagens.armazenamento import RepositorioSolicitacoes
+from viagens.notificacoes import CanalArquivo, CanalWebhook, EntregadorNotificacoes
+from viagens.simulacao import gerar_solicitacoes_em_massa, registros_de_lote
+
+
+def iniciar_webhook(latencia_s: float, taxa_erro: float) -> ThreadingHTTPServer:
+    aleatorio = random.Random(42)
+    trava = threading.Lock()
+
+    class Manipulador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(latencia_s)
+            with trava:
+                falhou = aleatorio.random() < taxa_erro
+            self.send_response(503 if falhou else 204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    class Servidor(ThreadingHTTPServer):
+        daemon_threads = True
+
+    servidor = Servidor(("127.0.0.1", 0), Manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def preparar_banco(pasta: str, n: int) -> tuple:
+    repo = RepositorioSolicitacoes(os.path.join(pasta, "viagens.db"))
+    repo.inserir_lote(registros_de_lote(gerar_solicitacoes_em_massa(n).assign(aprovacao="Pendente")))
+    return repo, [l["id"] for l in repo.listar_resumo()]
+
+
+def percentis(latencias: list) -> dict:
+    latencias = sorted(latencias)
+    return {"p50_ms": statistics.median(latencias) * 1000,
+            "p95_ms": latencias[int(0.95 * (len(latencias) - 1))] * 1000,
+            "max_ms": latencias[-1] * 1000}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Caixa de saída de notificações vs. entrega síncrona.")
+    parser.add_argument("--decisoes", type=int, default=200)
+    parser.add_argument("--latencia-ms", type=float, default=300, help="latência do dublê de webhook")
+    parser.add_argument("--taxa-erro", type=float, default=0.2, help="fração de respostas 503 do webhook")
+    parser.add_argument("--limite-webhook", type=float, default=50, help="mensagens/s no webhook")
+    parser.add_argument("--lote", type=int, default=notificacoes.TAMANHO_LOTE_PADRAO)
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    webhook = iniciar_webhook(args.latencia_ms / 1000, args.taxa_erro)
+    os.environ["VIAGENS_WEBHOOK_URL"] = f"http://127.0.0.1:{webhook.server_address[1]}/eventos"
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        canais = {"email": CanalArquivo(os.path.join(pasta, "caixa_saida")),
+                  "webhook": CanalWebhook(os.environ["VIAGENS_WEBHOOK_URL"], limite_por_s=args.limite_webhook)}
+        repo, ids = preparar_banco(pasta, 2 * args.decisoes)
+
+        # Caixa de saída: a decisão só grava; o entregador trabalha em paralelo
+        entregador = EntregadorNotificacoes(repo.caminho, canais, tamanho_lote=args.lote, intervalo_s=0.05,
+                                            espera_inicial_s=0.2).iniciar()
+        latencias = []
+        t0 = time.perf_counter()
+        for i, sol_id in enumerate(ids[:args.decisoes]):
+            inicio = time.perf_counter()
+            repo.registrar_decisao(sol_id, "Aprovado ✅" if i % 4 else "Reprovado ❌", "benchmark")
+            latencias.append(time.perf_counter() - inicio)
+        con = repo._conexao()
+        pendentes = lambda: con.execute("SELECT COUNT(*) FROM notificacoes WHERE situacao = 'pendente'").fetchone()[0]
+        while pendentes():
+            time.sleep(0.05)
+        drenagem = time.perf_counter() - t0
+        entregador.parar()
+        situacoes = {f"{r['canal']}_{r['situacao']}": r["quantidade"] for r in notificacoes.resumo(con)}
+        tentativas = con.execute("SELECT SUM(tentativas) FROM notificacoes WHERE situacao = 'enviada'").fetchone()[0]
+        resultados["caixa_saida"] = {**percentis(latencias), "drenagem_s": drenagem, **situacoes,
+                                     "novas_tentativas": tentativas}
+
+        # Comparação: entregar dentro da própria decisão (o que a página faria sem a caixa de saída)
+        latencias = []
+        for i, sol_id in enumerate(ids[args.decisoes:]):
+            inicio = time.perf_counter()
+            registro = repo.registrar_decisao(sol_id, "Aprovado ✅" if i % 4 else "Reprovado ❌", "benchmark")
+            mensagens = [{"id": n, "destinatario": d, "assunto": a, "corpo": c} for n, (d, a, c) in
+                         enumerate(notificacoes.mensagens_do_evento(notificacoes.EVENTO_DECISAO, registro))]
+            canais["email"].enviar(mensagens)
+            try:
+                canais["webhook"].enviar([{"id": 0, "corpo": json.dumps({"evento": "decisao", "id": sol_id})}])
+            except OSError:
+                pass
+            latencias.append(time.perf_counter() - inicio)
+        resultados["sincrono"] = percentis(latencias)
+    webhook.shutdown()
+
+    for nome, r in resultados.items():
+        print(f"{nome:<12} decisão p50 {r['p50_ms']:8.1f} ms  p95 {r['p95_ms']:8.1f} ms  max {r['max_ms']:8.1f} ms",
+              file=sys.stderr)
+    r = resultados["caixa_saida"]
+    print(f"caixa de saída esvaziada em {r['drenagem_s']:.1f} s; "
+          f"{ {k: v for k, v in r.items() if k.startswith(('email_', 'webhook_'))} }; "
+          f"novas tentativas: {r['novas_tentativas']}", file=sys.stderr)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"parametros": vars(args), "resultados": resultados}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
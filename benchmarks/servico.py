@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# servico.py - Vazão da cotação sem interface (biblioteca e API HTTP) contra um dublê local da Skyscanner
+#
+# Uso:
+#   python benchmarks/servico.py                                # 500 pedidos, fonte indicative, 50 ms de latência
+#   python benchmarks/servico.py --pedidos 2000 --latencia-ms 120 --paralelo 8 32 --saida servico.json
+#
+# O dublê (benchmarks/duble_skyscanner.py) responde com as respostas gravadas em
+# benchmarks/payloads/ após a latência configurada; nada sai da máquina. Cada
+# pedido usa uma data distinta, para não ser atendido pelo cache de tarifas.
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import requests
+
+from benchmarks.duble_skyscanner import ConfiguracaoDuble, DubleSkyscanner
+from viagens.api import ServidorCotacoes
+from viagens.servico import cotar_lote
+
+ROTAS = [("FOR", "GRU"), ("GRU", "SDU"), ("BSB", "CNF"), ("REC", "POA"), ("SSA", "CWB")]
+CARGOS = ["Analista", "Coordenador", "Gerente", "Diretor"]
+DATA_BASE = date.today() + timedelta(days=30)
+
+
+def gerar_pedidos(n: int, deslocamento: int) -> list:
+    """Pedidos com datas distintas (e distintas entre cenários, pelo deslocamento)."""
+    pedidos = []
+    for i in range(n):
+        origem, destino = ROTAS[i % len(ROTAS)]
+        ida = DATA_BASE + timedelta(days=deslocamento + i)
+        pedidos.append({"colaborador": f"Benchmark {i}", "area": "TI", "cargo": CARGOS[i % len(CARGOS)],
+                        "origem": origem, "destino": destino, "data_ida": str(ida),
+                        "data_volta": str(ida + timedelta(days=3)), "motivo": "benchmark"})
+    return pedidos
+
+
+# =========================================================
+# Cenários
+# =========================================================
+def medir_biblioteca(pedidos: list, fonte: str, paralelo: int) -> dict:
+    t0 = time.perf_counter()
+    resultados = cotar_lote(pedidos, fonte, paralelo)
+    duracao = time.perf_counter() - t0
+    return {"segundos": duracao, "pedidos_por_s": len(pedidos) / duracao,
+            "erros": sum("erro" in r for r in resultados)}
+
+
+def medir_http(pedidos: list, fonte: str, clientes: int, trabalhadores: int) -> dict:
+    """clientes threads, cada uma com sua sessão keep-alive, enviando um pedido por requisição."""
+    latencias, erros = [], 0
+    trava = threading.Lock()
+    with ServidorCotacoes(("127.0.0.1", 0), trabalhadores, fonte) as servidor:
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/cotacoes"
+        local = threading.local()
+
+        def enviar(pedido):
+            nonlocal erros
+            if not hasattr(local, "sessao"):
+                local.sessao = requests.Session()
+            sessao = local.sessao
+            t0 = time.perf_counter()
+            r = sessao.post(url, json=pedido, timeout=60)
+            duracao = time.perf_counter() - t0
+            with trava:
+                latencias.append(duracao)
+                erros += r.status_code != 200
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clientes) as executor:
+            list(executor.map(enviar, pedidos))
+        duracao = time.perf_counter() - t0
+        servidor.shutdown()
+    latencias.sort()
+    return {"segundos": duracao, "pedidos_por_s": len(pedidos) / duracao, "erros": erros,
+            "latencia_p50_ms": statistics.median(latencias) * 1000,
+            "latencia_p95_ms": latencias[int(0.95 * (len(latencias) - 1))] * 1000}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Vazão da cotação sem interface contra um dublê da Skyscanner.")
+    parser.add_argument("--pedidos", type=int, default=500)
+    parser.add_argument("--fonte", choices=["simulado", "indicative"], default="indicative")
+    parser.add_argument("--latencia-ms", type=float, default=50, help="latência do dublê por chamada")
+    parser.add_argument("--paralelo", type=int, nargs="+", default=[1, 8, 32],
+                        help="cotações simultâneas (biblioteca) e clientes simultâneos (HTTP)")
+    parser.add_argument("--trabalhadores", type=int, default=32, help="workers da API HTTP")
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    duble = DubleSkyscanner(config=ConfiguracaoDuble(latencia_s=args.latencia_ms / 1000)).iniciar()
+    os.environ["VIAGENS_SKYSCANNER_URL"] = duble.url
+
+    resultados, deslocamento = [], 0
+    for paralelo in args.paralelo:
+        for cenario in ("biblioteca", "http"):
+            pedidos = gerar_pedidos(args.pedidos, deslocamento)
+            deslocamento += args.pedidos
+            if cenario == "biblioteca":
+                medida = medir_biblioteca(pedidos, args.fonte, paralelo)
+            else:
+                medida = medir_http(pedidos, args.fonte, paralelo, args.trabalhadores)
+            resultados.append({"cenario": cenario, "paralelo": paralelo, "pedidos": args.pedidos, **medida})
+            extra = (f"  p50 {medida['latencia_p50_ms']:7.1f} ms  p95 {medida['latencia_p95_ms']:7.1f} ms"
+                     if cenario == "http" else "")
+            print(f"{cenario:<11} paralelo={paralelo:<4} {medida['pedidos_por_s']:8.1f} pedidos/s  "
+                  f"erros={medida['erros']}{extra}", file=sys.stderr)
+    duble.shutdown()
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"fonte": args.fonte, "latencia_ms": args.latencia_ms, "resultados": resultados},
+                      f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+# conftest.py - Fixtures compartilhadas dos testes (bancos temporários com solicitações e políticas)
+from datetime import date
+
+import pytest
+
+from viagens.armazenamento import RepositorioSolicitacoes
+from viagens.politicas import configurar_catalogo
+from viagens.politicas_versionadas import CatalogoPoliticas
+from viagens.simulacao import gerar_solicitacoes_em_massa, registros_de_lote
+
+DATA_BASE = date(2026, 1, 15)
+
+
+@pytest.fixture
+def caminho_banco(tmp_path) -> str:
+    return str(tmp_path / "viagens.db")
+
+
+@pytest.fixture
+def repo(caminho_banco) -> RepositorioSolicitacoes:
+    """Repositório com 20 solicitações pendentes (ids 1 a 20, versão 1)."""
+    repo = RepositorioSolicitacoes(caminho_banco)
+    df = gerar_solicitacoes_em_massa(20, data_base=DATA_BASE).assign(aprovacao="Pendente")
+    repo.inserir_lote(registros_de_lote(df))
+    return repo
+
+
+@pytest.fixture
+def catalogo(tmp_path):
+    """Catálogo de versões de política num banco temporário, ativo durante o teste."""
+    catalogo = CatalogoPoliticas(str(tmp_path / "politicas.db"), intervalo_recarga_s=0)
+    configurar_catalogo(catalogo)
+    yield catalogo
+    configurar_catalogo(None)
@@ -0,0 +1,73 @@
+# test_aeroportos.py - Resolução de aeroportos: acentos, erros de digitação, regiões metropolitanas e ambiguidade
+import pytest
+
+from viagens.aeroportos import ResolvedorAeroportos, expandir, normalizar, resolvedor, resolver_codigo
+
+
+@pytest.mark.parametrize("texto, codigo", [
+    ("GRU", "GRU"), (" gru ", "GRU"), ("Guarulhos", "GRU"),  # código e nome do aeroporto
+    ("Brasília", "BSB"), ("brasilia", "BSB"), ("FLORIANÓPOLIS", "FLN"),  # acentos e caixa
+    ("galeao", "GIG"), ("rio preto", "SJP"),  # palavra do meio do nome
+])
+def test_exatos_e_sem_acento(texto, codigo):
+    assert resolvedor().resolver(texto).codigo == codigo
+
+
+@pytest.mark.parametrize("texto, codigo", [
+    ("Recfie", "REC"), ("frotaleza", "FOR"),  # letras trocadas
+    ("Fortalesa", "FOR"), ("florianopols", "FLN"), ("guarulhso", "GRU"), ("Sao Palo", "SAO"),
+])
+def test_erros_de_digitacao(texto, codigo):
+    assert resolvedor().resolver(texto).codigo == codigo
+
+
+@pytest.mark.parametrize("texto, regiao, aeroportos", [
+    ("São Paulo", "SAO", ("GRU", "CGH", "VCP")), ("rio de janeiro", "RIO", ("GIG", "SDU")),
+    ("Belo Hor", "BHZ", ("CNF", "PLU")), ("nova york", "NYC", ("JFK", "EWR", "LGA")),
+])
+def test_cidade_com_varios_aeroportos_vira_regiao(texto, regiao, aeroportos):
+    local = resolvedor().resolver(texto)
+
+    assert local.codigo == regiao and set(aeroportos) <= set(local.aeroportos)
+    assert expandir(regiao) == local.aeroportos
+    assert [s.codigo for s in resolvedor().sugerir(texto)][0] == regiao  # a região vem antes dos aeroportos
+
+
+def test_ambiguo_ou_desconhecido():
+    assert resolvedor().resolver("cam") is None
+    assert len(resolvedor().sugerir("cam", limite=3)) == 3
+    assert resolvedor().resolver("qwerty") is None and resolvedor().sugerir("qwerty") == []
+    assert resolvedor().sugerir("   ") == []
+
+
+def test_resolver_codigo():
+    assert resolver_codigo("sao paulo") == "SAO"
+    assert resolver_codigo("ZZZ") == "ZZZ"  # código fora da base passa como está
+    with pytest.raises(ValueError, match="Sugestões: VCP"):
+        resolver_codigo("cam")
+    with pytest.raises(ValueError, match="não encontrado"):
+        resolver_codigo("qwerty")
+
+
+def test_expandir_aeroporto_e_codigo_desconhecido():
+    assert expandir("gru") == ("GRU",) and expandir("zzz") == ("ZZZ",)
+
+
+def test_normalizar():
+    assert normalizar("  São  JOSÉ-dos Campos ") == "sao jose dos campos"
+
+
+def test_base_propria_e_limite_de_erros():
+    base = [
+        {"iata": "AAA", "nome": "Aeroporto Alfa", "cidade": "Alfaville", "uf": "SP", "pais": "Brasil", "regiao": "ALF"},
+        {"iata": "AAB", "nome": "Aeroporto Beta", "cidade": "Alfaville", "uf": "SP", "pais": "Brasil", "regiao": "ALF"},
+        {"iata": "CCC", "nome": "Gama", "cidade": "Gamaburgo", "uf": "RJ", "pais": "Brasil", "regiao": ""},
+    ]
+    resolvedor_teste = ResolvedorAeroportos(base)
+
+    regiao = resolvedor_teste.resolver("alfaville")
+    assert (regiao.codigo, regiao.aeroportos) == ("ALF", ("AAA", "AAB"))
+    assert resolvedor_teste.resolver("gamaburgo").codigo == "CCC"
+    assert resolvedor_teste.sugerir("gmaaburgo", max_erros=0) == []
+    assert [l.codigo for l in resolvedor_teste.sugerir("gmaaburgo", max_erros=1)] == ["CCC"]
+    assert resolvedor_teste.sugerir("hamaburgo") == []  # a primeira letra precisa bater
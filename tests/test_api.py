@@ -0,0 +1,86 @@
+# test_api.py - API HTTP local: cotações, cabeçalhos inválidos e falhas das integrações viram respostas JSON
+import http.client
+import json
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from viagens import api
+from viagens.api import ServidorCotacoes
+
+
+def _pedido(**extra) -> dict:
+    ida = date.today() + timedelta(days=30)
+    return {"colaborador": "Ana", "cargo": "Analista", "origem": "GRU", "destino": "REC",
+            "data_ida": ida.isoformat(), "data_volta": (ida + timedelta(days=3)).isoformat(), **extra}
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorCotacoes(("127.0.0.1", 0), trabalhadores=2)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _post(servidor, corpo: bytes | None = None, cabecalhos: dict | None = None, caminho: str = "/cotacoes"):
+    """(status, JSON da resposta); cabeçalhos enviados como vieram, sem o Content-Length automático."""
+    con = http.client.HTTPConnection(*servidor.server_address, timeout=5)
+    try:
+        con.putrequest("POST", caminho)
+        for nome, valor in (cabecalhos or {"Content-Length": str(len(corpo or b""))}).items():
+            con.putheader(nome, valor)
+        con.endheaders(corpo)
+        resposta = con.getresponse()
+        return resposta.status, json.loads(resposta.read())
+    finally:
+        con.close()
+
+
+def test_cota_um_pedido_e_um_lote(servidor):
+    status, corpo = _post(servidor, json.dumps(_pedido()).encode())
+    assert status == 200 and corpo["solicitacao"]["destino"] == "REC"
+
+    status, corpo = _post(servidor, json.dumps([_pedido(), {"cargo": "Analista"}]).encode())
+    assert status == 200
+    assert "solicitacao" in corpo[0] and "erro" in corpo[1]
+
+
+@pytest.mark.parametrize("tamanho", ["abc", "-1"])
+def test_content_length_invalido_responde_400(servidor, tamanho):
+    status, corpo = _post(servidor, b"{}", {"Content-Length": tamanho})
+    assert status == 400 and "Content-Length" in corpo["erro"]
+
+
+def test_pedido_invalido_e_corpo_grande(servidor):
+    assert _post(servidor, json.dumps(_pedido(cargo="Estagiário")).encode())[0] == 422
+    assert _post(servidor, b"{nao e json")[0] == 400
+    assert _post(servidor, b"", {"Content-Length": str(api.MAX_CORPO_BYTES + 1)})[0] == 413
+    assert _post(servidor, b"{}", caminho="/cotacoes?fonte=outra")[0] == 400
+
+
+@pytest.mark.parametrize("excecao, status", [(ConnectionError("sem rede"), 502), (RuntimeError("bug"), 500)])
+def test_falha_ao_cotar_responde_json(servidor, monkeypatch, excecao, status):
+    def falhar(*args, **kwargs):
+        raise excecao
+    monkeypatch.setattr(api, "cotar", falhar)
+    monkeypatch.setattr(api, "cotar_lote", falhar)
+
+    for corpo in (_pedido(), [_pedido()]):
+        resposta = _post(servidor, json.dumps(corpo).encode())
+        assert resposta[0] == status and "erro" in resposta[1]
+
+
+def test_aeroportos_e_saude(servidor):
+    con = http.client.HTTPConnection(*servidor.server_address, timeout=5)
+    try:
+        con.request("GET", "/aeroportos?q=recife")
+        resposta = con.getresponse()
+        assert resposta.status == 200 and json.loads(resposta.read())[0]["codigo"] == "REC"
+        con.request("GET", "/saude")
+        assert con.getresponse().status == 200
+    finally:
+        con.close()
@@ -0,0 +1,120 @@
+# test_armazenamento.py - Decisões com controle de versão (compare-and-set) e alterações entre réplicas
+import threading
+
+import pytest
+
+from viagens.armazenamento import ConflitoVersao, RepositorioSolicitacoes
+
+APROVADO = "Aprovado ✅"
+REPROVADO = "Reprovado ❌"
+
+
+def test_decisao_com_versao_atual_grava_e_incrementa(repo):
+    exibida = repo.obter(1)
+    assert exibida["versao"] == 1
+
+    registro = repo.registrar_decisao(1, APROVADO, "ok", exibida["versao"])
+
+    assert registro["versao"] == 2
+    atual = repo.obter(1)
+    assert (atual["aprovacao"], atual["comentario_gestor"], atual["versao"]) == (APROVADO, "ok", 2)
+
+
+def test_decisao_sobre_versao_desatualizada_e_recusada_sem_gravar(repo):
+    vista_a = repo.obter(1)["versao"]
+    vista_b = repo.obter(1)["versao"]
+    repo.registrar_decisao(1, APROVADO, "gestor A", vista_a)
+
+    with pytest.raises(ConflitoVersao) as erro:
+        repo.registrar_decisao(1, REPROVADO, "gestor B", vista_b)
+
+    # O conflito traz o registro como está no banco, e a decisão do gestor A continua valendo
+    (atual,) = erro.value.atuais
+    assert (atual["id"], atual["aprovacao"], atual["versao"]) == (1, APROVADO, 2)
+    assert repo.obter(1)["comentario_gestor"] == "gestor A"
+
+
+def test_decisao_sem_versao_nao_confere(repo):
+    repo.registrar_decisao(1, APROVADO, "primeira")
+    assert repo.registrar_decisao(1, REPROVADO, "segunda")["versao"] == 3
+
+
+def test_decisao_de_id_inexistente_devolve_none(repo):
+    assert repo.registrar_decisao(999, APROVADO, "", 1) is None
+
+
+def test_lote_com_uma_versao_desatualizada_nao_grava_nenhuma(repo):
+    versoes = {i: repo.obter(i)["versao"] for i in (1, 2, 3)}
+    repo.registrar_decisao(2, REPROVADO, "outra sessão", versoes[2])
+
+    with pytest.raises(ConflitoVersao) as erro:
+        repo.registrar_decisoes([1, 2, 3], APROVADO, "lote", versoes)
+
+    assert [r["id"] for r in erro.value.atuais] == [2]
+    assert [(repo.obter(i)["aprovacao"], repo.obter(i)["versao"]) for i in (1, 3)] == [("Pendente", 1)] * 2
+
+
+def test_lote_com_versoes_atuais_grava_todas(repo):
+    versoes = {i: 1 for i in (4, 5, 6)}
+    registros = repo.registrar_decisoes([4, 5, 6], APROVADO, "lote", versoes)
+    assert [(r["id"], r["versao"]) for r in registros] == [(4, 2), (5, 2), (6, 2)]
+
+
+def test_conflito_entre_replicas_do_mesmo_banco(repo, caminho_banco):
+    outra_replica = RepositorioSolicitacoes(caminho_banco)
+    exibida = repo.obter(7)["versao"]
+    outra_replica.registrar_decisao(7, REPROVADO, "réplica 2", exibida)
+
+    with pytest.raises(ConflitoVersao):
+        repo.registrar_decisao(7, APROVADO, "réplica 1", exibida)
+
+
+def test_decisoes_simultaneas_sobre_a_mesma_versao_so_uma_grava(repo, caminho_banco):
+    replicas = [repo, RepositorioSolicitacoes(caminho_banco)]
+    largada = threading.Barrier(8)
+    resultados = []
+
+    def gestor(n: int):
+        replica = replicas[n % 2]
+        versao = replica.obter(8)["versao"]
+        largada.wait()
+        try:
+            replica.registrar_decisao(8, APROVADO if n % 2 else REPROVADO, f"gestor {n}", versao)
+            resultados.append("gravou")
+        except ConflitoVersao:
+            resultados.append("conflito")
+
+    threads = [threading.Thread(target=gestor, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(resultados) == ["conflito"] * 7 + ["gravou"]
+    assert repo.obter(8)["versao"] == 2
+
+
+def test_alteracoes_desde_entrega_decisoes_de_outra_replica(repo, caminho_banco):
+    cursor = repo.ultima_alteracao()
+    RepositorioSolicitacoes(caminho_banco).registrar_decisoes([9, 10], APROVADO, "", {9: 1, 10: 1})
+
+    novas, novo_cursor = repo.alteracoes_desde(cursor)
+
+    assert [(a["id"], a["versao"], a["aprovacao"]) for a in novas] == [(9, 2, APROVADO), (10, 2, APROVADO)]
+    assert novo_cursor == cursor + 2
+    assert repo.alteracoes_desde(novo_cursor) == ([], novo_cursor)
+
+
+def test_valores_distintos_pelo_indice(repo):
+    todos = repo.listar()
+    repo.registrar_decisao(3, APROVADO, "")
+
+    for coluna in ("status", "area", "cargo"):
+        assert repo.valores_distintos(coluna) == sorted({r[coluna] for r in todos})
+    assert repo.valores_distintos("aprovacao") == [APROVADO, "Pendente"]
+    with pytest.raises(ValueError, match="sem índice"):
+        repo.valores_distintos("colaborador")
+
+
+def test_valores_distintos_de_banco_vazio(caminho_banco):
+    assert RepositorioSolicitacoes(caminho_banco).valores_distintos("area") == []
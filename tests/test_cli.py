@@ -0,0 +1,46 @@
+# test_cli.py - Linha de comando: cotação de arquivos JSON/JSON Lines e códigos de saída
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from viagens.cli import main
+
+
+def _pedido(**extra) -> dict:
+    ida = date.today() + timedelta(days=30)
+    return {"colaborador": "Ana", "cargo": "Analista", "origem": "GRU", "destino": "REC",
+            "data_ida": ida.isoformat(), "data_volta": (ida + timedelta(days=3)).isoformat(), **extra}
+
+
+def test_cotar_um_objeto(tmp_path, capsys):
+    arquivo = tmp_path / "pedido.json"
+    arquivo.write_text(json.dumps(_pedido()), encoding="utf-8")
+
+    assert main(["cotar", str(arquivo)]) == 0
+    assert json.loads(capsys.readouterr().out)["solicitacao"]["origem"] == "GRU"
+
+
+def test_cotar_jsonl_com_pedido_invalido(tmp_path, capsys):
+    arquivo = tmp_path / "pedidos.jsonl"
+    arquivo.write_text("\n".join(json.dumps(p) for p in (_pedido(), _pedido(cargo="Estagiário"))) + "\n\n",
+                       encoding="utf-8")
+
+    assert main(["cotar", str(arquivo)]) == 1  # algum pedido com erro
+    resultados = json.loads(capsys.readouterr().out)
+    assert len(resultados) == 2 and "solicitacao" in resultados[0] and "Cargo inválido" in resultados[1]["erro"]
+
+
+def test_cotar_jsonl_invalido_aponta_a_linha(tmp_path, capsys):
+    arquivo = tmp_path / "pedidos.jsonl"
+    arquivo.write_text(json.dumps(_pedido()) + "\n{quebrado\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as saida:
+        main(["cotar", str(arquivo)])
+    assert saida.value.code == 2 and "linha 2" in capsys.readouterr().err
+
+
+def test_aeroportos(capsys):
+    assert main(["aeroportos", "recife"]) == 0
+    assert capsys.readouterr().out.startswith("REC")
+    assert main(["aeroportos", "xyzwq"]) == 1
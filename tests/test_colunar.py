@@ -0,0 +1,78 @@
+# test_colunar.py - Armazenamento colunar: paridade com o DataFrame de origem, retratos imutáveis e carga do repositório
+import numpy as np
+import pandas as pd
+import pytest
+
+from viagens.colunar import CAMPOS_CATEGORICOS, CAMPOS_TIPADOS, SolicitacoesColunares
+from viagens.simulacao import gerar_solicitacoes_em_massa, registros_de_lote
+
+TEXTO = list(CAMPOS_CATEGORICOS)
+NUMEROS = [c for c, (tipo, _) in CAMPOS_TIPADOS.items() if tipo != "datetime64[s]" and c not in ("id", "alertas_mask")]
+DATAS = [c for c, (tipo, _) in CAMPOS_TIPADOS.items() if tipo == "datetime64[s]"]
+
+
+@pytest.fixture(scope="module")
+def origem() -> pd.DataFrame:
+    return gerar_solicitacoes_em_massa(3000, semente=5)
+
+
+def _carregar(df: pd.DataFrame, tamanho_lote: int = 10_000, capacidade: int = 1024) -> SolicitacoesColunares:
+    store = SolicitacoesColunares(capacidade)
+    store.estender(registros_de_lote(df), tamanho_lote=tamanho_lote)
+    return store
+
+
+@pytest.mark.parametrize("tamanho_lote, capacidade", [(10_000, 1024), (137, 8)])
+def test_dataframe_reproduz_a_origem(origem, tamanho_lote, capacidade):
+    df = _carregar(origem, tamanho_lote, capacidade).dataframe()
+
+    assert len(df) == len(origem)
+    for c in TEXTO:
+        assert df[c].astype(object).tolist() == origem[c].astype(object).tolist(), c
+        assert list(df[c].cat.categories) == sorted(df[c].cat.categories), c
+    for c in NUMEROS:
+        np.testing.assert_allclose(df[c].to_numpy(dtype=np.float64), origem[c].to_numpy(dtype=np.float64), err_msg=c)
+    for c in DATAS:
+        assert (df[c] == pd.to_datetime(origem[c].astype(str))).all(), c
+    # Máscara de alertas reconstruída das mensagens dos registros
+    assert df["alertas_mask"].tolist() == origem["alertas_mask"].tolist()
+
+
+def test_retrato_nao_muda_com_inclusoes_posteriores(origem):
+    store = _carregar(origem.iloc[:10], capacidade=16)
+    retrato = store.dataframe()
+    copia = retrato.copy()
+
+    # Valores novos fora da ordem alfabética forçam recodificação, e o buffer cresce
+    novos = origem.iloc[10:40].assign(area="AAA Nova área", cargo="Analista")
+    store.estender(registros_de_lote(novos))
+    atual = store.dataframe()
+
+    pd.testing.assert_frame_equal(retrato, copia)
+    assert len(atual) == 40
+    assert atual["area"].astype(object).tolist() == [*origem["area"].iloc[:10], *["AAA Nova área"] * 30]
+    assert atual["area"].cat.categories[0] == "AAA Nova área"
+
+
+def test_campos_opcionais_ausentes(origem):
+    (registro,) = registros_de_lote(origem.iloc[:1])
+    for campo in ("aprovacao", "comentario_gestor", "motivo", "custo_voos"):
+        del registro[campo]
+    registro["voo_volta"]["preco"] = None
+
+    store = SolicitacoesColunares()
+    store.adicionar(registro)
+    (linha,) = store.dataframe().to_dict("records")
+
+    assert (linha["aprovacao"], linha["comentario_gestor"], linha["motivo"]) == ("Pendente", "", "")
+    assert np.isnan(linha["custo_voos"]) and np.isnan(linha["preco_volta"])
+
+
+def test_de_repositorio_aplica_os_filtros(repo):
+    todos = repo.listar()
+    area = todos[0]["area"]
+
+    df = SolicitacoesColunares.de_repositorio(repo, area=area).dataframe()
+
+    assert df["id"].tolist() == [r["id"] for r in todos if r["area"] == area]
+    assert set(df["area"]) == {area}
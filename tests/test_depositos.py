@@ -0,0 +1,82 @@
+# test_depositos.py - Agendador de depósitos em D-2: sem pagamento duplo, recuperação desde o início e dias vazios
+import csv
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+from viagens.depositos import AgendadorDepositos, data_deposito
+
+APROVADO = "Aprovado ✅"
+# Solicitações do repo aprovadas nos testes (id: data de ida)
+APROVADAS = {4: "2025-11-20", 6: "2026-01-15", 7: "2025-12-16", 8: "2025-12-19", 14: "2025-11-30", 18: "2025-12-08"}
+
+
+@pytest.fixture
+def aprovadas(repo):
+    repo.registrar_decisoes([*APROVADAS, 5], APROVADO, "ok")  # 5: ida em 2025-09-28, antes do início
+    return repo
+
+
+def _depositos(caminho_banco) -> list:
+    con = sqlite3.connect(caminho_banco)
+    try:
+        return con.execute("SELECT solicitacao_id, data_deposito FROM depositos ORDER BY solicitacao_id").fetchall()
+    finally:
+        con.close()
+
+
+@pytest.mark.parametrize("ida, deposito", [
+    ("2026-03-01", date(2026, 2, 27)),  # vira o mês (fevereiro sem 29)
+    ("2028-03-01", date(2028, 2, 28)),  # ano bissexto
+    ("2026-01-01T08:30:00", date(2025, 12, 30)),  # vira o ano; hora ignorada
+    (date(2026, 11, 10), date(2026, 11, 8)),
+])
+def test_data_deposito_d_menos_2(ida, deposito):
+    assert data_deposito(ida) == deposito
+
+
+def test_recupera_desde_o_inicio_sem_dias_vazios(aprovadas, caminho_banco, tmp_path):
+    agendador = AgendadorDepositos(caminho_banco, str(tmp_path / "pagamentos"), inicio="2025-11-01")
+    resumos = agendador.executar(ate="2026-01-31")
+
+    # Um lote por dia de depósito (D-2 de cada ida); os demais dias não geram lote nem arquivo
+    datas = sorted(str(data_deposito(ida)) for ida in APROVADAS.values())
+    assert [r["data_referencia"] for r in resumos] == datas
+    assert sorted(os.listdir(tmp_path / "pagamentos")) == [f"depositos_{d}.csv" for d in datas]
+    assert _depositos(caminho_banco) == sorted((i, str(data_deposito(ida))) for i, ida in APROVADAS.items())
+    with open(resumos[0]["arquivo"], encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert [l["solicitacao_id"] for l in linhas] == ["4"]
+    assert len(agendador) == 0
+
+
+def test_reexecucao_nao_paga_duas_vezes(aprovadas, caminho_banco, tmp_path):
+    pasta = str(tmp_path / "pagamentos")
+    assert len(AgendadorDepositos(caminho_banco, pasta, inicio="2025-11-01").executar(ate="2025-12-10")) == 3
+
+    # Outro processo, outro --inicio: continua do último dia processado
+    agendador = AgendadorDepositos(caminho_banco, pasta, inicio="2025-01-01")
+    assert agendador.inicio == date(2025, 11, 1)
+    assert agendador.executar(ate="2025-12-10") == []
+    assert agendador.processar_dia("2025-11-18") is None  # dia já processado
+    assert [r["data_referencia"] for r in agendador.executar(ate="2026-01-31")] == [
+        "2025-12-14", "2025-12-17", "2026-01-13"]
+    pagos = [i for i, _ in _depositos(caminho_banco)]
+    assert sorted(pagos) == sorted(APROVADAS) and len(set(pagos)) == len(pagos)
+
+
+def test_reprovada_ou_adiada_depois_de_entrar_na_fila(aprovadas, caminho_banco, tmp_path):
+    agendador = AgendadorDepositos(caminho_banco, str(tmp_path / "pagamentos"), inicio="2025-11-01")
+    aprovadas.registrar_decisao(4, "Reprovado ❌", "cancelada")
+    con = sqlite3.connect(caminho_banco)
+    with con:
+        con.execute("UPDATE solicitacoes SET data_ida = '2025-12-03' WHERE id = 14")
+    con.close()
+
+    agendador.executar(ate="2025-11-30")
+    assert _depositos(caminho_banco) == []  # 4 reprovada; 14 adiada para 2025-12-01
+
+    assert [r["quantidade"] for r in agendador.executar(ate="2025-12-01")] == [1]
+    assert _depositos(caminho_banco) == [(14, "2025-12-01")]
@@ -0,0 +1,93 @@
+# test_folha_ajuda.py - Folha de ajuda de custo: Páscoa e feriados, pesos por tipo de dia e rateio entre meses
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from viagens.folha_ajuda import consolidar, feriados_nacionais, folha_mensal, lancamentos_ajuda, pascoa
+from viagens.politicas import calcular_ajuda_custo
+
+APROVADO = "Aprovado ✅"
+# Viagens do repo (conftest) com dias em dezembro de 2025; a 14 vai de 30/11 a 05/12
+VIAGENS_DEZEMBRO = [7, 8, 14, 18]
+
+
+def _viagens(*datas, cargo: str = "Analista") -> pd.DataFrame:
+    return pd.DataFrame([{"id": i, "colaborador": f"Pessoa {i}", "area": "TI", "cargo": cargo,
+                          "data_ida": ida, "data_volta": volta} for i, (ida, volta) in enumerate(datas, 1)])
+
+
+@pytest.mark.parametrize("ano, domingo", [
+    (2000, date(2000, 4, 23)), (2008, date(2008, 3, 23)), (2019, date(2019, 4, 21)),
+    (2024, date(2024, 3, 31)), (2025, date(2025, 4, 20)), (2026, date(2026, 4, 5)), (2038, date(2038, 4, 25)),
+])
+def test_pascoa(ano, domingo):
+    assert pascoa(ano) == domingo and pascoa(ano).weekday() == 6
+
+
+def test_feriados_moveis_de_2026():
+    feriados = feriados_nacionais(2026)
+    # Carnaval (segunda e terça), Sexta-feira Santa e Corpus Christi
+    for dia in (date(2026, 2, 16), date(2026, 2, 17), date(2026, 4, 3), date(2026, 6, 4)):
+        assert dia in feriados
+    assert len(feriados) == 13 and feriados == sorted(feriados)
+
+
+def test_pesos_por_tipo_de_dia():
+    # 2026-02-13 (sexta) a 2026-02-18 (quarta): útil, sábado, domingo, Carnaval (2) e quarta útil
+    (lanc,) = lancamentos_ajuda(_viagens(("2026-02-13", "2026-02-18"))).to_dict("records")
+
+    assert (lanc["dias_uteis"], lanc["dias_fim_de_semana"], lanc["dias_feriado"]) == (2, 2, 2)
+    assert lanc["valor"] == int(150 * (2 + 0.5 * 2 + 0.5 * 2) * 1.3)  # 6 dias: multiplicador acima das faixas
+
+
+def test_feriado_extra_e_pesos_informados():
+    viagens = _viagens(("2026-03-10", "2026-03-10"))  # terça
+
+    (lanc,) = lancamentos_ajuda(viagens, feriados_extras=["2026-03-10"]).to_dict("records")
+    assert (lanc["dias_feriado"], lanc["valor"]) == (1, int(150 * 0.5))
+    assert lancamentos_ajuda(viagens, pesos={"util": 2.0})["valor"].tolist() == [300]
+
+
+def test_viagem_entre_meses_soma_exatamente_o_total():
+    # 2026-01-30 (sexta) a 2026-02-02 (segunda): cada mês com um dia útil e um de fim de semana
+    lanc = lancamentos_ajuda(_viagens(("2026-01-30", "2026-02-02"), cargo="Gerente"),
+                             pesos={"fim_de_semana": 1.0, "feriado": 1.0})
+
+    assert lanc["competencia"].tolist() == ["2026-01", "2026-02"]
+    assert lanc["inicio"].astype(str).tolist() == ["2026-01-30", "2026-02-01"]
+    assert lanc["fim"].astype(str).tolist() == ["2026-01-31", "2026-02-02"]
+    # Com todos os pesos 1, o total é o de calcular_ajuda_custo
+    assert lanc["valor"].sum() == calcular_ajuda_custo("Gerente", 4, "2026-01-30")
+
+
+def test_datas_invalidas():
+    with pytest.raises(ValueError, match="datas inválidas"):
+        lancamentos_ajuda(_viagens(("2026-02-10", "2026-02-09"), ("2026-13-01", "2026-13-02")))
+    assert lancamentos_ajuda(_viagens()).empty
+
+
+def test_folha_mensal_so_aprovadas_e_parte_do_mes(repo):
+    repo.registrar_decisoes([*VIAGENS_DEZEMBRO, 4], APROVADO, "ok")  # 4: viagem só em novembro
+
+    dezembro = folha_mensal(repo, "2025-12")
+    novembro = folha_mensal(repo, "2025-11")
+
+    assert dezembro["solicitacao_id"].tolist() == VIAGENS_DEZEMBRO
+    assert set(dezembro["competencia"]) == {"2025-12"}
+    assert novembro["solicitacao_id"].tolist() == [4, 14]
+    # A viagem que cruza os meses soma, nas duas folhas, o valor da viagem inteira
+    inteira = lancamentos_ajuda(pd.DataFrame(repo.viagens_no_periodo("2025-11-30", "2025-11-30")))
+    assert (novembro["valor"].iloc[1] + dezembro["valor"].iloc[2]) == inteira["valor"].sum()
+    assert folha_mensal(repo, "2025-10").empty  # nenhuma aprovada
+    with pytest.raises(ValueError, match="Competência inválida"):
+        folha_mensal(repo, "2025-13")
+
+
+def test_consolidar_por_colaborador():
+    lanc = lancamentos_ajuda(_viagens(("2026-03-02", "2026-03-03"), ("2026-03-09", "2026-03-09")).assign(
+        colaborador="Ana"))
+
+    (linha,) = consolidar(lanc).to_dict("records")
+    assert (linha["colaborador"], linha["viagens"], linha["dias_uteis"]) == ("Ana", 2, 3)
+    assert linha["valor"] == lanc["valor"].sum()
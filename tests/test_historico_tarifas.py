@@ -0,0 +1,150 @@
+# test_historico_tarifas.py - Histórico de tarifas: percentis do histograma, deduplicação, partições e fontes gravadas
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from viagens import historico_tarifas, servico, skyscanner
+from viagens.historico_tarifas import HistoricoTarifas
+
+COTADO_EM = datetime(2026, 3, 2, 10, 0)
+VOO = date(2026, 3, 20)  # 18 dias após a cotação: faixa 14–20 dias
+
+
+@pytest.fixture
+def historico(tmp_path) -> HistoricoTarifas:
+    return HistoricoTarifas(str(tmp_path / "tarifas.db"), intervalo_recarga_s=0)
+
+
+def _voos(precos) -> list:
+    return [{"preco": float(p)} for p in precos]
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_percentis_proximos_dos_exatos(historico, semente):
+    precos = np.random.default_rng(semente).lognormal(np.log(900), 0.35, 3000)
+
+    historico.registrar("live", [("GRU", "REC", VOO, _voos(precos))], COTADO_EM)
+
+    ref = historico.percentis("gru", "rec", 18)
+    assert (ref["amostras"], ref["faixa"]) == (3000, "14–20 dias")
+    assert ref["p50"] == pytest.approx(np.percentile(precos, 50), rel=0.02)
+    assert ref["p90"] == pytest.approx(np.percentile(precos, 90), rel=0.02)
+
+
+def test_sem_amostras_suficientes_nao_compara(historico):
+    historico.registrar("live", [("GRU", "REC", VOO, _voos([800] * 19))], COTADO_EM)
+
+    assert historico.percentis("GRU", "REC", 18) is None
+    assert historico.percentis("GRU", "REC", 2) is None  # outra faixa
+    assert historico.comparar({"trecho": "GRU → REC", "data": "2026-03-20", "preco": 900}, COTADO_EM.date()) is None
+
+
+def test_comparar_posiciona_o_preco(historico):
+    historico.registrar("live", [("GRU", "REC", VOO, _voos(range(500, 1500, 10)))], COTADO_EM)
+
+    comp = historico.comparar({"trecho": "GRU → REC", "data": "2026-03-20", "preco": 1450}, COTADO_EM.date())
+
+    assert (comp["antecedencia"], comp["nivel"]) == (18, "acima_p90")
+    assert comp["variacao_p50"] == pytest.approx(1450 / comp["p50"] - 1, abs=1e-3)
+
+
+def test_mesma_busca_no_mesmo_dia_grava_uma_vez(historico):
+    trechos = [("GRU", "REC", VOO, _voos([700, 800, 900]))]
+
+    assert historico.registrar("live", trechos, COTADO_EM) == 3
+    assert historico.registrar("live", trechos, COTADO_EM.replace(hour=18)) == 0
+    assert historico.registrar("indicative", trechos, COTADO_EM) == 3
+    assert historico.registrar("live", trechos, datetime(2026, 3, 3, 9, 0)) == 3
+    # Voo antes do dia da cotação e preços inválidos não entram
+    assert historico.registrar("live", [("GRU", "REC", date(2026, 3, 1), _voos([700]))], COTADO_EM) == 0
+    assert historico.registrar("live", [("GRU", "BSB", VOO, [{"preco": None}, {"preco": 0}])], COTADO_EM) == 0
+
+
+def test_gravacao_que_falha_nao_marca_a_busca_como_gravada(historico, monkeypatch):
+    trechos = [("GRU", "REC", VOO, _voos([700, 800, 900]))]
+
+    def banco_travado(*args):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(historico, "_somar_ao_indice", banco_travado)
+    with pytest.raises(sqlite3.OperationalError):
+        historico.registrar("live", trechos, COTADO_EM)
+    monkeypatch.undo()
+
+    assert historico.particoes() == []  # rollback: nem a partição ficou
+    assert historico.registrar("live", trechos, COTADO_EM) == 3
+    assert historico.registrar("live", trechos, COTADO_EM) == 0
+
+
+def test_outra_instancia_enxerga_as_gravacoes(historico):
+    leitor = HistoricoTarifas(historico.caminho, intervalo_recarga_s=0)
+    assert leitor.percentis("GRU", "REC", 18) is None
+
+    historico.registrar("live", [("GRU", "REC", VOO, _voos(range(600, 1000, 10)))], COTADO_EM)
+
+    assert leitor.percentis("GRU", "REC", 18) == historico.percentis("GRU", "REC", 18)
+
+
+def test_descartar_meses_tira_as_cotacoes_do_indice(historico):
+    historico.registrar("live", [("GRU", "REC", VOO, _voos([1000] * 30))], datetime(2026, 1, 10))
+    historico.registrar("live", [("GRU", "REC", VOO, _voos([500] * 30))], datetime(2026, 3, 5))
+    assert historico.particoes() == ["2026-01", "2026-03"]
+
+    assert historico.descartar_anteriores("2026-03") == ["2026-01"]
+
+    assert historico.particoes() == ["2026-03"]
+    ref = historico.percentis("GRU", "REC", 15)
+    assert (ref["amostras"], ref["p50"]) == (30, pytest.approx(500, rel=0.05))
+    assert historico.percentis("GRU", "REC", 69) is None  # faixa só das cotações de janeiro
+
+
+def test_reconstruir_indice_reproduz_o_incremental(historico):
+    aleatorio = np.random.default_rng(3)
+    for dia in range(1, 6):
+        historico.registrar("live", [("GRU", "REC", VOO, _voos(aleatorio.lognormal(7, 0.3, 40)))],
+                            datetime(2026, 3, dia))
+    antes = {faixa: historico.percentis("GRU", "REC", faixa) for faixa in (15, 18)}
+
+    historico.reconstruir_indice()
+
+    assert {faixa: historico.percentis("GRU", "REC", faixa) for faixa in (15, 18)} == antes
+
+
+@pytest.fixture
+def historico_do_app(historico):
+    historico_tarifas.configurar_historico(historico)
+    yield historico
+    historico_tarifas.configurar_historico(None)
+
+
+def _datas_futuras() -> tuple:
+    """A busca do app cota com a data de hoje: voos no passado não seriam gravados."""
+    ida = date.today() + timedelta(days=30)
+    return ida, ida + timedelta(days=3)
+
+
+def test_busca_simulada_nao_vai_para_o_historico(historico_do_app):
+    servico.buscar_voos("simulado", "GRU", "REC", *_datas_futuras())
+    assert historico_do_app.particoes() == []
+
+
+def test_busca_real_vai_para_o_historico_so_sem_avisos(historico_do_app, monkeypatch):
+    data_ida, data_volta = _datas_futuras()
+    ida = [{"trecho": "GRU → REC", "data": data_ida.isoformat(), "preco": 900.0}]
+    volta = [{"trecho": "REC → GRU", "data": data_volta.isoformat(), "preco": 950.0}]
+    avisos = []
+
+    def indicative(*args, aviso=None, **kwargs):
+        for msg in avisos:
+            aviso(msg)
+        return ida, volta
+
+    monkeypatch.setattr(skyscanner, "buscar_voos_indicative", indicative)
+    avisos.append("Cotação indisponível; exibindo valores simulados.")
+    servico.buscar_voos("indicative", "GRU", "REC", data_ida, data_volta)
+    assert historico_do_app.particoes() == []
+
+    avisos.clear()
+    servico.buscar_voos("indicative", "GRU", "REC", data_ida, data_volta)
+    assert len(historico_do_app.particoes()) == 1
@@ -0,0 +1,94 @@
+# test_importacao.py - Importação em lote: erros por linha, numeração entre lotes e cálculo das aceitas
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from viagens.armazenamento import RepositorioSolicitacoes
+from viagens.importacao import COLUNAS_OBRIGATORIAS, importar_arquivo, preparar_lote
+from viagens.politicas import STATUS_DENTRO, STATUS_FORA, calcular_ajuda_custo
+
+AGORA = datetime(2026, 3, 1, 9, 0)
+
+
+def _linha(**campos) -> dict:
+    """Linha válida do arquivo (tudo como texto, como vem do CSV), com os campos substituídos."""
+    return {"colaborador": "Ana", "area": "TI", "cargo": "Analista", "origem": "gru", "destino": "rec",
+            "data_ida": "2026-03-20", "data_volta": "2026-03-23", "preco_ida": "900", "preco_volta": "950,50",
+            "hotel_nome": "Hotel Central", "hotel_categoria": "Padrão", "hotel_diaria": "400", **campos}
+
+
+def test_linha_valida_sai_calculada():
+    aceitas, erros = preparar_lote(pd.DataFrame([_linha()]), AGORA)
+
+    assert erros.empty
+    (linha,) = aceitas.to_dict("records")
+    assert (linha["origem"], linha["trecho_ida"], linha["preco_volta"]) == ("GRU", "GRU → REC", 950.5)
+    assert (linha["dias_viagem"], linha["hotel_noites"], linha["antecedencia"]) == (4, 3, 19)
+    assert linha["ajuda_custo"] == calcular_ajuda_custo("Analista", 4)
+    assert linha["total_previsto"] == pytest.approx(900 + 950.5 + 400 * 3 + linha["ajuda_custo"])
+    assert (linha["status"], linha["aprovacao"]) == (STATUS_DENTRO, "Pendente")
+
+
+@pytest.mark.parametrize("campos, erro", [
+    ({"colaborador": "  "}, "colaborador vazio"),
+    ({"cargo": "Estagiário"}, "cargo sem política"),
+    ({"hotel_categoria": "Hostel"}, "categoria de hotel inválida"),
+    ({"data_ida": "20/03/2026"}, "data_ida inválida"),
+    ({"data_volta": "2026-03-19"}, "data_volta anterior à data_ida"),
+    ({"preco_ida": "-1"}, "preco_ida inválido"),
+    ({"hotel_diaria": "abc"}, "hotel_diaria inválido"),
+    ({"hotel_noites": "1.5"}, "hotel_noites inválido"),
+    ({"aprovacao": "Talvez"}, "aprovação inválida"),
+    ({"criado_em": "ontem"}, "criado_em inválido"),
+    ({"area": "", "preco_volta": "x"}, "area vazio; preco_volta inválido"),
+])
+def test_erros_por_linha(campos, erro):
+    aceitas, erros = preparar_lote(pd.DataFrame([_linha(), _linha(**campos)], index=[1, 2]), AGORA)
+
+    assert erros.to_dict() == {2: erro}
+    assert aceitas.index.tolist() == [1]
+
+
+def test_lote_sem_linhas_validas():
+    aceitas, erros = preparar_lote(pd.DataFrame([_linha(cargo="X"), _linha(destino="")]), AGORA)
+    assert aceitas.empty and len(erros) == 2
+
+
+def test_coluna_obrigatoria_ausente_e_erro_do_arquivo():
+    with pytest.raises(ValueError, match="hotel_diaria"):
+        preparar_lote(pd.DataFrame([_linha()]).drop(columns="hotel_diaria"), AGORA)
+
+
+def test_importar_csv_em_lotes(caminho_banco, tmp_path):
+    linhas = [_linha(colaborador=f"Colaborador {i}", preco_ida=str(800 + 100 * i)) for i in range(10)]
+    linhas[3]["cargo"] = "Estagiário"
+    linhas[7]["data_volta"] = ""
+    arquivo = tmp_path / "solicitacoes.csv"
+    pd.DataFrame(linhas, columns=COLUNAS_OBRIGATORIAS).to_csv(arquivo, index=False)
+    repo = RepositorioSolicitacoes(caminho_banco)
+    progresso = []
+
+    resumo = importar_arquivo(repo, str(arquivo), tamanho_lote=4, agora=AGORA,
+                              ao_progredir=lambda r: progresso.append(r["lidas"]))
+
+    assert (resumo["lidas"], resumo["importadas"], resumo["rejeitadas"]) == (10, 8, 2)
+    # Linha numerada a partir da primeira após o cabeçalho, contínua entre os lotes
+    assert resumo["erros"] == [{"linha": 4, "erro": "cargo sem política"}, {"linha": 8, "erro": "data_volta inválida"}]
+    assert progresso == [4, 8, 10]
+    assert repo.contar() == 8
+    assert repo.contar(status=STATUS_FORA) == 4  # ida acima de 1200 (i >= 5), exceto a rejeitada
+
+
+def test_max_erros_limita_a_lista_mas_nao_a_contagem(caminho_banco, tmp_path):
+    arquivo = tmp_path / "ruim.csv"
+    pd.DataFrame([_linha(cargo="X")] * 5).to_csv(arquivo, index=False)
+
+    resumo = importar_arquivo(RepositorioSolicitacoes(caminho_banco), str(arquivo), agora=AGORA, max_erros=2)
+
+    assert (resumo["rejeitadas"], [e["linha"] for e in resumo["erros"]]) == (5, [1, 2])
+
+
+def test_formato_nao_reconhecido(caminho_banco, tmp_path):
+    with pytest.raises(ValueError, match="Formato não reconhecido"):
+        importar_arquivo(RepositorioSolicitacoes(caminho_banco), str(tmp_path / "dados.xlsx"))
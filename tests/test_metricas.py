@@ -0,0 +1,103 @@
+# test_metricas.py - Spans (contexto e decorador), percentis da janela recente e exportação para o Prometheus
+import os
+
+import pytest
+
+from viagens import metricas
+from viagens.metricas import (
+    JANELA_AMOSTRAS, LIMITES_BALDES, amostras, cronometrado, exportar_prometheus, medir, registrar, resumo,
+    texto_prometheus,
+)
+
+
+@pytest.fixture(autouse=True)
+def _zerar():
+    metricas.zerar()
+    yield
+    metricas.zerar()
+
+
+def _serie(texto: str, prefixo: str) -> dict:
+    """Valores das linhas de uma série do texto exportado: {linha sem o valor: valor}."""
+    return {linha.rsplit(" ", 1)[0]: float(linha.rsplit(" ", 1)[1])
+            for linha in texto.splitlines() if linha.startswith(prefixo)}
+
+
+def test_medir_conta_erros_e_propaga():
+    with medir("a"):
+        pass
+    with pytest.raises(RuntimeError), medir("a"):
+        raise RuntimeError("falhou")
+
+    (linha,) = resumo()
+    assert (linha["span"], linha["contagem"], linha["erros"]) == ("a", 2, 1)
+
+
+def test_cronometrado_preserva_a_funcao():
+    @cronometrado("soma")
+    def somar(a, b=1):
+        """Soma."""
+        return a + b
+
+    assert somar(2, b=3) == 5 and somar.__name__ == "somar" and somar.__doc__ == "Soma."
+    assert len(amostras("soma")) == 1
+
+
+def test_percentis_da_janela_recente():
+    for i in range(1, 101):
+        registrar("b", i / 1000)
+
+    (linha,) = resumo()
+    assert linha["p50_ms"] == pytest.approx(50.5) and linha["max_ms"] == pytest.approx(100)
+    assert linha["media_ms"] == pytest.approx(50.5)
+
+
+def test_janela_guarda_so_as_mais_recentes():
+    for i in range(JANELA_AMOSTRAS + 10):
+        registrar("c", float(i))
+
+    recentes = amostras("c")
+    assert len(recentes) == JANELA_AMOSTRAS and recentes[0] == 10.0
+    assert resumo()[0]["contagem"] == JANELA_AMOSTRAS + 10  # contagem e baldes: desde o início
+    assert amostras("inexistente") == []
+
+
+def test_histograma_cumulativo_no_texto():
+    for duracao in (0.0005, 0.001, 0.003, 0.3, 60.0):
+        registrar('rota "x"\n', duracao)
+
+    texto = texto_prometheus()
+    rotulo = 'span="rota \\"x\\"\\n"'
+    baldes = _serie(texto, "viagens_span_duracao_segundos_bucket")
+    assert baldes[f'viagens_span_duracao_segundos_bucket{{{rotulo},le="0.001"}}'] == 2  # limite inclusivo
+    assert baldes[f'viagens_span_duracao_segundos_bucket{{{rotulo},le="0.005"}}'] == 3
+    assert baldes[f'viagens_span_duracao_segundos_bucket{{{rotulo},le="25.0"}}'] == 4
+    assert baldes[f'viagens_span_duracao_segundos_bucket{{{rotulo},le="+Inf"}}'] == 5
+    assert len(baldes) == len(LIMITES_BALDES) + 1
+    assert list(baldes.values()) == sorted(baldes.values())
+    assert _serie(texto, "viagens_span_duracao_segundos_count")[f"viagens_span_duracao_segundos_count{{{rotulo}}}"] == 5
+    assert _serie(texto, "viagens_span_duracao_segundos_sum")[
+        f"viagens_span_duracao_segundos_sum{{{rotulo}}}"] == pytest.approx(60.3045)
+    assert "# TYPE viagens_span_quantis_segundos summary" in texto and texto.endswith("\n")
+
+
+def test_erros_no_texto():
+    registrar("d", 0.01, erro=True)
+    registrar("d", 0.01)
+
+    assert _serie(texto_prometheus(), "viagens_span_erros_total") == {'viagens_span_erros_total{span="d"}': 1}
+
+
+def test_exportar_grava_de_uma_vez(tmp_path):
+    registrar("e", 0.02)
+    caminho = tmp_path / "viagens.prom"
+
+    exportar_prometheus(str(caminho))
+
+    assert caminho.read_text(encoding="utf-8") == texto_prometheus()
+    assert os.listdir(tmp_path) == ["viagens.prom"]  # sem temporários
+
+
+def test_sem_destino_nao_exporta(monkeypatch):
+    monkeypatch.delenv(metricas.VARIAVEL_ARQUIVO, raising=False)
+    assert metricas.iniciar_exportacao() is None
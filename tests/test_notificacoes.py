@@ -0,0 +1,155 @@
+# test_notificacoes.py - Caixa de saída: entrega em lotes, resultado por mensagem, nova tentativa com espera exponencial
+import sqlite3
+import time
+
+import pytest
+
+from viagens.notificacoes import (
+    EMAIL_FINANCEIRO, ESPERA_MAXIMA_S, EVENTO_DECISAO, EVENTO_SUBMISSAO, EntregadorNotificacoes, enfileirar_evento,
+    resumo,
+)
+
+APROVADO = "Aprovado ✅"
+
+
+class CanalFalso:
+    """Canal de teste: guarda os lotes recebidos; recusa os destinatários em `recusar` ou levanta `excecao`."""
+
+    def __init__(self, recusar=(), excecao: Exception | None = None, limite_por_s: float = 0):
+        self.recusar = set(recusar)
+        self.excecao = excecao
+        self.limite_por_s = limite_por_s
+        self.lotes = []
+
+    def enviar(self, mensagens: list) -> dict:
+        self.lotes.append([m["id"] for m in mensagens])
+        if self.excecao is not None:
+            raise self.excecao
+        return {m["id"]: "caixa cheia" if m["destinatario"] in self.recusar else None for m in mensagens}
+
+
+@pytest.fixture(autouse=True)
+def _so_email(monkeypatch):
+    monkeypatch.delenv("VIAGENS_WEBHOOK_URL", raising=False)
+
+
+@pytest.fixture
+def con(repo, caminho_banco) -> sqlite3.Connection:
+    """Conexão ao banco do repo, com uma aprovação na fila (3 e-mails: solicitante, gestor e financeiro)."""
+    con = sqlite3.connect(caminho_banco)
+    with con:  # sem as submissões da carga inicial do repo
+        con.execute("DELETE FROM notificacoes")
+    repo.registrar_decisao(1, APROVADO, "ok")
+    yield con
+    con.close()
+
+
+def test_insercao_em_lote_enfileira_as_submissoes(repo, caminho_banco):
+    # 20 solicitações do repo: gestor e solicitante de cada uma, com o id de cada linha
+    con = sqlite3.connect(caminho_banco)
+    linhas = con.execute("SELECT solicitacao_id, evento, COUNT(*) FROM notificacoes "
+                         "GROUP BY solicitacao_id, evento ORDER BY solicitacao_id").fetchall()
+    con.close()
+    assert linhas == [(i, EVENTO_SUBMISSAO, 2) for i in range(1, 21)]
+
+
+def _fila(con) -> list:
+    return con.execute("SELECT destinatario, situacao, tentativas, proxima_tentativa, ultimo_erro "
+                       "FROM notificacoes ORDER BY id").fetchall()
+
+
+def _liberar(con):
+    """Antecipa as novas tentativas agendadas (sem esperar a espera exponencial)."""
+    with con:
+        con.execute("UPDATE notificacoes SET proxima_tentativa = 0 WHERE situacao = 'pendente'")
+
+
+def test_entrega_o_lote_e_nao_repete(con, caminho_banco):
+    canal = CanalFalso()
+    entregador = EntregadorNotificacoes(caminho_banco, canais={"email": canal})
+
+    assert entregador.entregar_pendentes() == 3
+    assert entregador.entregar_pendentes() == 0
+
+    assert len(canal.lotes) == 1 and len(canal.lotes[0]) == 3
+    assert resumo(con) == [{"canal": "email", "situacao": "enviada", "quantidade": 3}]
+
+
+def test_tamanho_lote_e_limite_de_taxa(con, caminho_banco):
+    canal = CanalFalso(limite_por_s=2)
+    entregador = EntregadorNotificacoes(caminho_banco, canais={"email": canal}, tamanho_lote=10)
+
+    assert entregador.entregar_pendentes() == 2  # fichas do primeiro segundo
+    assert EntregadorNotificacoes(caminho_banco, canais={"email": CanalFalso()},
+                                  tamanho_lote=1).entregar_pendentes() == 1
+
+
+def test_falha_de_uma_mensagem_nao_afeta_as_outras(con, caminho_banco):
+    entregador = EntregadorNotificacoes(caminho_banco, canais={"email": CanalFalso(recusar=[EMAIL_FINANCEIRO])},
+                                        espera_inicial_s=30)
+    antes = time.time()
+
+    entregador.entregar_pendentes()
+
+    fila = {dest: resto for dest, *resto in _fila(con)}
+    situacao, tentativas, proxima, erro = fila.pop(EMAIL_FINANCEIRO)
+    assert (situacao, tentativas, erro) == ("pendente", 1, "caixa cheia")
+    assert antes + 30 <= proxima <= time.time() + 30
+    assert {s for s, *_ in fila.values()} == {"enviada"}
+    # Antes da espera vencer, ninguém tenta de novo
+    assert entregador.entregar_pendentes() == 0
+
+
+def test_espera_exponencial_ate_desistir(con, caminho_banco):
+    canal = CanalFalso(excecao=ConnectionRefusedError("smtp fora do ar"))
+    entregador = EntregadorNotificacoes(caminho_banco, canais={"email": canal}, espera_inicial_s=5,
+                                        max_tentativas=4)
+
+    for tentativa in range(1, 5):
+        antes = time.time()
+        assert entregador.entregar_pendentes() == 3
+        for _, situacao, tentativas, proxima, erro in _fila(con):
+            assert tentativas == tentativa
+            assert erro == "ConnectionRefusedError: smtp fora do ar"
+            assert situacao == ("falhou" if tentativa == 4 else "pendente")
+            assert proxima - antes == pytest.approx(5 * 2 ** (tentativa - 1), abs=1)
+        _liberar(con)
+
+    assert entregador.entregar_pendentes() == 0
+    assert len(canal.lotes) == 4
+    assert resumo(con) == [{"canal": "email", "situacao": "falhou", "quantidade": 3}]
+
+
+def test_espera_limitada_a_espera_maxima(con, caminho_banco):
+    entregador = EntregadorNotificacoes(caminho_banco, canais={"email": CanalFalso(excecao=OSError("x"))},
+                                        espera_inicial_s=ESPERA_MAXIMA_S / 2)
+    entregador.entregar_pendentes()
+    _liberar(con)
+    antes = time.time()
+
+    entregador.entregar_pendentes()
+
+    assert {round(p - antes) for *_, p, _ in _fila(con)} == {ESPERA_MAXIMA_S}
+
+
+def test_mensagem_sem_resultado_do_canal_volta_para_a_fila(con, caminho_banco):
+    class CanalMudo(CanalFalso):
+        def enviar(self, mensagens):
+            return {}
+
+    EntregadorNotificacoes(caminho_banco, canais={"email": CanalMudo()}).entregar_pendentes()
+
+    assert {(s, t, e) for _, s, t, _, e in _fila(con)} == {("pendente", 1, "sem confirmação do canal")}
+
+
+def test_evento_repetido_nao_duplica_a_fila(con, repo):
+    registro = repo.obter(1)
+
+    with con:
+        assert enfileirar_evento(con, EVENTO_DECISAO, registro) == 0
+    repo.registrar_decisao(1, APROVADO, "de novo")
+    assert len(_fila(con)) == 3
+
+    # Outra decisão é outro evento
+    repo.registrar_decisao(1, "Reprovado ❌", "orçamento")
+    assert len(_fila(con)) == 4
@@ -0,0 +1,84 @@
+# test_otimizador.py - Top-k de combinações ida + volta + hotel contra a força bruta
+import random
+from itertools import product
+
+import pytest
+
+from viagens.otimizador import PREFERENCIAS_PADRAO, otimizar_itinerario
+from viagens.politicas import dentro_da_politica_hotel, dentro_da_politica_voo, politicas_compiladas
+
+CIAS = ["LATAM", "GOL", "Azul"]
+CATEGORIAS = ["Padrão", "Executivo", "Luxo"]
+
+
+def _voos(aleatorio: random.Random, n: int) -> list:
+    return [{"cia": aleatorio.choice(CIAS), "partida": f"{aleatorio.randrange(5, 23):02d}:{aleatorio.choice(['00', '30'])}",
+             "preco": aleatorio.randrange(300, 3000), "trecho": "GRU → REC"} for _ in range(n)]
+
+
+def _hoteis(aleatorio: random.Random, n: int) -> list:
+    hoteis = []
+    for i in range(n):
+        diaria = aleatorio.randrange(150, 1100)
+        hoteis.append({"hotel": f"Hotel {i}", "categoria": aleatorio.choice(CATEGORIAS), "diaria": diaria,
+                       "noites": 3, "custo_total": diaria * 3})
+    return hoteis
+
+
+def _forca_bruta(voos_ida, voos_volta, hoteis, cargo, prefs) -> list:
+    """Custo efetivo de todas as combinações dentro da política, em ordem."""
+    prefs = {**PREFERENCIAS_PADRAO, **prefs}
+    politica = politicas_compiladas()
+
+    def penalidade_janela(voo, janela):
+        fora = janela and not (janela[0] <= voo["partida"] <= janela[1])
+        return prefs["penalidade_janela"] if fora else 0
+
+    custos = []
+    for vi, vv, h in product(voos_ida, voos_volta, hoteis):
+        if not (dentro_da_politica_voo(vi, cargo, politica) and dentro_da_politica_voo(vv, cargo, politica)
+                and dentro_da_politica_hotel(h, cargo, politica)):
+            continue
+        custo = vi["preco"] + vv["preco"] + h["custo_total"]
+        custo += penalidade_janela(vi, prefs["janela_ida"]) + penalidade_janela(vv, prefs["janela_volta"])
+        if prefs["mesma_cia"] and vi["cia"] != vv["cia"]:
+            custo += prefs["penalidade_cia"]
+        custos.append(custo)
+    return sorted(custos)
+
+
+@pytest.mark.parametrize("semente", range(12))
+@pytest.mark.parametrize("prefs", [
+    {},
+    {"mesma_cia": True},
+    {"janela_ida": ("08:00", "12:00"), "janela_volta": ("17:00", "21:00")},
+    {"mesma_cia": True, "janela_ida": ("06:00", "09:00")},
+])
+def test_top_k_igual_a_forca_bruta(semente, prefs):
+    aleatorio = random.Random(semente)
+    voos_ida, voos_volta, hoteis = _voos(aleatorio, 25), _voos(aleatorio, 25), _hoteis(aleatorio, 12)
+    cargo = aleatorio.choice(["Analista", "Gerente", "Diretor"])
+    k = aleatorio.choice([1, 3, 10])
+
+    combinacoes = otimizar_itinerario(voos_ida, voos_volta, hoteis, cargo, k=k, preferencias=prefs)
+
+    assert [c["custo"] for c in combinacoes] == _forca_bruta(voos_ida, voos_volta, hoteis, cargo, prefs)[:k]
+    for c in combinacoes:
+        assert c["custo"] - c["penalidade"] == c["ida"]["preco"] + c["volta"]["preco"] + c["hotel"]["custo_total"]
+
+
+def test_menos_combinacoes_que_k_devolve_todas():
+    aleatorio = random.Random(1)
+    voos_ida, voos_volta = _voos(aleatorio, 2), _voos(aleatorio, 2)
+    for v in voos_ida + voos_volta:
+        v["preco"] = 500
+    hoteis = [{"hotel": "Único", "categoria": "Padrão", "diaria": 200, "noites": 3, "custo_total": 600}]
+
+    assert len(otimizar_itinerario(voos_ida, voos_volta, hoteis, "Analista", k=10)) == 4
+
+
+def test_sem_opcao_dentro_da_politica_devolve_vazio():
+    voo_caro = {"cia": "GOL", "partida": "10:00", "preco": 5000, "trecho": "GRU → REC"}
+    hotel = {"hotel": "H", "categoria": "Padrão", "diaria": 200, "noites": 3, "custo_total": 600}
+    assert otimizar_itinerario([voo_caro], [voo_caro], [hotel], "Analista") == []
+    assert otimizar_itinerario([], [], [], "Analista", k=0) == []
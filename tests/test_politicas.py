@@ -0,0 +1,66 @@
+# test_politicas.py - Classificação de política: escalar x lote (máscara de alertas)
+import numpy as np
+import pandas as pd
+import pytest
+
+from viagens.politicas import (
+    ALERTA_ANTECEDENCIA, ALERTA_HOTEL, ALERTA_VOO_IDA, ALERTA_VOO_VOLTA, STATUS_DENTRO, STATUS_FORA,
+    alertas_da_mascara, bit_do_alerta, classificar_arrays, classificar_lote, classificar_solicitacao,
+    politicas_compiladas,
+)
+from viagens.simulacao import gerar_solicitacoes_em_massa, registros_de_lote
+
+
+def _classificar_escalar(linha) -> tuple:
+    return classificar_solicitacao(
+        int(linha.antecedencia), {"preco": linha.preco_ida}, {"preco": linha.preco_volta},
+        {"diaria": linha.hotel_diaria, "categoria": linha.hotel_categoria}, linha.cargo, linha.data_ida)
+
+
+def test_lote_igual_ao_escalar():
+    df = gerar_solicitacoes_em_massa(3000, semente=7)
+    lote = classificar_lote(df)
+
+    for linha, status, mascara in zip(df.itertuples(index=False), lote["status"], lote["alertas_mask"]):
+        assert (status, alertas_da_mascara(mascara)) == _classificar_escalar(linha)
+    # A amostra cobre todos os alertas
+    assert np.bitwise_or.reduce(lote["alertas_mask"].to_numpy()) == 15
+
+
+def test_lote_aceita_registros_aninhados():
+    df = gerar_solicitacoes_em_massa(500, semente=3)
+    aninhados = pd.DataFrame(list(registros_de_lote(df)))
+
+    resultado = classificar_lote(aninhados)
+
+    assert resultado["alertas_mask"].tolist() == df["alertas_mask"].tolist()
+    assert resultado.index.equals(aninhados.index)
+
+
+@pytest.mark.parametrize("antecedencia, preco_ida, preco_volta, diaria, categoria, esperado", [
+    (15, 1000, 1000, 400, "Padrão", 0),
+    (9, 1000, 1000, 400, "Padrão", ALERTA_ANTECEDENCIA),
+    (10, 1000, 1000, 400, "Padrão", 0),  # no limite: dentro
+    (15, 1201, 1200, 400, "Padrão", ALERTA_VOO_IDA),
+    (15, 1000, np.nan, 400, "Padrão", ALERTA_VOO_VOLTA),  # preço ausente conta como fora
+    (15, 1000, 1000, 451, "Padrão", ALERTA_HOTEL),
+    (15, 1000, 1000, 400, "Executivo", ALERTA_HOTEL),  # categoria não permitida ao Analista
+    (15, 1000, 1000, 400, "Hostel", ALERTA_HOTEL),  # categoria desconhecida
+    (0, 5000, 5000, 900, "Luxo", 15),
+])
+def test_bits_da_mascara(antecedencia, preco_ida, preco_volta, diaria, categoria, esperado):
+    status, mascara = classificar_arrays([antecedencia], ["Analista"], [preco_ida], [preco_volta],
+                                         [diaria], [categoria])
+    assert mascara[0] == esperado
+    assert status[0] == (STATUS_DENTRO if esperado == 0 else STATUS_FORA)
+
+
+def test_cargo_sem_politica_e_erro():
+    with pytest.raises(KeyError, match="Estagiário"):
+        classificar_arrays([15], ["Estagiário"], [100], [100], [100], ["Padrão"])
+
+
+def test_bit_do_alerta_inverte_as_mensagens():
+    for bit, mensagem in politicas_compiladas().mensagens_alerta.items():
+        assert bit_do_alerta(mensagem) == bit
+    assert bit_do_alerta("Tarifa de ida acima do p90 da rota.") == 0
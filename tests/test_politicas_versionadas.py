@@ -0,0 +1,151 @@
+# test_politicas_versionadas.py - Versões de política por vigência: consulta, recarga e classificação por linha
+import copy
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from viagens import servico
+from viagens.importacao import preparar_lote
+from viagens.politicas import (
+    AJUDA_CUSTO_HIERARQUIA, ALERTA_ANTECEDENCIA, ALERTA_VOO_IDA, FAIXAS_MULTIPLICADOR, POLITICAS, alertas_da_mascara,
+    bit_do_alerta, calcular_ajuda_custo, classificar_arrays, classificar_lote, classificar_solicitacao,
+    dentro_da_politica_hotel, dentro_da_politica_voo, multiplicador_ajuda, politica_vigente,
+)
+from viagens.politicas_versionadas import CatalogoPoliticas
+from viagens.simulacao import ajuda_custo_em_massa, gerar_solicitacoes_em_massa, registros_de_lote
+
+VIGENCIA_NOVA = "2026-06-01"
+
+
+def _publicar_nova(catalogo) -> int:
+    """Versão com antecedência mínima de 30 dias e o cargo Estagiário."""
+    nova = copy.deepcopy(POLITICAS)
+    nova["antecedencia_minima_dias"] = 30
+    nova["limite_trecho_aereo"]["Estagiário"] = 800
+    nova["limite_diaria_hotel"]["Estagiário"] = 300
+    nova["categorias_permitidas_por_cargo"]["Estagiário"] = ["Padrão"]
+    return catalogo.publicar(VIGENCIA_NOVA, nova, {**AJUDA_CUSTO_HIERARQUIA, "Estagiário": 80})
+
+
+def test_versao_vigente_pela_data(catalogo):
+    versao = _publicar_nova(catalogo)
+
+    assert politica_vigente("2026-05-31").antecedencia_minima == 10
+    assert politica_vigente(VIGENCIA_NOVA).versao == versao
+    assert politica_vigente(date(2030, 1, 1)).antecedencia_minima == 30
+    assert calcular_ajuda_custo("Estagiário", 2, VIGENCIA_NOVA) == 80 * 2 * 1.1
+
+
+def test_mesma_vigencia_vale_a_ultima_publicada(catalogo):
+    _publicar_nova(catalogo)
+    catalogo.publicar(VIGENCIA_NOVA, POLITICAS)
+
+    assert politica_vigente(VIGENCIA_NOVA).antecedencia_minima == 10
+    assert [v.vigente_desde for v in catalogo.versoes()] == ["2000-01-01", VIGENCIA_NOVA]
+
+
+def test_outra_instancia_enxerga_a_versao_publicada(catalogo):
+    outra = CatalogoPoliticas(catalogo.caminho, intervalo_recarga_s=0)
+    assert outra.vigente(VIGENCIA_NOVA).antecedencia_minima == 10
+
+    _publicar_nova(catalogo)
+
+    assert outra.vigente(VIGENCIA_NOVA).antecedencia_minima == 30
+
+
+def test_lote_classifica_cada_linha_pela_versao_da_ida(catalogo):
+    _publicar_nova(catalogo)
+    datas = ["2026-05-30", "2026-05-31", "2026-06-01", "2026-07-15"]
+    df = pd.DataFrame({"antecedencia": 20, "cargo": "Analista", "preco_ida": 1000, "preco_volta": 1000,
+                       "hotel_diaria": 400, "hotel_categoria": "Padrão", "data_ida": pd.to_datetime(datas)})
+
+    lote = classificar_lote(df)
+
+    assert lote["alertas_mask"].tolist() == [0, 0, ALERTA_ANTECEDENCIA, ALERTA_ANTECEDENCIA]
+    for data, mascara in zip(datas, lote["alertas_mask"]):
+        _, alertas = classificar_solicitacao(20, {"preco": 1000}, {"preco": 1000},
+                                             {"diaria": 400, "categoria": "Padrão"}, "Analista", data)
+        assert alertas == alertas_da_mascara(mascara, politica_vigente(data))
+
+
+def test_mensagem_de_antecedencia_traz_o_prazo_da_versao(catalogo):
+    _publicar_nova(catalogo)
+    df = gerar_solicitacoes_em_massa(400, semente=11, data_base=date(2026, 10, 1))
+    df[["status", "alertas_mask"]] = classificar_lote(df)
+
+    registros = list(registros_de_lote(df))
+
+    prazos = set()
+    for registro, data_ida in zip(registros, df["data_ida"]):
+        prazo = 30 if np.datetime64(data_ida, "D") >= np.datetime64(VIGENCIA_NOVA) else 10
+        antecedencia = [a for a in registro["alertas"] if bit_do_alerta(a) == ALERTA_ANTECEDENCIA]
+        assert antecedencia in ([], [f"Solicitação com menos de {prazo} dias de antecedência. Risco de tarifas altas."])
+        prazos.update([prazo] * len(antecedencia))
+    assert prazos == {10, 30}
+
+
+def test_importacao_valida_o_cargo_na_versao_da_ida(catalogo):
+    _publicar_nova(catalogo)
+    linhas = pd.DataFrame({
+        "colaborador": ["Ana", "Bia"], "area": "TI", "cargo": "Estagiário", "origem": "GRU", "destino": "REC",
+        "data_ida": ["2026-05-20", "2026-06-20"], "data_volta": ["2026-05-22", "2026-06-22"],
+        "preco_ida": "500", "preco_volta": "500", "hotel_nome": "Hotel", "hotel_categoria": "Padrão",
+        "hotel_diaria": "250", "criado_em": "2026-05-01T09:00:00",
+    })
+
+    aceitas, erros = preparar_lote(linhas)
+
+    assert erros.to_dict() == {0: "cargo sem política"}
+    assert aceitas["colaborador"].tolist() == ["Bia"]
+    assert aceitas["ajuda_custo"].tolist() == [calcular_ajuda_custo("Estagiário", 3, "2026-06-20")]
+
+
+def test_hotel_conveniado_respeita_o_limite_da_versao(catalogo):
+    _publicar_nova(catalogo)
+    data_ida = date(2026, 7, 1)
+
+    for destino in ("REC", "SSA", "POA", "MAO"):
+        conveniado = servico.hoteis_simulados(destino, 4, "Estagiário", data_ida)[0]
+        assert conveniado["categoria"] == "Padrão" and conveniado["diaria"] <= 300
+    # Antes da vigência, o cargo não existe
+    with pytest.raises(KeyError):
+        servico.hoteis_simulados("REC", 4, "Estagiário", date(2026, 5, 1))
+
+
+def test_sem_versao_explicita_vale_a_vigente_hoje(catalogo):
+    nova = copy.deepcopy(POLITICAS)
+    nova["antecedencia_minima_dias"] = 30
+    nova["limite_trecho_aereo"]["Analista"] = 700
+    nova["limite_diaria_hotel"]["Analista"] = 200
+    catalogo.publicar(date.today(), nova, faixas=[(2, 1.0)], acima=1.5)
+
+    assert not dentro_da_politica_voo({"preco": 800}, "Analista")
+    assert not dentro_da_politica_hotel({"diaria": 250, "categoria": "Padrão"}, "Analista")
+    assert multiplicador_ajuda(3) == 1.5
+    assert ajuda_custo_em_massa(["Analista"], [3]).tolist() == [int(150 * 3 * 1.5)]
+    _, mascara = classificar_arrays([20], ["Analista"], [800], [600], [150], ["Padrão"])
+    assert mascara[0] == ALERTA_ANTECEDENCIA | ALERTA_VOO_IDA
+    assert alertas_da_mascara(ALERTA_ANTECEDENCIA)[0].startswith("Solicitação com menos de 30 dias")
+
+
+def test_campos_omitidos_vem_da_versao_em_vigor_na_vigencia(catalogo):
+    catalogo.publicar(VIGENCIA_NOVA, POLITICAS, faixas=[(2, 1.5)], acima=2.0)
+    catalogo.publicar("2026-03-01", POLITICAS)  # antes da nova: herda da inicial
+    catalogo.publicar("2027-01-01", POLITICAS)  # depois: herda da nova
+
+    assert catalogo.versao_em("1999-12-31") is None
+    assert catalogo.versao_em("2026-07-01")["multiplicador_acima"] == 2.0
+    assert multiplicador_ajuda(3, politica_vigente("2026-03-01")) == 1.1
+    assert multiplicador_ajuda(3, politica_vigente("2027-01-01")) == 2.0
+
+
+@pytest.mark.parametrize("faixas, acima", [
+    ([(0, 1.0)], None), ([(1, 1.0), (1, 1.2)], None), ([(1, -1.0)], None), ([("uma", 1.0)], None),
+    ([(1,)], None), ([(1, 1.0)], 0),
+])
+def test_faixas_invalidas_nao_sao_gravadas(catalogo, faixas, acima):
+    with pytest.raises(ValueError):
+        catalogo.publicar(VIGENCIA_NOVA, POLITICAS, faixas=faixas, acima=acima)
+    assert catalogo.versao_em(VIGENCIA_NOVA)["faixas_multiplicador"] == [list(f) for f in FAIXAS_MULTIPLICADOR]
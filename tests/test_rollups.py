@@ -0,0 +1,82 @@
+# test_rollups.py - Agregados do dashboard: incremental igual ao recálculo, consultas iguais às do pandas
+import sqlite3
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from viagens import dashboard
+from viagens.simulacao import gerar_solicitacoes_em_massa, registros_de_lote
+
+APROVADO = "Aprovado ✅"
+REPROVADO = "Reprovado ❌"
+PERIODO = (date(2025, 1, 1), date(2026, 12, 31))
+DATA_BASE = date(2026, 2, 1)
+
+
+def _agregados(caminho_banco) -> tuple:
+    """Conteúdo das duas tabelas de agregados, ordenado e com as somas arredondadas."""
+    con = sqlite3.connect(caminho_banco)
+    try:
+        return tuple(sorted((*l[:-k], *(round(v, 2) for v in l[-k:])) for l in con.execute(sql))
+                     for sql, k in (("SELECT * FROM rollup_diario", 3), ("SELECT * FROM rollup_trechos", 1)))
+    finally:
+        con.close()
+
+
+@pytest.fixture
+def movimentado(repo):
+    """Repo depois de inserções avulsas e em lote, decisões individuais, em lote e revistas."""
+    df = gerar_solicitacoes_em_massa(30, semente=7, data_base=DATA_BASE)
+    registros = list(registros_de_lote(df))
+    repo.inserir_lote(registros[:25])
+    for registro in registros[25:]:
+        repo.inserir(registro)
+    repo.registrar_decisoes(range(1, 16), APROVADO, "lote")
+    repo.registrar_decisoes(range(16, 21), REPROVADO, "lote")
+    repo.registrar_decisao(3, REPROVADO, "revista")  # sai de uma combinação e entra em outra
+    repo.registrar_decisao(30, APROVADO, "ok")
+    return repo
+
+
+def test_incremental_igual_ao_recalculo(movimentado, caminho_banco):
+    incremental = _agregados(caminho_banco)
+
+    movimentado.reconstruir_rollups()
+
+    assert _agregados(caminho_banco) == incremental
+    assert sum(l[5] for l in incremental[0]) == 50  # uma linha de quantidade por solicitação
+    # Combinações zeradas (a revista saiu da sua) são removidas
+    assert all(l[5] > 0 for l in incremental[0]) and all(l[7] > 0 for l in incremental[1])
+
+
+@pytest.mark.parametrize("filtros", [{}, {"areas": ["Comercial", "TI"]}, {"aprovacoes": [APROVADO]},
+                                     {"cargos": []}])
+def test_consultas_iguais_as_do_pandas(movimentado, filtros):
+    consulta = movimentado.consultar_rollups(*PERIODO, **filtros)
+    dff = pd.DataFrame(movimentado.listar(*map(str, PERIODO)))
+    for chave, coluna in (("areas", "area"), ("cargos", "cargo"), ("aprovacoes", "aprovacao")):
+        if chave in filtros:
+            dff = dff[dff[coluna].isin(filtros[chave])]
+
+    kpis = consulta.kpis()
+    if dff.empty:
+        assert kpis == {"total": 0, "aprovadas": 0, "fora_politica": 0, "gasto_previsto": 0}
+        assert consulta.ticket_medio("area").empty and consulta.top_trechos().empty
+        return
+    assert (kpis["total"], kpis["aprovadas"]) == (len(dff), (dff["aprovacao"] == APROVADO).sum())
+    assert kpis["gasto_previsto"] == pytest.approx(dff["total_previsto"].sum())
+    pd.testing.assert_frame_equal(consulta.ticket_medio("area"), dashboard.ticket_medio(dff, "area"),
+                                  check_names=False, check_dtype=False)
+    pd.testing.assert_frame_equal(consulta.violacoes_por("cargo"), dashboard.violacoes_por(dff, "cargo"),
+                                  check_dtype=False)
+    esperado = dashboard.top_trechos(dff).sort_values(["solicitacoes", "trecho"], ascending=[False, True]).head(5)
+    pd.testing.assert_frame_equal(consulta.top_trechos(5), esperado.reset_index(drop=True), check_dtype=False)
+    mais_caro = consulta.trecho_mais_caro()
+    assert mais_caro["custo_medio_voos"].iloc[0] == pytest.approx(
+        dashboard.trecho_mais_caro(dff)["custo_medio_voos"].iloc[0])
+
+
+def test_dimensao_invalida(repo):
+    with pytest.raises(ValueError):
+        repo.consultar_rollups(*PERIODO).ticket_medio("colaborador")
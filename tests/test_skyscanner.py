@@ -0,0 +1,134 @@
+# test_skyscanner.py - Integração Skyscanner com sessão HTTP falsa: respostas vazias, preços ausentes e histórico
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from viagens import historico_tarifas, servico, skyscanner
+from viagens.cache_tarifas import CacheTarifas
+from viagens.historico_tarifas import HistoricoTarifas
+
+VAZIA = {"content": {"results": {"itineraries": {}}}}
+
+
+def _indicative(*precos) -> dict:
+    return {"content": {"results": {"itineraries": {
+        f"it{i}": {"pricingOptions": [{"price": {"amount": p}, "agentIds": ["gol"]}]} for i, p in enumerate(precos)},
+        "agents": {"gol": {"name": "GOL"}}}}}
+
+
+class RespostaFalsa:
+    def __init__(self, corpo: dict, status_code: int = 200):
+        self.corpo = corpo
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self) -> dict:
+        return self.corpo
+
+    def raise_for_status(self):
+        pass
+
+
+class SessaoFalsa:
+    """Responde a toda consulta com o mesmo corpo e conta as chamadas."""
+
+    def __init__(self, corpo: dict):
+        self.corpo = corpo
+        self.chamadas = 0
+
+    def post(self, url, timeout=None, **kwargs):
+        self.chamadas += 1
+        return RespostaFalsa(self.corpo)
+
+
+@pytest.fixture
+def sessao(monkeypatch):
+    """Sessão falsa e cache de tarifas vazio, só deste teste."""
+    sessao = SessaoFalsa(VAZIA)
+    cache = CacheTarifas()
+    monkeypatch.setattr(skyscanner, "sessao_http", lambda: sessao)
+    monkeypatch.setattr(skyscanner, "cache_tarifas", lambda: cache)
+    return sessao
+
+
+@pytest.fixture
+def historico(tmp_path):
+    historico = HistoricoTarifas(str(tmp_path / "tarifas.db"), intervalo_recarga_s=0)
+    historico_tarifas.configurar_historico(historico)
+    yield historico
+    historico_tarifas.configurar_historico(None)
+
+
+def _cotacoes_gravadas(historico) -> list:
+    """(fonte, preço) de todas as partições do histórico."""
+    con = sqlite3.connect(historico.caminho)
+    try:
+        return sorted(linha for mes in historico.particoes() for linha in con.execute(
+            f"SELECT fonte, preco FROM tarifas_{mes.replace('-', '')}"))
+    finally:
+        con.close()
+
+
+def _datas() -> tuple:
+    ida = date.today() + timedelta(days=20)
+    return ida, ida + timedelta(days=2)
+
+
+def test_itinerario_sem_preco_e_descartado():
+    resposta = _indicative(900, None, 750)
+    voos = skyscanner.extrair_voos(resposta, "GRU → REC", "2026-11-10")
+    assert [v["preco"] for v in voos] == [900, 750]
+
+
+def test_resposta_vazia_e_falha_do_trecho():
+    with pytest.raises(LookupError):
+        skyscanner.parse_indicative(VAZIA, "GRU → REC", "2026-11-10")
+    with pytest.raises(LookupError):
+        skyscanner.parse_indicative(_indicative(None), "GRU → REC", "2026-11-10")
+
+
+def test_resposta_vazia_avisa_e_nao_vai_para_o_historico(sessao, historico):
+    avisos = []
+
+    ida, volta = servico.buscar_voos("indicative", "GRU", "REC", *_datas(), aviso=avisos.append)
+
+    assert ida and volta  # simulação no lugar das cotações
+    assert len(avisos) == 2 and all("Usando simulação" in a for a in avisos)
+    assert _cotacoes_gravadas(historico) == []
+
+
+def test_resposta_com_precos_vai_para_o_historico(sessao, historico):
+    sessao.corpo = _indicative(900, 1100)
+    avisos = []
+
+    ida, volta = servico.buscar_voos("indicative", "GRU", "REC", *_datas(), aviso=avisos.append)
+
+    assert avisos == []
+    assert [v["preco"] for v in ida] == [900, 1100]
+    codigo = historico_tarifas.CODIGOS_FONTE["indicative"]
+    assert _cotacoes_gravadas(historico) == [(codigo, 900.0), (codigo, 900.0), (codigo, 1100.0), (codigo, 1100.0)]
+
+
+def test_simulacao_de_falha_nao_entra_no_cache(sessao):
+    ida, volta = _datas()
+    skyscanner.buscar_voos_indicative("GRU", "REC", ida, volta, aviso=lambda msg: None)
+    assert sessao.chamadas == 2
+
+    # Outra sessão, mesma rota: consulta a API de novo e recebe as cotações reais
+    sessao.corpo = _indicative(800)
+    voos_ida, _ = skyscanner.buscar_voos_indicative("GRU", "REC", ida, volta)
+
+    assert sessao.chamadas == 4
+    assert [v["preco"] for v in voos_ida] == [800]
+
+
+def test_resultado_da_api_fica_no_cache(sessao):
+    sessao.corpo = _indicative(800, 950)
+    ida, volta = _datas()
+    primeira = skyscanner.buscar_voos_indicative("GRU", "REC", ida, volta)
+
+    segunda = skyscanner.buscar_voos_indicative("GRU", "REC", ida, volta)
+
+    assert sessao.chamadas == 2
+    assert segunda == primeira
@@ -0,0 +1,74 @@
+# test_voucher.py - Voucher HTML: campos escapados, formatação e exportação em ZIP (serial e em processos)
+import io
+import zipfile
+
+import pytest
+
+from viagens.voucher import _compilar, exportar_vouchers_zip, gerar_voucher_html, nome_voucher
+
+
+def _solicitacao(sol_id: int = 1, **extra) -> dict:
+    voo = {"cia": "GOL", "trecho": "GRU → REC", "data": "2026-11-10", "partida": "08:00", "preco": 850.5}
+    return {"id": sol_id, "colaborador": "Ana Souza", "cargo": "Analista", "area": "TI", "origem": "GRU",
+            "destino": "REC", "data_ida": "2026-11-10", "data_volta": "2026-11-13", "dias_viagem": 4,
+            "voo_ida": voo, "voo_volta": {**voo, "trecho": "REC → GRU", "data": "2026-11-13"},
+            "hotel": {"hotel": "Mar Azul", "categoria": "Padrão", "diaria": 300, "noites": 3, "custo_total": 900},
+            "ajuda_custo": 660, "total_previsto": 3261.0, "status": "Dentro da política ✅",
+            "motivo": "Visita ao cliente", **extra}
+
+
+def test_texto_livre_e_escapado():
+    html = gerar_voucher_html(_solicitacao(
+        colaborador="<script>alert(1)</script>", motivo="P&D <urgente>", comentario_gestor='"ok" & <b>',
+        hotel={"hotel": "Hotel <i>", "categoria": "Padrão", "diaria": 300, "noites": 3, "custo_total": 900}))
+
+    assert "<script>" not in html and "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "P&amp;D &lt;urgente&gt;" in html
+    assert '"ok" &amp; &lt;b&gt;' in html
+    assert "<b>Hotel &lt;i&gt;</b>" in html  # marcação do modelo preservada, valor escapado
+
+
+def test_campos_opcionais_e_valores():
+    html = gerar_voucher_html(_solicitacao())
+
+    assert "<i>Aprovação:</i> Pendente" in html and "<i>Comentário do gestor:</i> </p>" in html
+    assert "<b>Ida:</b> GOL GRU → REC 2026-11-10 08:00 — R$ 850.5" in html
+    assert "(4 dias)" in html and "— 3 noites (Total R$ 900)" in html
+    assert "<i>Aprovação:</i> Aprovado ✅" in gerar_voucher_html(_solicitacao(aprovacao="Aprovado ✅"))
+
+
+def test_modelo_com_formato_e_chaves_literais():
+    renderizar = _compilar("{{x}} {colaborador:>6}|{voo_ida.preco:.0f}|{motivo:.3}")
+    assert renderizar(_solicitacao(colaborador="A&B", motivo="<abc>")) == "{x}    A&amp;B|850|&lt;ab"
+
+
+def test_campo_com_dois_niveis_e_recusado():
+    with pytest.raises(ValueError):
+        _compilar("{hotel.endereco.rua}")
+
+
+def test_campo_ausente_levanta_keyerror():
+    solic = _solicitacao()
+    del solic["hotel"]
+    with pytest.raises(KeyError):
+        gerar_voucher_html(solic)
+
+
+@pytest.mark.parametrize("processos", [0, 2])
+def test_exportar_zip(processos):
+    registros = (_solicitacao(i, colaborador=f"Pessoa {i}") for i in range(1, 8))  # gerador: lido lote a lote
+    destino = io.BytesIO()
+
+    assert exportar_vouchers_zip(registros, destino, processos=processos, tamanho_lote=3) == 7
+
+    with zipfile.ZipFile(destino) as zf:
+        assert sorted(zf.namelist()) == sorted(nome_voucher({"id": i}) for i in range(1, 8))
+        assert zf.read("voucher_5.html").decode("utf-8") == gerar_voucher_html(_solicitacao(5, colaborador="Pessoa 5"))
+
+
+def test_exportar_zip_vazio(tmp_path):
+    destino = tmp_path / "vouchers.zip"
+    assert exportar_vouchers_zip([], str(destino)) == 0
+    with zipfile.ZipFile(destino) as zf:
+        assert zf.namelist() == []
+
@@ -0,0 +1 @@
+"""Módulos de apoio ao protótipo de gestão de viagens corporativas."""
@@ -0,0 +1,5 @@
+import sys
+
+from viagens.cli import main
+
+sys.exit(main())
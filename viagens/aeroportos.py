@@ -0,0 +1,227 @@
+# aeroportos.py - Resolução offline de aeroportos e cidades para códigos IATA (índice de prefixos + busca aproximada)
+import csv
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import NamedTuple
+
+CAMINHO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados", "aeroportos.csv")
+# Cidades com mais de um aeroporto: código IATA da região -> nome. Buscar pela região
+# consulta todos os aeroportos dela (coluna "regiao" da base).
+REGIOES = {
+    "SAO": "São Paulo",
+    "RIO": "Rio de Janeiro",
+    "BHZ": "Belo Horizonte",
+    "BUE": "Buenos Aires",
+    "NYC": "Nova York",
+    "PAR": "Paris",
+    "LON": "Londres",
+}
+SUGESTOES_PADRAO = 8
+# Cada nó do índice guarda os locais de maior prioridade da sua subárvore
+SUGESTOES_POR_NO = 16
+# A busca aproximada compara só o início do texto (o custo cresce com o tamanho)
+MAX_LETRAS_APROXIMADA = 10
+# Palavras que não iniciam uma chave de busca ("rio preto" sim, "do rio preto" não)
+PALAVRAS_IGNORADAS = {"de", "da", "do", "das", "dos", "e"}
+_CODIGO = re.compile(r"^[A-Z]{3}$")
+
+
+class Local(NamedTuple):
+    """Aeroporto ou região; aeroportos: códigos consultados nas buscas por este local."""
+    codigo: str
+    nome: str
+    cidade: str
+    uf: str
+    pais: str
+    aeroportos: tuple
+
+    def descricao(self) -> str:
+        if len(self.aeroportos) > 1:
+            return f"{self.codigo} - {self.cidade}, todos os aeroportos ({', '.join(self.aeroportos)})"
+        return f"{self.codigo} - {self.nome}, {self.cidade}{f'/{self.uf}' if self.uf else f' ({self.pais})'}"
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sem acentos e sem pontuação: 'São Paulo' -> 'sao paulo'."""
+    sem_acento = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", sem_acento.lower()).split())
+
+
+def _chaves(local: Local) -> set:
+    """Textos pelos quais o local é encontrado: código, cidade, nome e cada palavra inicial deles."""
+    chaves = set()
+    for texto in (local.codigo, local.cidade, local.nome):
+        palavras = normalizar(texto).split()
+        chaves.update(" ".join(palavras[i:]) for i in range(len(palavras)) if palavras[i] not in PALAVRAS_IGNORADAS)
+    return chaves
+
+
+def _proxima_linha(chave: str, linha: list, anterior: list | None, c: str, c_anterior: str | None) -> list:
+    """Linha da distância de edição ao descer para a letra c (anterior e c_anterior: para as transposições)."""
+    nova = [linha[0] + 1]
+    esquerda = nova[0]
+    for j in range(1, len(chave) + 1):
+        custo = linha[j - 1] if chave[j - 1] == c else linha[j - 1] + 1
+        if linha[j] + 1 < custo:
+            custo = linha[j] + 1
+        if esquerda + 1 < custo:
+            custo = esquerda + 1
+        if anterior is not None and j > 1 and chave[j - 1] == c_anterior and chave[j - 2] == c \
+                and anterior[j - 2] + 1 < custo:
+            custo = anterior[j - 2] + 1
+        nova.append(custo)
+        esquerda = custo
+    return nova
+
+
+class _No:
+    __slots__ = ("filhos", "locais")
+
+    def __init__(self):
+        self.filhos = {}
+        self.locais = []
+
+
+class ResolvedorAeroportos:
+    """
+    Índice de prefixos (trie) sobre código, cidade e nome de cada aeroporto, sem
+    acentos. Cada nó já guarda os SUGESTOES_POR_NO locais de maior prioridade da
+    subárvore, então sugerir por prefixo custa o tamanho do texto digitado. Sem
+    prefixo exato, a busca aproximada percorre o mesmo índice a partir da
+    primeira letra com a linha da distância de edição, podando ramos que já
+    passaram do limite de erros.
+
+    A prioridade é a ordem da base (maiores aeroportos primeiro); uma região
+    (SAO, RIO...) vem logo antes do seu primeiro aeroporto.
+    """
+
+    def __init__(self, aeroportos: list):
+        regioes = {}
+        for a in aeroportos:
+            if a["regiao"]:
+                regioes.setdefault(a["regiao"], []).append(a["iata"])
+        self.locais = []
+        for a in aeroportos:
+            regiao = a["regiao"]
+            if regiao and regioes[regiao][0] == a["iata"]:
+                self.locais.append(Local(regiao, REGIOES.get(regiao, a["cidade"]), REGIOES.get(regiao, a["cidade"]),
+                                         a["uf"], a["pais"], tuple(regioes[regiao])))
+            self.locais.append(Local(a["iata"], a["nome"], a["cidade"], a["uf"], a["pais"], (a["iata"],)))
+        self._por_codigo = {l.codigo: l for l in self.locais}
+        self._exatos = {}  # texto completo (código, cidade, nome) -> índices, por prioridade
+        self._raiz = _No()
+        for i, local in enumerate(self.locais):
+            for texto in (local.codigo, local.cidade, local.nome):
+                self._exatos.setdefault(normalizar(texto), []).append(i)
+            for chave in _chaves(local):
+                no = self._raiz
+                for c in chave:
+                    no = no.filhos.setdefault(c, _No())
+                    # Locais entram em ordem de prioridade: os primeiros SUGESTOES_POR_NO são os melhores
+                    if len(no.locais) < SUGESTOES_POR_NO and (not no.locais or no.locais[-1] != i):
+                        no.locais.append(i)
+        self._exatos = {k: list(dict.fromkeys(v)) for k, v in self._exatos.items()}
+
+    @classmethod
+    def de_arquivo(cls, caminho: str = CAMINHO_DADOS) -> "ResolvedorAeroportos":
+        with open(caminho, encoding="utf-8", newline="") as f:
+            return cls(list(csv.DictReader(f)))
+
+    def local(self, codigo: str) -> Local | None:
+        return self._por_codigo.get(codigo.strip().upper())
+
+    def sugerir(self, texto: str, limite: int = SUGESTOES_PADRAO, max_erros: int | None = None) -> list:
+        """
+        Locais cujo código, cidade ou nome começam com o texto (acentos e caixa
+        ignorados), correspondências exatas primeiro. Sem nenhum, os que começam
+        com algo a até max_erros edições do texto (padrão: 0 até 3 letras, 1 até
+        7, 2 acima; a primeira letra precisa bater e só as MAX_LETRAS_APROXIMADA
+        primeiras contam), do mais próximo ao mais distante.
+        """
+        chave = normalizar(texto)
+        if not chave:
+            return []
+        no = self._raiz
+        for c in chave:
+            no = no.filhos.get(c)
+            if no is None:
+                break
+        else:
+            indices = dict.fromkeys(self._exatos.get(chave, []) + no.locais)
+            return [self.locais[i] for i in list(indices)[:limite]]
+        chave = chave[:MAX_LETRAS_APROXIMADA]
+        if max_erros is None:
+            max_erros = 0 if len(chave) < 4 else 1 if len(chave) < 8 else 2
+        return [self.locais[i] for i in self._aproximados(chave, max_erros)[:limite]]
+
+    def _aproximados(self, chave: str, max_erros: int) -> list:
+        """
+        Índices dos locais com alguma chave cujo prefixo está a até max_erros edições
+        do texto (Levenshtein com transposição de letras vizinhas). A primeira letra
+        precisa bater: poda quase todo o índice, e erros nela são raros.
+        """
+        primeiro = self._raiz.filhos.get(chave[0])
+        if primeiro is None:
+            return []
+        inicial = list(range(len(chave) + 1))
+        distancias = {}
+        pilha = [(primeiro, chave[0], _proxima_linha(chave, inicial, None, chave[0], None), inicial)]
+        while pilha:
+            no, c, linha, anterior = pilha.pop()
+            if linha[-1] <= max_erros:
+                for i in no.locais:
+                    if linha[-1] < distancias.get(i, max_erros + 1):
+                        distancias[i] = linha[-1]
+            for c_filho, filho in no.filhos.items():
+                nova = _proxima_linha(chave, linha, anterior, c_filho, c)
+                if min(nova) <= max_erros:
+                    pilha.append((filho, c_filho, nova, linha))
+        return sorted(distancias, key=lambda i: (distancias[i], i))
+
+    def resolver(self, texto: str) -> Local | None:
+        """
+        Local do texto digitado: correspondência exata de código, cidade ou nome
+        (a de maior prioridade, então "São Paulo" é a região SAO) ou a única
+        sugestão. Ambíguo ou desconhecido: None.
+        """
+        exatos = self._exatos.get(normalizar(texto))
+        if exatos:
+            return self.locais[exatos[0]]
+        sugestoes = self.sugerir(texto, limite=SUGESTOES_POR_NO)
+        if not sugestoes:
+            return None
+        # Única sugestão, ou uma região seguida só dos seus aeroportos ("Belo Hor" -> BHZ)
+        primeira = sugestoes[0]
+        return primeira if all(s.codigo in primeira.aeroportos for s in sugestoes[1:]) else None
+
+
+@lru_cache(maxsize=None)
+def resolvedor() -> ResolvedorAeroportos:
+    """Índice único por processo, montado a partir de dados/aeroportos.csv na primeira consulta."""
+    return ResolvedorAeroportos.de_arquivo()
+
+
+def resolver_codigo(texto: str) -> str:
+    """
+    Código para as buscas (aeroporto ou região). Um código de três letras em
+    maiúsculas fora da base passa como está; texto sem correspondência única:
+    ValueError com as sugestões.
+    """
+    local = resolvedor().resolver(texto)
+    if local is not None:
+        return local.codigo
+    if _CODIGO.match(texto.strip()):
+        return texto.strip()
+    sugestoes = resolvedor().sugerir(texto, limite=5)
+    if not sugestoes:
+        raise ValueError(f"Local não encontrado: {texto!r}.")
+    raise ValueError(f"Local ambíguo ou não encontrado: {texto!r}. Sugestões: "
+                     + "; ".join(l.descricao() for l in sugestoes))
+
+
+def expandir(codigo: str) -> tuple:
+    """Aeroportos consultados para um código: os da região (SAO -> GRU, CGH, VCP) ou o próprio código."""
+    local = resolvedor().local(codigo)
+    return local.aeroportos if local is not None else (codigo.strip().upper(),)
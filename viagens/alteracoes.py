@@ -0,0 +1,64 @@
+# alteracoes.py - Janela em memória das alterações recentes de solicitações, compartilhada pelas sessões do processo
+import threading
+import time
+from bisect import bisect_right
+
+INTERVALO_CONSULTA_S = 1.0  # no máximo uma consulta ao banco por intervalo, por processo
+TAMANHO_JANELA = 5000       # alterações mantidas; cursores mais antigos recarregam tudo
+
+
+class JanelaAlteracoes:
+    """
+    Últimas alterações das solicitações (de qualquer sessão ou réplica), lidas do
+    banco no máximo uma vez por intervalo_s, qualquer que seja o número de
+    sessões. Cada sessão guarda o seu cursor (o número da última alteração que
+    viu) e recebe só o que veio depois.
+
+    A janela é uma tupla imutável trocada inteira a cada consulta: as leituras
+    não pegam trava, e quem chega enquanto outra thread consulta o banco usa a
+    janela anterior em vez de esperar.
+    """
+
+    def __init__(self, ler_apos, ultima, intervalo_s: float = INTERVALO_CONSULTA_S, tamanho: int = TAMANHO_JANELA):
+        self._ler_apos = ler_apos  # apos -> alterações com número > apos, em ordem (dicts com "alteracao")
+        self._ultima = ultima      # () -> número da alteração mais recente no banco
+        self.intervalo_s = intervalo_s
+        self.tamanho = tamanho
+        fim = ultima()
+        # (início, fim, números, alterações): a janela cobre as alterações em (início, fim]
+        self._janela = (fim, fim, (), ())
+        self._trava = threading.Lock()
+        self._proxima_consulta = 0.0
+
+    def _atualizar(self):
+        if time.monotonic() < self._proxima_consulta or not self._trava.acquire(blocking=False):
+            return
+        try:
+            inicio, fim, _, itens = self._janela
+            ultima = self._ultima()
+            if ultima != fim:
+                if ultima < fim or ultima - fim > self.tamanho:
+                    # Banco trocado, ou mais alterações que a janela (importação em lote): recomeça
+                    inicio = fim = max(0, ultima - self.tamanho)
+                    itens = ()
+                itens += tuple(self._ler_apos(fim))
+                if len(itens) > self.tamanho:
+                    itens = itens[-self.tamanho:]
+                    inicio = itens[0]["alteracao"] - 1
+                fim = itens[-1]["alteracao"] if itens else fim
+                self._janela = (inicio, fim, tuple(a["alteracao"] for a in itens), itens)
+            self._proxima_consulta = time.monotonic() + self.intervalo_s
+        finally:
+            self._trava.release()
+
+    def desde(self, cursor: int) -> tuple:
+        """
+        (alterações depois de cursor, novo cursor); cursor anterior à janela: (None,
+        novo cursor). A janela pode estar até intervalo_s atrás do banco: um cursor
+        lido direto do banco (mais novo que ela) só recebe o que vier depois dele.
+        """
+        self._atualizar()
+        inicio, fim, numeros, itens = self._janela
+        if cursor < inicio:
+            return None, fim
+        return list(itens[bisect_right(numeros, cursor):]), max(cursor, fim)
@@ -0,0 +1,160 @@
+# api.py - API HTTP local (JSON) sobre viagens.servico, atendida por um pool de workers
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from viagens.aeroportos import SUGESTOES_PADRAO, resolvedor
+from viagens.servico import FONTES, MAX_PARALELO_PADRAO, cotar, cotar_lote
+
+log = logging.getLogger(__name__)
+
+TRABALHADORES_PADRAO = 16
+MAX_CORPO_BYTES = 10 * 2**20
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    """
+    POST /cotacoes[?fonte=simulado|indicative|live]
+        corpo: um pedido (objeto) -> um resultado; ou uma lista -> lista de resultados,
+        na mesma ordem ({"erro": ...} nas posições inválidas)
+    GET /aeroportos?q=texto[&limite=N]
+        autocompletar de origem/destino: locais (código, nome, cidade, uf, pais, aeroportos)
+    GET /saude
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive: clientes reaproveitam a conexão
+    timeout = 15  # conexão ociosa libera o worker após 15 s
+    disable_nagle_algorithm = True  # cabeçalho e corpo saem em writes separados
+
+    def _responder(self, status: int, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        if self.server.ha_conexoes_esperando():
+            # Pool ocupado: encerra esta conexão para o worker atender quem está na fila
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/saude":
+            self._responder(200, {"status": "ok"})
+        elif url.path == "/aeroportos":
+            parametros = parse_qs(url.query)
+            try:
+                limite = int(parametros.get("limite", [SUGESTOES_PADRAO])[0])
+            except ValueError:
+                self._responder(400, {"erro": "limite inválido."})
+                return
+            sugestoes = resolvedor().sugerir(parametros.get("q", [""])[0], limite=max(1, min(limite, 50)))
+            self._responder(200, [l._asdict() for l in sugestoes])
+        else:
+            self._responder(404, {"erro": "Rota não encontrada."})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/cotacoes":
+            self._responder(404, {"erro": "Rota não encontrada."})
+            return
+        fonte = parse_qs(url.query).get("fonte", [self.server.fonte])[0]
+        if fonte not in FONTES:
+            self._responder(400, {"erro": f"Fonte inválida: {fonte} (use {', '.join(FONTES)})"})
+            return
+        try:
+            tamanho = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            tamanho = -1
+        if tamanho < 0:
+            # Sem tamanho válido não dá para saber onde o corpo termina: a conexão é encerrada
+            self.close_connection = True
+            self._responder(400, {"erro": "Content-Length inválido."})
+            return
+        if tamanho > MAX_CORPO_BYTES:
+            self._responder(413, {"erro": "Corpo grande demais."})
+            return
+        try:
+            pedido = json.loads(self.rfile.read(tamanho) or b"null")
+        except ValueError:
+            self._responder(400, {"erro": "JSON inválido."})
+            return
+        if not isinstance(pedido, (list, dict)):
+            self._responder(400, {"erro": "Envie um objeto (um pedido) ou uma lista de pedidos."})
+            return
+        try:
+            if isinstance(pedido, list):
+                resultado = cotar_lote(pedido, fonte, self.server.max_paralelo)
+            else:
+                resultado = cotar(pedido, fonte)
+        except (ValueError, KeyError, TypeError) as e:
+            self._responder(422, {"erro": str(e)})
+        except OSError as e:  # rede e prazos das integrações (inclui requests.RequestException)
+            log.warning("Falha na integração ao cotar: %s", e)
+            self._responder(502, {"erro": f"Falha na integração de tarifas: {e}"})
+        except Exception:
+            log.exception("Erro ao cotar")
+            self._responder(500, {"erro": "Erro interno ao cotar."})
+        else:
+            self._responder(200, resultado)
+
+    def log_message(self, formato, *args):
+        log.debug("%s - " + formato, self.address_string(), *args)
+
+
+class ServidorCotacoes(HTTPServer):
+    """
+    HTTPServer cujas conexões são atendidas por um pool fixo de threads
+    (trabalhadores), em vez de uma thread nova por conexão: a concorrência fica
+    limitada mesmo sob carga. Conexões keep-alive ocupam um worker; com outras
+    na fila, a resposta sai com "Connection: close" e o worker é liberado.
+    Lotes usam o pool de cotações de viagens.servico.
+    """
+
+    request_queue_size = 128  # backlog do listen: rajadas de conexões esperam em vez de serem recusadas
+
+    def __init__(self, endereco: tuple, trabalhadores: int = TRABALHADORES_PADRAO, fonte: str = "simulado",
+                 max_paralelo: int = MAX_PARALELO_PADRAO):
+        super().__init__(endereco, _Manipulador)
+        self.fonte = fonte
+        self.max_paralelo = max_paralelo
+        self.executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="api")
+        self._esperando = 0
+        self._trava = threading.Lock()
+
+    def ha_conexoes_esperando(self) -> bool:
+        return self._esperando > 0
+
+    def process_request(self, request, client_address):
+        with self._trava:
+            self._esperando += 1
+        self.executor.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        with self._trava:
+            self._esperando -= 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def servir(host: str = "127.0.0.1", porta: int = 8080, trabalhadores: int = TRABALHADORES_PADRAO,
+           fonte: str = "simulado", max_paralelo: int = MAX_PARALELO_PADRAO):
+    """Atende até Ctrl+C."""
+    with ServidorCotacoes((host, porta), trabalhadores, fonte, max_paralelo) as servidor:
+        log.info("API de cotações em http://%s:%d (%d workers)", host, servidor.server_address[1], trabalhadores)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1 @@
+"""Páginas do app Streamlit, uma por módulo: só a página ativa é importada e executada."""
@@ -0,0 +1,203 @@
+# aprovacao.py - Página "Workflow de aprovação": fila paginada, decisões em lote e individuais
+import pandas as pd
+import streamlit as st
+
+from viagens.armazenamento import ConflitoVersao
+from viagens.depositos import data_deposito
+from viagens.voucher import gerar_voucher_html
+
+# De quanto em quanto tempo a página procura decisões de outros gestores (só o aviso é reexecutado)
+INTERVALO_ALTERACOES_S = 5
+MAX_ALTERACOES_EXIBIDAS = 10
+
+
+def _marcar_proprias(registros):
+    """Decisões desta sessão não aparecem como alterações de outros gestores."""
+    st.session_state.setdefault("alteracoes_proprias", set()).update((r["id"], r["versao"]) for r in registros)
+
+
+def _avisar_conflito(e: ConflitoVersao, chave: str):
+    """Decisão recusada por versão desatualizada: aviso no próximo rerun, que já relê a fila."""
+    st.session_state[chave] = f"Nada foi gravado. {e} Revise e decida de novo."
+    st.session_state.fila_versao = st.session_state.get("fila_versao", 0) + 1
+
+
+@st.fragment(run_every=INTERVALO_ALTERACOES_S)
+def _alteracoes_de_outros(repo, ids_exibidos: tuple, sol_id: int | None, versao: int | None):
+    """
+    Decisões e solicitações novas gravadas por outras sessões (ou réplicas) desde a
+    última atualização da página. Só este trecho roda a cada intervalo e lê a
+    janela de alterações do processo, não o banco; a fila e a solicitação aberta
+    só são relidas quando o gestor pede.
+    """
+    novas, st.session_state.alteracoes_cursor = repo.alteracoes_desde(st.session_state.alteracoes_cursor)
+    if novas is None:
+        st.info("Muitas alterações desde a última atualização da fila.")
+        if st.button("Atualizar fila", key="atualizar_alteracoes"):
+            st.rerun()
+        return
+    proprias = st.session_state.get("alteracoes_proprias", set())
+    vistas = st.session_state.setdefault("alteracoes_outros", {})
+    vistas.update((a["id"], a) for a in novas if (a["id"], a["versao"]) not in proprias)
+    if sol_id in vistas and vistas[sol_id]["versao"] != versao:
+        a = vistas[sol_id]
+        st.warning(f"A solicitação #{sol_id} foi alterada por outro gestor: {a['aprovacao']} (versão {a['versao']}). "
+                   "Atualize antes de decidir.")
+    na_pagina = [a for i, a in vistas.items() if i in ids_exibidos]
+    if vistas:
+        st.info(f"{len(vistas)} solicitação(ões) alterada(s) por outros gestores desde a última atualização"
+                + (f", {len(na_pagina)} nesta página." if na_pagina else "."))
+        recentes = sorted(vistas.values(), key=lambda a: a["alteracao"], reverse=True)[:MAX_ALTERACOES_EXIBIDAS]
+        st.dataframe(pd.DataFrame(recentes)[["id", "colaborador", "aprovacao", "versao"]],
+                     hide_index=True, use_container_width=True)
+        if st.button("Atualizar fila", key="atualizar_alteracoes"):
+            st.rerun()
+
+
+def renderizar(repo, fonte_dados: str):
+    st.title("Aprovação de solicitações")
+
+    # Rerun completo: a fila e a solicitação abaixo são lidas agora, então as alterações
+    # até aqui já aparecem nelas; o aviso mostra só as que vierem depois
+    st.session_state.alteracoes_cursor = repo.ultima_alteracao()
+    st.session_state.alteracoes_outros = {}
+    st.session_state.alteracoes_proprias = set()
+
+    if repo.maior_id() == 0:  # MAX(id): pela chave primária, sem contar a tabela
+        st.info("Nenhuma solicitação cadastrada ainda.")
+    else:
+        # Fila paginada: filtros nas colunas indexadas e páginas por chave (id), e
+        # opções dos filtros lidas pelo índice (valores_distintos): cada rerun lê só
+        # uma página, qualquer que seja o tamanho da base. Por isso não há total
+        # exato da fila (COUNT varreria todas as linhas do filtro a cada rerun).
+        colf = st.columns(4)
+        with colf[0]:
+            filtro_situacao = st.selectbox("Situação", ["Pendente", "Aprovado ✅", "Reprovado ❌", "Todas"])
+        with colf[1]:
+            filtro_status = st.multiselect("Status de política", repo.valores_distintos("status"))
+        with colf[2]:
+            filtro_area = st.multiselect("Área", repo.valores_distintos("area"))
+        with colf[3]:
+            filtro_cargo = st.multiselect("Cargo", repo.valores_distintos("cargo"))
+        filtros_fila = {k: v for k, v in (
+            ("aprovacao", None if filtro_situacao == "Todas" else filtro_situacao),
+            ("status", filtro_status), ("area", filtro_area), ("cargo", filtro_cargo)) if v}
+        tamanho_pagina = st.selectbox("Itens por página", [25, 50, 100], index=1)
+
+        # Pilha com o último id de cada página anterior; recomeça quando os filtros mudam
+        chave_fila = (repr(sorted(filtros_fila.items())), tamanho_pagina)
+        if st.session_state.get("fila_chave") != chave_fila:
+            st.session_state.fila_chave = chave_fila
+            st.session_state.fila_cursores = [0]
+        cursores = st.session_state.fila_cursores
+        pagina_fila = repo.pagina_resumo(cursores[-1], tamanho_pagina + 1, **filtros_fila)
+        tem_proxima = len(pagina_fila) > tamanho_pagina
+        pagina_fila = pagina_fila[:tamanho_pagina]
+
+        def decidir_selecionadas(versoes, aprovacao):
+            """
+            Callback: roda antes do próximo rerun, que já mostra a fila atualizada.
+            versoes (id -> versão) são as da página que o gestor viu: se outro gestor
+            decidiu alguma delas nesse meio tempo, nada é gravado.
+            """
+            try:
+                atualizadas = repo.registrar_decisoes(list(versoes), aprovacao,
+                                                      st.session_state.get("comentario_lote", ""), versoes)
+            except ConflitoVersao as e:
+                _avisar_conflito(e, "fila_aviso")
+                return
+            _marcar_proprias(atualizadas)
+            st.session_state.fila_versao = st.session_state.get("fila_versao", 0) + 1
+            st.session_state.fila_mensagem = f"{len(atualizadas)} solicitação(ões) marcada(s) como {aprovacao}."
+
+        if "fila_mensagem" in st.session_state:
+            st.success(st.session_state.pop("fila_mensagem"))
+        if "fila_aviso" in st.session_state:
+            st.warning(st.session_state.pop("fila_aviso"))
+        inicio = (len(cursores) - 1) * tamanho_pagina
+        st.caption(f"Página {len(cursores)} — solicitações {inicio + 1 if pagina_fila else 0} a "
+                   f"{inicio + len(pagina_fila)}" + (", há mais na próxima página" if tem_proxima else ""))
+        colunas_fila = ["id", "colaborador", "area", "cargo", "origem", "destino",
+                        "data_ida", "data_volta", "total_previsto", "status", "aprovacao", "versao"]
+        df = pd.DataFrame(pagina_fila, columns=colunas_fila)
+        df.insert(0, "selecionar", False)
+        editado = st.data_editor(df, disabled=colunas_fila, hide_index=True, use_container_width=True,
+                                 key=f"fila_{cursores[-1]}_{st.session_state.get('fila_versao', 0)}")
+        # id -> versão exibida: as decisões em lote só valem se nenhuma mudou desde então
+        selecionados = {int(i): int(v) for i, v in
+                        editado.loc[editado["selecionar"], ["id", "versao"]].itertuples(index=False)}
+
+        nav = st.columns(4)
+        nav[0].button("◀ Anterior", disabled=len(cursores) == 1, on_click=cursores.pop)
+        nav[1].button("Próxima ▶", disabled=not tem_proxima,
+                      on_click=lambda: cursores.append(pagina_fila[-1]["id"]))
+        nav[2].button(f"Aprovar selecionadas ({len(selecionados)})", disabled=not selecionados,
+                      on_click=decidir_selecionadas, args=(selecionados, "Aprovado ✅"))
+        nav[3].button(f"Reprovar selecionadas ({len(selecionados)})", disabled=not selecionados,
+                      on_click=decidir_selecionadas, args=(selecionados, "Reprovado ❌"))
+        st.text_input("Comentário para as selecionadas (opcional)", key="comentario_lote")
+
+        sel_id = st.number_input("ID da solicitação para analisar", min_value=1,
+                                 max_value=repo.maior_id(), value=pagina_fila[0]["id"] if pagina_fila else 1)
+        solic = repo.obter(int(sel_id))
+        _alteracoes_de_outros(repo, tuple(l["id"] for l in pagina_fila), solic and solic["id"],
+                              solic and solic["versao"])
+        if solic is None:
+            st.warning(f"Solicitação #{sel_id} não encontrada.")
+            return
+
+        st.markdown(f"#### Solicitação #{solic['id']} - {solic['colaborador']}")
+        st.write(f"**Status de política:** {solic['status']}")
+        if solic["alertas"]:
+            st.error("Alertas:")
+            for a in solic["alertas"]:
+                st.write(f"- {a}")
+
+        cols = st.columns(3)
+        with cols[0]:
+            st.write("**Voo ida:**", solic["voo_ida"])
+        with cols[1]:
+            st.write("**Voo volta:**", solic["voo_volta"])
+        with cols[2]:
+            st.write("**Hotel:**", solic["hotel"])
+
+        st.write(f"**Ajuda de custo:** R$ {solic['ajuda_custo']}")
+        st.write(f"**Total previsto:** R$ {solic['total_previsto']}")
+
+        st.radio("Decisão do gestor", ["Aprovar", "Reprovar"], index=0, key="decisao_gestor")
+        st.text_area("Comentário do gestor (opcional)", key="comentario_gestor")
+
+        def decidir(sol_id, versao):
+            """Callback com a versão exibida quando o botão foi desenhado (não a relida no clique)."""
+            aprovacao = "Aprovado ✅" if st.session_state.decisao_gestor == "Aprovar" else "Reprovado ❌"
+            try:
+                registro = repo.registrar_decisao(sol_id, aprovacao, st.session_state.comentario_gestor, versao)
+            except ConflitoVersao as e:
+                _avisar_conflito(e, "decisao_aviso")
+                return
+            _marcar_proprias([registro])
+            st.session_state.decisao_mensagem = f"Decisão registrada: {registro['aprovacao']}"
+
+        st.button("Registrar decisão", on_click=decidir, args=(solic["id"], solic["versao"]))
+        if "decisao_mensagem" in st.session_state:
+            st.success(st.session_state.pop("decisao_mensagem"))
+        if "decisao_aviso" in st.session_state:
+            st.warning(st.session_state.pop("decisao_aviso"))
+
+        st.markdown("##### Notificações automáticas")
+        if solic["aprovacao"] == "Aprovado ✅":
+            st.info("🔔 Gestor imediato, Financeiro e solicitante notificados sobre a aprovação e a programação "
+                    f"de depósito em {data_deposito(solic['data_ida']).strftime('%d/%m/%Y')} (D-2).")
+        elif solic["aprovacao"] == "Reprovado ❌":
+            st.info("🔔 Solicitante notificado com motivos e possibilidade de reenvio com ajustes.")
+        # Entrega em segundo plano (caixa de saída): aqui só a situação de cada envio
+        enviadas = repo.listar_notificacoes(solic["id"])
+        if enviadas:
+            st.dataframe(pd.DataFrame(enviadas)[["evento", "canal", "destinatario", "situacao", "tentativas",
+                                                 "ultimo_erro", "enviado_em"]],
+                         hide_index=True, use_container_width=True)
+
+        # Voucher pós-decisão
+        html = gerar_voucher_html(solic)
+        st.download_button("Baixar voucher HTML da solicitação", data=html,
+                           file_name=f"voucher_{solic['id']}.html", mime="text/html")
@@ -0,0 +1,40 @@
+# desempenho.py - Página oculta "Desempenho" (?pagina=desempenho): spans de viagens/metricas.py
+import altair
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from viagens import metricas
+
+
+def renderizar(repo, fonte_dados: str):
+    st.title("Desempenho")
+    arquivo_metricas = metricas.iniciar_exportacao()
+    st.caption("Percentis das últimas medições de cada span (por processo, desde o início do app).")
+    linhas_metricas = metricas.resumo()
+    if not linhas_metricas:
+        st.info("Nenhuma medição ainda: navegue pelas outras páginas e volte.")
+    else:
+        df_metricas = pd.DataFrame(linhas_metricas).set_index("span")
+        st.dataframe(df_metricas.round(2), use_container_width=True)
+        st.subheader("p50 / p95 / p99 por span (ms)")
+        st.bar_chart(df_metricas[["p50_ms", "p95_ms", "p99_ms"]], stack=False, horizontal=True)
+
+        st.subheader("Distribuição das medições recentes")
+        span_escolhido = st.selectbox("Span", df_metricas.index)
+        duracoes = pd.DataFrame({"duracao_ms": np.array(metricas.amostras(span_escolhido)) * 1000})
+        st.altair_chart(altair.Chart(duracoes).mark_bar().encode(
+            x=altair.X("duracao_ms:Q", bin=altair.Bin(maxbins=40), title="Duração (ms)"),
+            y=altair.Y("count()", title="Medições"),
+        ), use_container_width=True)
+
+    st.subheader("Exportação Prometheus")
+    if arquivo_metricas:
+        st.caption(f"Gravado a cada {metricas.INTERVALO_EXPORTACAO_S:.0f} s em {arquivo_metricas}")
+    else:
+        st.caption(f"Defina {metricas.VARIAVEL_ARQUIVO} para gravar o arquivo periodicamente.")
+    st.download_button("Baixar métricas (texto Prometheus)", data=metricas.texto_prometheus(),
+                       file_name="viagens.prom", mime="text/plain")
+    if st.button("Zerar medições"):
+        metricas.zerar()
+        st.rerun()
@@ -0,0 +1,146 @@
+# gerencial.py - Página "Dashboard gerencial": KPIs, tickets médios, violações, trechos, detalhamento e vouchers do período
+import io
+import tempfile
+from datetime import date, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from viagens.colunar import SolicitacoesColunares
+from viagens.politicas import ALERTA_ANTECEDENCIA, ALERTA_HOTEL, ALERTA_VOO_IDA, ALERTA_VOO_VOLTA
+from viagens.voucher import exportar_vouchers_zip
+
+# Detalhamento do período: colunas exibidas e filtro de violações (bit da máscara de alertas -> rótulo)
+COLUNAS_DETALHE = ["id", "colaborador", "area", "cargo", "trecho_ida", "data_ida", "data_volta",
+                   "custo_voos", "custo_hotel", "total_previsto", "status", "aprovacao"]
+VIOLACOES = {ALERTA_ANTECEDENCIA: "Antecedência", ALERTA_VOO_IDA: "Voo de ida",
+             ALERTA_VOO_VOLTA: "Voo de volta", ALERTA_HOTEL: "Hotel"}
+# ZIP de vouchers: tamanho mantido em memória antes de passar para um arquivo temporário em disco
+ZIP_EM_MEMORIA_BYTES = 32 * 2**20
+
+
+def renderizar(repo, fonte_dados: str):
+    st.title("Dashboard gerencial")
+
+    if repo.contar() == 0:
+        st.info("Sem dados para o dashboard ainda.")
+    else:
+        # Filtros: tudo é lido dos agregados incrementais (dia x área x cargo x aprovação x status),
+        # com custo proporcional ao período e não ao histórico completo
+        cols = st.columns(4)
+        with cols[3]:
+            periodo_ini = st.date_input("Período inicial", value=date.today() - timedelta(days=60))
+            periodo_fim = st.date_input("Período final", value=date.today() + timedelta(days=1))
+        opcoes = repo.consultar_rollups(periodo_ini, periodo_fim)
+        areas, cargos, aprovacoes = (opcoes.valores_distintos(c) for c in ("area", "cargo", "aprovacao"))
+        if not areas:
+            st.info("Nenhum dado no período filtrado.")
+            return
+        with cols[0]:
+            filtro_area = st.multiselect("Filtrar por área", areas, default=areas)
+        with cols[1]:
+            filtro_cargo = st.multiselect("Filtrar por cargo", cargos, default=cargos)
+        with cols[2]:
+            filtro_aprov = st.multiselect("Filtrar por aprovação", aprovacoes, default=aprovacoes)
+
+        consulta = repo.consultar_rollups(periodo_ini, periodo_fim, filtro_area, filtro_cargo, filtro_aprov)
+        kpis = consulta.kpis()
+        vazio = kpis["total"] == 0
+
+        # KPIs
+        colk = st.columns(4)
+        with colk[0]:
+            st.metric("Total de solicitações", kpis["total"])
+        with colk[1]:
+            st.metric("Aprovadas", kpis["aprovadas"])
+        with colk[2]:
+            st.metric("Fora da política", kpis["fora_politica"])
+        with colk[3]:
+            st.metric("Gasto previsto (R$)", int(kpis["gasto_previsto"]))
+
+        # Ticket médio: aéreo, hospedagem e total por área
+        st.subheader("Ticket médio por área")
+        if not vazio:
+            tm_area = consulta.ticket_medio("area")
+            st.dataframe(tm_area, use_container_width=True)
+            st.bar_chart(tm_area["total_previsto"])
+        else:
+            st.info("Nenhum dado no período filtrado.")
+
+        # Ticket médio por cargo
+        st.subheader("Ticket médio por cargo")
+        if not vazio:
+            tm_cargo = consulta.ticket_medio("cargo")
+            st.dataframe(tm_cargo, use_container_width=True)
+            st.bar_chart(tm_cargo["total_previsto"])
+
+        # Violações por área e cargo
+        st.subheader("Histórico de violações por área e cargo")
+        if not vazio:
+            viol_por_area = consulta.violacoes_por("area")
+            viol_por_cargo = consulta.violacoes_por("cargo")
+            colv = st.columns(2)
+            with colv[0]:
+                st.dataframe(viol_por_area.sort_values("violacoes", ascending=False), use_container_width=True)
+                st.bar_chart(viol_por_area.set_index("area"))
+            with colv[1]:
+                st.dataframe(viol_por_cargo.sort_values("violacoes", ascending=False), use_container_width=True)
+                st.bar_chart(viol_por_cargo.set_index("cargo"))
+
+        # Comentários dos gestores (qualitativo)
+        st.subheader("Comentários dos gestores")
+        comentarios = repo.listar_comentarios(periodo_ini, periodo_fim, filtro_area, filtro_cargo, filtro_aprov)
+        if comentarios:
+            st.dataframe(pd.DataFrame(comentarios), use_container_width=True)
+        else:
+            st.write("Sem comentários registrados.")
+
+        # Top 5 trechos mais solicitados (considerando ida e volta separadamente)
+        st.subheader("Top 5 trechos mais solicitados")
+        if not vazio:
+            top5 = consulta.top_trechos(5)
+            st.dataframe(top5, use_container_width=True)
+            st.bar_chart(top5.set_index("trecho"))
+        else:
+            st.write("Sem dados para trechos no período.")
+
+        # Trecho mais caro (pela soma de custo de voos)
+        st.subheader("Trecho mais caro (com base no custo de voos)")
+        if not vazio:
+            st.dataframe(consulta.trecho_mais_caro(), use_container_width=True)
+        else:
+            st.write("Sem dados para cálculo do trecho mais caro.")
+
+        # Detalhamento: as solicitações do período, lidas só quando pedido, no armazenamento colunar
+        # (códigos categóricos + arrays tipados), onde os filtros abaixo são operações vetorizadas
+        st.subheader("Solicitações do período")
+        if not vazio and st.toggle("Detalhar solicitações do período"):
+            df = SolicitacoesColunares.de_repositorio(repo, periodo_ini, periodo_fim, area=filtro_area,
+                                                      cargo=filtro_cargo, aprovacao=filtro_aprov).dataframe()
+            cold = st.columns(2)
+            with cold[0]:
+                filtro_trecho = st.multiselect("Trecho de ida", list(df["trecho_ida"].cat.categories))
+            with cold[1]:
+                filtro_violacao = st.multiselect("Violação", list(VIOLACOES), format_func=VIOLACOES.get)
+            if filtro_trecho:
+                df = df[df["trecho_ida"].isin(filtro_trecho)]
+            if filtro_violacao:
+                df = df[(df["alertas_mask"] & sum(filtro_violacao)) != 0]
+            st.caption(f"{len(df)} solicitação(ões), da mais cara para a mais barata")
+            st.dataframe(df[COLUNAS_DETALHE].sort_values("total_previsto", ascending=False),
+                         hide_index=True, use_container_width=True)
+
+        # Vouchers das viagens aprovadas no período (fechamento do mês)
+        st.subheader("Vouchers das viagens aprovadas no período")
+        if st.button("Gerar ZIP de vouchers"):
+            # Em memória até ZIP_EM_MEMORIA_BYTES; acima disso, o arquivo temporário vai para o disco
+            with tempfile.SpooledTemporaryFile(max_size=ZIP_EM_MEMORIA_BYTES) as arquivo_zip:
+                with st.spinner("Gerando vouchers..."):
+                    aprovadas = repo.iterar(periodo_ini, periodo_fim, aprovacao="Aprovado ✅",
+                                            area=filtro_area, cargo=filtro_cargo)
+                    # Volumes grandes: renderização em paralelo em processos auxiliares
+                    n_vouchers = exportar_vouchers_zip(aprovadas, arquivo_zip,
+                                                       processos=4 if kpis["aprovadas"] > 5000 else 0)
+                # O objeto de arquivo vai direto para o botão (BufferedReader: tipo aceito pelo Streamlit)
+                st.download_button(f"Baixar {n_vouchers} vouchers (ZIP)", data=io.BufferedReader(arquivo_zip),
+                                   file_name=f"vouchers_{periodo_ini}_{periodo_fim}.zip", mime="application/zip")
@@ -0,0 +1,243 @@
+# nova_solicitacao.py - Página "Nova solicitação": busca de voos e hotéis, política, otimizador e importação em lote
+from datetime import date, timedelta
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+from viagens import metricas
+from viagens.aeroportos import resolvedor, resolver_codigo
+from viagens.depositos import data_deposito
+from viagens.historico_tarifas import historico_configurado
+from viagens.otimizador import otimizar_itinerario
+from viagens.politicas import ALERTA_ANTECEDENCIA, politica_vigente, sugerir_reducao_custos
+from viagens.servico import buscar_voos, hoteis_simulados, montar_solicitacao
+from viagens.voucher import gerar_voucher_html
+
+HORAS_JANELA = [f"{h:02d}:00" for h in range(24)] + ["23:59"]
+# Opções do seletor "Voos" na sidebar -> fonte em viagens.servico
+FONTES_APP = {"Simulado": "simulado", "Skyscanner Indicative": "indicative", "Skyscanner Live": "live"}
+
+
+def _local(texto: str) -> str:
+    """Código do local digitado, descrito logo abaixo do campo; ambíguo ou desconhecido: erro com sugestões e a página para."""
+    try:
+        codigo = resolver_codigo(texto)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+    local = resolvedor().local(codigo)
+    st.caption(local.descricao() if local else f"{codigo} (fora da base de aeroportos)")
+    return codigo
+
+
+def renderizar(repo, fonte_dados: str):
+    """Integrações Skyscanner só são importadas quando a fonte selecionada as usa."""
+    st.title("Nova solicitação de viagem")
+
+    cols = st.columns(3)
+    with cols[0]:
+        colaborador = st.text_input("Nome do colaborador", value="Fulano de Tal")
+        area = st.selectbox("Área", ["Operações", "Comercial", "TI", "Financeiro", "RH"])
+        cargo = st.selectbox("Cargo", politica_vigente().cargos)
+    with cols[1]:
+        origem = _local(st.text_input("Origem (IATA, cidade ou aeroporto)", value="FOR"))
+        destino = _local(st.text_input("Destino (IATA, cidade ou aeroporto)", value="GRU"))
+        motivo = st.text_area("Motivo da viagem", value="Reunião com cliente e visita")
+    with cols[2]:
+        data_ida = st.date_input("Data de ida", value=date.today() + timedelta(days=12))
+        data_volta = st.date_input("Data de volta", value=date.today() + timedelta(days=15))
+
+    dias_viagem = (data_volta - data_ida).days + 1
+    antecedencia = (data_ida - date.today()).days
+    # Limites da versão de política vigente na data da viagem
+    politica = politica_vigente(data_ida)
+
+    # Alertas de antecedência
+    if antecedencia < politica.antecedencia_minima:
+        st.warning(f"⚠️ {politica.mensagens_alerta[ALERTA_ANTECEDENCIA]}")
+
+    # Tabelas de voo reservadas antes da busca: o Live Search as preenche a cada lote
+    st.subheader("Opções de voo - Ida")
+    tabela_ida = st.empty()
+    st.subheader("Opções de voo - Volta")
+    tabela_volta = st.empty()
+    tabelas_voo = [tabela_ida, tabela_volta]
+
+    def mostrar_parcial(indice, voos):
+        tabelas_voo[indice].dataframe(pd.DataFrame(voos), use_container_width=True)
+
+    # Consulta de voos conforme fonte
+    with metricas.medir("pagina.nova_solicitacao.busca_voos"):
+        voos_ida, voos_volta = buscar_voos(FONTES_APP[fonte_dados], origem, destino, data_ida, data_volta,
+                                           adultos=1, ao_receber=mostrar_parcial, aviso=st.warning)
+
+    # Hotéis (mantém simulado; você pode integrar uma API de hotéis depois)
+    hoteis = hoteis_simulados(destino, dias_viagem, cargo, data_ida)
+
+    df_ida = pd.DataFrame(voos_ida)
+    tabela_ida.dataframe(df_ida, use_container_width=True)
+    df_volta = pd.DataFrame(voos_volta)
+    tabela_volta.dataframe(df_volta, use_container_width=True)
+
+    with st.expander("Datas flexíveis (±N dias)"):
+        flex_ativo = st.checkbox("Comparar tarifas em datas próximas")
+        flex_dias = st.slider("Dias de flexibilidade", min_value=1, max_value=7, value=3)
+        if flex_ativo:
+            # Importados só aqui: o altair sozinho custa centenas de ms no primeiro render da página
+            import altair
+            from viagens.datas_flexiveis import celulas_mais_baratas, matriz_tarifas
+            # Live é caro demais para (2N+1) buscas: a matriz sempre usa o Indicative
+            buscar_flex = partial(buscar_voos, "simulado" if fonte_dados == "Simulado" else "indicative")
+            with st.spinner("Consultando tarifas nas datas próximas..."), metricas.medir("pagina.nova_solicitacao.datas_flexiveis"):
+                matriz, avisos_flex = matriz_tarifas(origem, destino, data_ida, data_volta,
+                                                     janela_dias=flex_dias, buscar=buscar_flex)
+            for a in dict.fromkeys(avisos_flex):
+                st.warning(a)
+            celulas = matriz.stack().rename("preco_total").reset_index()
+            st.altair_chart(altair.Chart(celulas).mark_rect().encode(
+                x=altair.X("data_volta:O", title="Volta"),
+                y=altair.Y("data_ida:O", title="Ida"),
+                color=altair.Color("preco_total:Q", scale=altair.Scale(scheme="redyellowgreen", reverse=True),
+                                   title="Ida + volta (R$)"),
+                tooltip=["data_ida", "data_volta", "preco_total"],
+            ), use_container_width=True)
+            st.markdown("**Datas mais baratas**")
+            st.dataframe(celulas_mais_baratas(matriz), use_container_width=True)
+
+    st.subheader("Opções de hospedagem")
+    df_hot = pd.DataFrame(hoteis)
+    st.dataframe(df_hot, use_container_width=True)
+
+    st.markdown("#### Selecione suas opções")
+    idx_ida = st.number_input("Índice da opção de ida", min_value=0, max_value=max(0, len(voos_ida)-1), value=0)
+    idx_volta = st.number_input("Índice da opção de volta", min_value=0, max_value=max(0, len(voos_volta)-1), value=0)
+    idx_hotel = st.number_input("Índice do hotel (0-4)", min_value=0, max_value=max(0, len(hoteis)-1), value=0)
+
+    voo_ida = voos_ida[idx_ida]
+    voo_volta = voos_volta[idx_volta]
+    hotel = hoteis[idx_hotel]
+
+    with metricas.medir("pagina.nova_solicitacao.politica"):
+        registro = montar_solicitacao(colaborador, area, cargo, origem, destino, data_ida, data_volta, motivo,
+                                      voo_ida, voo_volta, hotel)
+        ajuda_custo, total_previsto = registro["ajuda_custo"], registro["total_previsto"]
+        status, alertas = registro["status"], registro["alertas"]
+        alternativas = sugerir_reducao_custos(voos_ida, voos_volta, hoteis, cargo, data_ida)
+
+    st.markdown("### Resumo e política")
+    colr = st.columns(2)
+    with colr[0]:
+        st.write(f"**Status:** {status}")
+        st.write(f"**Dias de viagem:** {dias_viagem}")
+        st.write(f"**Ajuda de custo ({cargo}):** R$ {ajuda_custo}")
+        st.write(f"**Total previsto:** R$ {total_previsto}")
+        st.write(f"**Limite por trecho aéreo ({cargo}):** R$ {politica.politicas['limite_trecho_aereo'][cargo]}")
+        st.write(f"**Limite diária hotel ({cargo}):** R$ {politica.politicas['limite_diaria_hotel'][cargo]}")
+        st.write(f"**Categorias permitidas:** {', '.join(politica.politicas['categorias_permitidas_por_cargo'][cargo])}")
+        st.caption(f"Política versão {politica.versao}, vigente desde {politica.vigente_desde}")
+    with colr[1]:
+        if alertas:
+            st.error("Alertas de política:")
+            for a in alertas:
+                st.write(f"- {a}")
+        else:
+            st.success("Sem alertas. Dentro da política.")
+
+    st.markdown("### Sugestões de redução de custos")
+    sug_msgs = []
+    alt = alternativas
+    if alt["ida"] and alt["ida"] != voo_ida:
+        sug_msgs.append(f"**Ida:** considerar {alt['ida']['cia']} às {alt['ida']['partida']} por R$ {alt['ida']['preco']}.")
+    if alt["volta"] and alt["volta"] != voo_volta:
+        sug_msgs.append(f"**Volta:** considerar {alt['volta']['cia']} às {alt['volta']['partida']} por R$ {alt['volta']['preco']}.")
+    if alt["hotel"] and alt["hotel"] != hotel:
+        sug_msgs.append(f"**Hotel:** considerar {alt['hotel']['hotel']} ({alt['hotel']['categoria']}) por diária R$ {alt['hotel']['diaria']}.")
+
+    if sug_msgs:
+        for m in sug_msgs:
+            st.info(m)
+    else:
+        st.write("Nenhuma alternativa mais barata dentro da política encontrada para os itens escolhidos.")
+
+    # Tarifas escolhidas contra o histórico da rota na mesma faixa de antecedência
+    historico = historico_configurado()
+    if historico is not None:
+        for nome, voo, alt_voo in (("Ida", voo_ida, alt["ida"]), ("Volta", voo_volta, alt["volta"])):
+            comp = historico.comparar(voo)
+            if comp is None or comp["nivel"] == "ate_p50":
+                continue
+            msg = (f"**{nome}:** R$ {comp['preco']} está {comp['variacao_p50']:.0%} acima da mediana histórica "
+                   f"de {comp['trecho']} com {comp['faixa']} de antecedência (p50 R$ {comp['p50']}, "
+                   f"p90 R$ {comp['p90']}; {comp['amostras']} cotações).")
+            if alt_voo and alt_voo["preco"] <= comp["p50"]:
+                msg += f" A opção {alt_voo['cia']} às {alt_voo['partida']} (R$ {alt_voo['preco']}) fica abaixo dela."
+            (st.warning if comp["nivel"] == "acima_p90" else st.info)(msg)
+
+    with st.expander("Combinações mais econômicas (ida + volta + hotel)"):
+        colp = st.columns(3)
+        with colp[0]:
+            pref_mesma_cia = st.checkbox("Preferir mesma companhia na ida e na volta")
+            k_combinacoes = st.number_input("Quantidade de combinações", min_value=1, max_value=10, value=3)
+        with colp[1]:
+            janela_ida = st.select_slider("Janela de partida da ida", options=HORAS_JANELA, value=("00:00", "23:59"))
+        with colp[2]:
+            janela_volta = st.select_slider("Janela de partida da volta", options=HORAS_JANELA, value=("00:00", "23:59"))
+        with metricas.medir("pagina.nova_solicitacao.otimizador"):
+            combinacoes = otimizar_itinerario(voos_ida, voos_volta, hoteis, cargo, k=int(k_combinacoes), preferencias={
+                "mesma_cia": pref_mesma_cia, "janela_ida": janela_ida, "janela_volta": janela_volta,
+            }, data_ida=data_ida)
+        if combinacoes:
+            st.dataframe(pd.DataFrame([{
+                "ida": f"{c['ida']['cia']} {c['ida']['partida']} (R$ {c['ida']['preco']})",
+                "volta": f"{c['volta']['cia']} {c['volta']['partida']} (R$ {c['volta']['preco']})",
+                "hotel": f"{c['hotel']['hotel']} ({c['hotel']['categoria']}, R$ {c['hotel']['custo_total']})",
+                "custo": c["custo"] - c["penalidade"],
+                "penalidade_preferencias": c["penalidade"],
+            } for c in combinacoes]), use_container_width=True)
+        else:
+            st.write("Nenhuma combinação dentro da política para este cargo.")
+
+    # Fluxo financeiro e comunicações
+    st.markdown("### Fluxo financeiro e comunicações")
+    deposito = data_deposito(data_ida)
+    if deposito > date.today():
+        st.info(f"🔔 Após a aprovação, a ajuda de custo (R$ {registro['ajuda_custo']}) entra no lote de depósitos "
+                f"de {deposito.strftime('%d/%m/%Y')} (D-2). Financeiro e solicitante são avisados para "
+                "confirmação dos dados bancários.")
+    else:
+        st.warning(f"🔔 O D-2 desta viagem ({deposito.strftime('%d/%m/%Y')}) já passou: a ajuda de custo entra "
+                   "no primeiro lote de depósitos após a aprovação.")
+
+    # Enviar para aprovação
+    if st.button("Enviar para aprovação"):
+        repo.inserir(registro)
+        st.success(f"Solicitação #{registro['id']} enviada para aprovação. Gestor da área e solicitante "
+                   "serão notificados por e-mail.")
+
+    # Voucher rápido da última solicitação
+    ult = repo.ultima()
+    if ult:
+        st.markdown("### Exportação de voucher")
+        html = gerar_voucher_html(ult)
+        st.download_button("Baixar voucher HTML", data=html, file_name=f"voucher_{ult['id']}.html", mime="text/html")
+
+    # Importação em lote (agência de viagens)
+    with st.expander("Importação em lote (CSV/Parquet)"):
+        from viagens.importacao import COLUNAS_OBRIGATORIAS, COLUNAS_OPCIONAIS, importar_arquivo
+        st.caption("Colunas obrigatórias: " + ", ".join(COLUNAS_OBRIGATORIAS)
+                   + ". Opcionais: " + ", ".join(COLUNAS_OPCIONAIS) + ".")
+        arquivo_lote = st.file_uploader("Arquivo de solicitações", type=["csv", "parquet"])
+        separador_csv = st.selectbox("Separador (CSV)", [",", ";"])
+        if arquivo_lote is not None and st.button("Importar solicitações"):
+            progresso = st.empty()
+            try:
+                resumo = importar_arquivo(repo, arquivo_lote, separador=separador_csv, ao_progredir=lambda r: progresso.write(
+                    f"{r['lidas']} linhas lidas, {r['importadas']} importadas, {r['rejeitadas']} rejeitadas..."))
+            except (ValueError, ImportError) as exc:
+                st.error(f"Falha na importação: {exc}")
+            else:
+                progresso.success(f"{resumo['importadas']} de {resumo['lidas']} solicitações importadas.")
+                if resumo["erros"]:
+                    st.warning(f"{resumo['rejeitadas']} linhas rejeitadas (até {len(resumo['erros'])} listadas abaixo).")
+                    st.dataframe(pd.DataFrame(resumo["erros"]), use_container_width=True)
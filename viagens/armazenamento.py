@@ -0,0 +1,394 @@
+# armazenamento.py - Persistência das solicitações de viagem (SQLite)
+import json
+import os
+import sqlite3
+import threading
+
+from viagens import notificacoes, rollups
+from viagens.alteracoes import JanelaAlteracoes
+
+# =========================================================
+# Configuração do banco
+# =========================================================
+CAMINHO_BANCO_PADRAO = os.environ.get("VIAGENS_DB", "viagens.db")
+
+# Colunas promovidas do registro para a tabela (filtros e listagens);
+# o registro completo fica serializado em "dados".
+COLUNAS_INDEXADAS = [
+    "colaborador", "area", "cargo", "origem", "destino", "data_ida", "data_volta",
+    "total_previsto", "status", "aprovacao", "criado_em",
+]
+
+# versao: gravações de cada solicitação (uma decisão só é gravada sobre a versão que o
+# gestor viu). alteracao: sequência global das gravações, sem lacunas e na ordem dos
+# commits, para as sessões pedirem só o que mudou desde a última que viram.
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS solicitacoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    colaborador TEXT,
+    area TEXT,
+    cargo TEXT,
+    origem TEXT,
+    destino TEXT,
+    data_ida TEXT,
+    data_volta TEXT,
+    total_previsto REAL,
+    status TEXT,
+    aprovacao TEXT,
+    criado_em TEXT,
+    dados TEXT NOT NULL,
+    versao INTEGER NOT NULL DEFAULT 1,
+    alteracao INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_solic_status ON solicitacoes(status);
+CREATE INDEX IF NOT EXISTS idx_solic_aprovacao ON solicitacoes(aprovacao);
+CREATE INDEX IF NOT EXISTS idx_solic_area ON solicitacoes(area);
+CREATE INDEX IF NOT EXISTS idx_solic_cargo ON solicitacoes(cargo);
+CREATE INDEX IF NOT EXISTS idx_solic_data_ida ON solicitacoes(data_ida);
+-- Fila de aprovação: páginas por id dentro de cada situação de aprovação
+CREATE INDEX IF NOT EXISTS idx_solic_fila ON solicitacoes(aprovacao, id);
+"""
+# Depois da migração de bancos anteriores ao controle de versões (coluna nova)
+ESQUEMA_ALTERACOES = """
+CREATE INDEX IF NOT EXISTS idx_solic_alteracao ON solicitacoes(alteracao);
+"""
+
+SQL_INSERIR = (
+    f"INSERT INTO solicitacoes ({', '.join(COLUNAS_INDEXADAS)}, dados, alteracao) "
+    f"VALUES ({', '.join('?' for _ in COLUNAS_INDEXADAS)}, ?, ?)"
+)
+# Campos do registro que vêm da linha e não vão para o JSON
+CAMPOS_DA_LINHA = ("id", "versao")
+
+
+def _serializar(valor):
+    """Converte tipos numpy/datas para algo serializável em JSON."""
+    if hasattr(valor, "item"):
+        return valor.item()
+    return str(valor)
+
+
+class ConflitoVersao(ValueError):
+    """Decisão sobre uma versão desatualizada; atuais: os registros como estão no banco."""
+
+    def __init__(self, atuais: list):
+        self.atuais = atuais
+        super().__init__("Alterada(s) por outra sessão desde que foi(ram) exibida(s): " + ", ".join(
+            f"#{r['id']} ({r['aprovacao']}, versão {r['versao']})" for r in atuais))
+
+
+class RepositorioSolicitacoes:
+    """
+    Repositório de solicitações em SQLite (modo WAL), seguro entre sessões/threads
+    e entre réplicas que usam o mesmo banco. Decisões com a versão exibida ao
+    gestor são compare-and-set; alteracoes_desde() entrega as mudanças recentes
+    a partir de uma janela em memória compartilhada pelas sessões do processo.
+    """
+
+    def __init__(self, caminho: str = CAMINHO_BANCO_PADRAO):
+        self.caminho = caminho
+        self._local = threading.local()
+        con = self._conexao()
+        con.executescript(ESQUEMA)
+        # Banco criado antes do controle de versões: todas as linhas ficam na versão 1
+        if "versao" not in {l["name"] for l in con.execute("PRAGMA table_info(solicitacoes)")}:
+            con.execute("ALTER TABLE solicitacoes ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+            con.execute("ALTER TABLE solicitacoes ADD COLUMN alteracao INTEGER NOT NULL DEFAULT 0")
+        con.executescript(ESQUEMA_ALTERACOES)
+        con.executescript(rollups.ESQUEMA_ROLLUPS)
+        con.executescript(notificacoes.ESQUEMA_NOTIFICACOES)
+        con.commit()
+        # Banco criado antes dos agregados: popula-os uma vez a partir das solicitações
+        if self.contar() and not con.execute("SELECT 1 FROM rollup_diario LIMIT 1").fetchone():
+            self.reconstruir_rollups()
+        self._janela = JanelaAlteracoes(self._alteracoes_no_banco, self.ultima_alteracao)
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Uma conexão por thread (cada sessão do Streamlit roda em sua thread)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    @staticmethod
+    def _linha_para_registro(linha: sqlite3.Row) -> dict:
+        registro = json.loads(linha["dados"])
+        registro["id"] = linha["id"]
+        registro["versao"] = linha["versao"]
+        return registro
+
+    # -----------------------------------------------------
+    # Escrita
+    # -----------------------------------------------------
+    @staticmethod
+    def _proxima_alteracao(con: sqlite3.Connection) -> int:
+        """Próximo número da sequência de alterações; só dentro de BEGIN IMMEDIATE (sem lacunas nem repetições)."""
+        return con.execute("SELECT COALESCE(MAX(alteracao), 0) + 1 FROM solicitacoes").fetchone()[0]
+
+    @staticmethod
+    def _gravar(con: sqlite3.Connection, registro: dict, alteracao: int) -> int:
+        dados = {k: v for k, v in registro.items() if k not in CAMPOS_DA_LINHA}
+        cur = con.execute(SQL_INSERIR, [*(dados.get(c) for c in COLUNAS_INDEXADAS),
+                                        json.dumps(dados, ensure_ascii=False, default=_serializar), alteracao])
+        rollups.aplicar_registro(con, dados)
+        return cur.lastrowid
+
+    def inserir(self, registro: dict) -> int:
+        """
+        Insere a solicitação (versão 1) e devolve o ID alocado atomicamente pelo
+        banco. As notificações de submissão entram na caixa de saída na mesma transação.
+        """
+        con = self._conexao()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            registro["id"] = self._gravar(con, registro, self._proxima_alteracao(con))
+            registro["versao"] = 1
+            notificacoes.enfileirar_evento(con, notificacoes.EVENTO_SUBMISSAO, registro)
+        return registro["id"]
+
+    def inserir_lote(self, registros) -> int:
+        """
+        Insere várias solicitações (e seus agregados) numa única transação:
+        ou entram todas, ou nenhuma. As notificações de submissão de cada uma
+        entram na caixa de saída na mesma transação, como em inserir().
+        Devolve quantas foram gravadas.
+        """
+        lote = [{k: v for k, v in r.items() if k not in CAMPOS_DA_LINHA} for r in registros]
+        con = self._conexao()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            inicio = self._proxima_alteracao(con)
+            con.executemany(SQL_INSERIR, ([*(d.get(c) for c in COLUNAS_INDEXADAS),
+                                           json.dumps(d, ensure_ascii=False, default=_serializar), inicio + i]
+                                          for i, d in enumerate(lote)))
+            rollups.aplicar_lote(con, lote)
+            # O id de cada linha, pelo número de alteração (único, sequencial no lote)
+            ids = dict(con.execute("SELECT alteracao, id FROM solicitacoes WHERE alteracao >= ? AND alteracao < ?",
+                                   (inicio, inicio + len(lote))).fetchall())
+            notificacoes.enfileirar_eventos(con, notificacoes.EVENTO_SUBMISSAO,
+                                            ({**d, "id": ids[inicio + i]} for i, d in enumerate(lote)))
+        return len(lote)
+
+    def _conflitos(self, con: sqlite3.Connection, versoes: dict) -> list:
+        """Registros cuja versão no banco difere da exibida ao gestor (versoes: id -> versão)."""
+        if not versoes:
+            return []
+        linhas = con.execute(f"SELECT id, versao, dados FROM solicitacoes WHERE id IN "
+                             f"({', '.join('?' for _ in versoes)})", list(versoes)).fetchall()
+        return [self._linha_para_registro(l) for l in linhas if l["versao"] != versoes[l["id"]]]
+
+    def _decidir(self, con: sqlite3.Connection, sol_id: int, aprovacao: str, comentario: str) -> dict | None:
+        linha = con.execute("SELECT id, versao, dados FROM solicitacoes WHERE id = ?", (sol_id,)).fetchone()
+        if linha is None:
+            return None
+        registro = self._linha_para_registro(linha)
+        rollups.aplicar_registro(con, registro, -1)
+        registro["aprovacao"] = aprovacao
+        registro["comentario_gestor"] = comentario
+        registro["versao"] += 1
+        dados = {k: v for k, v in registro.items() if k not in CAMPOS_DA_LINHA}
+        con.execute(
+            "UPDATE solicitacoes SET aprovacao = ?, dados = ?, versao = ?, alteracao = ? WHERE id = ?",
+            (aprovacao, json.dumps(dados, ensure_ascii=False, default=_serializar), registro["versao"],
+             self._proxima_alteracao(con), sol_id),
+        )
+        rollups.aplicar_registro(con, registro)
+        notificacoes.enfileirar_evento(con, notificacoes.EVENTO_DECISAO, registro)
+        return registro
+
+    def registrar_decisao(self, sol_id: int, aprovacao: str, comentario: str, versao: int | None = None) -> dict | None:
+        """
+        Grava a decisão do gestor e devolve o registro atualizado (None se o ID não
+        existe). Com versao (a exibida ao gestor), só grava se ninguém alterou a
+        solicitação desde então; senão, ConflitoVersao com o registro atual. A
+        conferência vale dentro da transação de escrita; uma versão que já está
+        desatualizada é recusada antes, sem disputar a trava com quem grava.
+        """
+        versoes = {} if versao is None else {int(sol_id): versao}
+        con = self._conexao()
+        # Versão já desatualizada: recusada antes de pegar a trava de escrita
+        conflitos = self._conflitos(con, versoes)
+        if conflitos:
+            raise ConflitoVersao(conflitos)
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            conflitos = self._conflitos(con, versoes)
+            if conflitos:
+                raise ConflitoVersao(conflitos)
+            return self._decidir(con, int(sol_id), aprovacao, comentario)
+
+    def registrar_decisoes(self, ids, aprovacao: str, comentario: str, versoes: dict | None = None) -> list:
+        """
+        Mesma decisão para várias solicitações numa única transação (aprovação em
+        lote): ou todas são gravadas, ou nenhuma. versoes (id -> versão exibida):
+        se alguma mudou, nada é gravado e ConflitoVersao traz as alteradas.
+        Devolve os registros atualizados (IDs inexistentes são ignorados).
+        """
+        versoes = {int(k): v for k, v in (versoes or {}).items()}
+        con = self._conexao()
+        conflitos = self._conflitos(con, versoes)
+        if conflitos:
+            raise ConflitoVersao(conflitos)
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            conflitos = self._conflitos(con, versoes)
+            if conflitos:
+                raise ConflitoVersao(conflitos)
+            registros = [self._decidir(con, int(sol_id), aprovacao, comentario) for sol_id in ids]
+        return [r for r in registros if r is not None]
+
+    def reconstruir_rollups(self):
+        """Recalcula os agregados do dashboard a partir de todas as solicitações."""
+        con = self._conexao()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            rollups.reconstruir(con, (self._linha_para_registro(l) for l in con.execute(
+                "SELECT id, versao, dados FROM solicitacoes").fetchall()))
+
+    # -----------------------------------------------------
+    # Alterações (outras sessões e réplicas)
+    # -----------------------------------------------------
+    def ultima_alteracao(self) -> int:
+        """Número da alteração mais recente gravada no banco (lido do índice)."""
+        return self._conexao().execute("SELECT COALESCE(MAX(alteracao), 0) FROM solicitacoes").fetchone()[0]
+
+    def _alteracoes_no_banco(self, apos: int) -> list:
+        sql = (f"SELECT id, versao, alteracao, {', '.join(COLUNAS_INDEXADAS)} FROM solicitacoes "
+               "WHERE alteracao > ? ORDER BY alteracao")
+        return [dict(l) for l in self._conexao().execute(sql, (apos,))]
+
+    def alteracoes_desde(self, cursor: int) -> tuple:
+        """
+        (alterações, novo cursor): resumo (id, versao, alteracao e colunas indexadas)
+        das solicitações gravadas depois da alteração `cursor`, em qualquer sessão ou
+        réplica, na ordem em que foram gravadas. Vem da janela em memória do
+        processo (ver viagens.alteracoes), sem ir ao banco a cada chamada. Cursor
+        mais antigo que a janela: (None, novo cursor), e quem chamou recarrega tudo.
+        """
+        return self._janela.desde(cursor)
+
+
+    # -----------------------------------------------------
+    # Leitura
+    # -----------------------------------------------------
+    def obter(self, sol_id: int) -> dict | None:
+        """Busca uma solicitação pela chave primária."""
+        linha = self._conexao().execute(
+            "SELECT id, versao, dados FROM solicitacoes WHERE id = ?", (sol_id,)).fetchone()
+        return self._linha_para_registro(linha) if linha else None
+
+    def ultima(self) -> dict | None:
+        """Solicitação mais recente (maior ID)."""
+        linha = self._conexao().execute(
+            "SELECT id, versao, dados FROM solicitacoes ORDER BY id DESC LIMIT 1").fetchone()
+        return self._linha_para_registro(linha) if linha else None
+
+    def maior_id(self) -> int:
+        linha = self._conexao().execute("SELECT MAX(id) FROM solicitacoes").fetchone()
+        return linha[0] or 0
+
+    def contar(self, **filtros) -> int:
+        where, params = self._montar_filtros(None, None, filtros)
+        return self._conexao().execute("SELECT COUNT(*) FROM solicitacoes" + where, params).fetchone()[0]
+
+    def listar(self, data_ini: str | None = None, data_fim: str | None = None, **filtros) -> list:
+        """
+        Lista solicitações completas, opcionalmente filtradas por período de
+        data_ida (ISO, inclusivo) e por igualdade/pertinência nas colunas indexadas.
+        Ex.: listar(status="Fora da política ⚠️", area=["TI", "RH"])
+        """
+        return list(self.iterar(data_ini, data_fim, **filtros))
+
+    def iterar(self, data_ini: str | None = None, data_fim: str | None = None, **filtros):
+        """Como listar(), mas gerando os registros à medida que o cursor avança."""
+        where, params = self._montar_filtros(data_ini, data_fim, filtros)
+        sql = "SELECT id, versao, dados FROM solicitacoes" + where + " ORDER BY id"
+        for linha in self._conexao().execute(sql, params):
+            yield self._linha_para_registro(linha)
+
+    def listar_resumo(self, data_ini: str | None = None, data_fim: str | None = None, **filtros) -> list:
+        """Como listar(), mas só com as colunas indexadas (sem desserializar o JSON)."""
+        where, params = self._montar_filtros(data_ini, data_fim, filtros)
+        sql = f"SELECT id, {', '.join(COLUNAS_INDEXADAS)} FROM solicitacoes" + where + " ORDER BY id"
+        return [dict(l) for l in self._conexao().execute(sql, params)]
+
+    def viagens_no_periodo(self, data_ini: str, data_fim: str, **filtros) -> list:
+        """
+        Viagens com algum dia entre data_ini e data_fim (ISO, inclusivo): ida até
+        data_fim e volta a partir de data_ini. Só id, colaborador, área, cargo e datas.
+        """
+        where, params = self._montar_filtros(None, data_fim, filtros)
+        where += (" AND " if where else " WHERE ") + "data_volta >= ?"
+        sql = "SELECT id, colaborador, area, cargo, data_ida, data_volta FROM solicitacoes" + where + " ORDER BY id"
+        return [dict(l) for l in self._conexao().execute(sql, [*params, str(data_ini)])]
+
+    def pagina_resumo(self, apos_id: int = 0, limite: int = 50, **filtros) -> list:
+        """
+        Uma página de listar_resumo() por chave (keyset), com a versão de cada
+        solicitação: as `limite` seguintes a `apos_id`. Usa os índices de filtro +
+        id, então o custo não depende de quantas solicitações existem nem de qual página é.
+        """
+        where, params = self._montar_filtros(None, None, filtros)
+        where += (" AND " if where else " WHERE ") + "id > ?"
+        sql = (f"SELECT id, versao, {', '.join(COLUNAS_INDEXADAS)} FROM solicitacoes" + where
+               + " ORDER BY id LIMIT ?")
+        return [dict(l) for l in self._conexao().execute(sql, [*params, apos_id, limite])]
+
+    def valores_distintos(self, coluna: str) -> list:
+        """
+        Valores existentes numa coluna indexada (opções dos filtros), em ordem. Pula
+        de um valor ao seguinte pelo índice (MIN(coluna) > anterior): k buscas
+        O(log n) para k valores distintos, sem varrer o índice inteiro como o DISTINCT.
+        """
+        if coluna not in ("status", "aprovacao", "area", "cargo"):
+            raise ValueError(f"Coluna sem índice: {coluna}")
+        sql = (f"WITH RECURSIVE v(valor) AS (SELECT MIN({coluna}) FROM solicitacoes "
+               f"UNION ALL SELECT (SELECT MIN({coluna}) FROM solicitacoes WHERE {coluna} > valor) "
+               f"FROM v WHERE valor IS NOT NULL) SELECT valor FROM v WHERE valor IS NOT NULL")
+        return [l[0] for l in self._conexao().execute(sql)]
+
+    def consultar_rollups(self, data_ini, data_fim, areas=None, cargos=None, aprovacoes=None) -> rollups.ConsultaRollups:
+        """Consultas do dashboard sobre os agregados incrementais."""
+        return rollups.ConsultaRollups(self._conexao(), data_ini, data_fim, areas, cargos, aprovacoes)
+
+    def listar_notificacoes(self, sol_id: int) -> list:
+        """Notificações da solicitação na caixa de saída (situação da entrega)."""
+        return notificacoes.listar(self._conexao(), sol_id)
+
+    def listar_comentarios(self, data_ini, data_fim, areas=None, cargos=None, aprovacoes=None) -> list:
+        """Solicitações do período com comentário do gestor (só essas linhas são lidas)."""
+        filtros = {k: v for k, v in (("area", areas), ("cargo", cargos), ("aprovacao", aprovacoes)) if v is not None}
+        where, params = self._montar_filtros(data_ini, data_fim, filtros)
+        where += (" AND " if where else " WHERE ") + "json_extract(dados, '$.comentario_gestor') <> ''"
+        sql = ("SELECT id, colaborador, area, cargo, aprovacao, "
+               "json_extract(dados, '$.comentario_gestor') AS comentario_gestor FROM solicitacoes" + where + " ORDER BY id")
+        return [dict(l) for l in self._conexao().execute(sql, params)]
+
+    @staticmethod
+    def _montar_filtros(data_ini, data_fim, filtros):
+        clausulas, params = [], []
+        if data_ini is not None:
+            clausulas.append("data_ida >= ?")
+            params.append(str(data_ini))
+        if data_fim is not None:
+            clausulas.append("data_ida <= ?")
+            params.append(str(data_fim))
+        for coluna, valor in filtros.items():
+            if coluna not in COLUNAS_INDEXADAS:
+                raise ValueError(f"Filtro inválido: {coluna}")
+            if isinstance(valor, (list, tuple, set)):
+                valor = list(valor)
+                if not valor:
+                    clausulas.append("0")
+                    continue
+                clausulas.append(f"{coluna} IN ({', '.join('?' for _ in valor)})")
+                params.extend(valor)
+            else:
+                clausulas.append(f"{coluna} = ?")
+                params.append(valor)
+        where = (" WHERE " + " AND ".join(clausulas)) if clausulas else ""
+        return where, params
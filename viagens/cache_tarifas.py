@@ -0,0 +1,107 @@
+# cache_tarifas.py - Cache de tarifas compartilhado entre sessões (memória LRU + disco opcional)
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# TTL padrão por fonte, em segundos: preços indicativos já vêm cacheados da
+# Skyscanner e mudam pouco; o Live Search reflete disponibilidade real.
+TTL_POR_FONTE_PADRAO = {
+    "indicative": 6 * 3600,
+    "live": 10 * 60,
+}
+TTL_PADRAO_S = 15 * 60
+MAX_ENTRADAS_PADRAO = 5000
+
+
+def chave_tarifa(fonte: str, origem: str, destino: str, data, adultos: int) -> tuple:
+    """Chave canônica de um trecho: (fonte, origem, destino, data ISO, adultos)."""
+    return (fonte, origem.strip().upper(), destino.strip().upper(), str(data), int(adultos))
+
+
+class CacheTarifas:
+    """
+    Cache LRU com TTL por fonte, seguro entre threads (todas as sessões do app).
+    Com caminho_disco, as entradas também são gravadas em SQLite e sobrevivem a
+    reinícios; a camada de memória continua limitada a max_entradas.
+    """
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS_PADRAO, ttl_por_fonte: dict | None = None,
+                 caminho_disco: str | None = None):
+        self.max_entradas = max_entradas
+        self.ttl_por_fonte = {**TTL_POR_FONTE_PADRAO, **(ttl_por_fonte or {})}
+        self._memoria = OrderedDict()  # chave -> (expira_em, valor)
+        self._lock = threading.Lock()
+        self._contadores = {"hits": 0, "hits_disco": 0, "misses": 0, "expirados": 0, "despejos": 0}
+        self._disco = None
+        if caminho_disco:
+            self._disco = sqlite3.connect(caminho_disco, timeout=30, check_same_thread=False)
+            self._disco.execute("PRAGMA journal_mode=WAL")
+            self._disco.execute(
+                "CREATE TABLE IF NOT EXISTS tarifas (chave TEXT PRIMARY KEY, expira_em REAL, valor TEXT)")
+            self._disco.commit()
+
+    def ttl(self, fonte: str) -> float:
+        return self.ttl_por_fonte.get(fonte, TTL_PADRAO_S)
+
+    def obter(self, chave: tuple):
+        """Valor em cache ou None (miss ou expirado)."""
+        agora = time.time()
+        with self._lock:
+            item = self._memoria.get(chave)
+            if item is not None:
+                expira_em, valor = item
+                if expira_em > agora:
+                    self._memoria.move_to_end(chave)
+                    self._contadores["hits"] += 1
+                    return valor
+                del self._memoria[chave]
+                self._contadores["expirados"] += 1
+            if self._disco is not None:
+                linha = self._disco.execute(
+                    "SELECT expira_em, valor FROM tarifas WHERE chave = ?", (json.dumps(chave),)).fetchone()
+                if linha and linha[0] > agora:
+                    valor = json.loads(linha[1])
+                    self._guardar_memoria(chave, linha[0], valor)
+                    self._contadores["hits_disco"] += 1
+                    return valor
+            self._contadores["misses"] += 1
+            return None
+
+    def gravar(self, chave: tuple, valor):
+        """Guarda o valor com o TTL da fonte (primeiro elemento da chave)."""
+        expira_em = time.time() + self.ttl(chave[0])
+        with self._lock:
+            self._guardar_memoria(chave, expira_em, valor)
+            if self._disco is not None:
+                with self._disco:
+                    self._disco.execute(
+                        "INSERT OR REPLACE INTO tarifas (chave, expira_em, valor) VALUES (?, ?, ?)",
+                        (json.dumps(chave), expira_em, json.dumps(valor, ensure_ascii=False, default=str)))
+
+    def _guardar_memoria(self, chave, expira_em, valor):
+        self._memoria[chave] = (expira_em, valor)
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_entradas:
+            self._memoria.popitem(last=False)
+            self._contadores["despejos"] += 1
+
+    def limpar_expirados(self) -> int:
+        """Remove entradas vencidas da memória e do disco; devolve quantas saíram da memória."""
+        agora = time.time()
+        with self._lock:
+            vencidas = [c for c, (expira_em, _) in self._memoria.items() if expira_em <= agora]
+            for c in vencidas:
+                del self._memoria[c]
+            if self._disco is not None:
+                with self._disco:
+                    self._disco.execute("DELETE FROM tarifas WHERE expira_em <= ?", (agora,))
+        return len(vencidas)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            stats = dict(self._contadores, entradas=len(self._memoria))
+        consultas = stats["hits"] + stats["hits_disco"] + stats["misses"]
+        stats["taxa_acerto"] = (stats["hits"] + stats["hits_disco"]) / consultas if consultas else 0.0
+        return stats
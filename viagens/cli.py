@@ -0,0 +1,192 @@
+# cli.py - Linha de comando: cotação de pedidos (JSON/JSON Lines) e API HTTP local
+#
+# Uso:
+#   python -m viagens cotar pedidos.json                   # objeto ou lista JSON; .jsonl = um pedido por linha
+#   cat pedido.json | python -m viagens cotar - --fonte indicative
+#   python -m viagens servir --porta 8080 --trabalhadores 16
+#   python -m viagens folha 2026-11 --saida folha_2026-11.csv --consolidado
+#   python -m viagens depositos --pasta /srv/financeiro/pagamentos    # rodar uma vez por dia (cron)
+#   python -m viagens notificacoes                                    # entregador da caixa de saída
+#   python -m viagens tarifas --manter-meses 12                       # descarta meses antigos do histórico de tarifas
+#   python -m viagens aeroportos "sao paulo"                          # resolve cidade/aeroporto para código IATA
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import date
+
+from viagens.aeroportos import SUGESTOES_PADRAO, resolvedor
+from viagens.api import TRABALHADORES_PADRAO, servir
+from viagens.armazenamento import CAMINHO_BANCO_PADRAO, RepositorioSolicitacoes
+from viagens.depositos import PASTA_ARQUIVOS_PADRAO, AgendadorDepositos
+from viagens.folha_ajuda import consolidar, folha_mensal
+from viagens.historico_tarifas import HistoricoTarifas, configurar_historico
+from viagens.notificacoes import TAMANHO_LOTE_PADRAO, EntregadorNotificacoes
+from viagens.politicas import configurar_catalogo
+from viagens.politicas_versionadas import CatalogoPoliticas
+from viagens.servico import FONTES, MAX_PARALELO_PADRAO, cotar_lote
+
+
+def _ler_pedidos(caminho: str):
+    """Devolve (pedidos, veio_uma_lista). JSON inválido: ValueError (em .jsonl, com o nº da linha)."""
+    arquivo = sys.stdin if caminho == "-" else open(caminho, encoding="utf-8")
+    with arquivo:
+        if caminho.endswith(".jsonl"):
+            pedidos = []
+            for numero, linha in enumerate(arquivo, 1):
+                if linha.strip():
+                    try:
+                        pedidos.append(json.loads(linha))
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"linha {numero}: {e}") from e
+            return pedidos, True
+        dados = json.load(arquivo)
+    return (dados, True) if isinstance(dados, list) else ([dados], False)
+
+
+def _folha(args) -> int:
+    repo = RepositorioSolicitacoes(args.banco)
+    configurar_catalogo(CatalogoPoliticas(repo.caminho))  # mesmas versões de política do app
+    lancamentos = folha_mensal(repo, args.competencia, feriados_extras=args.feriados)
+    tabela = consolidar(lancamentos) if args.consolidado else lancamentos
+    tabela.to_csv(args.saida or sys.stdout, index=False)
+    logging.info("Competência %s: %d lançamentos, total R$ %s", args.competencia, len(lancamentos),
+                 f"{int(lancamentos['valor'].sum()):,}".replace(",", "."))
+    return 0
+
+
+def _depositos(args) -> int:
+    RepositorioSolicitacoes(args.banco)  # garante o esquema das solicitações
+    agendador = AgendadorDepositos(args.banco, args.pasta, inicio=args.inicio)
+    for resumo in agendador.executar(args.ate):
+        logging.info("Lote %d (%s): %d depósitos, R$ %.2f -> %s", resumo["lote"], resumo["data_referencia"],
+                     resumo["quantidade"], resumo["total"], resumo["arquivo"])
+    logging.info("%d viagens aprovadas aguardando o D-2", len(agendador))
+    return 0
+
+
+def _notificacoes(args) -> int:
+    RepositorioSolicitacoes(args.banco)  # garante o esquema das solicitações e da caixa de saída
+    entregador = EntregadorNotificacoes(args.banco, tamanho_lote=args.lote)
+    if args.uma_vez:
+        total = 0
+        while (tentadas := entregador.entregar_pendentes()):
+            total += tentadas
+        logging.info("%d notificações tentadas", total)
+        return 0
+    logging.info("Entregando notificações de %s (canais: %s); Ctrl+C para sair",
+                 args.banco, ", ".join(entregador.canais))
+    entregador.iniciar()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        entregador.parar()
+    return 0
+
+
+def _tarifas(args) -> int:
+    historico = HistoricoTarifas(args.banco)
+    if args.reconstruir:
+        historico.reconstruir_indice()
+    if args.manter_meses is not None:
+        hoje = date.today()
+        meses = hoje.year * 12 + hoje.month - 1 - (args.manter_meses - 1)
+        removidas = historico.descartar_anteriores(f"{meses // 12:04d}-{meses % 12 + 1:02d}")
+        logging.info("Partições removidas: %s", ", ".join(removidas) or "nenhuma")
+    particoes = historico.particoes()
+    logging.info("Histórico de tarifas em %s: %d meses (%s)", args.banco, len(particoes),
+                 f"{particoes[0]} a {particoes[-1]}" if particoes else "vazio")
+    return 0
+
+
+def _aeroportos(args) -> int:
+    local = resolvedor().resolver(args.texto)
+    sugestoes = [local] if local else resolvedor().sugerir(args.texto, limite=args.limite)
+    for s in sugestoes:
+        print(s.descricao())
+    if local is None:
+        logging.info("Sem correspondência única para %r: %d sugestões", args.texto, len(sugestoes))
+    return 0 if local else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m viagens", description="Gestão de viagens sem interface.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_cotar = comandos.add_parser("cotar", help="cota e classifica pedidos; resultado JSON na saída padrão")
+    p_cotar.add_argument("arquivo", help="JSON (objeto ou lista) ou .jsonl; '-' para a entrada padrão")
+    p_cotar.add_argument("--fonte", choices=FONTES, default="simulado")
+    p_cotar.add_argument("--paralelo", type=int, default=MAX_PARALELO_PADRAO, help="cotações simultâneas")
+    p_cotar.add_argument("--historico", help="banco SQLite do histórico de tarifas (grava as buscas e compara)")
+
+    p_servir = comandos.add_parser("servir", help="API HTTP local (POST /cotacoes, GET /saude)")
+    p_servir.add_argument("--host", default="127.0.0.1")
+    p_servir.add_argument("--porta", type=int, default=8080)
+    p_servir.add_argument("--trabalhadores", type=int, default=TRABALHADORES_PADRAO, help="conexões atendidas em paralelo")
+    p_servir.add_argument("--fonte", choices=FONTES, default="simulado", help="fonte padrão (?fonte= sobrepõe)")
+    p_servir.add_argument("--paralelo", type=int, default=MAX_PARALELO_PADRAO, help="cotações simultâneas por lote")
+    p_servir.add_argument("--historico", help="banco SQLite do histórico de tarifas (grava as buscas e compara)")
+
+    p_folha = comandos.add_parser("folha", help="folha mensal de ajuda de custo das viagens aprovadas (CSV)")
+    p_folha.add_argument("competencia", help="mês da folha, AAAA-MM")
+    p_folha.add_argument("--banco", default=CAMINHO_BANCO_PADRAO, help="banco SQLite das solicitações")
+    p_folha.add_argument("--saida", help="arquivo CSV (padrão: saída padrão)")
+    p_folha.add_argument("--consolidado", action="store_true", help="um total por colaborador em vez de por viagem")
+    p_folha.add_argument("--feriados", nargs="*", default=[], help="feriados adicionais (AAAA-MM-DD)")
+
+    p_depositos = comandos.add_parser("depositos", help="lotes diários de depósito da ajuda de custo (D-2)")
+    p_depositos.add_argument("--banco", default=CAMINHO_BANCO_PADRAO, help="banco SQLite das solicitações")
+    p_depositos.add_argument("--pasta", default=PASTA_ARQUIVOS_PADRAO, help="pasta dos arquivos de pagamento")
+    p_depositos.add_argument("--ate", help="último dia a processar, AAAA-MM-DD (padrão: hoje)")
+    p_depositos.add_argument("--inicio", help="primeiro dia, só na primeira execução (padrão: hoje)")
+
+    p_notif = comandos.add_parser("notificacoes", help="entrega a caixa de saída de notificações (e-mail, webhook)")
+    p_notif.add_argument("--banco", default=CAMINHO_BANCO_PADRAO, help="banco SQLite das solicitações")
+    p_notif.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO, help="mensagens por lote e canal")
+    p_notif.add_argument("--uma-vez", action="store_true", help="entrega o que estiver pendente e sai")
+
+    p_tarifas = comandos.add_parser("tarifas", help="manutenção do histórico de tarifas (partições mensais)")
+    p_tarifas.add_argument("--banco", default=CAMINHO_BANCO_PADRAO, help="banco SQLite do histórico")
+    p_tarifas.add_argument("--manter-meses", type=int, help="mantém só os últimos N meses de cotações")
+    p_tarifas.add_argument("--reconstruir", action="store_true", help="refaz o índice de percentis das partições")
+
+    p_aeroportos = comandos.add_parser("aeroportos", help="resolve cidade ou aeroporto para o código IATA usado nas buscas")
+    p_aeroportos.add_argument("texto", help="código, cidade ou nome do aeroporto (acentos e erros de digitação tolerados)")
+    p_aeroportos.add_argument("--limite", type=int, default=SUGESTOES_PADRAO, help="sugestões sem correspondência única")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    if getattr(args, "historico", None):
+        configurar_historico(HistoricoTarifas(args.historico))
+    if args.comando == "aeroportos":
+        return _aeroportos(args)
+    if args.comando == "tarifas":
+        if args.manter_meses is not None and args.manter_meses < 1:
+            parser.error("--manter-meses deve ser pelo menos 1")
+        return _tarifas(args)
+    if args.comando == "servir":
+        servir(args.host, args.porta, args.trabalhadores, args.fonte, args.paralelo)
+        return 0
+    if args.comando == "notificacoes":
+        return _notificacoes(args)
+    if args.comando == "depositos":
+        try:
+            return _depositos(args)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.comando == "folha":
+        try:
+            return _folha(args)
+        except ValueError as e:
+            parser.error(str(e))
+
+    try:
+        pedidos, lista = _ler_pedidos(args.arquivo)
+    except (OSError, ValueError) as e:
+        parser.error(f"não foi possível ler os pedidos de {args.arquivo}: {e}")
+    resultados = cotar_lote(pedidos, args.fonte, args.paralelo)
+    json.dump(resultados if lista else resultados[0], sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 1 if any("erro" in r for r in resultados) else 0
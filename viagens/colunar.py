@@ -0,0 +1,183 @@
+# colunar.py - Armazenamento colunar compacto das solicitações (códigos categóricos + arrays tipados)
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from viagens.politicas import bit_do_alerta
+
+CAPACIDADE_INICIAL = 1024
+TAMANHO_LOTE_PADRAO = 10_000
+
+# Campos repetitivos: guardados como códigos inteiros + lista de valores distintos
+CAMPOS_CATEGORICOS = {
+    "colaborador": lambda r: r["colaborador"],
+    "area": lambda r: r["area"],
+    "cargo": lambda r: r["cargo"],
+    "origem": lambda r: r["origem"],
+    "destino": lambda r: r["destino"],
+    "motivo": lambda r: r.get("motivo", ""),
+    "status": lambda r: r["status"],
+    "aprovacao": lambda r: r.get("aprovacao", "Pendente"),
+    "comentario_gestor": lambda r: r.get("comentario_gestor", ""),
+    "trecho_ida": lambda r: r["trecho_ida"],
+    "trecho_volta": lambda r: r["trecho_volta"],
+    "cia_ida": lambda r: r["voo_ida"].get("cia"),
+    "partida_ida": lambda r: r["voo_ida"].get("partida"),
+    "cia_volta": lambda r: r["voo_volta"].get("cia"),
+    "partida_volta": lambda r: r["voo_volta"].get("partida"),
+    "hotel_nome": lambda r: r["hotel"]["hotel"],
+    "hotel_categoria": lambda r: r["hotel"]["categoria"],
+}
+
+# Campos numéricos e datas: (dtype, extrator). Datas em datetime64[s], a unidade
+# nativa do pandas, para o DataFrame poder usar o mesmo buffer.
+CAMPOS_TIPADOS = {
+    "id": (np.int64, lambda r: r.get("id", 0)),
+    "data_ida": ("datetime64[s]", lambda r: r["data_ida"]),
+    "data_volta": ("datetime64[s]", lambda r: r["data_volta"]),
+    "criado_em": ("datetime64[s]", lambda r: r["criado_em"]),
+    "dias_viagem": (np.int16, lambda r: r["dias_viagem"]),
+    "preco_ida": (np.float64, lambda r: r["voo_ida"].get("preco")),
+    "preco_volta": (np.float64, lambda r: r["voo_volta"].get("preco")),
+    "hotel_diaria": (np.float64, lambda r: r["hotel"]["diaria"]),
+    "hotel_noites": (np.int16, lambda r: r["hotel"]["noites"]),
+    "ajuda_custo": (np.float64, lambda r: r["ajuda_custo"]),
+    "total_previsto": (np.float64, lambda r: r["total_previsto"]),
+    "custo_voos": (np.float64, lambda r: r.get("custo_voos")),
+    "custo_hotel": (np.float64, lambda r: r.get("custo_hotel")),
+    "alertas_mask": (np.uint8, lambda r: _mascara(r.get("alertas", ()))),
+}
+
+def _mascara(alertas) -> int:
+    return sum(bit_do_alerta(a) for a in alertas)
+
+
+def _tipo_codigo(n_categorias: int):
+    """Mesmo tamanho de código que o pandas escolhe (assim o Categorical não copia)."""
+    if n_categorias < np.iinfo(np.int8).max:
+        return np.int8
+    if n_categorias < np.iinfo(np.int16).max:
+        return np.int16
+    return np.int32
+
+
+class SolicitacoesColunares:
+    """
+    Solicitações guardadas coluna a coluna: campos repetitivos (área, cargo,
+    status, trechos, ...) como códigos int8/int16 com dicionário de valores,
+    preços como float64, contagens como int16 e datas como datetime64. Voo e
+    hotel ficam achatados (preco_ida, hotel_diaria, ...), no mesmo layout de
+    gerar_solicitacoes_em_massa.
+
+    Os buffers crescem por duplicação; dataframe() devolve um DataFrame que
+    aponta para eles sem copiar (um retrato: inclusões posteriores não o alteram).
+    As categorias saem em ordem alfabética, como nas colunas de texto comuns.
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_INICIAL):
+        self._n = 0
+        self._capacidade = capacidade
+        self._valores = {c: [] for c in CAMPOS_CATEGORICOS}
+        self._indices = {c: {} for c in CAMPOS_CATEGORICOS}
+        self._codigos = {c: np.empty(capacidade, dtype=np.int8) for c in CAMPOS_CATEGORICOS}
+        self._tipados = {c: np.empty(capacidade, dtype=t) for c, (t, _) in CAMPOS_TIPADOS.items()}
+
+    def __len__(self) -> int:
+        return self._n
+
+    # -----------------------------------------------------
+    # Inclusão
+    # -----------------------------------------------------
+    def _reservar(self, n_novos: int):
+        necessario = self._n + n_novos
+        if necessario <= self._capacidade:
+            return
+        while self._capacidade < necessario:
+            self._capacidade *= 2
+        # Buffers novos: DataFrames já entregues continuam apontando para os antigos
+        for buffers in (self._codigos, self._tipados):
+            for c, antigo in buffers.items():
+                novo = np.empty(self._capacidade, dtype=antigo.dtype)
+                novo[:self._n] = antigo[:self._n]
+                buffers[c] = novo
+
+    def _codificar(self, coluna: str, valores: list) -> np.ndarray:
+        indice, distintos = self._indices[coluna], self._valores[coluna]
+        codigos = []
+        for v in valores:
+            codigo = indice.get(v)
+            if v is None:
+                codigo = -1  # ausente (NaN no Categorical)
+            elif codigo is None:
+                codigo = indice[v] = len(distintos)
+                distintos.append(v)
+            codigos.append(codigo)
+        tipo = _tipo_codigo(len(distintos))
+        if tipo != self._codigos[coluna].dtype:
+            self._codigos[coluna] = self._codigos[coluna].astype(tipo)
+        return np.asarray(codigos, dtype=tipo)
+
+    def estender(self, registros, tamanho_lote: int = TAMANHO_LOTE_PADRAO):
+        """Inclui registros no formato do app (voo_ida/voo_volta/hotel aninhados), lote a lote."""
+        iterador = iter(registros)
+        while lote := list(islice(iterador, tamanho_lote)):
+            self._reservar(len(lote))
+            ini, fim = self._n, self._n + len(lote)
+            for coluna, extrair in CAMPOS_CATEGORICOS.items():
+                codigos = self._codificar(coluna, [extrair(r) for r in lote])
+                self._codigos[coluna][ini:fim] = codigos
+            for coluna, (tipo, extrair) in CAMPOS_TIPADOS.items():
+                valores = [extrair(r) for r in lote]
+                if tipo == np.float64:
+                    valores = [np.nan if v is None else v for v in valores]
+                self._tipados[coluna][ini:fim] = np.asarray(valores, dtype=tipo)
+            self._n = fim
+
+    def _ordenar_dicionarios(self):
+        """
+        Deixa os valores distintos em ordem alfabética (a ordem dos grupos no
+        groupby), recodificando só as colunas que ganharam valores fora de ordem.
+        Os códigos recodificados vão para um buffer novo, preservando os retratos.
+        """
+        for coluna, distintos in self._valores.items():
+            if all(a < b for a, b in zip(distintos, distintos[1:])):
+                continue
+            ordem = sorted(range(len(distintos)), key=distintos.__getitem__)
+            novo_codigo = np.empty(len(distintos) + 1, dtype=np.int64)
+            novo_codigo[ordem] = np.arange(len(distintos))
+            novo_codigo[-1] = -1  # código -1 (ausente) continua -1
+            codigos = self._codigos[coluna]
+            recodificado = np.empty_like(codigos)
+            recodificado[:self._n] = novo_codigo[codigos[:self._n]]
+            self._codigos[coluna] = recodificado
+            self._valores[coluna] = [distintos[i] for i in ordem]
+            self._indices[coluna] = {v: i for i, v in enumerate(self._valores[coluna])}
+
+    def adicionar(self, registro: dict):
+        self.estender((registro,))
+
+    @classmethod
+    def de_repositorio(cls, repo, data_ini=None, data_fim=None, **filtros) -> "SolicitacoesColunares":
+        """Carrega as solicitações do repositório (mesmos filtros de listar) sem materializar a lista."""
+        store = cls()
+        store.estender(repo.iterar(data_ini, data_fim, **filtros))
+        return store
+
+    # -----------------------------------------------------
+    # Leitura
+    # -----------------------------------------------------
+    def dataframe(self) -> pd.DataFrame:
+        """DataFrame sobre os buffers (sem cópia), pronto para viagens.dashboard e afins."""
+        self._ordenar_dicionarios()
+        n = self._n
+        colunas = {c: pd.Categorical.from_codes(self._codigos[c][:n], categories=pd.Index(self._valores[c], dtype=object),
+                                                validate=False)
+                   for c in CAMPOS_CATEGORICOS}
+        colunas.update({c: buffer[:n] for c, buffer in self._tipados.items()})
+        return pd.DataFrame(colunas, copy=False)
+
+    def memoria_bytes(self) -> int:
+        """Bytes ocupados pelos dados (sem a folga de capacidade nem os dicionários)."""
+        n = self._n
+        return sum(b[:n].nbytes for b in (*self._codigos.values(), *self._tipados.values()))
@@ -0,0 +1,43 @@
+# dashboard.py - Agregações do "Dashboard gerencial"
+import pandas as pd
+
+from viagens.metricas import cronometrado
+from viagens.politicas import STATUS_FORA
+
+COLUNAS_CUSTO = ["custo_voos", "custo_hotel", "total_previsto"]
+
+
+@cronometrado("dashboard.ticket_medio")
+def ticket_medio(dff: pd.DataFrame, coluna: str) -> pd.DataFrame:
+    """Custo médio (aéreo, hospedagem e total) por área ou cargo."""
+    return dff.groupby(coluna, observed=True)[COLUNAS_CUSTO].mean().round(2)
+
+
+@cronometrado("dashboard.violacoes_por")
+def violacoes_por(dff: pd.DataFrame, coluna: str) -> pd.DataFrame:
+    """Quantidade de solicitações fora da política por área ou cargo."""
+    fora = (dff["status"] == STATUS_FORA).astype("int64")
+    return fora.groupby(dff[coluna], observed=True).sum().reset_index(name="violacoes")
+
+
+@cronometrado("dashboard.top_trechos")
+def top_trechos(dff: pd.DataFrame) -> pd.DataFrame:
+    """Trechos por número de solicitações (ida e volta contadas separadamente), do maior ao menor."""
+    trechos = pd.concat([
+        dff["trecho_ida"].rename("trecho"),
+        dff["trecho_volta"].rename("trecho")
+    ], ignore_index=True)
+    top = trechos.value_counts().reset_index()
+    top.columns = ["trecho", "solicitacoes"]
+    return top
+
+
+@cronometrado("dashboard.trecho_mais_caro")
+def trecho_mais_caro(dff: pd.DataFrame) -> pd.DataFrame:
+    """Trecho com maior custo médio de voos (média das médias como ida e como volta)."""
+    custos_ida = dff.groupby("trecho_ida")["custo_voos"].mean().reset_index().rename(
+        columns={"trecho_ida": "trecho", "custo_voos": "custo_medio_voos"})
+    custos_volta = dff.groupby("trecho_volta")["custo_voos"].mean().reset_index().rename(
+        columns={"trecho_volta": "trecho", "custo_voos": "custo_medio_voos"})
+    custos_trechos = pd.concat([custos_ida, custos_volta]).groupby("trecho")["custo_medio_voos"].mean().reset_index()
+    return custos_trechos.sort_values(["custo_medio_voos", "trecho"], ascending=[False, True]).head(1)
@@ -0,0 +1,63 @@
+# datas_flexiveis.py - Matriz de tarifas ida x volta para datas flexíveis (±N dias)
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+MAX_PARALELO_PADRAO = 4
+
+
+def _menor_preco(voos: list) -> float:
+    precos = [v["preco"] for v in voos if v.get("preco") is not None]
+    return min(precos) if precos else np.nan
+
+
+def matriz_tarifas(origem: str, destino: str, data_ida: date, data_volta: date, janela_dias: int = 3,
+                   adultos: int = 1, buscar=None, max_paralelo: int = MAX_PARALELO_PADRAO,
+                   hoje: date | None = None) -> tuple:
+    """
+    Preço mínimo de ida + volta para cada par (ida ± janela_dias, volta ± janela_dias).
+
+    Como o total é separável (menor ida na data d + menor volta na data r), bastam
+    2N+1 consultas de ida/volta em vez de (2N+1)²: cada chamada a buscar (padrão
+    buscar_voos_indicative, que já usa o cache de tarifas compartilhado) traz a ida
+    do dia i e a volta do dia i da janela. As chamadas rodam em paralelo, limitadas
+    a max_paralelo. Células com volta antes da ida ou ida no passado ficam NaN.
+
+    Devolve (matriz, avisos): DataFrame com as datas de ida nas linhas e as de volta
+    nas colunas, e a lista de avisos de falha (emitidos fora das threads).
+    """
+    if buscar is None:
+        from viagens.skyscanner import buscar_voos_indicative as buscar  # requests só quando usado
+    hoje = hoje or date.today()
+    deslocamentos = range(-janela_dias, janela_dias + 1)
+    datas_ida = [data_ida + timedelta(days=k) for k in deslocamentos]
+    datas_volta = [data_volta + timedelta(days=k) for k in deslocamentos]
+    avisos = []
+
+    def consultar(par):
+        d_ida, d_volta = par
+        ida, volta = buscar(origem, destino, d_ida, d_volta, adultos=adultos, aviso=avisos.append)
+        return _menor_preco(ida), _menor_preco(volta)
+
+    with ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="datas-flex") as executor:
+        resultados = list(executor.map(consultar, zip(datas_ida, datas_volta)))
+
+    menor_ida = np.array([r[0] for r in resultados], dtype=np.float64)
+    menor_volta = np.array([r[1] for r in resultados], dtype=np.float64)
+    total = menor_ida[:, None] + menor_volta[None, :]
+    ida_dt = np.array(datas_ida, dtype="datetime64[D]")
+    volta_dt = np.array(datas_volta, dtype="datetime64[D]")
+    invalida = (volta_dt[None, :] < ida_dt[:, None]) | (ida_dt[:, None] < np.datetime64(hoje))
+    total[invalida] = np.nan
+    matriz = pd.DataFrame(total, index=[str(d) for d in datas_ida], columns=[str(d) for d in datas_volta])
+    matriz.index.name = "data_ida"
+    matriz.columns.name = "data_volta"
+    return matriz, avisos
+
+
+def celulas_mais_baratas(matriz: pd.DataFrame, n: int = 5) -> pd.DataFrame:
+    """As n combinações de datas mais baratas da matriz, em ordem crescente de preço."""
+    celulas = matriz.stack().dropna().rename("preco_total").reset_index()
+    return celulas.nsmallest(n, "preco_total").reset_index(drop=True)
@@ -0,0 +1,271 @@
+# depositos.py - Agendador de depósitos da ajuda de custo em D-2: fila por data de ida, lotes diários e arquivo de pagamento
+import csv
+import heapq
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from viagens.metricas import cronometrado
+from viagens.rollups import APROVADO
+
+ANTECEDENCIA_DEPOSITO_DIAS = 2
+PASTA_ARQUIVOS_PADRAO = os.environ.get("VIAGENS_PAGAMENTOS", "pagamentos")
+
+# depositos.solicitacao_id é a chave: uma viagem entra em no máximo um lote (nunca é paga duas vezes).
+# depositos_lotes.data_referencia é única: reprocessar um dia não gera outro lote.
+# depositos_estado 'processado_ate' é o último dia processado, com ou sem lote (dias sem depósito não geram lote).
+ESQUEMA_DEPOSITOS = """
+CREATE TABLE IF NOT EXISTS depositos_lotes (
+    lote INTEGER PRIMARY KEY AUTOINCREMENT,
+    data_referencia TEXT NOT NULL UNIQUE,
+    quantidade INTEGER NOT NULL,
+    total REAL NOT NULL,
+    arquivo TEXT,
+    criado_em TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS depositos (
+    solicitacao_id INTEGER PRIMARY KEY,
+    lote INTEGER NOT NULL REFERENCES depositos_lotes(lote),
+    colaborador TEXT,
+    area TEXT,
+    data_ida TEXT NOT NULL,
+    data_deposito TEXT NOT NULL,
+    valor REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_depositos_lote ON depositos(lote);
+CREATE TABLE IF NOT EXISTS depositos_estado (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+"""
+
+COLUNAS_ARQUIVO = ["lote", "data_referencia", "solicitacao_id", "colaborador", "area", "data_ida",
+                   "data_deposito", "valor"]
+
+
+def data_deposito(data_ida, antecedencia_dias: int = ANTECEDENCIA_DEPOSITO_DIAS) -> date:
+    """Dia do depósito da ajuda de custo (D-2 da ida)."""
+    return date.fromisoformat(str(data_ida)[:10]) - timedelta(days=antecedencia_dias)
+
+
+class AgendadorDepositos:
+    """
+    Depósitos da ajuda de custo das viagens aprovadas, um lote por dia.
+
+    A fila é um heap de (data do depósito, id) com as viagens aprovadas ainda não
+    pagas, montado do banco na criação (o banco é a fonte da verdade: reiniciar o
+    processo não perde nem repete nada). O agendador roda fora do app, uma vez por
+    dia, e a fila é remontada a cada execução: aprovações feitas entre execuções
+    entram pela consulta de recarregar(), sem aviso do caminho de decisão.
+    processar_dia(d) retira só as k viagens com depósito até d, O(k log n), confere
+    no banco se continuam aprovadas e com a mesma data, grava o lote numa transação
+    e emite o arquivo de pagamento; dias sem depósito não geram lote nem arquivo.
+    executar() processa os dias desde o último processado, recuperando os que
+    faltaram. Viagens com ida antes do primeiro dia processado ficam fora
+    (anteriores ao agendador).
+    """
+
+    def __init__(self, caminho: str, pasta_arquivos: str = PASTA_ARQUIVOS_PADRAO,
+                 antecedencia_dias: int = ANTECEDENCIA_DEPOSITO_DIAS, inicio=None):
+        self.caminho = caminho
+        self.pasta_arquivos = pasta_arquivos
+        self.antecedencia_dias = antecedencia_dias
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        con = self._conexao()
+        con.executescript(ESQUEMA_DEPOSITOS)
+        with con:
+            # O primeiro dia processado fica gravado: execuções seguintes continuam dele
+            con.execute("INSERT OR IGNORE INTO depositos_estado (chave, valor) VALUES ('inicio', ?)",
+                        (str(inicio or date.today())[:10],))
+        self.inicio = date.fromisoformat(self._estado("inicio"))
+        self._fila = []
+        self.recarregar()
+
+    def _conexao(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA journal_mode=WAL")
+            self._local.con = con
+        return con
+
+    def _estado(self, chave: str) -> str | None:
+        linha = self._conexao().execute("SELECT valor FROM depositos_estado WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    @staticmethod
+    def _processado_ate(con) -> str:
+        """Último dia processado ('AAAA-MM-DD', '' se nenhum): o marcador ou, em bancos sem ele, o último lote."""
+        return con.execute(
+            "SELECT MAX(COALESCE((SELECT valor FROM depositos_estado WHERE chave = 'processado_ate'), ''), "
+            "COALESCE((SELECT MAX(data_referencia) FROM depositos_lotes), ''))").fetchone()[0]
+
+    # -----------------------------------------------------
+    # Fila
+    # -----------------------------------------------------
+    def recarregar(self):
+        """Remonta a fila com as viagens aprovadas e ainda não pagas (heapify, O(n))."""
+        linhas = self._conexao().execute(
+            "SELECT s.id, s.data_ida FROM solicitacoes s WHERE s.aprovacao = ? AND s.data_ida >= ? "
+            "AND NOT EXISTS (SELECT 1 FROM depositos d WHERE d.solicitacao_id = s.id)",
+            (APROVADO, str(self.inicio))).fetchall()
+        fila = [(str(data_deposito(l["data_ida"], self.antecedencia_dias)), l["id"]) for l in linhas]
+        heapq.heapify(fila)
+        with self._trava:
+            self._fila = fila
+
+    def __len__(self) -> int:
+        return len(self._fila)
+
+    def proximos(self, n: int = 10) -> list:
+        """Os n próximos (data do depósito, id) da fila, sem retirá-los."""
+        with self._trava:
+            return heapq.nsmallest(n, self._fila)
+
+    def _retirar_vencidos(self, dia: date) -> list:
+        chave = str(dia)
+        vencidos = []
+        with self._trava:
+            while self._fila and self._fila[0][0] <= chave:
+                vencidos.append(heapq.heappop(self._fila))
+        return vencidos
+
+    # -----------------------------------------------------
+    # Lotes
+    # -----------------------------------------------------
+    @cronometrado("depositos.processar_dia")
+    def processar_dia(self, dia) -> dict | None:
+        """
+        Gera o lote do dia (date ou 'AAAA-MM-DD'): viagens com depósito até o dia,
+        incluindo as aprovadas depois do seu D-2. Devolve o resumo do lote, ou None
+        se o dia não tem depósitos ou já foi processado (outra execução chegou antes).
+        """
+        dia = date.fromisoformat(str(dia)[:10])
+        vencidos = self._retirar_vencidos(dia)
+        try:
+            lote, pagar, de_volta = self._gravar_lote(dia, vencidos)
+        except BaseException:
+            self._devolver(vencidos)  # nada foi gravado: as viagens continuam na fila
+            raise
+        self._devolver(de_volta)
+        if lote is None:
+            return None
+        arquivo = self._emitir_arquivo(lote)
+        return {"lote": lote, "data_referencia": str(dia), "quantidade": len(pagar),
+                "total": sum(p[-1] for p in pagar), "arquivo": arquivo}
+
+    def _devolver(self, itens: list):
+        with self._trava:
+            for item in itens:
+                heapq.heappush(self._fila, item)
+
+    def _gravar_lote(self, dia: date, vencidos: list) -> tuple:
+        """
+        Numa transação: confere as viagens retiradas no banco, grava o lote do dia (se
+        houver o que pagar) e marca o dia como processado. Devolve (lote, depósitos,
+        itens que voltam para a fila); lote None se o dia já tinha sido processado
+        (todas as retiradas voltam) ou não tem depósitos.
+        """
+        con = self._conexao()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            if str(dia) <= self._processado_ate(con):
+                return None, [], vencidos
+            atuais = {}
+            ids = sorted({sol_id for _, sol_id in vencidos})
+            for i in range(0, len(ids), 500):
+                parte = ids[i:i + 500]
+                atuais.update((l["id"], l) for l in con.execute(
+                    "SELECT s.id, s.colaborador, s.area, s.data_ida, s.aprovacao, "
+                    "json_extract(s.dados, '$.ajuda_custo') AS valor, "
+                    "EXISTS (SELECT 1 FROM depositos d WHERE d.solicitacao_id = s.id) AS pago "
+                    f"FROM solicitacoes s WHERE s.id IN ({', '.join('?' for _ in parte)})", parte))
+            # Reprovada depois da aprovação ou já paga: sai da fila; ida adiada: volta para a fila
+            pagar, adiadas = [], []
+            for sol_id in ids:
+                atual = atuais.get(sol_id)
+                if atual is None or atual["pago"] or atual["aprovacao"] != APROVADO:
+                    continue
+                deposito = str(data_deposito(atual["data_ida"], self.antecedencia_dias))
+                if deposito > str(dia):
+                    adiadas.append((deposito, sol_id))
+                    continue
+                pagar.append((sol_id, atual["colaborador"], atual["area"], atual["data_ida"], deposito,
+                              float(atual["valor"] or 0)))
+            con.execute("INSERT INTO depositos_estado (chave, valor) VALUES ('processado_ate', ?) "
+                        "ON CONFLICT (chave) DO UPDATE SET valor = MAX(valor, excluded.valor)", (str(dia),))
+            if not pagar:
+                return None, [], adiadas
+            lote = con.execute(
+                "INSERT INTO depositos_lotes (data_referencia, quantidade, total, criado_em) VALUES (?, ?, ?, ?)",
+                (str(dia), len(pagar), sum(p[-1] for p in pagar), datetime.now().isoformat(timespec="seconds")),
+            ).lastrowid
+            con.executemany(
+                "INSERT INTO depositos (solicitacao_id, lote, colaborador, area, data_ida, data_deposito, valor) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", [(p[0], lote, *p[1:]) for p in pagar])
+        return lote, pagar, adiadas
+
+    def executar(self, ate=None) -> list:
+        """
+        Processa todos os dias ainda não processados, do dia seguinte ao último (ou do
+        início) até `ate` (padrão: hoje), e reemite arquivos de lotes que não chegaram
+        ao disco. Devolve os resumos dos lotes gerados (dias sem depósito não entram).
+        """
+        ate = date.fromisoformat(str(ate or date.today())[:10])
+        self.reemitir_arquivos()
+        ultimo = self._processado_ate(self._conexao())
+        dia = date.fromisoformat(ultimo) + timedelta(days=1) if ultimo else self.inicio
+        resumos = []
+        while dia <= ate:
+            resumo = self.processar_dia(dia)
+            if resumo:
+                resumos.append(resumo)
+            dia += timedelta(days=1)
+        return resumos
+
+    # -----------------------------------------------------
+    # Arquivo de pagamento
+    # -----------------------------------------------------
+    def _emitir_arquivo(self, lote: int) -> str:
+        """
+        Grava o CSV do lote a partir do banco (gravação atômica: arquivo temporário +
+        os.replace) e registra o caminho no lote.
+        """
+        con = self._conexao()
+        data_referencia = con.execute("SELECT data_referencia FROM depositos_lotes WHERE lote = ?",
+                                      (lote,)).fetchone()[0]
+        linhas = con.execute("SELECT solicitacao_id, colaborador, area, data_ida, data_deposito, valor "
+                             "FROM depositos WHERE lote = ? ORDER BY solicitacao_id", (lote,)).fetchall()
+        os.makedirs(self.pasta_arquivos, exist_ok=True)
+        caminho = os.path.join(self.pasta_arquivos, f"depositos_{data_referencia}.csv")
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(COLUNAS_ARQUIVO)
+            escritor.writerows((lote, data_referencia, *l) for l in linhas)
+        os.replace(temporario, caminho)
+        with con:
+            con.execute("UPDATE depositos_lotes SET arquivo = ? WHERE lote = ?", (caminho, lote))
+        return caminho
+
+    def reemitir_arquivos(self) -> list:
+        """Lotes gravados cujo arquivo não existe (queda entre o commit e a escrita): gera de novo."""
+        lotes = self._conexao().execute("SELECT lote, arquivo FROM depositos_lotes ORDER BY lote").fetchall()
+        return [self._emitir_arquivo(l["lote"]) for l in lotes if not l["arquivo"] or not os.path.exists(l["arquivo"])]
+
+    # -----------------------------------------------------
+    # Consulta
+    # -----------------------------------------------------
+    def lotes(self, limite: int = 30) -> list:
+        return [dict(l) for l in self._conexao().execute(
+            "SELECT * FROM depositos_lotes ORDER BY data_referencia DESC LIMIT ?", (limite,))]
+
+    def situacao(self, sol_id: int) -> dict | None:
+        """Depósito já pago de uma solicitação (lote, data e valor), ou None."""
+        linha = self._conexao().execute(
+            "SELECT d.*, l.data_referencia FROM depositos d JOIN depositos_lotes l USING (lote) "
+            "WHERE d.solicitacao_id = ?", (sol_id,)).fetchone()
+        return dict(linha) if linha else None
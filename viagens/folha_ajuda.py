@@ -0,0 +1,185 @@
+# folha_ajuda.py - Folha mensal de ajuda de custo: viagens aprovadas rateadas por mês, com calendário de feriados
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from viagens.metricas import cronometrado
+from viagens.politicas import agrupar_por_vigencia
+from viagens.rollups import APROVADO
+
+DIAS_UTEIS_SEMANA = "1111100"  # segunda a sexta
+
+# Peso de cada tipo de dia na ajuda de custo (fração da diária da hierarquia).
+# Feriado = feriado em dia de semana; feriado no sábado/domingo conta como fim de semana.
+PESOS_DIA = {"util": 1.0, "fim_de_semana": 0.5, "feriado": 0.5}
+
+# Feriados nacionais de data fixa (mês, dia)
+FERIADOS_FIXOS = [
+    (1, 1),    # Confraternização Universal
+    (4, 21),   # Tiradentes
+    (5, 1),    # Dia do Trabalho
+    (9, 7),    # Independência
+    (10, 12),  # Nossa Senhora Aparecida
+    (11, 2),   # Finados
+    (11, 15),  # Proclamação da República
+    (11, 20),  # Consciência Negra
+    (12, 25),  # Natal
+]
+# Feriados e pontos facultativos móveis, em dias a partir do domingo de Páscoa
+FERIADOS_MOVEIS = [-48, -47, -2, 60]  # Carnaval (segunda e terça), Sexta-feira Santa, Corpus Christi
+
+COLUNAS_LANCAMENTO = [
+    "solicitacao_id", "colaborador", "area", "cargo", "competencia", "inicio", "fim",
+    "dias_uteis", "dias_fim_de_semana", "dias_feriado", "valor",
+]
+
+
+# =========================================================
+# Calendário
+# =========================================================
+def pascoa(ano: int) -> date:
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher, calendário gregoriano)."""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+def feriados_nacionais(ano: int) -> list:
+    domingo_pascoa = pascoa(ano)
+    return sorted([date(ano, m, d) for m, d in FERIADOS_FIXOS]
+                  + [domingo_pascoa + timedelta(days=n) for n in FERIADOS_MOVEIS])
+
+
+@lru_cache(maxsize=32)
+def calendario(ano_ini: int, ano_fim: int, feriados_extras: tuple = ()) -> np.busdaycalendar:
+    """
+    Calendário de dias úteis (segunda a sexta, menos feriados) de ano_ini a ano_fim,
+    compilado uma vez por combinação. feriados_extras: datas 'AAAA-MM-DD' adicionais
+    (feriados locais, recessos).
+    """
+    feriados = [d for ano in range(ano_ini, ano_fim + 1) for d in feriados_nacionais(ano)]
+    feriados += [date.fromisoformat(str(d)[:10]) for d in feriados_extras]
+    return np.busdaycalendar(weekmask=DIAS_UTEIS_SEMANA, holidays=np.array(feriados, dtype="datetime64[D]"))
+
+
+# =========================================================
+# Rateio por mês
+# =========================================================
+def _datas(valores) -> np.ndarray:
+    return pd.to_datetime(pd.Series(valores), errors="coerce").to_numpy().astype("datetime64[D]")
+
+
+def _acumulado_na_viagem(valores: np.ndarray, primeiro: np.ndarray, viagem: np.ndarray) -> np.ndarray:
+    """Soma acumulada de valores por segmento, reiniciada no primeiro segmento de cada viagem."""
+    soma = np.cumsum(valores)
+    return soma - (soma - valores)[primeiro][viagem]
+
+
+@cronometrado("folha_ajuda.lancamentos")
+def lancamentos_ajuda(viagens: pd.DataFrame, pesos: dict | None = None, feriados_extras=()) -> pd.DataFrame:
+    """
+    Rateia a ajuda de custo de cada viagem pelos meses em que ela acontece.
+    viagens: colunas id, colaborador, area, cargo, data_ida e data_volta (uma linha
+    por viagem). Cada dia vale a diária da hierarquia vezes o seu peso (PESOS_DIA),
+    e o multiplicador por duração é o da viagem inteira, pela política vigente na
+    data_ida; com todos os pesos 1, o total da viagem é o de calcular_ajuda_custo.
+    Os valores de cada mês são truncados sobre o acumulado da viagem, então somam
+    exatamente o total. Devolve um lançamento por viagem e mês (COLUNAS_LANCAMENTO).
+    Datas inválidas ou volta antes da ida: ValueError.
+    """
+    pesos = {**PESOS_DIA, **(pesos or {})}
+    if viagens.empty:
+        return pd.DataFrame(columns=COLUNAS_LANCAMENTO)
+    ida, volta = _datas(viagens["data_ida"]), _datas(viagens["data_volta"])
+    invalidas = np.isnat(ida) | np.isnat(volta) | (volta < ida)
+    if invalidas.any():
+        raise ValueError(f"Viagens com datas inválidas: {viagens['id'].to_numpy()[invalidas][:20].tolist()}")
+
+    # Um segmento por viagem e mês: [max(ida, 1º dia do mês), min(volta, último dia do mês)]
+    mes_ida = ida.astype("datetime64[M]")
+    n_meses = (volta.astype("datetime64[M]") - mes_ida).astype(np.int64) + 1
+    viagem = np.repeat(np.arange(len(viagens)), n_meses)
+    primeiro = np.cumsum(n_meses) - n_meses
+    mes = mes_ida[viagem] + (np.arange(len(viagem)) - primeiro[viagem])
+    inicio = np.maximum(ida[viagem], mes.astype("datetime64[D]"))
+    fim = np.minimum(volta[viagem], (mes + 1).astype("datetime64[D]") - 1)
+
+    anos = mes.astype("datetime64[Y]").astype(np.int64) + 1970
+    cal = calendario(int(anos.min()), int(anos.max()), tuple(str(d) for d in feriados_extras))
+    dias = (fim - inicio).astype(np.int64) + 1
+    dias_semana = np.busday_count(inicio, fim + 1, weekmask=DIAS_UTEIS_SEMANA)
+    uteis = np.busday_count(inicio, fim + 1, busdaycal=cal)
+    feriados = dias_semana - uteis
+    fim_de_semana = dias - dias_semana
+
+    # Diária e multiplicador (pela duração total) de cada viagem, na versão vigente na ida
+    base = np.empty(len(viagens), dtype=np.float64)
+    mult = np.empty(len(viagens), dtype=np.float64)
+    cargos = viagens["cargo"].to_numpy()
+    duracao = (volta - ida).astype(np.int64) + 1
+    for pc, linhas in agrupar_por_vigencia(ida):
+        base[linhas] = pc.ajuda_base[pc.codigos_cargo(cargos[linhas])]
+        mult[linhas] = pc.multiplicadores_array(duracao[linhas])
+
+    # Contagens acumuladas são inteiras: o peso acumulado não sofre erro de soma em ponto flutuante
+    peso_acumulado = (pesos["util"] * _acumulado_na_viagem(uteis, primeiro, viagem)
+                      + pesos["fim_de_semana"] * _acumulado_na_viagem(fim_de_semana, primeiro, viagem)
+                      + pesos["feriado"] * _acumulado_na_viagem(feriados, primeiro, viagem))
+    valor_acumulado = (base[viagem] * peso_acumulado * mult[viagem]).astype(np.int64)
+    valor = np.diff(valor_acumulado, prepend=0)
+    valor[primeiro] = valor_acumulado[primeiro]
+
+    # Texto repetido vira categórico (códigos + dicionário): montar o razão não copia strings
+    meses, codigo_mes = np.unique(mes, return_inverse=True)
+    return pd.DataFrame({
+        "solicitacao_id": viagens["id"].to_numpy()[viagem],
+        **{c: pd.Categorical(viagens[c]).take(viagem) for c in ("colaborador", "area", "cargo")},
+        "competencia": pd.Categorical.from_codes(codigo_mes, np.datetime_as_string(meses, unit="M")),
+        "inicio": inicio,
+        "fim": fim,
+        "dias_uteis": uteis,
+        "dias_fim_de_semana": fim_de_semana,
+        "dias_feriado": feriados,
+        "valor": valor,
+    })
+
+
+# =========================================================
+# Folha do mês
+# =========================================================
+def _limites_mes(competencia: str) -> tuple:
+    try:
+        inicio = date.fromisoformat(f"{competencia}-01")
+    except ValueError:
+        raise ValueError(f"Competência inválida: {competencia!r} (use AAAA-MM)") from None
+    proximo = date(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1)
+    return inicio, proximo - timedelta(days=1)
+
+
+@cronometrado("folha_ajuda.folha_mensal")
+def folha_mensal(repo, competencia: str, pesos: dict | None = None, feriados_extras=()) -> pd.DataFrame:
+    """
+    Lançamentos da competência ('AAAA-MM') para as viagens aprovadas que têm dias
+    no mês; viagens que cruzam meses entram só com a parte do mês (ver lancamentos_ajuda).
+    """
+    inicio, fim = _limites_mes(competencia)
+    viagens = pd.DataFrame(repo.viagens_no_periodo(str(inicio), str(fim), aprovacao=APROVADO),
+                           columns=["id", "colaborador", "area", "cargo", "data_ida", "data_volta"])
+    lancamentos = lancamentos_ajuda(viagens, pesos, feriados_extras)
+    return lancamentos[lancamentos["competencia"] == competencia].reset_index(drop=True)
+
+
+def consolidar(lancamentos: pd.DataFrame) -> pd.DataFrame:
+    """Razão consolidado: total por competência e colaborador (área e cargo da última viagem)."""
+    return (lancamentos.groupby(["competencia", "colaborador"], as_index=False, sort=True)
+            .agg(area=("area", "last"), cargo=("cargo", "last"), viagens=("solicitacao_id", "nunique"),
+                 dias_uteis=("dias_uteis", "sum"), dias_fim_de_semana=("dias_fim_de_semana", "sum"),
+                 dias_feriado=("dias_feriado", "sum"), valor=("valor", "sum")))
@@ -0,0 +1,425 @@
+# historico_tarifas.py - Histórico de cotações de voo (partições mensais) e índice de percentis por rota e antecedência
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from viagens.metricas import medir
+
+log = logging.getLogger(__name__)
+
+# Faixas de antecedência (dias entre a cotação e o voo), pelo primeiro dia de cada uma
+FAIXAS_ANTECEDENCIA = [0, 3, 7, 10, 14, 21, 30, 45, 60, 90]
+# Histograma de preços em escala log: classes de ~5% de largura entre PRECO_MIN e PRECO_MAX
+# (preços fora do intervalo entram na primeira ou na última classe)
+PRECO_MIN = 50.0
+PRECO_MAX = 20000.0
+N_CLASSES = 128
+# Abaixo disso, a célula (rota, faixa) não tem cotações suficientes para comparar
+AMOSTRAS_MINIMAS = 20
+# Intervalo mínimo entre consultas ao banco em busca de gravações de outros processos
+INTERVALO_RECARGA_S = 2.0
+# Buscas (fonte, trecho, data do voo, dia da cotação) já gravadas por este processo
+MAX_BUSCAS_RECENTES = 10_000
+CODIGOS_FONTE = {"simulado": 0, "indicative": 1, "live": 2}
+
+ESQUEMA_HISTORICO = """
+CREATE TABLE IF NOT EXISTS tarifas_rotas (
+    id INTEGER PRIMARY KEY,
+    origem TEXT NOT NULL,
+    destino TEXT NOT NULL,
+    UNIQUE (origem, destino)
+);
+CREATE TABLE IF NOT EXISTS tarifas_indice (
+    rota INTEGER NOT NULL,
+    faixa INTEGER NOT NULL,
+    amostras INTEGER NOT NULL,
+    p50 REAL NOT NULL,
+    p90 REAL NOT NULL,
+    histograma BLOB NOT NULL,  -- contagens por classe de preço (N_CLASSES x uint32)
+    PRIMARY KEY (rota, faixa)
+);
+CREATE TABLE IF NOT EXISTS tarifas_estado (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    versao INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO tarifas_estado (id, versao) VALUES (1, 0);
+"""
+
+# Uma tabela por mês da cotação; sem índices (só é lida inteira, ao reconstruir ou descartar)
+ESQUEMA_PARTICAO = """
+CREATE TABLE IF NOT EXISTS {tabela} (
+    cotado_em INTEGER NOT NULL,     -- epoch, segundos
+    rota INTEGER NOT NULL,
+    dia_voo INTEGER NOT NULL,       -- dias desde 1970-01-01
+    antecedencia INTEGER NOT NULL,
+    fonte INTEGER NOT NULL,
+    preco REAL NOT NULL
+)
+"""
+_PARTICAO = re.compile(r"^tarifas_(\d{4})(\d{2})$")
+
+_LOG_LARGURA = math.log(PRECO_MAX / PRECO_MIN) / N_CLASSES
+
+
+def _dia(data) -> int:
+    """Dias desde 1970-01-01 (date, datetime ou 'AAAA-MM-DD')."""
+    if isinstance(data, str):
+        data = date.fromisoformat(data[:10])
+    elif isinstance(data, datetime):
+        data = data.date()
+    return (data - date(1970, 1, 1)).days
+
+
+def _tabela_particao(competencia: str) -> str:
+    """'AAAA-MM' -> tarifas_AAAAMM."""
+    return f"tarifas_{competencia[:4]}{competencia[5:7]}"
+
+
+# =========================================================
+# Faixas e histogramas
+# =========================================================
+def faixa_antecedencia(dias: int) -> int:
+    return bisect_right(FAIXAS_ANTECEDENCIA, max(int(dias), 0)) - 1
+
+
+def descrever_faixa(faixa: int) -> str:
+    inicio = FAIXAS_ANTECEDENCIA[faixa]
+    if faixa + 1 == len(FAIXAS_ANTECEDENCIA):
+        return f"{inicio}+ dias"
+    fim = FAIXAS_ANTECEDENCIA[faixa + 1] - 1
+    return f"{inicio} dia{'s' if fim > 1 else ''}" if inicio == fim else f"{inicio}–{fim} dias"
+
+
+def classes_preco(precos) -> np.ndarray:
+    posicao = np.log(np.asarray(precos, dtype=np.float64) / PRECO_MIN) / _LOG_LARGURA
+    return np.clip(np.floor(posicao), 0, N_CLASSES - 1).astype(np.int64)
+
+
+def percentil_histograma(contagens: np.ndarray, q: float) -> float:
+    """
+    Percentil q (0 a 1) a partir das contagens por classe, interpolando em escala
+    log dentro da classe. Custo fixo (N_CLASSES), independente do número de cotações.
+    """
+    acumulado = np.cumsum(contagens, dtype=np.int64)
+    alvo = q * acumulado[-1]
+    k = int(np.searchsorted(acumulado, alvo, side="left"))
+    fracao = (alvo - (acumulado[k] - contagens[k])) / contagens[k] if contagens[k] else 0.5
+    return PRECO_MIN * math.exp((k + fracao) * _LOG_LARGURA)
+
+
+# =========================================================
+# Histórico
+# =========================================================
+class HistoricoTarifas:
+    """
+    Cotações de voo guardadas em tabelas mensais (tarifas_AAAAMM, pelo mês da
+    cotação), mais um índice por rota e faixa de antecedência com o histograma
+    dos preços, atualizado na mesma transação de cada gravação. Descartar meses
+    antigos é um DROP TABLE (e a subtração dos seus histogramas do índice).
+
+    p50 e p90 de cada célula ficam num dict em memória: comparar uma cotação é um
+    acesso a dict, sem reler o histórico. Gravações de outros processos ou
+    réplicas são carregadas na primeira consulta após INTERVALO_RECARGA_S.
+    """
+
+    def __init__(self, caminho: str, amostras_minimas: int = AMOSTRAS_MINIMAS,
+                 intervalo_recarga_s: float = INTERVALO_RECARGA_S):
+        self.caminho = caminho
+        self.amostras_minimas = amostras_minimas
+        self.intervalo_recarga_s = intervalo_recarga_s
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._recentes = OrderedDict()
+        self._gravando = set()  # trechos com gravação em andamento (entram em _recentes após o commit)
+        self._rotas = {}    # (origem, destino) -> id
+        self._celulas = {}  # (origem, destino, faixa) -> (amostras, p50, p90)
+        self._conexao().executescript(ESQUEMA_HISTORICO)
+        self._versao = None
+        self._proxima_verificacao = 0.0
+        self._recarregar()
+
+    def _conexao(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            self._local.con = con
+        return con
+
+    # -----------------------------------------------------
+    # Gravação
+    # -----------------------------------------------------
+    def _id_rota(self, con, origem: str, destino: str, novas: dict) -> int:
+        """Id da rota; rotas criadas vão para novas e só entram no cache depois do commit."""
+        rota = self._rotas.get((origem, destino)) or novas.get((origem, destino))
+        if rota is None:
+            con.execute("INSERT OR IGNORE INTO tarifas_rotas (origem, destino) VALUES (?, ?)", (origem, destino))
+            rota = con.execute("SELECT id FROM tarifas_rotas WHERE origem = ? AND destino = ?",
+                               (origem, destino)).fetchone()[0]
+            novas[(origem, destino)] = rota
+        return rota
+
+    def _somar_ao_indice(self, con, rota: int, faixa: int, delta: np.ndarray) -> tuple:
+        """Soma delta (contagens por classe) ao histograma da célula; devolve (amostras, p50, p90)."""
+        linha = con.execute("SELECT histograma FROM tarifas_indice WHERE rota = ? AND faixa = ?",
+                            (rota, faixa)).fetchone()
+        contagens = np.frombuffer(linha[0], dtype=np.uint32).astype(np.int64) if linha else np.zeros(N_CLASSES, np.int64)
+        contagens = np.maximum(contagens + delta, 0)
+        amostras = int(contagens.sum())
+        if amostras == 0:
+            con.execute("DELETE FROM tarifas_indice WHERE rota = ? AND faixa = ?", (rota, faixa))
+            return 0, 0.0, 0.0
+        p50, p90 = percentil_histograma(contagens, 0.5), percentil_histograma(contagens, 0.9)
+        con.execute("INSERT OR REPLACE INTO tarifas_indice (rota, faixa, amostras, p50, p90, histograma) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", (rota, faixa, amostras, p50, p90, contagens.astype(np.uint32).tobytes()))
+        return amostras, p50, p90
+
+    def registrar(self, fonte: str, trechos, cotado_em: datetime | None = None) -> int:
+        """
+        Grava as cotações de uma busca. trechos: (origem, destino, data do voo, voos
+        no formato do app). Cada trecho (fonte, rota, data do voo) é gravado uma vez
+        por dia da cotação neste processo: reruns da mesma busca não repetem amostras.
+        O trecho só conta como gravado depois do commit; se a gravação falhar, a
+        próxima busca grava de novo. Devolve o número de cotações gravadas.
+        """
+        cotado_em = cotado_em or datetime.now()
+        dia_cotacao = _dia(cotado_em)
+        chaves, linhas = [], []
+        with self._trava:
+            for origem, destino, data_voo, voos in trechos:
+                origem, destino, dia_voo = origem.strip().upper(), destino.strip().upper(), _dia(data_voo)
+                chave = (fonte, origem, destino, dia_voo, dia_cotacao)
+                if chave in self._recentes or chave in self._gravando or dia_voo < dia_cotacao:
+                    continue
+                self._gravando.add(chave)  # reservada: outra thread não grava o mesmo trecho em paralelo
+                chaves.append(chave)
+                linhas += [(origem, destino, dia_voo, float(v["preco"])) for v in voos
+                           if isinstance(v.get("preco"), (int, float)) and v["preco"] > 0]
+        registros, resumos, novas, versao = [], {}, {}, None
+        try:
+            if linhas:
+                registros, resumos, novas, versao = self._gravar(fonte, linhas, cotado_em, dia_cotacao)
+        finally:
+            with self._trava:
+                self._gravando.difference_update(chaves)
+        with self._trava:
+            for chave in chaves:
+                self._recentes[chave] = True
+            while len(self._recentes) > MAX_BUSCAS_RECENTES:
+                self._recentes.popitem(last=False)
+            self._rotas.update(novas)
+            self._celulas.update(resumos)
+            if versao is not None and self._versao == versao - 1:
+                self._versao = versao  # ninguém gravou no meio: a memória continua completa
+        return len(registros)
+
+    def _gravar(self, fonte: str, linhas: list, cotado_em: datetime, dia_cotacao: int) -> tuple:
+        """
+        Grava as amostras na partição do mês e soma-as aos histogramas, numa transação.
+        Devolve (registros, resumos das células, rotas novas, versão do histórico).
+        """
+        con = self._conexao()
+        tabela = _tabela_particao(cotado_em.strftime("%Y-%m"))
+        epoch = int(cotado_em.timestamp())
+        with medir("historico_tarifas.registrar"), con:
+            # BEGIN IMMEDIATE: o histograma é lido e regravado; outra réplica não intercala
+            con.execute("BEGIN IMMEDIATE")
+            con.execute(ESQUEMA_PARTICAO.format(tabela=tabela))
+            celulas, registros, novas = {}, [], {}
+            for origem, destino, dia_voo, preco in linhas:
+                rota = self._id_rota(con, origem, destino, novas)
+                antecedencia = dia_voo - dia_cotacao
+                registros.append((epoch, rota, dia_voo, antecedencia, CODIGOS_FONTE.get(fonte, -1), preco))
+                celulas.setdefault((origem, destino, rota, faixa_antecedencia(antecedencia)), []).append(preco)
+            con.executemany(f"INSERT INTO {tabela} (cotado_em, rota, dia_voo, antecedencia, fonte, preco) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", registros)
+            resumos = {(o, d, faixa): self._somar_ao_indice(con, rota, faixa,
+                                                            np.bincount(classes_preco(precos), minlength=N_CLASSES))
+                       for (o, d, rota, faixa), precos in celulas.items()}
+            versao = con.execute("UPDATE tarifas_estado SET versao = versao + 1 RETURNING versao").fetchone()[0]
+        return registros, resumos, novas, versao
+
+    def registrar_busca(self, fonte: str, origem: str, destino: str, data_ida, data_volta, voos_ida: list,
+                        voos_volta: list, cotado_em: datetime | None = None) -> int:
+        """
+        Ida e volta de uma busca do app (viagens.servico.buscar_voos). A rota de cada
+        voo é o seu "trecho": numa busca por região (SAO -> RIO), cada par de
+        aeroportos tem o seu histórico.
+        """
+        trechos = {}
+        for o, d, data_voo, voos in ((origem, destino, data_ida, voos_ida), (destino, origem, data_volta, voos_volta)):
+            for v in voos:
+                rota = tuple(v["trecho"].split(" → ")) if " → " in v.get("trecho", "") else (o, d)
+                trechos.setdefault((*rota, data_voo), []).append(v)
+        return self.registrar(fonte, [(o, d, data_voo, voos) for (o, d, data_voo), voos in trechos.items()], cotado_em)
+
+    # -----------------------------------------------------
+    # Manutenção
+    # -----------------------------------------------------
+    def particoes(self) -> list:
+        """Meses ('AAAA-MM') com cotações gravadas, em ordem."""
+        nomes = self._conexao().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'tarifas_%'").fetchall()
+        return sorted(f"{m[1]}-{m[2]}" for (nome,) in nomes if (m := _PARTICAO.match(nome)))
+
+    def _histogramas_da_particao(self, con, tabela: str) -> dict:
+        """(rota, faixa) -> contagens por classe das cotações de uma partição."""
+        linhas = np.array(con.execute(f"SELECT rota, antecedencia, preco FROM {tabela}").fetchall(),
+                          dtype=np.float64).reshape(-1, 3)
+        if len(linhas) == 0:
+            return {}
+        rota, antecedencia, preco = linhas[:, 0].astype(np.int64), linhas[:, 1].astype(np.int64), linhas[:, 2]
+        faixa = np.searchsorted(FAIXAS_ANTECEDENCIA, np.maximum(antecedencia, 0), side="right") - 1
+        celula = rota.astype(np.int64) * len(FAIXAS_ANTECEDENCIA) + faixa
+        codigos, inversa = np.unique(celula, return_inverse=True)
+        contagens = np.zeros((len(codigos), N_CLASSES), dtype=np.int64)
+        np.add.at(contagens, (inversa, classes_preco(preco)), 1)
+        return {divmod(int(c), len(FAIXAS_ANTECEDENCIA)): contagens[i] for i, c in enumerate(codigos)}
+
+    def descartar_anteriores(self, competencia: str) -> list:
+        """
+        Remove as partições de meses anteriores a competencia ('AAAA-MM') e tira as
+        suas cotações do índice. Devolve os meses removidos.
+        """
+        removidas = [p for p in self.particoes() if p < competencia[:7]]
+        con = self._conexao()
+        for mes in removidas:
+            tabela = _tabela_particao(mes)
+            with con:
+                con.execute("BEGIN IMMEDIATE")
+                for (rota, faixa), contagens in self._histogramas_da_particao(con, tabela).items():
+                    self._somar_ao_indice(con, rota, faixa, -contagens)
+                con.execute(f"DROP TABLE {tabela}")
+                con.execute("UPDATE tarifas_estado SET versao = versao + 1")
+        if removidas:
+            self._recarregar()
+        return removidas
+
+    def reconstruir_indice(self):
+        """Refaz o índice do zero a partir de todas as partições."""
+        con = self._conexao()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            con.execute("DELETE FROM tarifas_indice")
+            for mes in self.particoes():
+                for (rota, faixa), contagens in self._histogramas_da_particao(con, _tabela_particao(mes)).items():
+                    self._somar_ao_indice(con, rota, faixa, contagens)
+            con.execute("UPDATE tarifas_estado SET versao = versao + 1")
+        self._recarregar()
+
+    # -----------------------------------------------------
+    # Recarga
+    # -----------------------------------------------------
+    def _recarregar(self):
+        con = self._conexao()
+        versao = con.execute("SELECT versao FROM tarifas_estado").fetchone()[0]
+        rotas = {(o, d): i for i, o, d in con.execute("SELECT id, origem, destino FROM tarifas_rotas")}
+        celulas = {(o, d, faixa): (amostras, p50, p90) for o, d, faixa, amostras, p50, p90 in con.execute(
+            "SELECT r.origem, r.destino, i.faixa, i.amostras, i.p50, i.p90 "
+            "FROM tarifas_indice i JOIN tarifas_rotas r ON r.id = i.rota")}
+        with self._trava:
+            self._rotas, self._celulas, self._versao = rotas, celulas, versao
+
+    def _verificar_recarga(self):
+        agora = time.monotonic()
+        if agora < self._proxima_verificacao:
+            return
+        versao = self._conexao().execute("SELECT versao FROM tarifas_estado").fetchone()[0]
+        if versao != self._versao:
+            self._recarregar()
+        self._proxima_verificacao = agora + self.intervalo_recarga_s
+
+    # -----------------------------------------------------
+    # Consulta
+    # -----------------------------------------------------
+    def percentis(self, origem: str, destino: str, antecedencia: int) -> dict | None:
+        """
+        p50 e p90 históricos da rota na faixa de antecedência, ou None se a célula
+        tiver menos de amostras_minimas cotações.
+        """
+        self._verificar_recarga()
+        faixa = faixa_antecedencia(antecedencia)
+        celula = self._celulas.get((origem.strip().upper(), destino.strip().upper(), faixa))
+        if celula is None or celula[0] < self.amostras_minimas:
+            return None
+        amostras, p50, p90 = celula
+        return {"faixa": descrever_faixa(faixa), "amostras": amostras, "p50": round(p50), "p90": round(p90)}
+
+    def comparar(self, voo: dict, hoje: date | None = None) -> dict | None:
+        """
+        Posição do preço de um voo do app (campos "trecho" 'ORIGEM → DESTINO', "data"
+        e "preco") no histórico da rota, com a antecedência contada a partir de hoje.
+        nivel: "ate_p50", "acima_p50" ou "acima_p90". Sem histórico suficiente: None.
+        """
+        if voo.get("preco") is None or " → " not in voo.get("trecho", ""):
+            return None
+        origem, destino = voo["trecho"].split(" → ")
+        antecedencia = _dia(voo["data"]) - _dia(hoje or date.today())
+        ref = self.percentis(origem, destino, antecedencia)
+        if ref is None:
+            return None
+        preco = voo["preco"]
+        nivel = "acima_p90" if preco > ref["p90"] else "acima_p50" if preco > ref["p50"] else "ate_p50"
+        return {**ref, "trecho": voo["trecho"], "antecedencia": antecedencia, "preco": preco,
+                "variacao_p50": round(preco / ref["p50"] - 1, 3), "nivel": nivel}
+
+    def alertas_antecedencia(self, voo_ida: dict, voo_volta: dict, antecedencia: int,
+                             antecedencia_minima: int) -> list:
+        """
+        Quantifica o alerta de antecedência: para cada trecho com histórico, onde a
+        tarifa cotada fica entre p50 e p90 da faixa atual e quanto a mediana da rota
+        costuma custar com a antecedência mínima da política.
+        """
+        hoje = date.fromisoformat(voo_ida["data"][:10]) - timedelta(days=antecedencia)
+        alertas = []
+        for nome, voo in (("Ida", voo_ida), ("Volta", voo_volta)):
+            comp = self.comparar(voo, hoje)
+            if comp is None:
+                continue
+            posicao = (f"{abs(comp['variacao_p50']):.0%} {'acima' if comp['variacao_p50'] > 0 else 'abaixo'} "
+                       f"da mediana histórica")
+            msg = (f"{nome} {comp['trecho']}: R$ {comp['preco']:.0f} está {posicao} para {comp['faixa']} "
+                   f"de antecedência (p50 R$ {comp['p50']}, p90 R$ {comp['p90']}; {comp['amostras']} cotações).")
+            origem, destino = comp["trecho"].split(" → ")
+            antecipada = self.percentis(origem, destino, antecedencia_minima)
+            if antecipada is not None:
+                msg += f" Com {antecipada['faixa']}, a mediana da rota é R$ {antecipada['p50']}."
+            alertas.append(msg)
+        return alertas
+
+
+# =========================================================
+# Histórico do processo
+# =========================================================
+_historico = None
+
+
+def configurar_historico(historico: HistoricoTarifas | None):
+    """Passa a gravar as buscas de voo (viagens.servico) e a comparar cotações neste histórico; None desliga."""
+    global _historico
+    _historico = historico
+
+
+def historico_configurado() -> HistoricoTarifas | None:
+    return _historico
+
+
+def registrar_busca(fonte: str, origem: str, destino: str, data_ida, data_volta, voos_ida: list, voos_volta: list):
+    """
+    Grava a busca no histórico configurado, se houver. Uma falha de gravação
+    (banco ocupado, disco) só é registrada no log: a cotação segue sem histórico.
+    """
+    if _historico is None:
+        return
+    try:
+        _historico.registrar_busca(fonte, origem, destino, data_ida, data_volta, voos_ida, voos_volta)
+    except sqlite3.Error as e:
+        log.warning("Histórico de tarifas indisponível: %s", e)
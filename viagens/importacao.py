@@ -0,0 +1,195 @@
+# importacao.py - Importação em lote de solicitações (CSV/Parquet) com validação vetorizada
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from viagens.politicas import agrupar_por_vigencia, classificar_arrays
+from viagens.simulacao import ajuda_custo_em_massa, registros_de_lote
+
+TAMANHO_LOTE_PADRAO = 5000
+MAX_ERROS_PADRAO = 1000
+
+# Layout do arquivo: mesmas colunas achatadas de gerar_solicitacoes_em_massa
+COLUNAS_OBRIGATORIAS = [
+    "colaborador", "area", "cargo", "origem", "destino", "data_ida", "data_volta",
+    "preco_ida", "preco_volta", "hotel_nome", "hotel_categoria", "hotel_diaria",
+]
+COLUNAS_OPCIONAIS = {
+    "motivo": "", "cia_ida": "", "partida_ida": "", "cia_volta": "", "partida_volta": "",
+    "hotel_noites": "", "criado_em": "", "aprovacao": "Pendente", "comentario_gestor": "",
+}
+APROVACOES_VALIDAS = ["Pendente", "Aprovado ✅", "Reprovado ❌"]
+
+
+# =========================================================
+# Leitura em lotes
+# =========================================================
+def _formato(arquivo, formato: str | None) -> str:
+    if formato:
+        return formato.lower()
+    nome = getattr(arquivo, "name", arquivo)
+    sufixo = Path(str(nome)).suffix.lower().lstrip(".")
+    if sufixo not in ("csv", "parquet"):
+        raise ValueError(f"Formato não reconhecido: {nome!r} (use .csv ou .parquet)")
+    return sufixo
+
+
+def ler_em_lotes(arquivo, formato: str | None = None, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                 separador: str = ","):
+    """
+    Lê o arquivo (caminho ou arquivo aberto) em DataFrames de até tamanho_lote linhas;
+    só um lote fica em memória por vez. Parquet exige o pacote opcional pyarrow.
+    """
+    formato = _formato(arquivo, formato)
+    if formato == "csv":
+        # Tudo como texto: a conversão/validação de tipos é feita por lote, com erro por linha
+        yield from pd.read_csv(arquivo, sep=separador, dtype=str, keep_default_na=False,
+                               encoding="utf-8-sig", chunksize=tamanho_lote)
+    elif formato == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("A importação de Parquet requer o pacote pyarrow (pip install pyarrow).") from exc
+        for lote in pq.ParquetFile(arquivo).iter_batches(batch_size=tamanho_lote):
+            yield lote.to_pandas()
+    else:
+        raise ValueError(f"Formato não suportado: {formato}")
+
+
+# =========================================================
+# Validação e cálculo vetorizados
+# =========================================================
+def _texto(serie: pd.Series) -> pd.Series:
+    return serie.astype(object).where(serie.notna(), "").astype(str).str.strip()
+
+
+def _data(serie: pd.Series) -> pd.Series:
+    """Aceita 'AAAA-MM-DD' (texto, date ou timestamp); inválidas viram NaT."""
+    return pd.to_datetime(_texto(serie).str.slice(0, 10), format="%Y-%m-%d", errors="coerce")
+
+
+def preparar_lote(df: pd.DataFrame, agora: datetime | None = None) -> tuple:
+    """
+    Valida e completa um lote de linhas do arquivo. Devolve (aceitas, erros):
+    aceitas no layout achatado de gerar_solicitacoes_em_massa (dias_viagem,
+    antecedência, ajuda de custo, total previsto e status já calculados) e erros
+    como Series de mensagens indexada pelas linhas rejeitadas.
+    """
+    agora = agora or datetime.now()
+    faltando = [c for c in COLUNAS_OBRIGATORIAS if c not in df]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+    erros = pd.Series("", index=df.index, dtype=object)
+
+    def marcar(mascara, mensagem):
+        nonlocal erros
+        erros = erros.where(~np.asarray(mascara), erros + mensagem + "; ")
+
+    t = {c: _texto(df[c]) for c in ("colaborador", "area", "cargo", "origem", "destino",
+                                     "hotel_nome", "hotel_categoria")}
+    for c in COLUNAS_OPCIONAIS:
+        t[c] = _texto(df[c]) if c in df else pd.Series(COLUNAS_OPCIONAIS[c], index=df.index)
+    t["aprovacao"] = t["aprovacao"].where(t["aprovacao"] != "", "Pendente")
+    for c in ("colaborador", "area", "origem", "destino", "hotel_nome"):
+        marcar(t[c] == "", f"{c} vazio")
+    marcar(~t["aprovacao"].isin(APROVACOES_VALIDAS), "aprovação inválida")
+
+    data_ida, data_volta = _data(df["data_ida"]), _data(df["data_volta"])
+    marcar(data_ida.isna(), "data_ida inválida")
+    marcar(data_volta.isna(), "data_volta inválida")
+    marcar(data_volta < data_ida, "data_volta anterior à data_ida")
+    # Cargo e categoria pela mesma versão de política que vai classificar a linha (a vigente
+    # na data de ida; sem data válida, a de hoje): um cargo que ela não conhece é erro da linha
+    for versao, linhas in agrupar_por_vigencia(data_ida.fillna(pd.Timestamp(agora)).to_numpy()):
+        marcar(linhas & ~t["cargo"].isin(versao.cargos).to_numpy(), "cargo sem política")
+        marcar(linhas & ~t["hotel_categoria"].isin(versao.categorias).to_numpy(), "categoria de hotel inválida")
+    criado_em = pd.to_datetime(t["criado_em"].where(t["criado_em"] != "", agora.isoformat(timespec="seconds")),
+                               format="ISO8601", errors="coerce")
+    marcar(criado_em.isna(), "criado_em inválido")
+
+    valores = {}
+    for c in ("preco_ida", "preco_volta", "hotel_diaria"):
+        valores[c] = pd.to_numeric(_texto(df[c]).str.replace(",", ".", regex=False), errors="coerce").round(2)
+        marcar(~(valores[c] >= 0), f"{c} inválido")
+    dias = (data_volta - data_ida).dt.days + 1
+    noites = pd.to_numeric(t["hotel_noites"], errors="coerce")
+    noites = noites.where(t["hotel_noites"] != "", np.maximum(1, dias - 1))
+    marcar((t["hotel_noites"] != "") & (~(noites >= 1) | (noites % 1 != 0)), "hotel_noites inválido")
+
+    ok = (erros == "").to_numpy()
+    erros = erros[~ok].str.rstrip("; ")
+    if not ok.any():
+        return pd.DataFrame(), erros
+
+    ida, volta, criado = data_ida[ok], data_volta[ok], criado_em[ok]
+    dias = dias[ok].astype(np.int64)
+    antecedencia = (ida - criado.dt.normalize()).dt.days
+    cargo = t["cargo"][ok]
+    preco_ida, preco_volta, diaria = (valores[c][ok] for c in ("preco_ida", "preco_volta", "hotel_diaria"))
+    noites = noites[ok].astype(np.int64)
+    custo_hotel = (diaria * noites).round(2)
+    custo_voos = preco_ida + preco_volta
+    # Ajuda de custo e status pela versão de política vigente na data de ida de cada linha
+    arrays = (antecedencia.to_numpy(), cargo.to_numpy(), preco_ida.to_numpy(), preco_volta.to_numpy(),
+              diaria.to_numpy(), t["hotel_categoria"][ok].to_numpy())
+    ajuda = np.zeros(len(cargo), dtype=np.int64)
+    status = np.empty(len(cargo), dtype=object)
+    mascara = np.zeros(len(cargo), dtype=np.uint8)
+    for versao, linhas in agrupar_por_vigencia(ida.to_numpy()):
+        ajuda[linhas] = ajuda_custo_em_massa(arrays[1][linhas], dias.to_numpy()[linhas], versao)
+        status[linhas], mascara[linhas] = classificar_arrays(*(a[linhas] for a in arrays), versao)
+    origem, destino = t["origem"][ok].str.upper(), t["destino"][ok].str.upper()
+    aceitas = pd.DataFrame({
+        "colaborador": t["colaborador"][ok], "area": t["area"][ok], "cargo": cargo,
+        "origem": origem, "destino": destino,
+        "data_ida": ida.dt.strftime("%Y-%m-%d"), "data_volta": volta.dt.strftime("%Y-%m-%d"),
+        "dias_viagem": dias, "antecedencia": antecedencia, "motivo": t["motivo"][ok],
+        "cia_ida": t["cia_ida"][ok], "partida_ida": t["partida_ida"][ok], "preco_ida": preco_ida,
+        "cia_volta": t["cia_volta"][ok], "partida_volta": t["partida_volta"][ok], "preco_volta": preco_volta,
+        "hotel_nome": t["hotel_nome"][ok], "hotel_categoria": t["hotel_categoria"][ok],
+        "hotel_diaria": diaria, "hotel_noites": noites,
+        "ajuda_custo": ajuda, "total_previsto": (custo_voos + custo_hotel + ajuda).round(2),
+        "status": status, "alertas_mask": mascara,
+        "aprovacao": t["aprovacao"][ok], "comentario_gestor": t["comentario_gestor"][ok],
+        "criado_em": criado.dt.strftime("%Y-%m-%dT%H:%M:%S"),
+        "custo_voos": custo_voos, "custo_hotel": custo_hotel,
+        "trecho_ida": origem + " → " + destino, "trecho_volta": destino + " → " + origem,
+    })
+    # Texto como object: a conversão para registros itera linha a linha
+    texto = [c for c in aceitas if aceitas[c].dtype.kind not in "iufb"]
+    return aceitas.astype({c: object for c in texto}), erros
+
+
+# =========================================================
+# Importação
+# =========================================================
+def importar_arquivo(repo, arquivo, formato: str | None = None, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                     separador: str = ",", agora: datetime | None = None,
+                     max_erros: int = MAX_ERROS_PADRAO, ao_progredir=None) -> dict:
+    """
+    Importa um CSV/Parquet de solicitações lote a lote: valida, calcula e grava
+    as linhas aceitas de cada lote numa única transação (repo.inserir_lote).
+    A memória fica limitada a um lote, independentemente do tamanho do arquivo.
+
+    Devolve {"lidas", "importadas", "rejeitadas", "erros"}, onde erros lista até
+    max_erros itens {"linha": nº da linha de dados (1 = primeira após o cabeçalho),
+    "erro": mensagens}. ao_progredir(resumo) é chamado após cada lote.
+    """
+    agora = agora or datetime.now()
+    resumo = {"lidas": 0, "importadas": 0, "rejeitadas": 0, "erros": []}
+    for lote in ler_em_lotes(arquivo, formato, tamanho_lote, separador):
+        inicio = resumo["lidas"]
+        lote.index = pd.RangeIndex(inicio + 1, inicio + 1 + len(lote))
+        aceitas, erros = preparar_lote(lote, agora)
+        if len(aceitas):
+            resumo["importadas"] += repo.inserir_lote(registros_de_lote(aceitas))
+        resumo["lidas"] += len(lote)
+        resumo["rejeitadas"] += len(erros)
+        vagas = max_erros - len(resumo["erros"])
+        if vagas > 0:
+            resumo["erros"].extend({"linha": int(i), "erro": e} for i, e in erros.head(vagas).items())
+        if ao_progredir:
+            ao_progredir(resumo)
+    return resumo
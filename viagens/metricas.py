@@ -0,0 +1,194 @@
+# metricas.py - Medição de tempo dos caminhos críticos (spans) e exportação no formato texto do Prometheus
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# Limites superiores (segundos) dos baldes do histograma; o último balde é +Inf
+LIMITES_BALDES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0)
+# Percentis calculados sobre as últimas medições de cada span
+JANELA_AMOSTRAS = 2048
+QUANTIS = (0.5, 0.95, 0.99)
+# Arquivo de métricas (textfile collector do node_exporter) e frequência de gravação
+VARIAVEL_ARQUIVO = "VIAGENS_METRICAS"
+INTERVALO_EXPORTACAO_S = 15.0
+
+
+class Histograma:
+    """Medições de um span: baldes cumulativos desde o início e janela das mais recentes."""
+
+    __slots__ = ("baldes", "soma", "contagem", "erros", "recentes")
+
+    def __init__(self):
+        self.baldes = [0] * (len(LIMITES_BALDES) + 1)
+        self.soma = 0.0
+        self.contagem = 0
+        self.erros = 0
+        self.recentes = deque(maxlen=JANELA_AMOSTRAS)
+
+    def registrar(self, duracao_s: float, erro: bool = False):
+        self.baldes[bisect_left(LIMITES_BALDES, duracao_s)] += 1
+        self.soma += duracao_s
+        self.contagem += 1
+        self.erros += erro
+        self.recentes.append(duracao_s)
+
+
+_histogramas: dict = {}
+_trava = threading.Lock()
+
+
+def registrar(nome: str, duracao_s: float, erro: bool = False):
+    """Registra uma medição (em segundos) do span `nome`."""
+    with _trava:
+        histograma = _histogramas.get(nome)
+        if histograma is None:
+            histograma = _histogramas[nome] = Histograma()
+        histograma.registrar(duracao_s, erro)
+
+
+class medir:
+    """
+    Span como gerenciador de contexto: `with medir("skyscanner.live.poll"): ...`.
+    Exceções são contadas como erro do span e propagadas.
+    """
+
+    __slots__ = ("nome", "_inicio")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        registrar(self.nome, time.perf_counter() - self._inicio, erro=tipo is not None)
+        return False
+
+
+def cronometrado(nome: str):
+    """Decorador: cada chamada da função vira uma medição do span `nome`."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def embrulho(*args, **kwargs):
+            with medir(nome):
+                return funcao(*args, **kwargs)
+        return embrulho
+    return decorador
+
+
+def zerar():
+    with _trava:
+        _histogramas.clear()
+
+
+# =========================================================
+# Consulta
+# =========================================================
+def _copia() -> dict:
+    with _trava:
+        return {nome: (h.contagem, h.soma, h.erros, list(h.baldes), np.array(h.recentes))
+                for nome, h in _histogramas.items()}
+
+
+def resumo() -> list:
+    """Uma linha por span: contagem, erros e p50/p95/p99/máximo (ms) das medições recentes."""
+    linhas = []
+    for nome, (contagem, soma, erros, _, recentes) in sorted(_copia().items()):
+        p50, p95, p99 = np.quantile(recentes, QUANTIS) * 1000
+        linhas.append({"span": nome, "contagem": contagem, "erros": erros, "media_ms": soma / contagem * 1000,
+                       "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": recentes.max() * 1000})
+    return linhas
+
+
+def amostras(nome: str) -> list:
+    """Medições recentes (segundos) do span, da mais antiga para a mais nova."""
+    with _trava:
+        histograma = _histogramas.get(nome)
+        return list(histograma.recentes) if histograma else []
+
+
+# =========================================================
+# Exportação (formato texto do Prometheus)
+# =========================================================
+def _rotulo(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def texto_prometheus() -> str:
+    """
+    Métricas no formato texto do Prometheus:
+    - viagens_span_duracao_segundos: histograma cumulativo (para histogram_quantile);
+    - viagens_span_quantis_segundos: summary com p50/p95/p99 das últimas JANELA_AMOSTRAS
+      medições (_sum e _count acumulados desde o início, como nos clientes do Prometheus);
+    - viagens_span_erros_total: spans encerrados por exceção.
+    """
+    copia = sorted(_copia().items())
+    linhas = ["# HELP viagens_span_duracao_segundos Duração dos spans instrumentados.",
+              "# TYPE viagens_span_duracao_segundos histogram"]
+    for nome, (contagem, soma, _, baldes, _) in copia:
+        span = _rotulo(nome)
+        acumulado = 0
+        for limite, qtd in zip((*LIMITES_BALDES, "+Inf"), baldes):
+            acumulado += qtd
+            linhas.append(f'viagens_span_duracao_segundos_bucket{{span="{span}",le="{limite}"}} {acumulado}')
+        linhas.append(f'viagens_span_duracao_segundos_sum{{span="{span}"}} {soma:.6f}')
+        linhas.append(f'viagens_span_duracao_segundos_count{{span="{span}"}} {contagem}')
+    linhas += ["# HELP viagens_span_quantis_segundos Percentis das medições recentes de cada span.",
+               "# TYPE viagens_span_quantis_segundos summary"]
+    for nome, (contagem, soma, _, _, recentes) in copia:
+        span = _rotulo(nome)
+        for quantil, valor in zip(QUANTIS, np.quantile(recentes, QUANTIS)):
+            linhas.append(f'viagens_span_quantis_segundos{{span="{span}",quantile="{quantil}"}} {valor:.6f}')
+        linhas.append(f'viagens_span_quantis_segundos_sum{{span="{span}"}} {soma:.6f}')
+        linhas.append(f'viagens_span_quantis_segundos_count{{span="{span}"}} {contagem}')
+    linhas += ["# HELP viagens_span_erros_total Spans encerrados por exceção.",
+               "# TYPE viagens_span_erros_total counter"]
+    for nome, (_, _, erros, _, _) in copia:
+        linhas.append(f'viagens_span_erros_total{{span="{_rotulo(nome)}"}} {erros}')
+    return "\n".join(linhas) + "\n"
+
+
+def exportar_prometheus(caminho: str):
+    """Grava as métricas em `caminho` de forma atômica (o coletor nunca lê um arquivo pela metade)."""
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(texto_prometheus())
+    os.replace(temporario, caminho)
+
+
+_exportador = None
+_caminho_exportacao = None
+
+
+def iniciar_exportacao(caminho: str | None = None, intervalo_s: float = INTERVALO_EXPORTACAO_S) -> str | None:
+    """
+    Grava o arquivo de métricas a cada intervalo_s numa thread de fundo (uma por
+    processo; chamadas repetidas não criam outra). Sem caminho, usa a variável de
+    ambiente VIAGENS_METRICAS; sem nenhum dos dois, não exporta. Devolve o caminho.
+    """
+    global _exportador, _caminho_exportacao
+    caminho = caminho or os.environ.get(VARIAVEL_ARQUIVO)
+    if not caminho:
+        return None
+    with _trava:
+        if _exportador is None:
+            def laco():
+                while True:
+                    time.sleep(intervalo_s)
+                    try:
+                        exportar_prometheus(caminho)
+                    except OSError as e:
+                        log.warning("Falha ao gravar métricas em %s: %s", caminho, e)
+            _exportador = threading.Thread(target=laco, name="exportador-metricas", daemon=True)
+            _exportador.start()
+            _caminho_exportacao = caminho
+    return _caminho_exportacao
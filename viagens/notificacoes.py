@@ -0,0 +1,383 @@
+# notificacoes.py - Caixa de saída de notificações (SQLite) e entrega assíncrona em lotes por canal
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from datetime import datetime
+
+from viagens.depositos import data_deposito
+from viagens.metricas import medir
+from viagens.rollups import APROVADO
+
+log = logging.getLogger(__name__)
+
+EVENTO_SUBMISSAO = "submissao"
+EVENTO_DECISAO = "decisao"
+
+DOMINIO_EMAIL = os.environ.get("VIAGENS_DOMINIO_EMAIL", "empresa.com.br")
+EMAIL_FINANCEIRO = f"financeiro@{DOMINIO_EMAIL}"
+REMETENTE_PADRAO = f"viagens@{DOMINIO_EMAIL}"
+PASTA_CAIXA_SAIDA_PADRAO = "caixa_saida"
+
+TAMANHO_LOTE_PADRAO = 50
+INTERVALO_POLL_S = 0.5
+RESERVA_S = 60            # lote reservado por um entregador; vencida a reserva, outro pode pegá-lo
+MAX_TENTATIVAS = 6
+ESPERA_INICIAL_S = 5.0    # nova tentativa com espera exponencial: 5 s, 10 s, 20 s, ... até ESPERA_MAXIMA_S
+ESPERA_MAXIMA_S = 600.0
+
+# chave (única) deduplica: a mesma notificação de um evento nunca entra duas vezes na fila.
+# proxima_tentativa (epoch) é também a reserva: enquanto estiver no futuro, ninguém pega a linha.
+ESQUEMA_NOTIFICACOES = """
+CREATE TABLE IF NOT EXISTS notificacoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chave TEXT NOT NULL UNIQUE,
+    solicitacao_id INTEGER,
+    evento TEXT NOT NULL,
+    canal TEXT NOT NULL,
+    destinatario TEXT NOT NULL,
+    assunto TEXT NOT NULL,
+    corpo TEXT NOT NULL,
+    situacao TEXT NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa REAL NOT NULL DEFAULT 0,
+    ultimo_erro TEXT,
+    criado_em TEXT NOT NULL,
+    enviado_em TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_notif_fila ON notificacoes(situacao, canal, proxima_tentativa);
+CREATE INDEX IF NOT EXISTS idx_notif_solic ON notificacoes(solicitacao_id);
+"""
+
+
+# =========================================================
+# Eventos -> mensagens (gravadas na transação do evento)
+# =========================================================
+def _endereco(nome: str, prefixo: str = "") -> str:
+    texto = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode().lower()
+    return f"{prefixo}{re.sub(r'[^a-z0-9]+', '.', texto).strip('.') or 'sem.nome'}@{DOMINIO_EMAIL}"
+
+
+def canais_ativos() -> tuple:
+    """E-mail sempre; webhook quando VIAGENS_WEBHOOK_URL estiver definido."""
+    return ("email", "webhook") if os.environ.get("VIAGENS_WEBHOOK_URL") else ("email",)
+
+
+def mensagens_do_evento(evento: str, registro: dict) -> list:
+    """(destinatário, assunto, corpo) de cada e-mail de um evento de solicitação."""
+    sol_id = registro.get("id")
+    trecho = f"{registro.get('origem')} → {registro.get('destino')} ({registro.get('data_ida')} a {registro.get('data_volta')})"
+    solicitante = _endereco(registro.get("colaborador", ""))
+    gestor = _endereco(registro.get("area", ""), "gestor.")
+    if evento == EVENTO_SUBMISSAO:
+        return [
+            (gestor, f"Solicitação de viagem #{sol_id} aguardando aprovação",
+             f"{registro.get('colaborador')} ({registro.get('cargo')}) solicitou {trecho}. "
+             f"Total previsto: R$ {registro.get('total_previsto')}. {registro.get('status')}"),
+            (solicitante, f"Solicitação de viagem #{sol_id} recebida",
+             f"Sua solicitação {trecho} foi enviada para aprovação."),
+        ]
+    if evento == EVENTO_DECISAO and registro.get("aprovacao") == APROVADO:
+        deposito = data_deposito(registro["data_ida"]).strftime("%d/%m/%Y")
+        return [
+            (solicitante, f"Solicitação de viagem #{sol_id} aprovada",
+             f"Sua viagem {trecho} foi aprovada. A ajuda de custo (R$ {registro.get('ajuda_custo')}) "
+             f"será depositada em {deposito}; confirme seus dados bancários."),
+            (gestor, f"Solicitação de viagem #{sol_id} aprovada", f"Aprovada: {registro.get('colaborador')}, {trecho}."),
+            (EMAIL_FINANCEIRO, f"Depósito programado: solicitação #{sol_id}",
+             f"Ajuda de custo de R$ {registro.get('ajuda_custo')} para {registro.get('colaborador')} em {deposito} (D-2)."),
+        ]
+    if evento == EVENTO_DECISAO:
+        comentario = registro.get("comentario_gestor") or "sem comentário"
+        return [
+            (solicitante, f"Solicitação de viagem #{sol_id} reprovada",
+             f"Sua solicitação {trecho} foi reprovada ({comentario}). Ajuste e reenvie se for o caso."),
+        ]
+    return []
+
+
+def _linhas_do_evento(evento: str, registro: dict, canais, agora: str) -> list:
+    """Linhas da tabela notificacoes (sem id) de um evento de solicitação."""
+    sol_id = registro.get("id")
+    situacao = registro.get("aprovacao", "") if evento == EVENTO_DECISAO else ""
+    linhas = []
+    if "email" in canais:
+        linhas += [(f"{evento}:{sol_id}:{situacao}:email:{dest}", sol_id, evento, "email", dest, assunto, corpo, agora)
+                   for dest, assunto, corpo in mensagens_do_evento(evento, registro)]
+    if "webhook" in canais:
+        corpo = json.dumps({"evento": evento, "solicitacao": {k: registro.get(k) for k in (
+            "id", "colaborador", "area", "cargo", "origem", "destino", "data_ida", "data_volta",
+            "ajuda_custo", "total_previsto", "status", "aprovacao", "comentario_gestor")}},
+            ensure_ascii=False, default=str)
+        linhas.append((f"{evento}:{sol_id}:{situacao}:webhook", sol_id, evento, "webhook", "webhook",
+                       f"{evento} #{sol_id}", corpo, agora))
+    return linhas
+
+
+def enfileirar_eventos(con: sqlite3.Connection, evento: str, registros, canais=None) -> int:
+    """
+    Grava as notificações do evento de cada registro na caixa de saída, na transação
+    de quem chamou (a gravação e as notificações são gravadas juntas, ou nenhuma),
+    com um único INSERT em lote. Notificações já enfileiradas (mesmo evento,
+    situação, canal e destinatário) são ignoradas. Devolve quantas entraram.
+    """
+    canais = canais or canais_ativos()
+    agora = datetime.now().isoformat(timespec="seconds")
+    antes = con.total_changes
+    con.executemany("INSERT OR IGNORE INTO notificacoes (chave, solicitacao_id, evento, canal, destinatario, "
+                    "assunto, corpo, criado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (linha for registro in registros for linha in _linhas_do_evento(evento, registro, canais, agora)))
+    return con.total_changes - antes
+
+
+def enfileirar_evento(con: sqlite3.Connection, evento: str, registro: dict, canais=None) -> int:
+    """enfileirar_eventos de um único registro."""
+    return enfileirar_eventos(con, evento, (registro,), canais)
+
+
+def listar(con: sqlite3.Connection, sol_id: int) -> list:
+    """Notificações de uma solicitação, da mais recente para a mais antiga."""
+    cur = con.execute("SELECT id, evento, canal, destinatario, assunto, situacao, tentativas, ultimo_erro, "
+                      "criado_em, enviado_em FROM notificacoes WHERE solicitacao_id = ? ORDER BY id DESC", (sol_id,))
+    colunas = [c[0] for c in cur.description]
+    return [dict(zip(colunas, l)) for l in cur]
+
+
+def resumo(con: sqlite3.Connection) -> list:
+    """Quantidade por canal e situação (pendente, enviada, falhou)."""
+    return [{"canal": c, "situacao": s, "quantidade": n} for c, s, n in con.execute(
+        "SELECT canal, situacao, COUNT(*) FROM notificacoes GROUP BY canal, situacao ORDER BY canal, situacao")]
+
+
+# =========================================================
+# Canais
+# =========================================================
+# Um canal recebe um lote de mensagens (dicts com id, destinatario, assunto, corpo)
+# e devolve {id: None (entregue) ou mensagem de erro}. Exceção = lote inteiro falhou.
+class CanalArquivo:
+    """Sink local de e-mail: cada mensagem vira um .eml na pasta (desenvolvimento e testes)."""
+
+    nome = "email"
+
+    def __init__(self, pasta: str = PASTA_CAIXA_SAIDA_PADRAO, remetente: str = REMETENTE_PADRAO,
+                 limite_por_s: float = 0):
+        self.pasta = pasta
+        self.remetente = remetente
+        self.limite_por_s = limite_por_s
+
+    def enviar(self, mensagens: list) -> dict:
+        from email.message import EmailMessage
+        os.makedirs(self.pasta, exist_ok=True)
+        for m in mensagens:
+            email = _email(EmailMessage(), self.remetente, m)
+            temporario = os.path.join(self.pasta, f".{m['id']}.eml.tmp")
+            with open(temporario, "wb") as f:
+                f.write(email.as_bytes())
+            os.replace(temporario, os.path.join(self.pasta, f"{m['id']:08d}.eml"))
+        return {m["id"]: None for m in mensagens}
+
+
+class CanalSMTP:
+    """E-mail por SMTP: uma conexão por lote."""
+
+    nome = "email"
+
+    def __init__(self, host: str, porta: int = 25, remetente: str = REMETENTE_PADRAO, timeout_s: float = 10,
+                 limite_por_s: float = 0):
+        self.host, self.porta, self.remetente = host, porta, remetente
+        self.timeout_s = timeout_s
+        self.limite_por_s = limite_por_s
+
+    def enviar(self, mensagens: list) -> dict:
+        import smtplib
+        from email.message import EmailMessage
+        resultado = {}
+        with smtplib.SMTP(self.host, self.porta, timeout=self.timeout_s) as smtp:
+            for m in mensagens:
+                try:
+                    smtp.send_message(_email(EmailMessage(), self.remetente, m))
+                    resultado[m["id"]] = None
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                    resultado[m["id"]] = str(e)
+        return resultado
+
+
+class CanalWebhook:
+    """POST JSON com o lote inteiro ({"notificacoes": [...]}); qualquer status 2xx confirma todas."""
+
+    nome = "webhook"
+
+    def __init__(self, url: str, timeout_s: float = 10, limite_por_s: float = 0):
+        self.url = url
+        self.timeout_s = timeout_s
+        self.limite_por_s = limite_por_s
+
+    def enviar(self, mensagens: list) -> dict:
+        import urllib.request
+        corpo = json.dumps({"notificacoes": [{"id": m["id"], **json.loads(m["corpo"])} for m in mensagens]},
+                           ensure_ascii=False).encode("utf-8")
+        requisicao = urllib.request.Request(self.url, data=corpo, method="POST",
+                                            headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(requisicao, timeout=self.timeout_s):
+            pass  # status >= 400 levanta HTTPError
+        return {m["id"]: None for m in mensagens}
+
+
+def _email(email, remetente: str, m: dict):
+    email["From"] = remetente
+    email["To"] = m["destinatario"]
+    email["Subject"] = m["assunto"]
+    email["Message-ID"] = f"<notificacao-{m['id']}@{DOMINIO_EMAIL}>"
+    email.set_content(m["corpo"])
+    return email
+
+
+def canais_padrao() -> dict:
+    """
+    Canais pelo ambiente: VIAGENS_SMTP ('host:porta') ou, sem ele, .eml em
+    VIAGENS_CAIXA_SAIDA (padrão caixa_saida/); webhook em VIAGENS_WEBHOOK_URL.
+    """
+    smtp = os.environ.get("VIAGENS_SMTP")
+    if smtp:
+        host, _, porta = smtp.partition(":")
+        canais = {"email": CanalSMTP(host, int(porta or 25))}
+    else:
+        canais = {"email": CanalArquivo(os.environ.get("VIAGENS_CAIXA_SAIDA", PASTA_CAIXA_SAIDA_PADRAO))}
+    if os.environ.get("VIAGENS_WEBHOOK_URL"):
+        canais["webhook"] = CanalWebhook(os.environ["VIAGENS_WEBHOOK_URL"])
+    return canais
+
+
+# =========================================================
+# Entrega em segundo plano
+# =========================================================
+class _LimiteTaxa:
+    """Token bucket por canal: até limite_por_s mensagens por segundo (rajada de um segundo, no mínimo uma)."""
+
+    def __init__(self, limite_por_s: float):
+        self.limite = limite_por_s
+        self.fichas = limite_por_s
+        self.atualizado = time.monotonic()
+
+    def disponiveis(self) -> int:
+        if not self.limite:
+            return 1 << 30
+        agora = time.monotonic()
+        self.fichas = min(max(self.limite, 1), self.fichas + (agora - self.atualizado) * self.limite)
+        self.atualizado = agora
+        return int(self.fichas)
+
+    def consumir(self, n: int):
+        if self.limite:
+            self.fichas -= n
+
+
+class EntregadorNotificacoes:
+    """
+    Esvazia a caixa de saída numa thread própria: quem grava o evento (a página de
+    aprovação) não espera nenhuma entrega. A cada passada, cada canal reserva um
+    lote de pendentes (no máximo tamanho_lote e o que o limite de taxa do canal
+    permite), entrega e registra o resultado; falhas voltam para a fila com espera
+    exponencial até max_tentativas. Vários entregadores (réplicas do app) podem
+    rodar sobre o mesmo banco: a reserva impede que dois peguem a mesma mensagem.
+    """
+
+    def __init__(self, caminho: str, canais: dict | None = None, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                 intervalo_s: float = INTERVALO_POLL_S, espera_inicial_s: float = ESPERA_INICIAL_S,
+                 max_tentativas: int = MAX_TENTATIVAS):
+        self.caminho = caminho
+        self.canais = canais if canais is not None else canais_padrao()
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_s = intervalo_s
+        self.espera_inicial_s = espera_inicial_s
+        self.max_tentativas = max_tentativas
+        self._limites = {nome: _LimiteTaxa(getattr(c, "limite_por_s", 0)) for nome, c in self.canais.items()}
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+        self._con = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._con.row_factory = sqlite3.Row
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.executescript(ESQUEMA_NOTIFICACOES)
+
+    def iniciar(self) -> "EntregadorNotificacoes":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._laco, name="entregador-notificacoes", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self, timeout_s: float = 5):
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+
+    def acordar(self):
+        """Antecipa a próxima passada (ex.: logo após gravar um evento)."""
+        self._acordar.set()
+
+    def _laco(self):
+        while not self._parar.is_set():
+            try:
+                entregues = self.entregar_pendentes()
+            except Exception:
+                log.exception("Falha no entregador de notificações")
+                entregues = 0
+            if not entregues:
+                self._acordar.wait(self.intervalo_s)
+                self._acordar.clear()
+
+    def _reservar(self, canal: str, limite: int) -> list:
+        agora = time.time()
+        with self._con:
+            self._con.execute("BEGIN IMMEDIATE")
+            linhas = self._con.execute(
+                "SELECT id, destinatario, assunto, corpo, tentativas FROM notificacoes "
+                "WHERE situacao = 'pendente' AND canal = ? AND proxima_tentativa <= ? ORDER BY id LIMIT ?",
+                (canal, agora, limite)).fetchall()
+            self._con.executemany("UPDATE notificacoes SET proxima_tentativa = ? WHERE id = ?",
+                                  [(agora + RESERVA_S, l["id"]) for l in linhas])
+        return [dict(l) for l in linhas]
+
+    def _registrar(self, mensagens: list, resultado: dict):
+        agora = time.time()
+        enviado_em = datetime.now().isoformat(timespec="seconds")
+        enviadas, falhas = [], []
+        for m in mensagens:
+            erro = resultado.get(m["id"], "sem confirmação do canal")
+            if erro is None:
+                enviadas.append((enviado_em, m["id"]))
+                continue
+            tentativas = m["tentativas"] + 1
+            situacao = "falhou" if tentativas >= self.max_tentativas else "pendente"
+            espera = min(self.espera_inicial_s * 2 ** (tentativas - 1), ESPERA_MAXIMA_S)
+            falhas.append((situacao, tentativas, agora + espera, str(erro)[:500], m["id"]))
+        with self._con:
+            self._con.executemany("UPDATE notificacoes SET situacao = 'enviada', enviado_em = ?, ultimo_erro = NULL "
+                                  "WHERE id = ?", enviadas)
+            self._con.executemany("UPDATE notificacoes SET situacao = ?, tentativas = ?, proxima_tentativa = ?, "
+                                  "ultimo_erro = ? WHERE id = ?", falhas)
+
+    def entregar_pendentes(self) -> int:
+        """Uma passada por todos os canais; devolve quantas mensagens foram tentadas."""
+        tentadas = 0
+        for nome, canal in self.canais.items():
+            limite = min(self.tamanho_lote, self._limites[nome].disponiveis())
+            if limite <= 0:
+                continue
+            mensagens = self._reservar(nome, limite)
+            if not mensagens:
+                continue
+            self._limites[nome].consumir(len(mensagens))
+            try:
+                with medir(f"notificacoes.{nome}"):
+                    resultado = canal.enviar(mensagens)
+            except Exception as e:
+                resultado = {m["id"]: f"{type(e).__name__}: {e}" for m in mensagens}
+            self._registrar(mensagens, resultado)
+            tentadas += len(mensagens)
+        return tentadas
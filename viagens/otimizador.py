@@ -0,0 +1,84 @@
+# otimizador.py - Combinações ida + volta + hotel mais baratas dentro da política
+import heapq
+from itertools import count
+
+from viagens.politicas import dentro_da_politica_hotel, dentro_da_politica_voo, politica_vigente
+
+# Preferências "suaves": não eliminam opções, só somam uma penalidade (R$) ao custo
+PREFERENCIAS_PADRAO = {
+    "mesma_cia": False,          # penaliza ida e volta em companhias diferentes
+    "penalidade_cia": 150,
+    "janela_ida": None,          # ("HH:MM", "HH:MM"): partida desejada da ida
+    "janela_volta": None,
+    "penalidade_janela": 200,
+}
+
+
+def _fora_da_janela(partida: str, janela) -> bool:
+    if not janela or not partida:
+        return False
+    inicio, fim = janela
+    return not (inicio <= partida <= fim)
+
+
+def _candidatos_trecho(voos: list, cargo: str, k: int, janela, penalidade: float, politica) -> list:
+    """
+    Voos dentro da política com custo efetivo (preço + penalidade de janela),
+    reduzidos aos que podem aparecer entre as k melhores combinações: os k mais
+    baratos no geral e os k mais baratos de cada companhia (para a preferência de
+    mesma companhia). Seleção parcial com heap: O(n log k), sem ordenar a lista toda.
+    """
+    validos = [(v["preco"] + (penalidade if _fora_da_janela(v.get("partida"), janela) else 0), i, v)
+               for i, v in enumerate(voos) if dentro_da_politica_voo(v, cargo, politica)]
+    escolhidos = {i: (c, i, v) for c, i, v in heapq.nsmallest(k, validos)}
+    por_cia = {}
+    for item in validos:
+        por_cia.setdefault(item[2].get("cia"), []).append(item)
+    for itens in por_cia.values():
+        for c, i, v in heapq.nsmallest(k, itens):
+            escolhidos[i] = (c, i, v)
+    return list(escolhidos.values())
+
+
+def otimizar_itinerario(voos_ida: list, voos_volta: list, hoteis: list, cargo: str,
+                        k: int = 3, preferencias: dict | None = None, data_ida=None) -> list:
+    """
+    As k combinações (ida, volta, hotel) de menor custo dentro da política do cargo.
+    Custo = preço da ida + preço da volta + custo total do hotel + penalidades das
+    preferências suaves (ver PREFERENCIAS_PADRAO). Cada item devolvido traz "ida",
+    "volta", "hotel", "custo" (R$ efetivo) e "penalidade". Vale a política vigente em data_ida.
+    """
+    prefs = {**PREFERENCIAS_PADRAO, **(preferencias or {})}
+    if k <= 0:
+        return []
+    politica = politica_vigente(data_ida)
+    ida = _candidatos_trecho(voos_ida, cargo, k, prefs["janela_ida"], prefs["penalidade_janela"], politica)
+    volta = _candidatos_trecho(voos_volta, cargo, k, prefs["janela_volta"], prefs["penalidade_janela"], politica)
+    hoteis_ok = heapq.nsmallest(k, ((h["custo_total"], i, h) for i, h in enumerate(hoteis)
+                                    if dentro_da_politica_hotel(h, cargo, politica)))
+    if not ida or not volta or not hoteis_ok:
+        return []
+
+    # k melhores pares ida/volta (a penalidade de companhia acopla os dois trechos)
+    pares = heapq.nsmallest(k, (
+        (ci + cv + (prefs["penalidade_cia"] if prefs["mesma_cia"] and vi.get("cia") != vv.get("cia") else 0),
+         ii, iv, vi, vv)
+        for ci, ii, vi in ida for cv, iv, vv in volta), key=lambda p: (p[0], p[1], p[2]))
+
+    # k menores somas par + hotel: varredura com heap sobre as duas listas já ordenadas
+    desempate = count()
+    heap = [(pares[0][0] + hoteis_ok[0][0], next(desempate), 0, 0)]
+    vistos = {(0, 0)}
+    combinacoes = []
+    while heap and len(combinacoes) < k:
+        custo, _, ip, ih = heapq.heappop(heap)
+        custo_par, _, _, vi, vv = pares[ip]
+        hotel = hoteis_ok[ih][2]
+        preco_base = vi["preco"] + vv["preco"] + hotel["custo_total"]
+        combinacoes.append({"ida": vi, "volta": vv, "hotel": hotel,
+                            "custo": custo, "penalidade": custo - preco_base})
+        for jp, jh in ((ip + 1, ih), (ip, ih + 1)):
+            if jp < len(pares) and jh < len(hoteis_ok) and (jp, jh) not in vistos:
+                vistos.add((jp, jh))
+                heapq.heappush(heap, (pares[jp][0] + hoteis_ok[jh][0], next(desempate), jp, jh))
+    return combinacoes
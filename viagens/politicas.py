@@ -0,0 +1,317 @@
+# politicas.py - Políticas internas, cálculos e classificação (escalar e em lote)
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# Políticas internas parametrizadas
+# ---------------------------------------------------------
+POLITICAS = {
+    "limite_trecho_aereo": {
+        "Diretor": 2500,
+        "Superintendente": 2000,
+        "Gerente": 1800,
+        "Coordenador": 1500,
+        "Analista": 1200,
+        "Outros": 1000,
+    },
+    "limite_diaria_hotel": {
+        "Diretor": 900,
+        "Superintendente": 750,
+        "Gerente": 650,
+        "Coordenador": 550,
+        "Analista": 450,
+        "Outros": 350,
+    },
+    "categorias_permitidas_por_cargo": {
+        "Diretor": ["Luxo", "Executivo", "Padrão"],
+        "Superintendente": ["Executivo", "Padrão"],
+        "Gerente": ["Executivo", "Padrão"],
+        "Coordenador": ["Padrão"],
+        "Analista": ["Padrão"],
+        "Outros": ["Padrão"],
+    },
+    "antecedencia_minima_dias": 10,
+}
+
+# Ajuda de custo por hierarquia (valor base por dia)
+AJUDA_CUSTO_HIERARQUIA = {
+    "Diretor": 500,
+    "Superintendente": 400,
+    "Gerente": 300,
+    "Coordenador": 200,
+    "Analista": 150,
+    "Outros": 100,
+}
+
+# Multiplicador da ajuda de custo por duração: (até N dias, multiplicador), em ordem;
+# acima da última faixa vale MULTIPLICADOR_ACIMA
+FAIXAS_MULTIPLICADOR = [(1, 1.0), (3, 1.1), (5, 1.2)]
+MULTIPLICADOR_ACIMA = 1.3
+
+def multiplicador_ajuda(dias: int, politica=None) -> float:
+    """Multiplicador da ajuda de custo conforme duração da viagem."""
+    return (politica or politica_vigente()).multiplicador(dias)
+
+STATUS_DENTRO = "Dentro da política ✅"
+STATUS_FORA = "Fora da política ⚠️"
+
+# Bits da máscara de alertas (classificação em lote)
+ALERTA_ANTECEDENCIA = 1
+ALERTA_VOO_IDA = 2
+ALERTA_VOO_VOLTA = 4
+ALERTA_HOTEL = 8
+
+# Modelos das mensagens; o prazo vem da versão de política (PoliticasCompiladas.mensagens_alerta)
+MENSAGENS_ALERTA = {
+    ALERTA_ANTECEDENCIA: "Solicitação com menos de {antecedencia_minima} dias de antecedência. Risco de tarifas altas.",
+    ALERTA_VOO_IDA: "Voo de ida acima do limite por trecho.",
+    ALERTA_VOO_VOLTA: "Voo de volta acima do limite por trecho.",
+    ALERTA_HOTEL: "Hotel fora da política (categoria/diária).",
+}
+
+# =========================================================
+# Funções de política e classificação
+# =========================================================
+# As funções aceitam a data da viagem (data_ida): valem os limites da versão de
+# política vigente nessa data (ver politica_vigente). Sem data, vale a atual.
+def dentro_da_politica_voo(opcao_voo: dict, cargo: str, politica=None) -> bool:
+    """Checa se o preço do voo está dentro do limite por trecho para o cargo."""
+    pol = (politica or politica_vigente()).politicas
+    return opcao_voo["preco"] <= pol["limite_trecho_aereo"][cargo]
+
+def dentro_da_politica_hotel(opcao_hotel: dict, cargo: str, politica=None) -> bool:
+    """Checa se a diária e categoria do hotel estão dentro da política."""
+    pol = (politica or politica_vigente()).politicas
+    limite = pol["limite_diaria_hotel"][cargo]
+    cat_ok = opcao_hotel["categoria"] in pol["categorias_permitidas_por_cargo"][cargo]
+    return (opcao_hotel["diaria"] <= limite) and cat_ok
+
+def calcular_ajuda_custo(cargo: str, dias_viagem: int, data_ida=None) -> int:
+    """Calcula ajuda de custo por hierarquia e multiplicador por dias."""
+    pc = politica_vigente(data_ida)
+    base = pc.ajuda[cargo]
+    mult = pc.multiplicador(dias_viagem)
+    return int(base * dias_viagem * mult)
+
+def classificar_solicitacao(antecedencia: int, voo_ida: dict, voo_volta: dict, hotel: dict, cargo: str,
+                            data_ida=None, historico=None):
+    """
+    Classifica solicitação como dentro/fora da política e gera alertas.
+    historico (viagens.historico_tarifas.HistoricoTarifas): o alerta de antecedência
+    ganha a posição das tarifas cotadas nos percentis históricos da rota.
+    """
+    pc = politica_vigente(data_ida)
+    alertas = []
+    status = STATUS_DENTRO
+    if antecedencia < pc.antecedencia_minima:
+        status = STATUS_FORA
+        alertas.append(pc.mensagens_alerta[ALERTA_ANTECEDENCIA])
+        if historico is not None:
+            alertas.extend(historico.alertas_antecedencia(voo_ida, voo_volta, antecedencia, pc.antecedencia_minima))
+    if not dentro_da_politica_voo(voo_ida, cargo, pc):
+        status = STATUS_FORA
+        alertas.append(pc.mensagens_alerta[ALERTA_VOO_IDA])
+    if not dentro_da_politica_voo(voo_volta, cargo, pc):
+        status = STATUS_FORA
+        alertas.append(pc.mensagens_alerta[ALERTA_VOO_VOLTA])
+    if not dentro_da_politica_hotel(hotel, cargo, pc):
+        status = STATUS_FORA
+        alertas.append(pc.mensagens_alerta[ALERTA_HOTEL])
+    return status, alertas
+
+def sugerir_reducao_custos(voos_ida: list, voos_volta: list, hoteis: list, cargo: str, data_ida=None):
+    """Sugere alternativas mais baratas dentro da política."""
+    pc = politica_vigente(data_ida)
+    alternativas = {"ida": None, "volta": None, "hotel": None}
+    ida_filtrado = [v for v in voos_ida if dentro_da_politica_voo(v, cargo, pc)]
+    volta_filtrado = [v for v in voos_volta if dentro_da_politica_voo(v, cargo, pc)]
+    hoteis_filtrado = [h for h in hoteis if dentro_da_politica_hotel(h, cargo, pc)]
+    # min() em vez de sorted()[0]: O(n) e mesmo desempate (primeiro mais barato)
+    if ida_filtrado:
+        alternativas["ida"] = min(ida_filtrado, key=lambda x: x["preco"])
+    if volta_filtrado:
+        alternativas["volta"] = min(volta_filtrado, key=lambda x: x["preco"])
+    if hoteis_filtrado:
+        alternativas["hotel"] = min(hoteis_filtrado, key=lambda x: x["diaria"])
+    return alternativas
+
+# =========================================================
+# Classificação em lote (vetorizada)
+# =========================================================
+class PoliticasCompiladas:
+    """
+    Uma versão de política convertida em estruturas de consulta rápida: arrays
+    NumPy indexados pelo código do cargo (lote), os dicts originais (escalar) e
+    as faixas do multiplicador da ajuda de custo como pontos de corte (bisect).
+    """
+
+    def __init__(self, politicas: dict, ajuda: dict | None = None, faixas: list | None = None,
+                 acima: float = MULTIPLICADOR_ACIMA, versao: int = 0, vigente_desde: str | None = None):
+        self.politicas = politicas
+        self.ajuda = ajuda or AJUDA_CUSTO_HIERARQUIA
+        self.versao = versao
+        self.vigente_desde = vigente_desde
+        faixas = sorted(faixas or FAIXAS_MULTIPLICADOR)
+        self.cortes_dias = [dias for dias, _ in faixas]
+        self.multiplicadores = [mult for _, mult in faixas] + [acima]
+        self._multiplicadores_array = np.array(self.multiplicadores, dtype=np.float64)
+        self.cargos = list(politicas["limite_trecho_aereo"].keys())
+        self._indice_cargos = pd.Index(self.cargos)
+        categorias = sorted({c for cats in politicas["categorias_permitidas_por_cargo"].values() for c in cats})
+        self.categorias = categorias
+        self._indice_categorias = pd.Index(categorias)
+        self.limite_trecho = np.array(
+            [politicas["limite_trecho_aereo"][c] for c in self.cargos], dtype=np.float64)
+        self.limite_diaria = np.array(
+            [politicas["limite_diaria_hotel"][c] for c in self.cargos], dtype=np.float64)
+        # Matriz cargo x categoria; a última coluna representa categoria desconhecida (nunca permitida)
+        self.categoria_permitida = np.zeros((len(self.cargos), len(categorias) + 1), dtype=bool)
+        for i, cargo in enumerate(self.cargos):
+            for cat in politicas["categorias_permitidas_por_cargo"][cargo]:
+                self.categoria_permitida[i, categorias.index(cat)] = True
+        self.antecedencia_minima = politicas["antecedencia_minima_dias"]
+        self.mensagens_alerta = {bit: msg.format(antecedencia_minima=self.antecedencia_minima)
+                                 for bit, msg in MENSAGENS_ALERTA.items()}
+        self.ajuda_base = np.array([self.ajuda[c] for c in self.cargos], dtype=np.float64)
+
+    def multiplicador(self, dias: int) -> float:
+        """Primeira faixa com limite >= dias (bisect nos pontos de corte)."""
+        return self.multiplicadores[bisect_left(self.cortes_dias, dias)]
+
+    def multiplicadores_array(self, dias) -> np.ndarray:
+        return self._multiplicadores_array[np.searchsorted(self.cortes_dias, dias, side="left")]
+
+    def ajuda_custo_array(self, cargos, dias) -> np.ndarray:
+        """Equivalente vetorizado de calcular_ajuda_custo para esta versão."""
+        dias = np.asarray(dias)
+        return (self.ajuda_base[self.codigos_cargo(cargos)] * dias * self.multiplicadores_array(dias)).astype(np.int64)
+
+    def codigos_cargo(self, cargos) -> np.ndarray:
+        codigos = self._indice_cargos.get_indexer(cargos)  # -1: fora da política
+        if (codigos < 0).any():
+            invalidos = sorted(set(np.asarray(cargos, dtype=object)[codigos < 0]))
+            raise KeyError(f"Cargo(s) sem política: {invalidos}")
+        return codigos
+
+    def codigos_categoria(self, categorias) -> np.ndarray:
+        codigos = self._indice_categorias.get_indexer(categorias)
+        # Categoria desconhecida (-1) aponta para a coluna extra, sempre False
+        return np.where(codigos < 0, len(self.categorias), codigos)
+
+
+_compiladas = None
+_catalogo = None
+
+def politicas_compiladas() -> PoliticasCompiladas:
+    """Compila POLITICAS uma única vez por processo."""
+    global _compiladas
+    if _compiladas is None:
+        _compiladas = PoliticasCompiladas(POLITICAS)
+    return _compiladas
+
+def configurar_catalogo(catalogo):
+    """
+    Passa a usar as versões de um catalogo (ex.: politicas_versionadas.CatalogoPoliticas)
+    em vez das constantes deste módulo. None volta às constantes.
+    """
+    global _catalogo
+    _catalogo = catalogo
+
+def politica_vigente(data=None) -> PoliticasCompiladas:
+    """Versão compilada vigente na data (date ou 'AAAA-MM-DD'; None = hoje)."""
+    if _catalogo is None:
+        return politicas_compiladas()
+    return _catalogo.vigente(data)
+
+def agrupar_por_vigencia(datas):
+    """
+    Para cálculos em lote: pares (versão compilada, máscara das linhas em que ela
+    vale) cobrindo todas as datas. Sem catálogo, uma única versão para tudo.
+    """
+    if _catalogo is None:
+        return [(politicas_compiladas(), np.ones(len(datas), dtype=bool))]
+    return _catalogo.agrupar(datas)
+
+def classificar_arrays(antecedencia, cargo, preco_ida, preco_volta, diaria_hotel, categoria_hotel,
+                       politicas: PoliticasCompiladas | None = None):
+    """
+    Versão vetorizada de classificar_solicitacao.
+    Recebe arrays (ou Series) alinhados e devolve (status, mascara_alertas),
+    onde mascara_alertas combina os bits ALERTA_*. Preços ausentes (NaN)
+    contam como fora da política. Sem politicas, vale a versão vigente hoje.
+    """
+    pc = politicas or politica_vigente()
+    idx = pc.codigos_cargo(cargo)
+    mascara = np.zeros(len(idx), dtype=np.uint8)
+    mascara |= np.where(np.asarray(antecedencia) < pc.antecedencia_minima, ALERTA_ANTECEDENCIA, 0).astype(np.uint8)
+    limite = pc.limite_trecho[idx]
+    mascara |= np.where(~(np.asarray(preco_ida, dtype=np.float64) <= limite), ALERTA_VOO_IDA, 0).astype(np.uint8)
+    mascara |= np.where(~(np.asarray(preco_volta, dtype=np.float64) <= limite), ALERTA_VOO_VOLTA, 0).astype(np.uint8)
+    hotel_ok = (np.asarray(diaria_hotel, dtype=np.float64) <= pc.limite_diaria[idx]) \
+        & pc.categoria_permitida[idx, pc.codigos_categoria(categoria_hotel)]
+    mascara |= np.where(~hotel_ok, ALERTA_HOTEL, 0).astype(np.uint8)
+    status = np.where(mascara == 0, STATUS_DENTRO, STATUS_FORA).astype(object)
+    return status, mascara
+
+def classificar_lote(df: pd.DataFrame, politicas: PoliticasCompiladas | None = None) -> pd.DataFrame:
+    """
+    Classifica um DataFrame inteiro de solicitações de uma vez.
+    Aceita colunas achatadas (preco_ida, preco_volta, hotel_diaria, hotel_categoria)
+    ou os dicts aninhados dos registros (voo_ida, voo_volta, hotel). A antecedência
+    vem da coluna "antecedencia" ou é derivada de data_ida - criado_em. Sem
+    politicas explícitas, cada linha usa a versão vigente na sua data_ida.
+    Devolve DataFrame com "status" e "alertas_mask" no mesmo índice.
+    """
+    if "preco_ida" in df:
+        preco_ida, preco_volta = df["preco_ida"], df["preco_volta"]
+    else:
+        preco_ida = df["voo_ida"].map(lambda v: v.get("preco"))
+        preco_volta = df["voo_volta"].map(lambda v: v.get("preco"))
+    if "hotel_diaria" in df:
+        diaria, categoria = df["hotel_diaria"], df["hotel_categoria"]
+    else:
+        diaria = df["hotel"].map(lambda h: h["diaria"])
+        categoria = df["hotel"].map(lambda h: h["categoria"])
+    if "antecedencia" in df:
+        antecedencia = df["antecedencia"]
+    else:
+        antecedencia = (pd.to_datetime(df["data_ida"]).dt.normalize()
+                        - pd.to_datetime(df["criado_em"]).dt.normalize()).dt.days
+    arrays = (antecedencia.to_numpy(), df["cargo"].to_numpy(),
+              pd.to_numeric(preco_ida, errors="coerce").to_numpy(dtype=np.float64),
+              pd.to_numeric(preco_volta, errors="coerce").to_numpy(dtype=np.float64),
+              pd.to_numeric(diaria, errors="coerce").to_numpy(dtype=np.float64),
+              categoria.to_numpy())
+    if politicas is not None or "data_ida" not in df:
+        status, mascara = classificar_arrays(*arrays, politicas)
+    else:
+        # Cada linha pela versão vigente na sua data de ida
+        status = np.empty(len(df), dtype=object)
+        mascara = np.zeros(len(df), dtype=np.uint8)
+        for pc, linhas in agrupar_por_vigencia(df["data_ida"].to_numpy()):
+            status[linhas], mascara[linhas] = classificar_arrays(*(a[linhas] for a in arrays), pc)
+    return pd.DataFrame({"status": status, "alertas_mask": mascara}, index=df.index)
+
+def alertas_da_mascara(mascara: int, politicas: PoliticasCompiladas | None = None) -> list:
+    """Traduz a máscara de bits para as mensagens de alerta da versão (sem ela, a vigente hoje), na ordem do escalar."""
+    mensagens = (politicas or politica_vigente()).mensagens_alerta
+    return [msg for bit, msg in mensagens.items() if int(mascara) & bit]
+
+_BIT_DA_MENSAGEM = {msg: bit for bit, msg in MENSAGENS_ALERTA.items() if "{" not in msg}
+_PREFIXO_ANTECEDENCIA, _, _SUFIXO_ANTECEDENCIA = MENSAGENS_ALERTA[ALERTA_ANTECEDENCIA].partition(
+    "{antecedencia_minima}")
+
+def bit_do_alerta(mensagem: str) -> int:
+    """
+    Inverso de alertas_da_mascara para uma mensagem: o bit ALERTA_* (0 se não for
+    um alerta de política). Reconhece o alerta de antecedência de qualquer versão.
+    """
+    bit = _BIT_DA_MENSAGEM.get(mensagem)
+    if bit is not None:
+        return bit
+    prazo = mensagem[len(_PREFIXO_ANTECEDENCIA):len(mensagem) - len(_SUFIXO_ANTECEDENCIA)]
+    if mensagem.startswith(_PREFIXO_ANTECEDENCIA) and mensagem.endswith(_SUFIXO_ANTECEDENCIA) and prazo.isdigit():
+        return ALERTA_ANTECEDENCIA
+    return 0
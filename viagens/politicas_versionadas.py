@@ -0,0 +1,203 @@
+# politicas_versionadas.py - Versões de política com data de vigência (SQLite), compiladas e recarregadas a quente
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from viagens.politicas import (
+    AJUDA_CUSTO_HIERARQUIA, FAIXAS_MULTIPLICADOR, MULTIPLICADOR_ACIMA, POLITICAS, PoliticasCompiladas,
+)
+
+ESQUEMA_POLITICAS = """
+CREATE TABLE IF NOT EXISTS politicas (
+    versao INTEGER PRIMARY KEY AUTOINCREMENT,
+    vigente_desde TEXT NOT NULL,
+    dados TEXT NOT NULL,
+    criado_em TEXT NOT NULL
+);
+"""
+
+# A versão inicial (as constantes de viagens/politicas.py) vale desde esta data
+VIGENCIA_INICIAL = "2000-01-01"
+# Intervalo mínimo entre consultas ao banco em busca de versões novas
+INTERVALO_RECARGA_S = 2.0
+
+
+def _dia(data) -> int:
+    """Dias desde 1970-01-01 (mesma escala de datetime64[D])."""
+    if data is None:
+        data = date.today()
+    elif isinstance(data, str):
+        data = date.fromisoformat(data[:10])
+    elif isinstance(data, datetime):
+        data = data.date()
+    return (data - date(1970, 1, 1)).days
+
+
+def _validar_faixas(faixas: list, acima) -> list:
+    """Faixas do multiplicador como [[dias, multiplicador], ...]; ValueError se inválidas."""
+    try:
+        faixas = [[int(dias), float(mult)] for dias, mult in faixas]
+        acima = float(acima)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Faixas do multiplicador inválidas (use pares [dias, multiplicador]): {e}") from e
+    if not faixas:
+        raise ValueError("Informe ao menos uma faixa do multiplicador.")
+    dias = [d for d, _ in faixas]
+    if min(dias) < 1 or len(set(dias)) != len(dias):
+        raise ValueError(f"Dias das faixas devem ser positivos e distintos: {dias}")
+    if min(m for _, m in faixas) <= 0 or acima <= 0:
+        raise ValueError("Multiplicadores devem ser positivos.")
+    return sorted(faixas)
+
+
+class CatalogoPoliticas:
+    """
+    Versões de política guardadas na tabela `politicas`, cada uma vigente a partir
+    de uma data (a mais recente publicada vence se duas começarem no mesmo dia).
+
+    Cada versão é compilada uma vez (PoliticasCompiladas) e uma tabela dia -> versão
+    cobre o intervalo entre a primeira e a última vigência, então achar a versão de
+    uma data é um acesso a array, O(1). Versões publicadas por outro processo ou
+    réplica são carregadas na primeira consulta após INTERVALO_RECARGA_S.
+    """
+
+    def __init__(self, caminho: str, intervalo_recarga_s: float = INTERVALO_RECARGA_S):
+        self.caminho = caminho
+        self.intervalo_recarga_s = intervalo_recarga_s
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        con = self._conexao()
+        con.executescript(ESQUEMA_POLITICAS)
+        if con.execute("SELECT COUNT(*) FROM politicas").fetchone()[0] == 0:
+            self.publicar(VIGENCIA_INICIAL, POLITICAS, AJUDA_CUSTO_HIERARQUIA, FAIXAS_MULTIPLICADOR, MULTIPLICADOR_ACIMA)
+        self._ultima_versao = None
+        self._proxima_verificacao = 0.0
+        with self._trava:
+            self._recarregar()
+
+    def _conexao(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            self._local.con = con
+        return con
+
+    # -----------------------------------------------------
+    # Escrita
+    # -----------------------------------------------------
+    def publicar(self, vigente_desde, politicas: dict, ajuda: dict | None = None,
+                 faixas: list | None = None, acima: float | None = None) -> int:
+        """
+        Grava uma nova versão vigente a partir de vigente_desde (date ou 'AAAA-MM-DD').
+        Campos omitidos são herdados da versão em vigor em vigente_desde (versao_em),
+        não da de hoje. Versão inválida: ValueError (ou KeyError, campo ausente).
+        """
+        anterior = self.versao_em(vigente_desde) or {}
+        if acima is None:
+            acima = anterior.get("multiplicador_acima", MULTIPLICADOR_ACIMA)
+        faixas = _validar_faixas(faixas or anterior.get("faixas_multiplicador", FAIXAS_MULTIPLICADOR), acima)
+        dados = {
+            "politicas": politicas,
+            "ajuda_custo_hierarquia": ajuda or anterior.get("ajuda_custo_hierarquia", AJUDA_CUSTO_HIERARQUIA),
+            "faixas_multiplicador": faixas,
+            "multiplicador_acima": float(acima),
+        }
+        # Valida antes de gravar: a versão precisa compilar
+        PoliticasCompiladas(politicas, dados["ajuda_custo_hierarquia"], [tuple(f) for f in faixas],
+                            dados["multiplicador_acima"])
+        con = self._conexao()
+        with con:
+            cur = con.execute("INSERT INTO politicas (vigente_desde, dados, criado_em) VALUES (?, ?, ?)",
+                              (str(vigente_desde)[:10], json.dumps(dados, ensure_ascii=False),
+                               datetime.now().isoformat(timespec="seconds")))
+        self._proxima_verificacao = 0.0  # a próxima consulta já enxerga a versão nova
+        return cur.lastrowid
+
+    def versao_em(self, data) -> dict | None:
+        """
+        Dados (como gravados) da versão em vigor na data, lidos do banco (inclui as
+        publicadas por outros processos ainda não recarregadas); None se nenhuma
+        versão começa até a data.
+        """
+        linha = self._conexao().execute(
+            "SELECT dados FROM politicas WHERE vigente_desde <= ? ORDER BY vigente_desde DESC, versao DESC LIMIT 1",
+            (str(data)[:10],)).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    # -----------------------------------------------------
+    # Compilação e recarga
+    # -----------------------------------------------------
+    def _recarregar(self):
+        """
+        Relê e compila todas as versões. Chamado com self._trava: a troca é uma única
+        atribuição (versões, base, tabela), e as consultas leem sempre um trio coerente.
+        """
+        linhas = self._conexao().execute(
+            "SELECT versao, vigente_desde, dados FROM politicas ORDER BY vigente_desde, versao").fetchall()
+        versoes, inicios = [], []
+        for versao, vigente_desde, dados in linhas:
+            d = json.loads(dados)
+            pc = PoliticasCompiladas(d["politicas"], d["ajuda_custo_hierarquia"],
+                                     [tuple(f) for f in d["faixas_multiplicador"]], d["multiplicador_acima"],
+                                     versao=versao, vigente_desde=vigente_desde)
+            inicio = _dia(vigente_desde)
+            if inicios and inicios[-1] == inicio:
+                versoes[-1] = pc  # mesma data de vigência: vale a publicada por último
+            else:
+                versoes.append(pc)
+                inicios.append(inicio)
+        # Tabela dia -> índice da versão, do primeiro ao último início de vigência
+        base = inicios[0]
+        dias = np.arange(base, inicios[-1] + 1)
+        tabela = (np.searchsorted(inicios, dias, side="right") - 1).astype(np.int32)
+        self._indice = (versoes, base, tabela)
+        self._ultima_versao = max(l[0] for l in linhas)
+
+    def _verificar_recarga(self):
+        agora = time.monotonic()
+        if agora < self._proxima_verificacao:
+            return
+        with self._trava:
+            if agora < self._proxima_verificacao:
+                return
+            ultima = self._conexao().execute("SELECT MAX(versao) FROM politicas").fetchone()[0]
+            if ultima != self._ultima_versao:
+                self._recarregar()
+            self._proxima_verificacao = agora + self.intervalo_recarga_s
+
+    # -----------------------------------------------------
+    # Consulta
+    # -----------------------------------------------------
+    def vigente(self, data=None) -> PoliticasCompiladas:
+        """Versão vigente na data (date, datetime ou 'AAAA-MM-DD'; None = hoje)."""
+        self._verificar_recarga()
+        versoes, base, tabela = self._indice
+        return versoes[tabela[min(max(_dia(data) - base, 0), len(tabela) - 1)]]
+
+    def indices_vigentes(self, datas) -> np.ndarray:
+        """Versão vigente (índice em versoes()) para cada data de um array."""
+        self._verificar_recarga()
+        return self._indices(self._indice, datas)
+
+    @staticmethod
+    def _indices(indice: tuple, datas) -> np.ndarray:
+        _, base, tabela = indice
+        dias = np.asarray(datas, dtype="datetime64[D]").astype(np.int64)
+        return tabela[np.clip(dias - base, 0, len(tabela) - 1)]
+
+    def agrupar(self, datas) -> list:
+        """Pares (versão compilada, máscara das linhas) para cálculos em lote."""
+        self._verificar_recarga()
+        indice = self._indice  # o mesmo trio para os índices e as versões
+        indices = self._indices(indice, datas)
+        return [(indice[0][i], indices == i) for i in np.unique(indices)]
+
+    def versoes(self) -> list:
+        """Versões em vigor em algum período, em ordem de vigência."""
+        self._verificar_recarga()
+        return list(self._indice[0])
@@ -0,0 +1,193 @@
+# rollups.py - Agregados incrementais do dashboard (dia x área x cargo x aprovação x status)
+import pandas as pd
+
+from viagens.metricas import cronometrado
+from viagens.politicas import STATUS_FORA
+
+APROVADO = "Aprovado ✅"
+
+ESQUEMA_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS rollup_diario (
+    dia TEXT NOT NULL,
+    area TEXT NOT NULL,
+    cargo TEXT NOT NULL,
+    aprovacao TEXT NOT NULL,
+    status TEXT NOT NULL,
+    qtd INTEGER NOT NULL DEFAULT 0,
+    soma_voos REAL NOT NULL DEFAULT 0,
+    soma_hotel REAL NOT NULL DEFAULT 0,
+    soma_total REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, area, cargo, aprovacao, status)
+);
+CREATE TABLE IF NOT EXISTS rollup_trechos (
+    dia TEXT NOT NULL,
+    area TEXT NOT NULL,
+    cargo TEXT NOT NULL,
+    aprovacao TEXT NOT NULL,
+    status TEXT NOT NULL,
+    trecho TEXT NOT NULL,
+    papel TEXT NOT NULL,  -- 'ida' ou 'volta'
+    qtd INTEGER NOT NULL DEFAULT 0,
+    soma_voos REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, area, cargo, aprovacao, status, trecho, papel)
+);
+"""
+
+
+def _chave(registro: dict) -> tuple:
+    return (registro["data_ida"], registro["area"], registro["cargo"],
+            registro.get("aprovacao", "Pendente"), registro["status"])
+
+
+def aplicar_registro(con, registro: dict, sinal: int = 1):
+    """
+    Soma (sinal=1) ou retira (sinal=-1) a contribuição de uma solicitação dos
+    agregados. Deve rodar na mesma transação que grava a solicitação.
+    """
+    chave = _chave(registro)
+    custo_voos = registro.get("custo_voos") or 0
+    con.execute(
+        "INSERT INTO rollup_diario (dia, area, cargo, aprovacao, status, qtd, soma_voos, soma_hotel, soma_total) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (dia, area, cargo, aprovacao, status) DO UPDATE SET "
+        "qtd = qtd + excluded.qtd, soma_voos = soma_voos + excluded.soma_voos, "
+        "soma_hotel = soma_hotel + excluded.soma_hotel, soma_total = soma_total + excluded.soma_total",
+        (*chave, sinal, sinal * custo_voos, sinal * (registro.get("custo_hotel") or 0),
+         sinal * (registro.get("total_previsto") or 0)),
+    )
+    for papel in ("ida", "volta"):
+        con.execute(
+            "INSERT INTO rollup_trechos (dia, area, cargo, aprovacao, status, trecho, papel, qtd, soma_voos) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (dia, area, cargo, aprovacao, status, trecho, papel) DO UPDATE SET "
+            "qtd = qtd + excluded.qtd, soma_voos = soma_voos + excluded.soma_voos",
+            (*chave, registro[f"trecho_{papel}"], papel, sinal, sinal * custo_voos),
+        )
+    if sinal < 0:
+        # Remove combinações que zeraram (pela chave primária, sem varrer a tabela)
+        con.execute("DELETE FROM rollup_diario WHERE dia = ? AND area = ? AND cargo = ? AND aprovacao = ? "
+                    "AND status = ? AND qtd <= 0", chave)
+        for papel in ("ida", "volta"):
+            con.execute("DELETE FROM rollup_trechos WHERE dia = ? AND area = ? AND cargo = ? AND aprovacao = ? "
+                        "AND status = ? AND trecho = ? AND papel = ? AND qtd <= 0",
+                        (*chave, registro[f"trecho_{papel}"], papel))
+
+
+def aplicar_lote(con, registros):
+    """
+    Soma vários registros novos aos agregados com um upsert por combinação
+    (e não por registro): os totais são acumulados em memória antes.
+    """
+    diario, trechos = {}, {}
+    for registro in registros:
+        chave = _chave(registro)
+        custo_voos = registro.get("custo_voos") or 0
+        acc = diario.setdefault(chave, [0, 0, 0, 0])
+        acc[0] += 1
+        acc[1] += custo_voos
+        acc[2] += registro.get("custo_hotel") or 0
+        acc[3] += registro.get("total_previsto") or 0
+        for papel in ("ida", "volta"):
+            acc = trechos.setdefault((*chave, registro[f"trecho_{papel}"], papel), [0, 0])
+            acc[0] += 1
+            acc[1] += custo_voos
+    con.executemany(
+        "INSERT INTO rollup_diario (dia, area, cargo, aprovacao, status, qtd, soma_voos, soma_hotel, soma_total) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (dia, area, cargo, aprovacao, status) DO UPDATE SET "
+        "qtd = qtd + excluded.qtd, soma_voos = soma_voos + excluded.soma_voos, "
+        "soma_hotel = soma_hotel + excluded.soma_hotel, soma_total = soma_total + excluded.soma_total",
+        [(*k, *v) for k, v in diario.items()])
+    con.executemany(
+        "INSERT INTO rollup_trechos (dia, area, cargo, aprovacao, status, trecho, papel, qtd, soma_voos) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (dia, area, cargo, aprovacao, status, trecho, papel) DO UPDATE SET "
+        "qtd = qtd + excluded.qtd, soma_voos = soma_voos + excluded.soma_voos",
+        [(*k, *v) for k, v in trechos.items()])
+
+
+def reconstruir(con, registros):
+    """Refaz os agregados do zero a partir de todas as solicitações."""
+    con.execute("DELETE FROM rollup_diario")
+    con.execute("DELETE FROM rollup_trechos")
+    for registro in registros:
+        aplicar_registro(con, registro)
+
+
+class ConsultaRollups:
+    """
+    Consultas do dashboard sobre os agregados, já filtrados por período (data_ida)
+    e pelas seleções de área, cargo e aprovação. O custo é proporcional ao número
+    de combinações no período, não ao total de solicitações.
+    """
+
+    def __init__(self, con, data_ini, data_fim, areas=None, cargos=None, aprovacoes=None):
+        self.con = con
+        clausulas, params = ["dia >= ?", "dia <= ?"], [str(data_ini), str(data_fim)]
+        for coluna, valores in (("area", areas), ("cargo", cargos), ("aprovacao", aprovacoes)):
+            if valores is not None:
+                valores = list(valores)
+                clausulas.append(f"{coluna} IN ({', '.join('?' for _ in valores)})" if valores else "0")
+                params.extend(valores)
+        self._where = " WHERE " + " AND ".join(clausulas)
+        self._params = params
+
+    def _df(self, sql: str, params=()) -> pd.DataFrame:
+        cur = self.con.execute(sql, [*self._params, *params])
+        return pd.DataFrame(cur.fetchall(), columns=[c[0] for c in cur.description])
+
+    @cronometrado("dashboard.rollups.kpis")
+    def kpis(self) -> dict:
+        linha = self.con.execute(
+            "SELECT COALESCE(SUM(qtd), 0), "
+            "COALESCE(SUM(CASE WHEN aprovacao = ? THEN qtd END), 0), "
+            "COALESCE(SUM(CASE WHEN status = ? THEN qtd END), 0), "
+            "COALESCE(SUM(soma_total), 0) FROM rollup_diario" + self._where,
+            [APROVADO, STATUS_FORA, *self._params]).fetchone()
+        return {"total": linha[0], "aprovadas": linha[1], "fora_politica": linha[2], "gasto_previsto": linha[3]}
+
+    @cronometrado("dashboard.rollups.ticket_medio")
+    def ticket_medio(self, coluna: str) -> pd.DataFrame:
+        """Mesmo formato de dashboard.ticket_medio."""
+        if coluna not in ("area", "cargo"):
+            raise ValueError(f"Dimensão inválida: {coluna}")
+        df = self._df(
+            f"SELECT {coluna}, SUM(soma_voos) * 1.0 / SUM(qtd) AS custo_voos, "
+            f"SUM(soma_hotel) * 1.0 / SUM(qtd) AS custo_hotel, SUM(soma_total) * 1.0 / SUM(qtd) AS total_previsto "
+            f"FROM rollup_diario{self._where} GROUP BY {coluna} ORDER BY {coluna}")
+        return df.set_index(coluna).round(2)
+
+    @cronometrado("dashboard.rollups.violacoes_por")
+    def violacoes_por(self, coluna: str) -> pd.DataFrame:
+        """Mesmo formato de dashboard.violacoes_por."""
+        if coluna not in ("area", "cargo"):
+            raise ValueError(f"Dimensão inválida: {coluna}")
+        cur = self.con.execute(
+            f"SELECT {coluna}, COALESCE(SUM(CASE WHEN status = ? THEN qtd END), 0) AS violacoes "
+            f"FROM rollup_diario{self._where} GROUP BY {coluna} ORDER BY {coluna}",
+            [STATUS_FORA, *self._params])
+        return pd.DataFrame(cur.fetchall(), columns=[coluna, "violacoes"])
+
+    @cronometrado("dashboard.rollups.top_trechos")
+    def top_trechos(self, n: int = 5) -> pd.DataFrame:
+        return self._df(
+            f"SELECT trecho, SUM(qtd) AS solicitacoes FROM rollup_trechos{self._where} "
+            f"GROUP BY trecho ORDER BY solicitacoes DESC, trecho LIMIT ?", (n,))
+
+    @cronometrado("dashboard.rollups.trecho_mais_caro")
+    def trecho_mais_caro(self) -> pd.DataFrame:
+        """Média, por trecho, do custo médio de voos como ida e como volta; o maior."""
+        return self._df(
+            f"SELECT trecho, AVG(media) AS custo_medio_voos FROM ("
+            f"  SELECT trecho, papel, SUM(soma_voos) * 1.0 / SUM(qtd) AS media "
+            f"  FROM rollup_trechos{self._where} GROUP BY trecho, papel"
+            f") GROUP BY trecho ORDER BY custo_medio_voos DESC LIMIT 1")
+
+    def valores_distintos(self, coluna: str) -> list:
+        """Opções dos filtros: valores presentes no período (ignora os outros filtros)."""
+        if coluna not in ("area", "cargo", "aprovacao"):
+            raise ValueError(f"Dimensão inválida: {coluna}")
+        cur = self.con.execute(
+            f"SELECT DISTINCT {coluna} FROM rollup_diario WHERE dia >= ? AND dia <= ? ORDER BY {coluna}",
+            self._params[:2])
+        return [linha[0] for linha in cur]
@@ -0,0 +1,219 @@
+# servico.py - Cotação e classificação de solicitações sem Streamlit (biblioteca usada pelo app, pela CLI e pela API)
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
+
+from viagens import historico_tarifas
+from viagens.aeroportos import expandir, resolver_codigo
+from viagens.metricas import cronometrado
+from viagens.politicas import calcular_ajuda_custo, classificar_solicitacao, politica_vigente, sugerir_reducao_custos
+from viagens.simulacao import simula_hoteis, simula_voos
+
+FONTES = ("simulado", "indicative", "live")
+CAMPOS_OBRIGATORIOS = ("cargo", "origem", "destino", "data_ida", "data_volta")
+MAX_PARALELO_PADRAO = 8
+
+
+# =========================================================
+# Opções de voo e hotel
+# =========================================================
+# Simulações são determinísticas (semente derivada dos parâmetros): chamadas
+# repetidas reaproveitam o resultado. As listas devolvidas são compartilhadas e
+# não devem ser alteradas.
+@lru_cache(maxsize=256)
+def voos_simulados(origem: str, destino: str, data_ida: date, data_volta: date):
+    return simula_voos(origem, destino, data_ida, data_volta)
+
+
+@lru_cache(maxsize=256)
+def _hoteis_simulados(destino: str, dias_viagem: int, cargo: str, politica) -> list:
+    return simula_hoteis(destino, dias_viagem, cargo, politica=politica)
+
+
+def hoteis_simulados(destino: str, dias_viagem: int, cargo: str, data_ida=None) -> list:
+    """Hotéis simulados com o limite de diária da versão de política vigente em data_ida."""
+    return _hoteis_simulados(destino, dias_viagem, cargo, politica_vigente(data_ida))
+
+
+def _voos_simulados_regiao(origem: str, destino: str, data_ida: date, data_volta: date) -> tuple:
+    """Simulação por par de aeroportos das regiões (SAO -> GRU, CGH, VCP), do mais barato ao mais caro."""
+    pares = [(o, d) for o in expandir(origem) for d in expandir(destino) if o != d] or [(origem, destino)]
+    if len(pares) == 1:
+        return voos_simulados(*pares[0], data_ida, data_volta)
+    voos = [voos_simulados(o, d, data_ida, data_volta) for o, d in pares]
+    return tuple(sorted((v for ida_volta in voos for v in ida_volta[perna]), key=lambda v: v["preco"])
+                 for perna in (0, 1))
+
+
+def buscar_voos(fonte: str, origem: str, destino: str, data_ida: date, data_volta: date, adultos: int = 1,
+                ao_receber=None, aviso=None, url_base: str | None = None) -> tuple:
+    """
+    (voos_ida, voos_volta) da fonte; a integração Skyscanner só é importada quando
+    usada. origem e destino passam por viagens.aeroportos.resolver_codigo ("São
+    Paulo" -> SAO; ValueError se ambíguo), e uma região consulta todos os seus
+    aeroportos. url_base: ver viagens.skyscanner.url_base_voos. As cotações reais
+    vão para o histórico de tarifas configurado; as da fonte simulada e as de
+    buscas com falha (que podem trazer opções simuladas no lugar das reais), não.
+    """
+    origem, destino = resolver_codigo(origem), resolver_codigo(destino)
+    avisos = []
+
+    def avisar(msg):
+        avisos.append(msg)
+        if aviso:
+            aviso(msg)
+
+    if fonte == "simulado":
+        voos = _voos_simulados_regiao(origem, destino, data_ida, data_volta)
+    elif fonte == "indicative":
+        from viagens.skyscanner import buscar_voos_indicative
+        voos = buscar_voos_indicative(origem, destino, data_ida, data_volta, adultos=adultos, aviso=avisar,
+                                      url_base=url_base)
+    elif fonte == "live":
+        from viagens.skyscanner import buscar_voos_live
+        voos = buscar_voos_live(origem, destino, data_ida, data_volta, adultos=adultos,
+                                ao_receber=ao_receber, aviso=avisar, url_base=url_base)
+    else:
+        raise ValueError(f"Fonte inválida: {fonte} (use {', '.join(FONTES)})")
+    if fonte != "simulado" and not avisos:
+        historico_tarifas.registrar_busca(fonte, origem, destino, data_ida, data_volta, *voos)
+    return voos
+
+
+# =========================================================
+# Solicitação
+# =========================================================
+def montar_solicitacao(colaborador: str, area: str, cargo: str, origem: str, destino: str, data_ida: date,
+                       data_volta: date, motivo: str, voo_ida: dict, voo_volta: dict, hotel: dict,
+                       hoje: date | None = None) -> dict:
+    """
+    Registro no formato do repositório a partir das opções escolhidas: dias,
+    ajuda de custo, total previsto e status/alertas pela política vigente na ida
+    (com o histórico de tarifas configurado, o alerta de antecedência vem quantificado).
+    """
+    hoje = hoje or date.today()
+    dias_viagem = (data_volta - data_ida).days + 1
+    antecedencia = (data_ida - hoje).days
+    ajuda_custo = calcular_ajuda_custo(cargo, dias_viagem, data_ida)
+    custo_voos = (voo_ida.get("preco") or 0) + (voo_volta.get("preco") or 0)
+    status, alertas = classificar_solicitacao(antecedencia, voo_ida, voo_volta, hotel, cargo, data_ida,
+                                              historico=historico_tarifas.historico_configurado())
+    return {
+        "colaborador": colaborador,
+        "area": area,
+        "cargo": cargo,
+        "origem": origem,
+        "destino": destino,
+        "data_ida": str(data_ida),
+        "data_volta": str(data_volta),
+        "dias_viagem": dias_viagem,
+        "motivo": motivo,
+        "voo_ida": voo_ida,
+        "voo_volta": voo_volta,
+        "hotel": hotel,
+        "ajuda_custo": ajuda_custo,
+        "total_previsto": custo_voos + hotel["custo_total"] + ajuda_custo,
+        "status": status,
+        "alertas": alertas,
+        "aprovacao": "Pendente",
+        "comentario_gestor": "",
+        "criado_em": datetime.now().isoformat(timespec="seconds"),
+        # Campos auxiliares para análises
+        "custo_voos": custo_voos,
+        "custo_hotel": hotel["custo_total"],
+        "trecho_ida": voo_ida["trecho"],
+        "trecho_volta": voo_volta["trecho"],
+    }
+
+
+def _data(pedido: dict, campo: str) -> date:
+    valor = pedido[campo]
+    if isinstance(valor, date):
+        return valor
+    try:
+        return date.fromisoformat(str(valor))
+    except ValueError:
+        raise ValueError(f"{campo} inválida: {valor!r} (use AAAA-MM-DD)") from None
+
+
+def _escolher(opcoes: list, indice, nome: str) -> dict:
+    if not opcoes:
+        raise ValueError(f"Nenhuma opção de {nome} encontrada.")
+    if not isinstance(indice, int) or not 0 <= indice < len(opcoes):
+        raise ValueError(f"Índice de {nome} inválido: {indice!r} (0 a {len(opcoes) - 1})")
+    return opcoes[indice]
+
+
+@cronometrado("servico.cotar")
+def cotar(pedido: dict, fonte: str = "simulado", hoje: date | None = None) -> dict:
+    """
+    Cota e classifica uma solicitação. pedido: colaborador, area, cargo, origem,
+    destino (código IATA, cidade ou aeroporto: ver viagens.aeroportos), data_ida,
+    data_volta ('AAAA-MM-DD'), motivo, adultos e, opcionalmente,
+    escolha = {"ida": i, "volta": j, "hotel": k} (índices nas opções; padrão 0,
+    como no app). Devolve {"solicitacao": registro, "sugestoes": alternativas
+    mais baratas dentro da política, "tarifas": posição dos voos escolhidos no
+    histórico de tarifas ({"ida", "volta"}; None sem histórico), "avisos": falhas
+    das integrações}.
+    Pedido inválido: ValueError.
+    """
+    faltando = [c for c in CAMPOS_OBRIGATORIOS if not pedido.get(c)]
+    if faltando:
+        raise ValueError(f"Campos obrigatórios ausentes: {', '.join(faltando)}")
+    cargo = pedido["cargo"]
+    data_ida, data_volta = _data(pedido, "data_ida"), _data(pedido, "data_volta")
+    if data_volta < data_ida:
+        raise ValueError("data_volta anterior à data_ida.")
+    if cargo not in politica_vigente(data_ida).cargos:
+        raise ValueError(f"Cargo inválido: {cargo}")
+    origem, destino = resolver_codigo(str(pedido["origem"])), resolver_codigo(str(pedido["destino"]))
+
+    avisos = []
+    voos_ida, voos_volta = buscar_voos(fonte, origem, destino, data_ida, data_volta,
+                                       adultos=int(pedido.get("adultos", 1)), aviso=avisos.append)
+    hoteis = hoteis_simulados(destino, (data_volta - data_ida).days + 1, cargo, data_ida)
+    escolha = pedido.get("escolha") or {}
+    registro = montar_solicitacao(
+        pedido.get("colaborador", ""), pedido.get("area", ""), cargo, origem, destino, data_ida, data_volta,
+        pedido.get("motivo", ""),
+        _escolher(voos_ida, escolha.get("ida", 0), "voo de ida"),
+        _escolher(voos_volta, escolha.get("volta", 0), "voo de volta"),
+        _escolher(hoteis, escolha.get("hotel", 0), "hotel"),
+        hoje,
+    )
+    historico = historico_tarifas.historico_configurado()
+    return {"solicitacao": registro,
+            "sugestoes": sugerir_reducao_custos(voos_ida, voos_volta, hoteis, cargo, data_ida),
+            "tarifas": {papel: historico.comparar(registro[f"voo_{papel}"], hoje) if historico else None
+                        for papel in ("ida", "volta")},
+            "avisos": avisos}
+
+
+# =========================================================
+# Lotes
+# =========================================================
+@lru_cache(maxsize=None)
+def executor_cotacoes(max_paralelo: int = MAX_PARALELO_PADRAO) -> ThreadPoolExecutor:
+    """Pool de cotações por processo (as buscas na Skyscanner são dominadas por espera de rede)."""
+    return ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="cotacoes")
+
+
+def _cotar_ou_erro(pedido, fonte: str, hoje) -> dict:
+    try:
+        if not isinstance(pedido, dict):
+            raise ValueError("Cada solicitação deve ser um objeto JSON.")
+        return cotar(pedido, fonte, hoje)
+    except (ValueError, KeyError, TypeError) as e:
+        return {"erro": str(e)}
+
+
+def cotar_lote(pedidos, fonte: str = "simulado", max_paralelo: int = MAX_PARALELO_PADRAO,
+               hoje: date | None = None) -> list:
+    """
+    Cota uma lista de pedidos em paralelo, preservando a ordem. Um pedido inválido
+    não derruba o lote: sua posição recebe {"erro": mensagem}.
+    """
+    if fonte not in FONTES:
+        raise ValueError(f"Fonte inválida: {fonte} (use {', '.join(FONTES)})")
+    executor = executor_cotacoes(max_paralelo)
+    return list(executor.map(lambda p: _cotar_ou_erro(p, fonte, hoje), pedidos))
@@ -0,0 +1,292 @@
+# simulacao.py - Dados sintéticos determinísticos (voos, hotéis e solicitações)
+import zlib
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from viagens.politicas import (
+    AJUDA_CUSTO_HIERARQUIA, STATUS_DENTRO, STATUS_FORA, agrupar_por_vigencia, alertas_da_mascara,
+    classificar_arrays, politica_vigente,
+)
+
+SEMENTE_PADRAO = 42
+
+AEROPORTOS = ["GRU", "CGH", "VCP", "GIG", "SDU", "BSB", "CNF", "FOR", "SSA", "REC",
+              "POA", "CWB", "FLN", "MAO", "BEL"]
+CIAS = ["LATAM", "GOL", "Azul"]
+HORARIOS = ["06:05", "07:40", "09:15", "11:30", "13:50", "16:20", "18:45", "21:10"]
+AREAS = ["Operações", "Comercial", "TI", "Financeiro", "RH"]
+CARGOS = list(AJUDA_CUSTO_HIERARQUIA.keys())
+CATEGORIAS_HOTEL = ["Padrão", "Executivo", "Luxo"]
+NOMES_HOTEL = ["Ibis", "Mercure", "Novotel", "Blue Tree", "Nobile", "Intercity", "Radisson", "Tivoli"]
+
+# Distribuições por cargo (volume relativo, fator de preço e probabilidade de cada categoria de hotel)
+PESO_CARGO = np.array([0.03, 0.05, 0.12, 0.20, 0.45, 0.15])
+FATOR_PRECO_CARGO = np.array([1.35, 1.2, 1.1, 1.0, 0.95, 0.9])
+PROB_CATEGORIA_CARGO = np.array([
+    [0.15, 0.45, 0.40],  # Diretor
+    [0.30, 0.55, 0.15],  # Superintendente
+    [0.45, 0.45, 0.10],  # Gerente
+    [0.75, 0.22, 0.03],  # Coordenador
+    [0.85, 0.13, 0.02],  # Analista
+    [0.90, 0.09, 0.01],  # Outros
+])
+# Faixa de diária (média, desvio) por categoria
+DIARIA_CATEGORIA = {"Padrão": (330, 70), "Executivo": (560, 110), "Luxo": (950, 180)}
+
+
+def _semente(*partes) -> int:
+    """Semente estável (independe do hash aleatório de str do Python)."""
+    return zlib.crc32("|".join(str(p) for p in partes).encode("utf-8"))
+
+
+def preco_base_rota(origem: str, destino: str) -> float:
+    """Preço base do trecho (mesmo valor nos dois sentidos), entre R$ 380 e R$ 1.700."""
+    a, b = sorted((origem.strip().upper(), destino.strip().upper()))
+    return 380 + _semente(a, b) % 1320
+
+
+def _matriz_precos_base() -> np.ndarray:
+    n = len(AEROPORTOS)
+    matriz = np.empty((n, n))
+    for i, o in enumerate(AEROPORTOS):
+        for j, d in enumerate(AEROPORTOS):
+            matriz[i, j] = preco_base_rota(o, d)
+    return matriz
+
+
+# =========================================================
+# Modo interativo (usado pelo app e como fallback das APIs)
+# =========================================================
+def simula_voos(origem: str, destino: str, data_ida: date, data_volta: date,
+                n_opcoes: int = 4, semente: int = SEMENTE_PADRAO):
+    """
+    Gera opções de voo de ida e de volta no formato do app.
+    O resultado é determinístico para os mesmos parâmetros (reruns mostram as mesmas opções).
+    """
+    def trecho(o, d, data):
+        rng = np.random.default_rng(_semente(semente, o, d, data))
+        precos = preco_base_rota(o, d) * rng.lognormal(0.0, 0.25, n_opcoes)
+        cias = rng.choice(CIAS, n_opcoes)
+        horarios = np.sort(rng.choice(HORARIOS, n_opcoes, replace=False))
+        return [{
+            "trecho": f"{o} → {d}",
+            "data": str(data),
+            "partida": str(horarios[k]),
+            "cia": str(cias[k]),
+            "preco": int(np.clip(precos[k], 250, 4000)),
+        } for k in range(n_opcoes)]
+
+    return trecho(origem, destino, data_ida), trecho(destino, origem, data_volta)
+
+
+def simula_hoteis(destino: str, dias_viagem: int, cargo: str,
+                  n_opcoes: int = 5, semente: int = SEMENTE_PADRAO, politica=None):
+    """
+    Gera opções de hospedagem no destino. A primeira é sempre um hotel conveniado
+    Padrão dentro do limite de diária do cargo na versão de política dada (a da
+    data da viagem; sem ela, a vigente hoje); as demais seguem a distribuição de
+    categorias.
+    """
+    limite = (politica or politica_vigente()).politicas["limite_diaria_hotel"][cargo]
+    rng = np.random.default_rng(_semente(semente, destino, dias_viagem, cargo))
+    noites = max(1, dias_viagem - 1)
+    categorias = ["Padrão"] + list(rng.choice(CATEGORIAS_HOTEL, n_opcoes - 1, p=[0.45, 0.4, 0.15]))
+    nomes = rng.choice(NOMES_HOTEL, n_opcoes, replace=False)
+    hoteis = []
+    for k, categoria in enumerate(categorias):
+        media, desvio = DIARIA_CATEGORIA[categoria]
+        diaria = int(max(150, rng.normal(media, desvio)))
+        if k == 0:
+            diaria = min(diaria, limite)
+        hoteis.append({
+            "hotel": f"{nomes[k]} {destino}",
+            "categoria": str(categoria),
+            "diaria": diaria,
+            "noites": noites,
+            "custo_total": diaria * noites,
+        })
+    return hoteis
+
+
+# =========================================================
+# Modo em massa (NumPy) para testes de carga
+# =========================================================
+def gerar_voos_em_massa(n: int, semente: int = SEMENTE_PADRAO, data_base: date | None = None) -> pd.DataFrame:
+    """n voos sintéticos (rotas entre AEROPORTOS, preço log-normal em torno do base da rota)."""
+    rng = np.random.default_rng(semente)
+    data_base = data_base or date.today()
+    n_aero = len(AEROPORTOS)
+    i_orig = rng.integers(0, n_aero, n)
+    i_dest = (i_orig + rng.integers(1, n_aero, n)) % n_aero
+    precos = _matriz_precos_base()[i_orig, i_dest] * rng.lognormal(0.0, 0.25, n)
+    aero = np.array(AEROPORTOS)
+    datas = np.datetime64(data_base) + rng.integers(0, 180, n).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "origem": aero[i_orig],
+        "destino": aero[i_dest],
+        "trecho": np.char.add(np.char.add(aero[i_orig], " → "), aero[i_dest]),
+        "data": datas,
+        "partida": np.array(HORARIOS)[rng.integers(0, len(HORARIOS), n)],
+        "cia": np.array(CIAS)[rng.integers(0, len(CIAS), n)],
+        "preco": np.clip(precos, 250, 4000).astype(np.int64),
+    })
+
+
+def _diarias_em_massa(rng, i_cat: np.ndarray) -> np.ndarray:
+    medias = np.array([DIARIA_CATEGORIA[c][0] for c in CATEGORIAS_HOTEL])
+    desvios = np.array([DIARIA_CATEGORIA[c][1] for c in CATEGORIAS_HOTEL])
+    return np.maximum(150, rng.normal(medias[i_cat], desvios[i_cat])).astype(np.int64)
+
+
+def gerar_hoteis_em_massa(n: int, semente: int = SEMENTE_PADRAO) -> pd.DataFrame:
+    """n ofertas de hotel sintéticas em destinos de AEROPORTOS."""
+    rng = np.random.default_rng(semente)
+    i_cat = rng.choice(len(CATEGORIAS_HOTEL), n, p=[0.45, 0.4, 0.15])
+    diarias = _diarias_em_massa(rng, i_cat)
+    noites = rng.integers(1, 8, n)
+    destinos = np.array(AEROPORTOS)[rng.integers(0, len(AEROPORTOS), n)]
+    return pd.DataFrame({
+        "destino": destinos,
+        "hotel": np.char.add(np.char.add(np.array(NOMES_HOTEL)[rng.integers(0, len(NOMES_HOTEL), n)], " "), destinos),
+        "categoria": np.array(CATEGORIAS_HOTEL)[i_cat],
+        "diaria": diarias,
+        "noites": noites,
+        "custo_total": diarias * noites,
+    })
+
+
+def ajuda_custo_em_massa(cargos, dias, politica=None) -> np.ndarray:
+    """Equivalente vetorizado de calcular_ajuda_custo (na versão de política dada, ou na vigente hoje)."""
+    return (politica or politica_vigente()).ajuda_custo_array(cargos, dias)
+
+
+def gerar_solicitacoes_em_massa(n: int, semente: int = SEMENTE_PADRAO, data_base: date | None = None) -> pd.DataFrame:
+    """
+    n solicitações completas, com as colunas dos registros do app (campos de voo e
+    hotel achatados: preco_ida, cia_ida, hotel_diaria, hotel_categoria, ...), status
+    de política calculado e colunas auxiliares do dashboard.
+    """
+    rng = np.random.default_rng(semente)
+    data_base = data_base or date.today()
+    n_aero = len(AEROPORTOS)
+    i_cargo = rng.choice(len(CARGOS), n, p=PESO_CARGO)
+    cargos = _categorico(i_cargo, CARGOS)
+    i_orig = rng.integers(0, n_aero, n)
+    i_dest = (i_orig + rng.integers(1, n_aero, n)) % n_aero
+    base = _matriz_precos_base()[i_orig, i_dest] * FATOR_PRECO_CARGO[i_cargo]
+    preco_ida = np.clip(base * rng.lognormal(0.0, 0.25, n), 250, 4000).astype(np.int64)
+    preco_volta = np.clip(base * rng.lognormal(0.0, 0.25, n), 250, 4000).astype(np.int64)
+
+    # Criação espalhada nos últimos 365 dias; antecedência concentrada em 3-20 dias
+    criado = np.datetime64(data_base) - rng.integers(0, 365, n).astype("timedelta64[D]")
+    antecedencia = np.maximum(0, rng.gamma(3.0, 4.0, n)).astype(np.int64)
+    dias = rng.integers(1, 8, n)
+    data_ida = criado + antecedencia.astype("timedelta64[D]")
+    data_volta = data_ida + (dias - 1).astype("timedelta64[D]")
+
+    u = rng.random(n)[:, None]
+    i_cat = (u > PROB_CATEGORIA_CARGO[i_cargo].cumsum(axis=1)).sum(axis=1).clip(0, len(CATEGORIAS_HOTEL) - 1)
+    diaria = _diarias_em_massa(rng, i_cat)
+    noites = np.maximum(1, dias - 1)
+    categoria = _categorico(i_cat, CATEGORIAS_HOTEL)
+
+    ajuda = ajuda_custo_em_massa(cargos, dias)
+    custo_hotel = diaria * noites
+    custo_voos = preco_ida + preco_volta
+    status, mascara = classificar_arrays(antecedencia, cargos, preco_ida, preco_volta, diaria, categoria)
+    trechos = [f"{o} → {d}" for o in AEROPORTOS for d in AEROPORTOS]
+    i_aprov = rng.choice(3, n, p=[0.3, 0.6, 0.1])
+    nomes_colab = [f"Colaborador {k}" for k in range(1, 5000)]
+
+    # Campos repetitivos como Categorical (códigos inteiros): geração rápida e memória baixa
+    return pd.DataFrame({
+        "colaborador": _categorico(rng.integers(0, len(nomes_colab), n), nomes_colab),
+        "area": _categorico(rng.integers(0, len(AREAS), n), AREAS),
+        "cargo": _categorico(i_cargo, CARGOS),
+        "origem": _categorico(i_orig, AEROPORTOS),
+        "destino": _categorico(i_dest, AEROPORTOS),
+        "data_ida": _datas_categoricas(data_ida),
+        "data_volta": _datas_categoricas(data_volta),
+        "dias_viagem": dias,
+        "antecedencia": antecedencia,
+        "motivo": _categorico(np.zeros(n, dtype=np.int64), ["Reunião com cliente"]),
+        "cia_ida": _categorico(rng.integers(0, len(CIAS), n), CIAS),
+        "partida_ida": _categorico(rng.integers(0, len(HORARIOS), n), HORARIOS),
+        "preco_ida": preco_ida,
+        "cia_volta": _categorico(rng.integers(0, len(CIAS), n), CIAS),
+        "partida_volta": _categorico(rng.integers(0, len(HORARIOS), n), HORARIOS),
+        "preco_volta": preco_volta,
+        "hotel_nome": _categorico(rng.integers(0, len(NOMES_HOTEL), n), [f"{h} Hotel" for h in NOMES_HOTEL]),
+        "hotel_categoria": _categorico(i_cat, CATEGORIAS_HOTEL),
+        "hotel_diaria": diaria,
+        "hotel_noites": noites,
+        "ajuda_custo": ajuda,
+        "total_previsto": custo_voos + custo_hotel + ajuda,
+        "status": _categorico((mascara != 0).astype(np.int64), [STATUS_DENTRO, STATUS_FORA]),
+        "alertas_mask": mascara,
+        "aprovacao": _categorico(i_aprov, ["Pendente", "Aprovado ✅", "Reprovado ❌"]),
+        "comentario_gestor": _categorico(np.zeros(n, dtype=np.int64), [""]),
+        "criado_em": _datas_categoricas(criado, sufixo="T09:00:00"),
+        "custo_voos": custo_voos,
+        "custo_hotel": custo_hotel,
+        "trecho_ida": _categorico(i_orig * n_aero + i_dest, trechos),
+        "trecho_volta": _categorico(i_dest * n_aero + i_orig, trechos),
+    })
+
+
+def _categorico(codigos: np.ndarray, categorias: list) -> pd.Categorical:
+    return pd.Categorical.from_codes(codigos, categories=categorias)
+
+
+def _datas_categoricas(datas: np.ndarray, sufixo: str = "") -> pd.Categorical:
+    """Datas (datetime64[D]) como Categorical de strings ISO, convertendo só os dias distintos."""
+    dias, codigos = np.unique(datas.astype("datetime64[D]"), return_inverse=True)
+    return _categorico(codigos.reshape(-1), [d + sufixo for d in np.datetime_as_string(dias, unit="D")])
+
+
+def _numero(valor):
+    """int para valores inteiros (dados simulados); float quando há centavos (dados importados)."""
+    valor = float(valor)
+    return int(valor) if valor.is_integer() else valor
+
+
+def registros_de_lote(df: pd.DataFrame):
+    """
+    Gera os registros no formato aninhado do app (voo_ida/voo_volta/hotel), linha a
+    linha. Os alertas saem com as mensagens da versão de política vigente na ida.
+    """
+    versoes = np.empty(len(df), dtype=object)
+    for pc, linhas in agrupar_por_vigencia(df["data_ida"].to_numpy()):
+        versoes[linhas] = pc
+    for linha, pc in zip(df.itertuples(index=False), versoes):
+        yield {
+            "colaborador": linha.colaborador,
+            "area": linha.area,
+            "cargo": linha.cargo,
+            "origem": linha.origem,
+            "destino": linha.destino,
+            "data_ida": linha.data_ida,
+            "data_volta": linha.data_volta,
+            "dias_viagem": int(linha.dias_viagem),
+            "motivo": linha.motivo,
+            "voo_ida": {"trecho": linha.trecho_ida, "data": linha.data_ida, "partida": linha.partida_ida,
+                        "cia": linha.cia_ida, "preco": _numero(linha.preco_ida)},
+            "voo_volta": {"trecho": linha.trecho_volta, "data": linha.data_volta, "partida": linha.partida_volta,
+                          "cia": linha.cia_volta, "preco": _numero(linha.preco_volta)},
+            "hotel": {"hotel": linha.hotel_nome, "categoria": linha.hotel_categoria,
+                      "diaria": _numero(linha.hotel_diaria), "noites": int(linha.hotel_noites),
+                      "custo_total": _numero(linha.custo_hotel)},
+            "ajuda_custo": _numero(linha.ajuda_custo),
+            "total_previsto": _numero(linha.total_previsto),
+            "status": linha.status,
+            "alertas": alertas_da_mascara(linha.alertas_mask, pc),
+            "aprovacao": linha.aprovacao,
+            "comentario_gestor": linha.comentario_gestor,
+            "criado_em": linha.criado_em,
+            "custo_voos": _numero(linha.custo_voos),
+            "custo_hotel": _numero(linha.custo_hotel),
+            "trecho_ida": linha.trecho_ida,
+            "trecho_volta": linha.trecho_volta,
+        }
@@ -0,0 +1,344 @@
+# skyscanner.py - Integração com a API de voos da Skyscanner (Indicative e Live Search)
+import logging
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache, partial
+
+import requests
+
+from viagens.aeroportos import expandir
+from viagens.cache_tarifas import CacheTarifas, chave_tarifa
+from viagens.metricas import cronometrado, medir
+from viagens.simulacao import simula_voos
+
+log = logging.getLogger(__name__)
+
+API_KEY_SKYSCANNER = "/apiservices/v3/voos/indicativo/pesquisa"
+URL_SKYSCANNER_VOOS = "https://partners.api.skyscanner.net/apiservices/v3/flights"
+VARIAVEL_URL = "VIAGENS_SKYSCANNER_URL"  # aponta a integração para outro servidor (ex.: benchmarks/duble_skyscanner.py)
+TIMEOUT_REQUISICAO_S = 20   # teto por chamada HTTP
+PRAZO_BUSCA_VOOS_S = 25     # prazo único para a busca completa (ida + volta)
+POLL_INTERVALO_INICIAL_S = 0.2  # backoff do polling do Live Search
+POLL_INTERVALO_MAXIMO_S = 2.0
+LIVE_STATUS_COMPLETO = "RESULT_STATUS_COMPLETE"
+TRECHOS_EM_PARALELO = 32     # consultas simultâneas à API por processo (app, CLI e API HTTP)
+# Respostas transitórias (limite de requisições, indisponibilidade): novas tentativas
+# com espera exponencial (ou a do Retry-After), dentro do prazo da busca
+STATUS_TRANSITORIOS = {429, 502, 503, 504}
+MAX_TENTATIVAS = 3
+ESPERA_INICIAL_S = 0.25
+
+# Recursos compartilhados por processo (todas as sessões do app)
+@lru_cache(maxsize=None)
+def sessao_http() -> requests.Session:
+    """Sessão HTTP compartilhada: conexões keep-alive reaproveitadas entre buscas e sessões."""
+    sessao = requests.Session()
+    adaptador = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)  # servidores locais (dublês da API em testes de carga)
+    sessao.headers.update({"x-api-key": API_KEY_SKYSCANNER, "Content-Type": "application/json"})
+    return sessao
+
+@lru_cache(maxsize=None)
+def cache_tarifas() -> CacheTarifas:
+    """Cache de tarifas único por processo; camada em disco se VIAGENS_CACHE_TARIFAS estiver definido."""
+    return CacheTarifas(caminho_disco=os.environ.get("VIAGENS_CACHE_TARIFAS"))
+
+@lru_cache(maxsize=None)
+def executor_buscas() -> ThreadPoolExecutor:
+    """Pool de threads para buscar os trechos em paralelo."""
+    return ThreadPoolExecutor(max_workers=TRECHOS_EM_PARALELO, thread_name_prefix="busca-voos")
+
+def _tempo_restante(prazo: float) -> float:
+    """Timeout da próxima chamada: o menor entre o teto por chamada e o que resta do prazo."""
+    restante = prazo - time.monotonic()
+    if restante <= 0:
+        raise TimeoutError("Prazo da busca de voos esgotado.")
+    return min(TIMEOUT_REQUISICAO_S, restante)
+
+def url_base_voos(url_base: str | None = None) -> str:
+    """URL base da API de voos: o argumento, a variável VIAGENS_SKYSCANNER_URL ou a da Skyscanner."""
+    return (url_base or os.environ.get(VARIAVEL_URL) or URL_SKYSCANNER_VOOS).rstrip("/")
+
+def _espera_retry(resposta: requests.Response, padrao: float) -> float:
+    try:
+        return float(resposta.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return padrao
+
+def _post(sessao: requests.Session, url: str, prazo: float, span: str, **kwargs) -> requests.Response:
+    """
+    POST com timeout pelo prazo da busca. Respostas transitórias (429, 502-504) são
+    repetidas até MAX_TENTATIVAS se a espera couber no prazo; as demais falhas,
+    ou a última tentativa, levantam requests.HTTPError.
+    """
+    espera = ESPERA_INICIAL_S
+    for tentativa in range(1, MAX_TENTATIVAS + 1):
+        with medir(span):
+            r = sessao.post(url, timeout=_tempo_restante(prazo), **kwargs)
+            if r.status_code not in STATUS_TRANSITORIOS or tentativa == MAX_TENTATIVAS:
+                r.raise_for_status()
+                return r
+        espera = _espera_retry(r, espera)
+        if prazo - time.monotonic() <= espera:
+            r.raise_for_status()
+        with medir("skyscanner.http.espera_retry"):
+            time.sleep(espera)
+        espera *= 2
+
+def _simula_trecho(trecho_desc: str, data_str: str) -> list:
+    """Fallback de simulação para um único trecho."""
+    origem, destino = trecho_desc.split(" → ")
+    return simula_voos(origem, destino, date.fromisoformat(data_str), date.fromisoformat(data_str))[0]
+
+def extrair_voos(resp_json, trecho_desc, data_str, limite: int | None = 4) -> list:
+    """
+    Converte os itinerários de uma resposta Skyscanner (Indicative ou Live) em voos
+    do app. Itinerários sem preço são descartados (não viram cotação inventada).
+    """
+    voos = []
+    agents = resp_json.get("content", {}).get("results", {}).get("agents", {})
+    itinerarios = resp_json.get("itineraries", []) or resp_json.get("content", {}).get("results", {}).get("itineraries", [])
+    if isinstance(itinerarios, dict):
+        itinerarios = list(itinerarios.values())
+    for i in itinerarios:
+        if limite is not None and len(voos) >= limite:
+            break
+        if not isinstance(i, dict):
+            continue
+        preco = i.get("price", {}).get("amount") or i.get("pricingOptions", [{}])[0].get("price", {}).get("amount")
+        if preco is None:
+            continue
+        agent_id = i.get("pricingOptions", [{}])[0].get("agentIds", [None])[0]
+        voos.append({
+            "trecho": trecho_desc,
+            "data": data_str,
+            "partida": "00:00",
+            "cia": agents.get(agent_id, {}).get("name", "—"),
+            "preco": preco
+        })
+    return voos
+
+@cronometrado("skyscanner.parse_indicative")
+def parse_indicative(resp_json, trecho_desc, data_str):
+    """
+    Como extrair_voos (até 4 opções). Resposta sem itinerários com preço levanta
+    LookupError: a busca trata como falha do trecho (aviso, simulação fora do cache).
+    """
+    voos = extrair_voos(resp_json, trecho_desc, data_str)
+    if not voos:
+        raise LookupError("nenhum itinerário retornado")
+    return voos
+
+def _buscar_trechos_em_paralelo(consultas: list, prazo: float, rotulo: str, ao_receber=None, aviso=None):
+    """
+    Executa a consulta de cada trecho no pool de threads, todos sob o mesmo prazo.
+    consultas: lista de (trecho_desc, data_str, funcao(publicar), chave_cache); a
+    função pode chamar publicar(voos) com resultados parciais antes de retornar.
+    Trechos presentes no cache de tarifas não são consultados; só os concluídos
+    com itinerários da API são gravados nele (parciais, respostas vazias e
+    simulações de falha, não: a próxima busca consulta de novo).
+    Os parciais (ao_receber(indice_trecho, voos)) e os avisos de falha
+    (aviso(mensagem)) são entregues aqui, na thread de quem chamou (no app, o st.*
+    não funciona nas workers). Trecho que estoura o prazo fica com o último
+    parcial publicado; sem parcial, ou em caso de erro, cai para simulação.
+    """
+    executor = executor_buscas()
+    cache = cache_tarifas()
+    fila = queue.Queue()
+    em_cache = [cache.obter(chave) for _, _, _, chave in consultas]
+    futuros = [None if em_cache[indice] is not None
+               else executor.submit(consulta, partial(lambda i, voos: fila.put((i, voos)), indice))
+               for indice, (_, _, consulta, _) in enumerate(consultas)]
+    parciais = {}
+    pendentes = {f for f in futuros if f is not None}
+    # Cada trecho concluído também avisa pela fila: o laço acorda na hora, sem esperar o timeout
+    for futuro in pendentes:
+        futuro.add_done_callback(lambda _: fila.put(None))
+    while pendentes or not fila.empty():
+        restante = prazo - time.monotonic()
+        try:
+            item = fila.get(timeout=max(0, min(0.1, restante)))
+            if item is not None:
+                indice, voos = item
+                parciais[indice] = voos
+                if ao_receber:
+                    ao_receber(indice, voos)
+                continue
+        except queue.Empty:
+            pass
+        pendentes = {f for f in pendentes if not f.done()}
+        if not pendentes or restante <= 0:
+            break
+    resultados = []
+    for indice, ((trecho_desc, data_str, _, chave), futuro) in enumerate(zip(consultas, futuros)):
+        if futuro is None:
+            resultados.append(em_cache[indice])
+            continue
+        try:
+            if not futuro.done():
+                futuro.cancel()
+                raise TimeoutError("prazo da busca esgotado")
+            voos = futuro.result()
+            if voos:  # só resultados vindos da API; vazio nunca fica no cache
+                cache.gravar(chave, voos)
+            resultados.append(voos)
+        except Exception as e:
+            # Com resultados parciais (Live Search interrompido), ficam eles; sem, simulação
+            if parciais.get(indice):
+                (aviso or log.warning)(f"Consulta {rotulo} ({trecho_desc}) incompleta: {e}. "
+                                       f"Usando os {len(parciais[indice])} resultados já recebidos.")
+                resultados.append(parciais[indice])
+                continue
+            (aviso or log.warning)(f"Falha na consulta {rotulo} ({trecho_desc}): {e}. Usando simulação para este trecho.")
+            resultados.append(_simula_trecho(trecho_desc, data_str))
+    return resultados
+
+def _pares_de_consulta(origem: str, destino: str, data_ida: date, data_volta: date) -> list:
+    """
+    (perna, origem, destino, data) de cada consulta: origem ou destino de região
+    (SAO, RIO...) vira uma consulta por aeroporto (perna 0 = ida, 1 = volta).
+    """
+    pares = [(o, d) for o in expandir(origem) for d in expandir(destino) if o != d] or [(origem, destino)]
+    return [(0, o, d, data_ida) for o, d in pares] + [(1, d, o, data_volta) for o, d in pares]
+
+def _juntar_pernas(pares: list, resultados: list) -> tuple:
+    """(voos_ida, voos_volta) a partir dos resultados por consulta; vários aeroportos: do mais barato ao mais caro."""
+    pernas = ([], [])
+    for (perna, *_), voos in zip(pares, resultados):
+        pernas[perna].extend(voos)
+    if len(pares) > 2:
+        for voos in pernas:
+            voos.sort(key=lambda v: v["preco"])
+    return pernas
+
+def _parciais_por_perna(pares: list, ao_receber):
+    """Adapta ao_receber(perna, voos) aos parciais por consulta, juntando os aeroportos de cada perna."""
+    if ao_receber is None or len(pares) == 2:
+        return ao_receber
+    parciais = {}
+
+    def receber(indice, voos):
+        parciais[indice] = voos
+        perna = pares[indice][0]
+        ao_receber(perna, sorted((v for i, lote in parciais.items() if pares[i][0] == perna for v in lote),
+                                 key=lambda v: v["preco"]))
+    return receber
+
+def _payload_indicative(origem: str, destino: str, data: date, adultos: int) -> dict:
+    return {
+        "query": {
+            "market": "BR",
+            "locale": "pt-BR",
+            "currency": "BRL",
+            "originPlace": {"iata": origem},
+            "destinationPlace": {"iata": destino},
+            "outboundDate": {"year": data.year, "month": data.month, "day": data.day},
+            "adults": adultos
+        }
+    }
+
+def _payload_live(origem: str, destino: str, data: date, adultos: int) -> dict:
+    return {
+        "query": {
+            "market": "BR",
+            "locale": "pt-BR",
+            "currency": "BRL",
+            "queryLegs": [
+                {
+                    "originPlace": {"iata": origem},
+                    "destinationPlace": {"iata": destino},
+                    "date": {"year": data.year, "month": data.month, "day": data.day}
+                }
+            ],
+            "adults": adultos
+        }
+    }
+
+@cronometrado("skyscanner.buscar_voos_indicative")
+def buscar_voos_indicative(origem: str, destino: str, data_ida: date, data_volta: date, adultos: int = 1,
+                           aviso=None, url_base: str | None = None, prazo_s: float | None = None):
+    """
+    Consulta preços indicativos (cacheados) via Skyscanner:
+    POST https://partners.api.skyscanner.net/apiservices/v3/flights/indicative/search
+    Ida e volta são consultadas em paralelo, sob um prazo único (prazo_s, padrão
+    PRAZO_BUSCA_VOOS_S); origem ou destino de região (SAO, RIO...) consulta cada
+    aeroporto dela. Falhas por trecho são reportadas via aviso(mensagem)
+    (padrão: logging). url_base: ver url_base_voos.
+    Retorna lista de voos no formato do app.
+    """
+    prazo = time.monotonic() + (prazo_s or PRAZO_BUSCA_VOOS_S)
+    sessao = sessao_http()
+    base = url_base_voos(url_base)
+
+    def consulta(payload, trecho_desc, data_str, publicar):
+        r = _post(sessao, f"{base}/indicative/search", prazo, "skyscanner.http.indicative_search", json=payload)
+        return parse_indicative(r.json(), trecho_desc, data_str)
+
+    pares = _pares_de_consulta(origem, destino, data_ida, data_volta)
+    consultas = [
+        (f"{o} → {d}", str(dt), partial(consulta, _payload_indicative(o, d, dt, adultos), f"{o} → {d}", str(dt)),
+         chave_tarifa("indicative", o, d, dt, adultos))
+        for _, o, d, dt in pares
+    ]
+    return _juntar_pernas(pares, _buscar_trechos_em_paralelo(consultas, prazo, "Indicative", aviso=aviso))
+
+@cronometrado("skyscanner.buscar_voos_live")
+def buscar_voos_live(origem: str, destino: str, data_ida: date, data_volta: date, adultos: int = 1,
+                     ao_receber=None, aviso=None, url_base: str | None = None, prazo_s: float | None = None):
+    """
+    Consulta voos em tempo real via Skyscanner Live Search:
+    - POST /flights/live/search/create
+    - POST /flights/live/search/poll/{sessionToken}, repetido com backoff até o
+      status completo ou o fim do prazo
+    Ida e volta são consultadas em paralelo, sob um prazo único. Cada lote de
+    itinerários (do mais barato ao mais caro) é entregue a ao_receber(indice, voos)
+    assim que chega (0 = ida, 1 = volta); falhas por trecho vão para aviso(mensagem).
+    Se um poll falhar depois de algum lote, o trecho fica com os itinerários já
+    recebidos. Regiões, url_base e prazo_s: como em buscar_voos_indicative (com
+    vários aeroportos, os parciais de cada perna já vêm juntos).
+    Retorna lista de voos no formato do app.
+    """
+    prazo = time.monotonic() + (prazo_s or PRAZO_BUSCA_VOOS_S)
+    sessao = sessao_http()
+    base = url_base_voos(url_base)
+
+    def create_and_poll(payload, trecho_desc, data_str, publicar):
+        r_create = _post(sessao, f"{base}/live/search/create", prazo, "skyscanner.http.live_create", json=payload)
+        data_json = r_create.json()
+        session_token = data_json.get("sessionToken")
+        if not session_token:
+            raise ValueError("Session token não retornado.")
+        voos = []
+        intervalo = POLL_INTERVALO_INICIAL_S
+        while True:
+            lote = sorted(extrair_voos(data_json, trecho_desc, data_str, limite=None), key=lambda v: v["preco"])
+            if lote:
+                voos = lote
+                publicar(voos)
+            if data_json.get("status") == LIVE_STATUS_COMPLETO:
+                break
+            # Sem tempo para esperar + consultar de novo: o trecho fica com os parciais já publicados
+            if prazo - time.monotonic() <= intervalo:
+                raise TimeoutError("prazo esgotado antes do status completo")
+            time.sleep(intervalo)
+            intervalo = min(intervalo * 2, POLL_INTERVALO_MAXIMO_S)
+            r_poll = _post(sessao, f"{base}/live/search/poll/{session_token}", prazo, "skyscanner.http.live_poll")
+            data_json = r_poll.json()
+        if not voos:
+            # Sem itinerários: falha (simulação, fora do cache), não um resultado válido
+            raise LookupError("nenhum itinerário retornado")
+        return voos
+
+    pares = _pares_de_consulta(origem, destino, data_ida, data_volta)
+    consultas = [
+        (f"{o} → {d}", str(dt), partial(create_and_poll, _payload_live(o, d, dt, adultos), f"{o} → {d}", str(dt)),
+         chave_tarifa("live", o, d, dt, adultos))
+        for _, o, d, dt in pares
+    ]
+    resultados = _buscar_trechos_em_paralelo(consultas, prazo, "Live Search",
+                                             _parciais_por_perna(pares, ao_receber), aviso)
+    return _juntar_pernas(pares, resultados)
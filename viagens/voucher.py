@@ -0,0 +1,170 @@
+# voucher.py - Voucher de viagem em HTML (individual e exportação em lote)
+import string
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+
+from viagens.metricas import cronometrado
+
+# =========================================================
+# Exportação de bilhete/voucher (HTML)
+# =========================================================
+MODELO_VOUCHER = """
+    <html>
+    <head><meta charset="utf-8"><title>Voucher de Viagem</title></head>
+    <body>
+      <h2>Voucher de Viagem - {colaborador}</h2>
+      <p><b>Cargo:</b> {cargo}</p>
+      <p><b>Área:</b> {area}</p>
+      <p><b>Origem/Destino:</b> {origem} → {destino}</p>
+      <p><b>Datas:</b> {data_ida} a {data_volta} ({dias_viagem} dias)</p>
+      <hr>
+      <h3>Voos</h3>
+      <p><b>Ida:</b> {voo_ida.cia} {voo_ida.trecho} {voo_ida.data} {voo_ida.partida} — R$ {voo_ida.preco}</p>
+      <p><b>Volta:</b> {voo_volta.cia} {voo_volta.trecho} {voo_volta.data} {voo_volta.partida} — R$ {voo_volta.preco}</p>
+      <h3>Hotel</h3>
+      <p><b>{hotel.hotel}</b> ({hotel.categoria}) — Diária R$ {hotel.diaria} — {hotel.noites} noites (Total R$ {hotel.custo_total})</p>
+      <h3>Custos</h3>
+      <p><b>Ajuda de custo:</b> R$ {ajuda_custo}</p>
+      <p><b>Total previsto:</b> R$ {total_previsto}</p>
+      <hr>
+      <p><i>Status:</i> {status}</p>
+      <p><i>Motivo da viagem:</i> {motivo}</p>
+      <p><i>Aprovação:</i> {aprovacao}</p>
+      <p><i>Comentário do gestor:</i> {comentario_gestor}</p>
+    </body>
+    </html>
+    """
+
+# Campos opcionais do registro e seus valores padrão
+PADROES_VOUCHER = {"aprovacao": "Pendente", "comentario_gestor": ""}
+
+# Campos de texto livre (digitados no app ou vindos da importação em lote): escapados
+CAMPOS_ESCAPADOS = {
+    "colaborador", "area", "origem", "destino", "motivo", "comentario_gestor",
+    "voo_ida.cia", "voo_ida.trecho", "voo_ida.partida",
+    "voo_volta.cia", "voo_volta.trecho", "voo_volta.partida", "hotel.hotel",
+}
+
+TAMANHO_LOTE_EXPORTACAO = 200
+
+
+def _pegar(chaves: list):
+    """itemgetter que sempre devolve tupla (com uma chave só, itemgetter devolve o valor)."""
+    if len(chaves) == 1:
+        chave = chaves[0]
+        return lambda d: (d[chave],)
+    return itemgetter(*chaves)
+
+
+def _compilar(modelo: str):
+    """
+    Interpreta o modelo uma única vez (string.Formatter().parse) num modelo
+    posicional para str.format e nos itemgetters que buscam os valores: um para
+    os campos simples, um por campo aninhado ("voo_ida.cia" = s["voo_ida"]["cia"]).
+    Cada voucher custa poucas chamadas em C em vez de uma função por campo.
+    Os campos de CAMPOS_ESCAPADOS são formatados e escapados para HTML antes.
+    """
+    trechos = list(string.Formatter().parse(modelo))
+    campos = list(dict.fromkeys(campo for _, campo, _, _ in trechos if campo))
+    simples = [c for c in campos if "." not in c and c not in PADROES_VOUCHER]
+    padroes = [c for c in campos if c in PADROES_VOUCHER]
+    aninhados: dict = {}
+    for campo in campos:
+        if "." in campo:
+            raiz, chave = campo.split(".", 1)
+            if "." in chave:
+                raise ValueError(f"Campo do modelo com mais de um nível: {campo}")
+            aninhados.setdefault(raiz, []).append(chave)
+
+    # Ordem dos valores: simples, aninhados (por raiz) e opcionais
+    ordem = simples + [f"{raiz}.{chave}" for raiz, chaves in aninhados.items() for chave in chaves] + padroes
+    posicao = {campo: i for i, campo in enumerate(ordem)}
+    formatos = {campo: formato for _, campo, formato, _ in trechos if campo}
+    escapados = [(posicao[c], formatos[c] or "") for c in ordem if c in CAMPOS_ESCAPADOS]
+
+    plano = []
+    for literal, campo, formato, _ in trechos:
+        plano.append(literal.replace("{", "{{").replace("}", "}}"))
+        if campo:
+            # Campo escapado já chega como texto formatado
+            especificacao = f":{formato}" if formato and campo not in CAMPOS_ESCAPADOS else ""
+            plano.append(f"{{{posicao[campo]}{especificacao}}}")
+    plano = "".join(plano)
+
+    pegar_simples = _pegar(simples) if simples else (lambda s: ())
+    pegar_raizes = _pegar(list(aninhados)) if aninhados else (lambda s: ())
+    pegar_aninhados = [_pegar(chaves) for chaves in aninhados.values()]
+    opcionais = [(campo, PADROES_VOUCHER[campo]) for campo in padroes]
+
+    def renderizar(s: dict) -> str:
+        valores = list(pegar_simples(s))
+        for pegar, sub in zip(pegar_aninhados, pegar_raizes(s)):
+            valores += pegar(sub)
+        valores += [s.get(campo, padrao) for campo, padrao in opcionais]
+        for i, formato in escapados:
+            # replace encadeado: bem mais rápido que str.translate com dicionário ("&" primeiro)
+            valores[i] = format(valores[i], formato).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        return plano.format(*valores)
+    return renderizar
+
+
+_renderizar_voucher = _compilar(MODELO_VOUCHER)
+
+
+@cronometrado("voucher.gerar_html")
+def gerar_voucher_html(solic: dict) -> str:
+    """Gera um voucher HTML simples para registro da viagem."""
+    return _renderizar_voucher(solic)
+
+
+def nome_voucher(solic: dict) -> str:
+    return f"voucher_{solic['id']}.html"
+
+
+def _renderizar_lote(lote: list) -> list:
+    """Executado nos processos auxiliares: devolve [(nome do arquivo, HTML em bytes)]."""
+    # Direto na função compilada: no lote, o span é a exportação inteira
+    return [(nome_voucher(s), _renderizar_voucher(s).encode("utf-8")) for s in lote]
+
+
+def _lotes(registros, tamanho: int):
+    iterador = iter(registros)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+@cronometrado("voucher.exportar_zip")
+def exportar_vouchers_zip(registros, destino, processos: int = 0,
+                          tamanho_lote: int = TAMANHO_LOTE_EXPORTACAO) -> int:
+    """
+    Grava os vouchers das solicitações num ZIP (caminho ou arquivo binário aberto),
+    um arquivo voucher_<id>.html por solicitação. registros pode ser um gerador
+    (ex.: repo.iterar(...)): os documentos são renderizados e gravados lote a lote,
+    sem manter todos em memória. Com processos > 0, os lotes são renderizados em
+    paralelo por um pool de processos, com no máximo 2 lotes por processo em voo.
+    Devolve a quantidade de vouchers exportados.
+    """
+    total = 0
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        def gravar(renderizados):
+            nonlocal total
+            for nome, conteudo in renderizados:
+                zf.writestr(nome, conteudo)
+            total += len(renderizados)
+
+        if processos <= 0:
+            for lote in _lotes(registros, tamanho_lote):
+                gravar(_renderizar_lote(lote))
+            return total
+
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            pendentes = []
+            for lote in _lotes(registros, tamanho_lote):
+                pendentes.append(executor.submit(_renderizar_lote, lote))
+                if len(pendentes) >= 2 * processos:
+                    gravar(pendentes.pop(0).result())
+            for futuro in pendentes:
+                gravar(futuro.result())
+    return total